@@ -139,7 +139,7 @@ namespace CloacaGuiDemo
         {
             var future = new FutureVoidAwaiter(scheduler, context);
             scheduler.NotifyBlocked(context, future);
-            mock_sleep_subsystem_daemon(future, (int)(sleepTime.InternalValue * 1000.0m));
+            mock_sleep_subsystem_daemon(future, (int)(sleepTime.InternalValue * 1000.0));
             await future;
             return future;
         }
@@ -178,9 +178,9 @@ namespace CloacaGuiDemo
         public async Task<PyTuple> get_player_pos_wrapper(IInterpreter interpreter, FrameContext context)
         {
             PyFloat f1 = (PyFloat) await PyFloatClass.Instance.Call(interpreter, context, new object[0]);
-            f1.InternalValue = Decimal.Parse(playerXLabel.Text);
+            f1.InternalValue = double.Parse(playerXLabel.Text);
             PyFloat f2 = (PyFloat)await PyFloatClass.Instance.Call(interpreter, context, new object[0]);
-            f2.InternalValue = Decimal.Parse(playerYLabel.Text);
+            f2.InternalValue = double.Parse(playerYLabel.Text);
 
             var tuples = new PyObject[2]
             {
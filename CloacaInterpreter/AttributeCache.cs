@@ -0,0 +1,183 @@
+﻿using System;
+using System.Collections.Concurrent;
+
+using LanguageImplementation;
+using LanguageImplementation.DataTypes;
+
+namespace CloacaInterpreter
+{
+    /// <summary>
+    /// Inline cache for LOAD_ATTR and LOAD_METHOD. Each site remembers the class it last looked its attribute up in,
+    /// that class's VersionTag, and what the walk through the class and its bases turned up. While objects of the same
+    /// class keep coming through and the class hasn't changed, the walk is skipped. An object's own attributes are still
+    /// checked first so they shadow the class's like usual.
+    ///
+    /// Only objects using the stock attribute lookup get cached. Anything overriding __getattribute__, TryGetAttribute,
+    /// or TryGetUnboundAttribute, like super() proxies and .NET namespace modules, goes through ObjectResolver every
+    /// time.
+    /// </summary>
+    public class AttributeCache
+    {
+        private enum Lookup
+        {
+            Uncached,
+            Instance,       // Stock PyObject lookup: the object's __dict__ and then its class.
+            Class,          // Stock PyClass lookup: the class's __dict__ and then its bases.
+        }
+
+        private static ConcurrentDictionary<Type, Lookup> lookups = new ConcurrentDictionary<Type, Lookup>();
+
+        private readonly PyClass cachedClass;
+        private readonly int versionTag;
+        private readonly object value;
+        private readonly bool found;
+
+        private AttributeCache(PyClass cachedClass, int versionTag, object value, bool found)
+        {
+            this.cachedClass = cachedClass;
+            this.versionTag = versionTag;
+            this.value = value;
+            this.found = found;
+        }
+
+        private static Lookup lookupFor(Type objType)
+        {
+            Lookup lookup;
+            if(!lookups.TryGetValue(objType, out lookup))
+            {
+                var getattribute = objType.GetMethod("__getattribute__", new Type[] { typeof(string) });
+                var tryGetAttribute = objType.GetMethod("TryGetAttribute", new Type[] { typeof(string), typeof(object).MakeByRefType() });
+                var tryGetUnbound = objType.GetMethod("TryGetUnboundAttribute");
+                if(getattribute.DeclaringType != typeof(PyObject) || tryGetAttribute.DeclaringType != typeof(PyObject))
+                {
+                    lookup = Lookup.Uncached;
+                }
+                else if(tryGetUnbound.DeclaringType == typeof(PyObject))
+                {
+                    lookup = Lookup.Instance;
+                }
+                else if(tryGetUnbound.DeclaringType == typeof(PyClass))
+                {
+                    lookup = Lookup.Class;
+                }
+                else
+                {
+                    lookup = Lookup.Uncached;
+                }
+                lookups[objType] = lookup;
+            }
+            return lookup;
+        }
+
+        /// <summary>
+        /// Gets an attribute for the LOAD_ATTR at the given offset. This gives the same results as
+        /// ObjectResolver.TryGetValue().
+        /// </summary>
+        /// <param name="code">The code the LOAD_ATTR is in.</param>
+        /// <param name="offset">Where the LOAD_ATTR is in the code.</param>
+        /// <param name="attrName">The attribute to get.</param>
+        /// <param name="rawObject">The object to get it from.</param>
+        /// <param name="value">The attribute, bound into a PyMethod if it's callable.</param>
+        /// <returns>False if the object doesn't have the attribute.</returns>
+        public static bool TryGetValue(CodeByteArray code, int offset, string attrName, object rawObject, out object value)
+        {
+            if(!tryLookup(code, offset, attrName, rawObject, out value))
+            {
+                return ObjectResolver.TryGetValue(attrName, rawObject, out value);
+            }
+            value = bind((PyObject)rawObject, attrName, value);
+            return true;
+        }
+
+        /// <summary>
+        /// Gets an attribute for the LOAD_METHOD at the given offset. When TryGetValue() would have bound the attribute
+        /// into a PyMethod, this returns the callable as-is instead so the caller can pass the object as self itself.
+        /// </summary>
+        /// <param name="code">The code the LOAD_METHOD is in.</param>
+        /// <param name="offset">Where the LOAD_METHOD is in the code.</param>
+        /// <param name="attrName">The method to get.</param>
+        /// <param name="rawObject">The object to get it from.</param>
+        /// <param name="value">The unbound callable, or the attribute as TryGetValue() would have given it.</param>
+        /// <param name="unbound">True if the returned callable still needs the object as its self argument.</param>
+        /// <returns>False if the object doesn't have the attribute.</returns>
+        public static bool TryGetMethod(CodeByteArray code, int offset, string attrName, object rawObject, out object value, out bool unbound)
+        {
+            if(!tryLookup(code, offset, attrName, rawObject, out value))
+            {
+                unbound = false;
+                return ObjectResolver.TryGetValue(attrName, rawObject, out value);
+            }
+
+            unbound = bindsSelf((PyObject)rawObject, attrName, value);
+            return true;
+        }
+
+        // Does the lookup for objects using the stock attribute lookup. Returns false if something else has to take
+        // care of it, including when the attribute is missing.
+        private static bool tryLookup(CodeByteArray code, int offset, string attrName, object rawObject, out object value)
+        {
+            value = null;
+            var obj = rawObject as PyObject;
+            if(obj == null)
+            {
+                return false;
+            }
+
+            PyClass lookupClass;
+            switch(lookupFor(obj.GetType()))
+            {
+                case Lookup.Instance:
+                    if(obj.__class__ == null)
+                    {
+                        return false;
+                    }
+                    if(obj.TryGetInstanceAttribute(attrName, out value))
+                    {
+                        return true;
+                    }
+                    lookupClass = obj.__class__;
+                    break;
+                case Lookup.Class:
+                    // Classes only fall back to their own __class__ when they have one.
+                    if(obj.__class__ != null)
+                    {
+                        return false;
+                    }
+                    lookupClass = (PyClass)obj;
+                    break;
+                default:
+                    return false;
+            }
+
+            var cache = code.GetInlineCache(offset) as AttributeCache;
+            if(cache == null || cache.cachedClass != lookupClass || cache.versionTag != lookupClass.VersionTag)
+            {
+                // Take the tag before walking so a change in the middle of the walk makes the next lookup walk again.
+                int versionTag = lookupClass.VersionTag;
+                object classValue;
+                bool found = lookupClass.TryGetClassAttribute(attrName, out classValue);
+                cache = new AttributeCache(lookupClass, versionTag, classValue, found);
+                code.SetInlineCache(offset, cache);
+            }
+
+            // A missing attribute goes to the regular path so it can report the AttributeError.
+            value = cache.value;
+            return cache.found;
+        }
+
+        private static bool bindsSelf(PyObject self, string attrName, object value)
+        {
+            return !(self is PyModule) && value is IPyCallable && attrName != "__call__";
+        }
+
+        // Same binding rules as PyClass.__getattribute__.
+        private static object bind(PyObject self, string attrName, object value)
+        {
+            if(bindsSelf(self, attrName, value))
+            {
+                return new PyMethod(self, (IPyCallable)value);
+            }
+            return value;
+        }
+    }
+}
@@ -50,35 +50,14 @@ namespace CloacaInterpreter
 
         public static bool isinstance(PyObject obj, PyClass _class)
         {
-            return obj.__class__ == _class;
+            return obj.__class__ != null && obj.__class__.IsSubclassOf(_class);
         }
 
         public static bool issubclass(PyClass child, PyClass parent)
         {
-            // Same class also qualifies as true; it doesn't technically have to be a child.
-            if(child == parent)
-            {
-                return true;
-            }               
-            if(child.__bases__ == null)
-            {
-                return false;
-            }
-            foreach(var __base__ in child.__bases__)
-            {                
-                if(__base__ == parent)
-                {
-                    return true;
-                }
-                else
-                {
-                    if(isinstance(__base__, parent))
-                    {
-                        return true;
-                    }
-                }
-            }
-            return false;
+            // Same class also qualifies as true; it doesn't technically have to be a child. The class's MRO has
+            // the class itself in it, so that falls out of checking the MRO.
+            return child == parent || (child != null && child.IsSubclassOf(parent));
         }
 
         /// <summary>
@@ -103,8 +82,32 @@ namespace CloacaInterpreter
         public static async Task<object> dir(IInterpreter interpreter, FrameContext context, PyObject o)
         {
             // TODO: Figure out how to switch to Task<PyList> signature without everything hanging.
+            // Instances only carry their own attributes so we have to also walk the class hierarchy for everything else.
+            var names = new HashSet<string>();
+            if(o.HasInstanceDict)
+            {
+                names.UnionWith(o.__dict__.Keys);
+            }
+            var classesToVisit = new Stack<PyClass>();
+            if(o.__class__ != null)
+            {
+                classesToVisit.Push(o.__class__);
+            }
+            while(classesToVisit.Count > 0)
+            {
+                var visiting = classesToVisit.Pop();
+                names.UnionWith(visiting.__dict__.Keys);
+                if(visiting.__bases__ != null)
+                {
+                    foreach(var parentClass in visiting.__bases__)
+                    {
+                        classesToVisit.Push(parentClass);
+                    }
+                }
+            }
+
             var internalList = new List<object>();
-            foreach(var name in o.__dict__.Keys)
+            foreach(var name in names)
             {
                 internalList.Add(PyString.Create(name));
             }
@@ -127,14 +130,14 @@ namespace CloacaInterpreter
             var asPyObject = o as PyObject;
             if(asPyObject != null)
             {
-                if(!asPyObject.__dict__.ContainsKey("__len__"))
+                if(!asPyObject.HasUnboundAttribute("__len__"))
                 {
                     context.CurrentException = TypeErrorClass.Create("TypeError: object of type " + asPyObject.__class__.Name + " has no len()");
                     return null;
                 }
                 else
                 {
-                    var callable_len = asPyObject.__dict__["__len__"] as IPyCallable;
+                    var callable_len = asPyObject.GetUnboundAttribute("__len__") as IPyCallable;
                     if(callable_len == null)
                     {
                         // Yeah, same error as if __len__ was not found in the first place...
@@ -299,7 +302,20 @@ namespace CloacaInterpreter
             }
 
             var built_list = new List<object>();
-            var next_func = (IPyCallable)itr.__dict__["__next__"];
+
+            // Builtin iterators can be drained without calling __next__ and waiting for StopIteration.
+            var asNative = itr as INativeIterator;
+            if (asNative != null && asNative.IsNative)
+            {
+                object item;
+                while (asNative.TryNext(out item))
+                {
+                    built_list.Add(item);
+                }
+                return PyList.Create(built_list);
+            }
+
+            var next_func = (IPyCallable)itr.GetUnboundAttribute("__next__");
             var next_args = new object[] { itr };        // Let's not repeatedly make this list.
 
             try
@@ -378,7 +394,20 @@ namespace CloacaInterpreter
             }
 
             var built_set = new HashSet<object>();
-            var next_func = (IPyCallable)itr.__dict__["__next__"];
+
+            // Builtin iterators can be drained without calling __next__ and waiting for StopIteration.
+            var asNative = itr as INativeIterator;
+            if (asNative != null && asNative.IsNative)
+            {
+                object item;
+                while (asNative.TryNext(out item))
+                {
+                    built_set.Add(item);
+                }
+                return PySet.Create(built_set);
+            }
+
+            var next_func = (IPyCallable)itr.GetUnboundAttribute("__next__");
             var next_args = new object[] { itr };        // Let's not repeatedly make this list.
 
             try
@@ -450,16 +479,16 @@ namespace CloacaInterpreter
             var asPyObject = o as PyObject;
             if(asPyObject != null)
             {
-                if(asPyObject.__dict__.ContainsKey("__reversed__"))
+                if(asPyObject.HasUnboundAttribute("__reversed__"))
                 {
-                    var reversed_dunder = (IPyCallable)asPyObject.__dict__["__reversed__"];
+                    var reversed_dunder = (IPyCallable)asPyObject.GetUnboundAttribute("__reversed__");
                     var result = await reversed_dunder.Call(interpreter, context, new object[] { asPyObject });
                     return (PyObject)result;
                 }
-                else if (asPyObject.__dict__.ContainsKey("__len__") && asPyObject.__dict__.ContainsKey("__getitem__"))
+                else if (asPyObject.HasUnboundAttribute("__len__") && asPyObject.HasUnboundAttribute("__getitem__"))
                 {
-                    var len_dunder = (IPyCallable)asPyObject.__dict__["__len__"];
-                    var getitem_dunder = (IPyCallable)asPyObject.__dict__["__getitem__"];
+                    var len_dunder = (IPyCallable)asPyObject.GetUnboundAttribute("__len__");
+                    var getitem_dunder = (IPyCallable)asPyObject.GetUnboundAttribute("__getitem__");
                     return IteratorMaker.MakeIterator(new ReversedLenGetItemIterator(asPyObject, len_dunder, getitem_dunder));
                 }
                 else
@@ -500,14 +529,14 @@ namespace CloacaInterpreter
 
                 var nextPyObj = next as PyObject;
                 var lowestPyObj = best as PyObject;
-                if (!lowestPyObj.__dict__.ContainsKey(func_dunder))
+                if (!lowestPyObj.HasUnboundAttribute(func_dunder))
                 {
                     context.CurrentException = new NotImplementedError("We cannot compare PyObjects that do not implement " + func_dunder + "(): " + best.ToString());
                     return null;
                 }
                 else
                 {
-                    var ltFunc = (IPyCallable)lowestPyObj.__dict__[func_dunder];
+                    var ltFunc = (IPyCallable)lowestPyObj.GetUnboundAttribute(func_dunder);
                     var isLower = (PyBool)await ltFunc.Call(interpreter, context, new object[] { lowestPyObj, nextPyObj });
                     if (isLower.InternalValue == false)
                     {
@@ -522,13 +551,13 @@ namespace CloacaInterpreter
         private static async Task<object> __helper_find_best(IInterpreter interpreter, FrameContext context, PyObject obj, string func_name, string func_dunder)
         {
             // Try to get an iterator off of this thing.
-            if (!obj.__dict__.ContainsKey("__iter__"))
+            if (!obj.HasUnboundAttribute("__iter__"))
             {
                 context.CurrentException = TypeErrorClass.Create("TypeError: '" + obj.__class__.Name + "' object is not iterable");
                 return null;
             }
 
-            var iterator_func = (IPyCallable)obj.__dict__["__iter__"];
+            var iterator_func = (IPyCallable)obj.GetUnboundAttribute("__iter__");
             var iterator = (await iterator_func.Call(interpreter, context, new object[] { obj })) as PyIterable;
             if (iterator == null)
             {
@@ -559,14 +588,14 @@ namespace CloacaInterpreter
 
                 var nextPyObj = next as PyObject;
                 var lowestPyObj = best as PyObject;
-                if (!lowestPyObj.__dict__.ContainsKey(func_dunder))
+                if (!lowestPyObj.HasUnboundAttribute(func_dunder))
                 {
                     context.CurrentException = new NotImplementedError("We cannot compare PyObjects that do not implement " + func_dunder + "(): " + best.ToString());
                     return null;
                 }
                 else
                 {
-                    var ltFunc = (IPyCallable)lowestPyObj.__dict__[func_dunder];
+                    var ltFunc = (IPyCallable)lowestPyObj.GetUnboundAttribute(func_dunder);
                     var isLower = (PyBool)await ltFunc.Call(interpreter, context, new object[] { lowestPyObj, nextPyObj });
                     if (isLower.InternalValue == false)
                     {
@@ -630,16 +659,16 @@ namespace CloacaInterpreter
                 var asPyObject = iterable as PyObject;
                 if (asPyObject != null)
                 {
-                    if (asPyObject.__dict__.ContainsKey("__iter__"))
+                    if (asPyObject.HasUnboundAttribute("__iter__"))
                     {
-                        var iter_dunder = (IPyCallable)asPyObject.__dict__["__iter__"];
+                        var iter_dunder = (IPyCallable)asPyObject.GetUnboundAttribute("__iter__");
                         var result = await iter_dunder.Call(interpreter, context, new object[] { asPyObject });
                         converted_iters[i] = (PyObject) result;
                     }
-                    else if (asPyObject.__dict__.ContainsKey("__len__") && asPyObject.__dict__.ContainsKey("__getitem__"))
+                    else if (asPyObject.HasUnboundAttribute("__len__") && asPyObject.HasUnboundAttribute("__getitem__"))
                     {
-                        var len_dunder = (IPyCallable)asPyObject.__dict__["__len__"];
-                        var getitem_dunder = (IPyCallable)asPyObject.__dict__["__getitem__"];
+                        var len_dunder = (IPyCallable)asPyObject.GetUnboundAttribute("__len__");
+                        var getitem_dunder = (IPyCallable)asPyObject.GetUnboundAttribute("__getitem__");
                         converted_iters[i] = IteratorMaker.MakeIterator(new LenGetItemIterator(asPyObject, len_dunder, getitem_dunder));
                     }
                     else
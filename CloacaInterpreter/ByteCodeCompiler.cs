@@ -26,11 +26,26 @@ namespace CloacaInterpreter
         /// <param name="scheduler">The scheduler to use to run any code required to completely compile the code. It's used
         /// particularly to fill in default values in function declarations; that involves running some code ahead of time
         /// that then gets assigned as defaults.</param>
+        /// <param name="cache">Programs compiled recently, keyed by their source and the global and builtin names they
+        /// were compiled against. This is usually the interpreter's CompileCache. Nothing is cached if it's null.</param>
         /// <returns>The compiled code.</returns>
         /// <exception cref="CloacaParseException">There were errors trying to build the script into byte code.</exception>
         public static async Task<PyFunction> Compile(string program, Dictionary<string, object> globals, 
-            Dictionary<string, object> builtins, IScheduler scheduler)
+            Dictionary<string, object> builtins, IScheduler scheduler, CompileCache cache = null)
         {
+            // The key sorts every global and builtin name, so only make it if it's going to be used.
+            bool caching = cache != null && cache.Capacity > 0;
+            CompileCacheKey cacheKey = null;
+            if(caching)
+            {
+                cacheKey = new CompileCacheKey(program, globals.Keys, builtins.Keys);
+                CodeObjectBuilder cached;
+                if(cache.TryGet(cacheKey, out cached))
+                {
+                    return cached.Build(globals);
+                }
+            }
+
             var inputStream = new AntlrInputStream(program);
             var lexer = new CloacaLexer(inputStream);
             CommonTokenStream commonTokenStream = new CommonTokenStream(lexer);
@@ -49,6 +64,16 @@ namespace CloacaInterpreter
             byteVisitor.Visit(antlrVisitorContext);
 
             await byteVisitor.PostProcess(scheduler);
+            PeepholeOptimizer.Optimize(byteVisitor.RootProgram);
+
+            // Defaults are calculated while compiling. They can only be reused if they came from literals and came out
+            // as immutable constants; otherwise they depend on the globals at the time or would be shared between
+            // compiles.
+            if(caching && !byteVisitor.DefaultsReadNames &&
+               CodeObjectSerializer.CanSerialize(byteVisitor.RootProgram))
+            {
+                cache.Add(cacheKey, byteVisitor.RootProgram);
+            }
 
             PyFunction compiledFunction = byteVisitor.RootProgram.Build(globals);
             return compiledFunction;
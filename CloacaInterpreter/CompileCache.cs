@@ -0,0 +1,221 @@
+﻿using System;
+using System.Collections.Generic;
+using System.Linq;
+
+using LanguageImplementation;
+
+namespace CloacaInterpreter
+{
+    /// <summary>
+    /// Identifies a compile for the CompileCache. The compiled code depends on the source text and on which names were
+    /// globals and builtins at compile time, since those decide how the variable scan resolves names. The values
+    /// behind the names don't matter.
+    /// </summary>
+    public class CompileCacheKey : IEquatable<CompileCacheKey>
+    {
+        private string program;
+        private string globalNames;
+        private string builtinNames;
+        private int hashCode;
+
+        public CompileCacheKey(string program, IEnumerable<string> globalNames, IEnumerable<string> builtinNames)
+        {
+            this.program = program;
+            this.globalNames = joinNames(globalNames);
+            this.builtinNames = joinNames(builtinNames);
+
+            unchecked
+            {
+                hashCode = program.GetHashCode();
+                hashCode = hashCode * 31 + this.globalNames.GetHashCode();
+                hashCode = hashCode * 31 + this.builtinNames.GetHashCode();
+            }
+        }
+
+        private static string joinNames(IEnumerable<string> names)
+        {
+            return string.Join("\0", names.OrderBy(name => name, StringComparer.Ordinal));
+        }
+
+        public bool Equals(CompileCacheKey other)
+        {
+            return other != null && hashCode == other.hashCode &&
+                program == other.program &&
+                globalNames == other.globalNames &&
+                builtinNames == other.builtinNames;
+        }
+
+        public override bool Equals(object obj)
+        {
+            return Equals(obj as CompileCacheKey);
+        }
+
+        public override int GetHashCode()
+        {
+            return hashCode;
+        }
+    }
+
+    /// <summary>
+    /// Least-recently-used cache of compiled programs for ByteCodeCompiler. Hosts tend to compile the same snippets over
+    /// and over, and a hit skips lexing, parsing, and visiting entirely.
+    ///
+    /// What's stored is a pristine copy of the root code object builder. Every hit gets its own deep copy to build
+    /// from, since running code can append to its code object's names.
+    /// </summary>
+    public class CompileCache
+    {
+        public const int DefaultCapacity = 256;
+
+        private class Entry
+        {
+            public CompileCacheKey Key;
+            public CodeObjectBuilder Code;
+        }
+
+        private object cacheLock;
+        private Dictionary<CompileCacheKey, LinkedListNode<Entry>> entries;
+
+        // Most recently used first.
+        private LinkedList<Entry> recency;
+        private int capacity;
+
+        public long Hits
+        {
+            get; private set;
+        }
+
+        public long Misses
+        {
+            get; private set;
+        }
+
+        public long Evictions
+        {
+            get; private set;
+        }
+
+        /// <summary>
+        /// The most programs to keep. Zero turns the cache off. Lowering it evicts the least recently used programs
+        /// right away.
+        /// </summary>
+        public int Capacity
+        {
+            get
+            {
+                return capacity;
+            }
+            set
+            {
+                if(value < 0)
+                {
+                    throw new ArgumentOutOfRangeException("value", "Compile cache capacity cannot be negative");
+                }
+
+                lock(cacheLock)
+                {
+                    capacity = value;
+                    evictOverCapacity();
+                }
+            }
+        }
+
+        public int Count
+        {
+            get
+            {
+                lock(cacheLock)
+                {
+                    return entries.Count;
+                }
+            }
+        }
+
+        public CompileCache(int capacity = DefaultCapacity)
+        {
+            cacheLock = new object();
+            entries = new Dictionary<CompileCacheKey, LinkedListNode<Entry>>();
+            recency = new LinkedList<Entry>();
+            Capacity = capacity;
+        }
+
+        /// <summary>
+        /// Looks up a compiled program and counts the hit or miss.
+        /// </summary>
+        /// <param name="key">The program and names it was compiled with.</param>
+        /// <param name="code">A copy of the cached root code that the caller can build from.</param>
+        /// <returns>True if the program was cached.</returns>
+        public bool TryGet(CompileCacheKey key, out CodeObjectBuilder code)
+        {
+            CodeObjectBuilder cached = null;
+            lock(cacheLock)
+            {
+                LinkedListNode<Entry> node;
+                if(entries.TryGetValue(key, out node))
+                {
+                    recency.Remove(node);
+                    recency.AddFirst(node);
+                    cached = node.Value.Code;
+                    Hits += 1;
+                }
+                else
+                {
+                    Misses += 1;
+                }
+            }
+
+            code = cached != null ? cached.DeepCopy() : null;
+            return code != null;
+        }
+
+        /// <summary>
+        /// Caches a freshly compiled program. This takes its own copy, so call it before running anything built from
+        /// the code.
+        /// </summary>
+        public void Add(CompileCacheKey key, CodeObjectBuilder code)
+        {
+            if(capacity == 0)
+            {
+                return;
+            }
+
+            var copy = code.DeepCopy();
+            lock(cacheLock)
+            {
+                LinkedListNode<Entry> node;
+                if(entries.TryGetValue(key, out node))
+                {
+                    node.Value.Code = copy;
+                    recency.Remove(node);
+                    recency.AddFirst(node);
+                    return;
+                }
+
+                node = recency.AddFirst(new Entry { Key = key, Code = copy });
+                entries.Add(key, node);
+                evictOverCapacity();
+            }
+        }
+
+        public void Clear()
+        {
+            lock(cacheLock)
+            {
+                entries.Clear();
+                recency.Clear();
+            }
+        }
+
+        // Caller must hold cacheLock.
+        private void evictOverCapacity()
+        {
+            while(entries.Count > capacity)
+            {
+                var oldest = recency.Last;
+                recency.RemoveLast();
+                entries.Remove(oldest.Value.Key);
+                Evictions += 1;
+            }
+        }
+    }
+}
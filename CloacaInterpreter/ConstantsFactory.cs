@@ -1,4 +1,5 @@
 ﻿using System;
+using System.Globalization;
 using System.Numerics;
 using System.Text.RegularExpressions;
 using LanguageImplementation.DataTypes;
@@ -42,7 +43,7 @@ namespace CloacaInterpreter
             string rawText = context.GetText();
             if (DecimalPointNumberRegex.Match(rawText).Success)
             {
-                return PyFloat.Create(Decimal.Parse(rawText));
+                return PyFloat.Create(double.Parse(rawText, CultureInfo.InvariantCulture));
             }
             return PyInteger.Create(BigInteger.Parse(context.GetText()));
         }
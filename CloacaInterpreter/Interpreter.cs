@@ -17,6 +17,10 @@ namespace CloacaInterpreter
     public class Interpreter: IInterpreter
     {
         private Dictionary<string, object> builtins;
+
+        /// <summary>
+        /// The builtins namespace. Change it with SetBuiltin or AddBuiltin, not directly; see IInterpreter.GetBuiltins.
+        /// </summary>
         public Dictionary<string, object> GetBuiltins()
         {
             return builtins;
@@ -48,9 +52,29 @@ namespace CloacaInterpreter
             get; private set;
         }
 
+        /// <summary>
+        /// Modules imported by any script run by this interpreter. Scripts scheduled separately share modules through
+        /// this instead of each importing their own.
+        /// </summary>
+        public ModuleRegistry SysModules
+        {
+            get; private set;
+        }
+
+        /// <summary>
+        /// Programs this interpreter has compiled recently, so compiling the same source again can skip parsing. Pass
+        /// this to ByteCodeCompiler.Compile. Each interpreter has its own, so separate interpreters don't share or
+        /// see each other's entries. Set the capacity to zero to turn it off.
+        /// </summary>
+        public CompileCache CompileCache
+        {
+            get; private set;
+        } = new CompileCache();
+
         public Interpreter(Scheduler scheduler)
         {
             sys_meta_path = new List<ISpecFinder>();
+            SysModules = new ModuleRegistry();
 
             // Prepare built-in modules.
             var builtinsInjector = new InjectedModuleRepository();
@@ -130,6 +154,7 @@ namespace CloacaInterpreter
                 { "NotImplementedError", NotImplementedErrorClass.Instance },
                 { "ImportError", ImportErrorClass.Instance },
                 { "ValueError", ValueErrorClass.Instance },
+                { "KeyError", KeyErrorClass.Instance },
                 { "ModuleNotFoundError", ModuleNotFoundErrorClass.Instance },
             };
 
@@ -138,14 +163,12 @@ namespace CloacaInterpreter
 
         public void AddBuiltin(WrappedCodeObject toEmbed)
         {
-            if(builtins.ContainsKey(toEmbed.Name))
-            {
-                builtins[toEmbed.Name] = toEmbed;
-            }
-            else
-            {
-                builtins.Add(toEmbed.Name, toEmbed);
-            }
+            SetBuiltin(toEmbed.Name, toEmbed);
+        }
+
+        public void SetBuiltin(string name, object value)
+        {
+            Namespaces.Set(builtins, name, value);
         }
 
         public bool DumpState;
@@ -218,6 +241,7 @@ namespace CloacaInterpreter
                     pyclass.__dict__.AddOrSet(classMemberName, context.GetVariable(classMemberName));
                 }
             }
+            pyclass.Modified();
             
             return pyclass;
         }
@@ -268,7 +292,7 @@ namespace CloacaInterpreter
         /// callable. It might await for something which is why it is Task.</returns>
         public async Task<object> CallInto(FrameContext context, PyFunction functionToRun, object[] args, Dictionary<string, object> newGlobals = null)
         {
-            Frame nextFrame = new Frame(functionToRun, context, newGlobals);
+            Frame nextFrame = Frame.Rent(functionToRun, context, newGlobals);
 
             // If the function has a __closure__ dunder that isn't just None or whatever, then assign the
             // closure's contents as cell variables for the current frame. These are determined by
@@ -286,7 +310,14 @@ namespace CloacaInterpreter
                 }
             }
 
-            return await CallInto(context, nextFrame, args);
+            var returned = await CallInto(context, nextFrame, args);
+
+            // Anything that went wrong leaves the frame for the traceback.
+            if(context.CurrentException == null)
+            {
+                nextFrame.Release();
+            }
+            return returned;
         }
 
         /// <summary>
@@ -311,34 +342,18 @@ namespace CloacaInterpreter
             //     return x + y
             //   return made
             // made is a closure using x as a free variable, and x in maker is a cell variable that provides it.
-            int fastIdx = 0;
-            for (int argIdx = 0; argIdx < args.Length; ++argIdx)
-            {
-                var argName = frame.Function.Code.ArgVarNames[argIdx];
+            frame.SetArguments(args);
 
-                // Normally variables will just be fast locals to function calls, but the
-                // parameter might be a cell variable! If it's a cell (an originator), then
-                // we need to divert it into a cell. If it is a free variable, then it's none
-                // of our business here (is that even valid for argument names?!).
-                if(frame.Function.Code.CellNames.Contains(argName))
-                {
-                    frame.SetCellVar(argName, args[argIdx]);
-                }
-                else if (frame.Function.Code.FreeNames.Contains(argName))
-                {
-                    continue;       // Skip the free variable!
-                }
-                else
+            // The first frame for a code object registers its VarNames as names. After that it's all already there.
+            var code = frame.Function.Code;
+            if(!code.VarNamesAdded)
+            {
+                for (int varIndex = 0; varIndex < code.VarNames.Count; ++varIndex)
                 {
-                    frame.SetFastLocal(fastIdx, args[argIdx]);
+                    var varName = code.VarNames[varIndex];
+                    frame.AddOnlyNewLocal(varName, null);
                 }
-                ++fastIdx;
-            }
-
-            for (int varIndex = 0; varIndex < frame.Function.Code.VarNames.Count; ++varIndex)
-            {
-                var varName = frame.Function.Code.VarNames[varIndex];
-                frame.AddOnlyNewLocal(varName, null);                
+                code.VarNamesAdded = true;
             }
 
             // Carry values from the closure into our available cell variables (if we have a closure).
@@ -359,7 +374,7 @@ namespace CloacaInterpreter
             }
 
             context.callStack.Push(frame);      // nextFrame is now the active frame.
-            await Run(context);
+            await runFrame(context, frame);
 
             if(context.CurrentException != null)
             {
@@ -400,6 +415,162 @@ namespace CloacaInterpreter
             get; set;
         }
 
+        /// <summary>
+        /// Compile hot functions with the Tier2Compiler. This is on by default. Turning it off leaves everything to
+        /// Run(), which is handy for comparing the two. Functions aren't compiled in StepMode either.
+        /// </summary>
+        public bool Tier2Enabled
+        {
+            get; set;
+        } = true;
+
+        /// <summary>
+        /// Tests if an object is true the way conditionals and `not` do: its __bool__ if it has one, then its __len__,
+        /// and otherwise it's true. The builtin types are answered directly without calling anything.
+        /// </summary>
+        /// <returns>Whether the object is true. If __bool__ or __len__ raised an exception, it's in
+        /// context.CurrentException and the result doesn't mean anything.</returns>
+        internal async Task<bool> IsTrue(FrameContext context, object value)
+        {
+            bool truth;
+            if(PyBool.TryGetTruth(value, out truth))
+            {
+                return truth;
+            }
+
+            // TryGetTruth takes care of everything that isn't a PyObject. Like Python, the dunders come from the type
+            // and not the object itself. Otherwise a class defining __len__ would be false as a class object.
+            var asPyObject = (PyObject) value;
+            var boolDunder = typeDunder(asPyObject, "__bool__");
+            if(boolDunder != null)
+            {
+                var returned = await boolDunder.Call(this, context, new object[] { value });
+                if(context.CurrentException != null)
+                {
+                    return false;
+                }
+
+                var asPyBool = returned as PyBool;
+                if(asPyBool == null)
+                {
+                    context.CurrentException = TypeErrorClass.Create("TypeError: __bool__ should return bool, returned " + typeName(returned));
+                    return false;
+                }
+                return asPyBool.InternalValue;
+            }
+
+            var lenDunder = typeDunder(asPyObject, "__len__");
+            if(lenDunder != null)
+            {
+                var returned = await lenDunder.Call(this, context, new object[] { value });
+                if(context.CurrentException != null)
+                {
+                    return false;
+                }
+
+                var asPyInteger = returned as PyInteger;
+                if(asPyInteger == null)
+                {
+                    context.CurrentException = TypeErrorClass.Create("TypeError: '" + typeName(returned) + "' object cannot be interpreted as an integer");
+                    return false;
+                }
+                return !asPyInteger.InternalValue.IsZero;
+            }
+
+            return true;
+        }
+
+        private static IPyCallable typeDunder(PyObject obj, string name)
+        {
+            object dunder;
+            if(obj.__class__ == null || !obj.__class__.TryGetClassAttribute(name, out dunder))
+            {
+                return null;
+            }
+            return dunder as IPyCallable;
+        }
+
+        private static string typeName(object value)
+        {
+            if(value == null || value is NonePyObject)
+            {
+                return "NoneType";
+            }
+            var asPyObject = value as PyObject;
+            return asPyObject != null && asPyObject.__class__ != null ? asPyObject.__class__.Name : value.GetType().Name;
+        }
+
+        /// <summary>
+        /// Looks up a global the way LOAD_GLOBAL does: the current frame's globals and then the builtins. The
+        /// offset is where the LOAD_GLOBAL is in the current frame's code, which caches where it found the name.
+        /// </summary>
+        internal object LoadGlobal(FrameContext context, int offset, string globalName)
+        {
+            object value;
+            if(NameCache.TryLoad(context.CodeBytes, offset, globalName, context.callStack.Peek().Globals, builtins, out value))
+            {
+                return value;
+            }
+            else
+            {
+                throw new Exception("Global '" + globalName + "' was not found!");
+            }
+        }
+
+        /// <summary>
+        /// Runs a frame that was just pushed for a call. Hot code gets compiled by the Tier2Compiler and run from
+        /// that. Compiled code can hand the frame back part way through, in which case Run() finishes it.
+        /// </summary>
+        private Task runFrame(FrameContext context, Frame frame)
+        {
+            var code = frame.Function.Code;
+            if (!Tier2Enabled || StepMode || code.Tier2Rejected)
+            {
+                return Run(context);
+            }
+
+            if (code.Tier2 == null)
+            {
+                code.Hotness += 1;
+                if (code.Hotness < Tier2Compiler.HotThreshold)
+                {
+                    return Run(context);
+                }
+
+                Tier2Compiler.Compile(code);
+                if (code.Tier2 == null)
+                {
+                    return Run(context);
+                }
+            }
+
+            var handedBack = code.Tier2(this, context, frame);
+            if (handedBack == null)
+            {
+                return Task.CompletedTask;
+            }
+
+            // Code that keeps bailing out is only costing us, so give up on it.
+            code.Tier2Deopts += 1;
+            if (code.Tier2Deopts > Tier2Compiler.DeoptLimit)
+            {
+                code.Tier2 = null;
+                code.Tier2Rejected = true;
+            }
+
+            if (handedBack.IsCompleted)
+            {
+                return Run(context);
+            }
+            return runFrameAsync(context, handedBack);
+        }
+
+        private async Task runFrameAsync(FrameContext context, Task handedBack)
+        {
+            await handedBack;
+            await Run(context);
+        }
+
         /// <summary>
         /// Returns true if an exception was raised and the context would not be in a position to still try to
         /// handle it. This is used when stepping through frame context in debugging to allow the interpreter to
@@ -412,26 +583,53 @@ namespace CloacaInterpreter
             return context.CurrentException != null && context.BlockStack.Count == 0;
         }
 
+        // The operation helpers below do their work synchronously and hand back an already-completed task unless
+        // whatever they called actually suspended (a FutureAwaiter, a YieldTick from a script function, and so on).
+        // Awaiting a completed task in Run() doesn't give up control, so the common case never touches the
+        // scheduler or allocates a state machine. Only a pending task sends us down the *Async continuations.
+
+        /// <summary>
+        /// Pushes the result of a dunder operation and advances past the opcode. This only goes asynchronous
+        /// if the operation's task has not already completed.
+        /// </summary>
+        private Task pushOperationResult(FrameContext context, Task<object> pending)
+        {
+            if (pending.IsCompleted)
+            {
+                context.DataStack.Push((PyObject)pending.GetAwaiter().GetResult());
+                context.Cursor += 1;
+                return Task.CompletedTask;
+            }
+            return pushOperationResultAsync(context, pending);
+        }
+
+        private async Task pushOperationResultAsync(FrameContext context, Task<object> pending)
+        {
+            PyObject returned = (PyObject)await pending;
+            context.DataStack.Push(returned);
+            context.Cursor += 1;
+        }
+
         // Unary form
-        private async Task DynamicDispatchOperation(FrameContext context, string op_dunder, Func<object, dynamic> dotNetOp)
+        private Task DynamicDispatchOperation(FrameContext context, string op_dunder, Func<object, dynamic> dotNetOp)
         {
-            dynamic a = context.DataStack.Pop();
+            object a = context.DataStack.Pop();
             var leftObj = a as PyObject;
 
             if (leftObj == null)
             {
                 context.DataStack.Push(dotNetOp(a));
+                context.Cursor += 1;
+                return Task.CompletedTask;
             }
             else
             {
-                PyObject returned = (PyObject)await leftObj.InvokeFromDict(this, context, op_dunder, new PyObject[] { });
-                context.DataStack.Push(returned);
+                return pushOperationResult(context, leftObj.InvokeFromDict(this, context, op_dunder, new PyObject[] { }));
             }
-            context.Cursor += 1;
         }
 
         // Sketching this out for now as an experiment. This looks like a job for multiple dispatch.
-        private async Task DynamicDispatchOperation(FrameContext context, dynamic a, dynamic b,
+        private Task DynamicDispatchOperation(FrameContext context, dynamic a, dynamic b,
             string op_dunder, string op_fallback, 
             Func<object, dynamic, dynamic> dotNetOp)
         {
@@ -452,71 +650,76 @@ namespace CloacaInterpreter
             }
             else
             {
-                if (leftObj.__dict__.ContainsKey(op_dunder))
+                if (leftObj.HasUnboundAttribute(op_dunder))
                 {
-                    PyObject returned = (PyObject)await leftObj.InvokeFromDict(this, context, op_dunder, new PyObject[] { rightObj });
-                    context.DataStack.Push(returned);
+                    return pushOperationResult(context, leftObj.InvokeFromDict(this, context, op_dunder, new PyObject[] { rightObj }));
                 }
                 else
                 {
-                    PyObject returned = (PyObject)await leftObj.InvokeFromDict(this, context, op_fallback, new PyObject[] { rightObj });
-                    context.DataStack.Push(returned);
+                    return pushOperationResult(context, leftObj.InvokeFromDict(this, context, op_fallback, new PyObject[] { rightObj }));
                 }
             }
             context.Cursor += 1;
+            return Task.CompletedTask;
+        }
+
+        private Task leftRightOperation(FrameContext context, string op_dunder, string op_fallback, Func<object, dynamic, dynamic> dotNetOp)
+        {
+            object right = context.DataStack.Pop();
+            object left = context.DataStack.Pop();
+            return DynamicDispatchOperation(context, left, right, op_dunder, op_fallback, dotNetOp);
         }
 
-        private async Task leftRightOperation(FrameContext context, string op_dunder, string op_fallback, Func<object, dynamic, dynamic> dotNetOp)
+        private Task rightLeftOperation(FrameContext context, string op_dunder, string op_fallback, Func<object, dynamic, dynamic> dotNetOp)
         {
-            dynamic right = context.DataStack.Pop();
-            dynamic left = context.DataStack.Pop();
-            await DynamicDispatchOperation(context, left, right, op_dunder, op_fallback, dotNetOp);
+            object left = context.DataStack.Pop();
+            object right = context.DataStack.Pop();
+            return DynamicDispatchOperation(context, left, right, op_dunder, op_fallback, dotNetOp);
         }
 
-        private async Task rightLeftOperation(FrameContext context, string op_dunder, string op_fallback, Func<object, dynamic, dynamic> dotNetOp)
+        /// <summary>
+        /// Pushes what a call returned onto the data stack. Future awaiters get unwrapped into their results.
+        /// </summary>
+        /// <param name="context">The context whose data stack receives the result.</param>
+        /// <param name="returned">The object returned from the call.</param>
+        /// <param name="voidIsNone">If true, a FutureVoidAwaiter pushes None. If false, it pushes nothing.</param>
+        private static void pushCallResult(FrameContext context, object returned, bool voidIsNone)
         {
-            dynamic left = context.DataStack.Pop();
-            dynamic right = context.DataStack.Pop();
-            await DynamicDispatchOperation(context, left, right, op_dunder, op_fallback, dotNetOp);
+            if (returned != null && !(returned is FutureVoidAwaiter))
+            {
+                if (returned is IGetsFutureAwaiterResult)
+                {
+                    returned = ((IGetsFutureAwaiterResult)returned).GetGenericResult();
+                }
+                context.DataStack.Push(returned);
+            }
+            else if (returned == null || voidIsNone)
+            {
+                context.DataStack.Push(NoneType.Instance);
+            }
         }
 
-        private async Task commonCallFunction(FrameContext context, List<object> args, Dictionary<string, object> defaultOverrides=null)
+        private Task commonCallFunction(FrameContext context, List<object> args, Dictionary<string, object> defaultOverrides=null)
         {
             object abstractFunctionToRun = context.DataStack.Pop();
             var asPyObject = abstractFunctionToRun as PyObject;
 
-            var asPyFunction = abstractFunctionToRun as PyFunction;
-
             var outArgs = args.ToArray();
 
-            if (asPyObject != null)
+            object __call__;
+            if (asPyObject != null && asPyObject.TryGetAttribute("__call__", out __call__))
             {
-                try
-                {
-                    var __call__ = asPyObject.__getattribute__("__call__");
-                    var functionToRun = (IPyCallable)__call__;
+                var functionToRun = (IPyCallable)__call__;
 
-                    // Copypasta from next if clause. Hopefully this will replace it!
-                    var returned = await functionToRun.Call(this, context, outArgs, defaultOverrides: defaultOverrides);
-                    if (returned != null && !(returned is FutureVoidAwaiter))
-                    {
-                        if (returned is IGetsFutureAwaiterResult)
-                        {
-                            returned = ((IGetsFutureAwaiterResult)returned).GetGenericResult();
-                        }
-                        context.DataStack.Push(returned);
-                    }
-                    else if (returned == null)
-                    {
-                        context.DataStack.Push(NoneType.Instance);
-                    }
-                    context.Cursor += 2;
-                    return;
-                }
-                catch (EscapedPyException e)
+                // Copypasta from callCallable. Hopefully this will replace it!
+                var pending = functionToRun.Call(this, context, outArgs, defaultOverrides: defaultOverrides);
+                if (pending.IsCompleted)
                 {
-                    // We'll just proceed as usual.
+                    pushCallResult(context, pending.GetAwaiter().GetResult(), false);
+                    context.Cursor += 2;
+                    return Task.CompletedTask;
                 }
+                return commonCallFunctionAsync(context, pending);
             }
             else if (abstractFunctionToRun is Type)
             {
@@ -530,25 +733,56 @@ namespace CloacaInterpreter
             // Treat this kind of like an else if. We don't do that literally because we have
             // to test for __call__ in the PyObject, and also because it might not be a PyObject
             // to begin with.
+            return callCallable(context, abstractFunctionToRun, outArgs, defaultOverrides);
+        }
+
+        /// <summary>
+        /// Slow path for commonCallFunction when __call__ suspended.
+        /// </summary>
+        private async Task commonCallFunctionAsync(FrameContext context, Task<object> pending)
+        {
+            var returned = await pending;
+            pushCallResult(context, returned, false);
+            context.Cursor += 2;
+        }
+
+        /// <summary>
+        /// Calls an unbound method for CALL_METHOD. The self argument is already at the front of the arguments. This
+        /// does what calling the PyMethod that LOAD_ATTR would have created does.
+        /// </summary>
+        private Task callMethod(FrameContext context, IPyCallable method, object[] args)
+        {
+            var pending = method.Call(this, context, args);
+            if (pending.IsCompleted)
+            {
+                pushCallResult(context, pending.GetAwaiter().GetResult(), false);
+                context.Cursor += 2;
+                return Task.CompletedTask;
+            }
+            return callMethodAsync(context, pending);
+        }
+
+        private async Task callMethodAsync(FrameContext context, Task<object> pending)
+        {
+            var returned = await pending;
+            pushCallResult(context, returned, false);
+            context.Cursor += 2;
+        }
+
+        private Task callCallable(FrameContext context, object abstractFunctionToRun, object[] outArgs, Dictionary<string, object> defaultOverrides)
+        {
             if (abstractFunctionToRun is IPyCallable)
             {
                 var functionToRun = (IPyCallable)abstractFunctionToRun;
 
-                var returned = await functionToRun.Call(this, context, outArgs, defaultOverrides: defaultOverrides);
-                if (returned != null && !(returned is FutureVoidAwaiter))
+                var pending = functionToRun.Call(this, context, outArgs, defaultOverrides: defaultOverrides);
+                if (pending.IsCompleted)
                 {
-                    if (returned is IGetsFutureAwaiterResult)
-                    {
-                        returned = ((IGetsFutureAwaiterResult)returned).GetGenericResult();
-                    }
-                    context.DataStack.Push(returned);
-                }
-                else if (returned == null || returned is FutureVoidAwaiter)
-                {
-                    context.DataStack.Push(NoneType.Instance);
+                    pushCallResult(context, pending.GetAwaiter().GetResult(), true);
+                    context.Cursor += 2;
+                    return Task.CompletedTask;
                 }
-
-                context.Cursor += 2;
+                return callCallableAsync(context, pending);
             }
             else
             {
@@ -556,6 +790,13 @@ namespace CloacaInterpreter
             }
         }
 
+        private async Task callCallableAsync(FrameContext context, Task<object> pending)
+        {
+            var returned = await pending;
+            pushCallResult(context, returned, true);
+            context.Cursor += 2;
+        }
+
         /// <summary>
         /// Runs the given frame context until it either finishes normally or yields. This actually interprets
         /// our Python(ish) code!
@@ -564,12 +805,36 @@ namespace CloacaInterpreter
         /// </summary>
         /// <param name="context">The current state of the frame and stacks to run</param>
         /// <returns>A task if the code being run gets pre-empted cooperatively.</returns>
-        public async Task Run(FrameContext context)
+        public Task Run(FrameContext context)
         {
+            return run(context, false);
+        }
+
+        /// <summary>
+        /// Runs just the instruction at the current frame's cursor. The tier-2 compiler hands instructions it doesn't
+        /// compile itself to this. Exceptions raised by the instruction are left for the caller to unwind.
+        /// </summary>
+        internal Task RunOneInstruction(FrameContext context)
+        {
+            return run(context, true);
+        }
+
+        private async Task run(FrameContext context, bool oneInstruction)
+        {
+            bool ranOne = false;
             try
             {
                 while (context.Cursor < context.Code.Length)
                 {
+                    if (oneInstruction)
+                    {
+                        if (ranOne)
+                        {
+                            return;
+                        }
+                        ranOne = true;
+                    }
+
                     //if(DumpState)
                     //{
                     //    Console.WriteLine(Dis.dis(callStack.Peek().Program, Cursor, 1));
@@ -608,7 +873,8 @@ namespace CloacaInterpreter
                         throw new EscapedPyException(context.CurrentException);
                     }
 
-                    var opcode = (ByteCodes)context.Code[context.Cursor];
+                    var instruction = context.CodeBytes.Instructions[context.Cursor];
+                    var opcode = instruction.Opcode;
                     switch (opcode)
                     {
                         case ByteCodes.UNARY_NOT:
@@ -616,27 +882,21 @@ namespace CloacaInterpreter
                                 // NOTE: Many of the other unary operations use functions like __and__, __or__, etc. There is NOT
                                 // one for not. There is not __not__. The __invert__ fuction implements the ~ operator, which is
                                 // distinct from not.
-                                var toFlip = context.DataStack.Pop() as PyBool;
-                                if(toFlip == PyBool.False)
-                                {
-                                    context.DataStack.Push(PyBool.True);
-                                }
-                                else if(toFlip == PyBool.True)
-                                {
-                                    context.DataStack.Push(PyBool.False);
-                                }
-                                else
+                                var truth = await IsTrue(context, context.DataStack.Pop());
+                                if(context.CurrentException == null)
                                 {
-                                    throw new Exception("UNARY_NOT received a PyBool that is not one of the static types.");
+                                    context.DataStack.Push(PyBool.Create(!truth));
                                 }
                             }
                             context.Cursor += 1;
                             break;
                         case ByteCodes.BINARY_ADD:
+                            Specializer.Count(context, instruction);
                             await leftRightOperation(context, "__add__", null,
                                 (left, right) => { return (dynamic) left + (dynamic) right; });
                             break;
                         case ByteCodes.INPLACE_ADD:
+                            Specializer.Count(context, instruction);
                             await rightLeftOperation(context, "__iadd__", "__add__", (left, right) =>
                             {
                                 var leftEvent = left as EventInstance;
@@ -662,10 +922,12 @@ namespace CloacaInterpreter
                             });
                             break;
                         case ByteCodes.BINARY_SUBTRACT:
+                            Specializer.Count(context, instruction);
                             await leftRightOperation(context, "__sub__", null,
                                 (left, right) => { return (dynamic)left - (dynamic)right; });
                             break;
                         case ByteCodes.INPLACE_SUBTRACT:
+                            Specializer.Count(context, instruction);
                             await rightLeftOperation(context, "__isub__", "__sub__", (left, right) =>
                             {
                                 var leftEvent = left as EventInstance;
@@ -702,6 +964,7 @@ namespace CloacaInterpreter
                             break;
 
                         case ByteCodes.BINARY_MULTIPLY:
+                            Specializer.Count(context, instruction);
                             await leftRightOperation(context, "__mul__", null,
                                 (left, right) => { return (dynamic)left * (dynamic)right; });
                             break;
@@ -718,6 +981,7 @@ namespace CloacaInterpreter
                                 (left, right) => { return Math.Pow((double)(dynamic)left, (double)(dynamic)right); });
                             break;
                         case ByteCodes.BINARY_TRUE_DIVIDE:
+                            Specializer.Count(context, instruction);
                             await leftRightOperation(context, "__truediv__", null,
                                 (left, right) => { return ((decimal) (dynamic)left) / ((decimal) (dynamic)right); });
                             break;
@@ -726,6 +990,7 @@ namespace CloacaInterpreter
                                 (left, right) => { return ((decimal)(dynamic)left) / ((decimal)(dynamic)right); });
                             break;
                         case ByteCodes.BINARY_FLOOR_DIVIDE:
+                            Specializer.Count(context, instruction);
                             await leftRightOperation(context, "__floordiv__", null,
                                 (left, right) => { return (dynamic)left / (dynamic)right; });
                             break;
@@ -734,6 +999,7 @@ namespace CloacaInterpreter
                                 (left, right) => { return (dynamic)left / (dynamic)right; });
                             break;
                         case ByteCodes.BINARY_MODULO:
+                            Specializer.Count(context, instruction);
                             await leftRightOperation(context, "__mod__", null,
                                 (left, right) => { return (dynamic)left % (dynamic)right; });
                             break;
@@ -784,60 +1050,25 @@ namespace CloacaInterpreter
                         case ByteCodes.LOAD_CONST:
                             {
                                 context.Cursor += 1;
-                                context.DataStack.Push(context.Function.Code.Constants[context.CodeBytes.GetUShort(context.Cursor)]);
+                                context.DataStack.Push(context.Function.Code.Constants[instruction.Operand]);
                             }
                             context.Cursor += 2;
                             break;
                         case ByteCodes.STORE_NAME:
                             {
                                 context.Cursor += 1;
-                                string name = context.LocalNames[context.CodeBytes.GetUShort(context.Cursor)];
+                                string name = context.LocalNames[instruction.Operand];
 
-                                // Try to resolve locally, then globally, and then in our built-in namespace
-                                bool foundVar = false;
-                                foreach (var stackFrame in context.callStack)
-                                {
-                                    // Unlike LOAD_GLOBAL, the current frame is fair game. In fact, we search it first!
-                                    var nameIdx = stackFrame.LocalNames.IndexOf(name);
-                                    if (nameIdx >= 0)
-                                    {
-                                        stackFrame.Locals[name] = context.DataStack.Pop();
-                                        foundVar = true;
-                                        break;
-                                    }
-                                }
-
-                                if(!foundVar)
-                                {
-                                    context.callStack.Peek().AddLocal(name, context.DataStack.Pop());
-                                }
-
-                                // Incorrect attempt at a refactor. Don't look in LocalNames!
-                                //var stackFrame = context.callStack.Peek();
-                                //var localIdx = stackFrame.LocalNames.IndexOf(name);
-                                //if(localIdx >= 0)
-                                //{
-                                //    stackFrame.Locals.AddOrSet(name, context.DataStack.Pop());
-                                //}
-                                //else if(stackFrame.Globals.ContainsKey(name))
-                                //{
-                                //    stackFrame.Globals[name] = context.DataStack.Pop();
-                                //}
-                                //else if(builtins.ContainsKey(name))
-                                //{
-                                //    builtins[name] = context.DataStack.Pop();
-                                //}
-                                //else
-                                //{
-                                //    throw new Exception("'" + name + "' not found in local, global, nor built-in namespaces.");
-                                //}
+                                // The name came out of the current frame's names so that's where it goes. There's no
+                                // need to go looking through the other frames on the call stack for it.
+                                Namespaces.Set(context.Locals, name, context.DataStack.Pop());
                             }
-                                context.Cursor += 2;
+                            context.Cursor += 2;
                             break;
                         case ByteCodes.STORE_FAST:
                             {
                                 context.Cursor += 1;
-                                var localIdx = context.CodeBytes.GetUShort(context.Cursor);
+                                var localIdx = instruction.Operand;
                                 context.LocalFasts[localIdx] = context.DataStack.Pop();
                             }
                             context.Cursor += 2;
@@ -845,7 +1076,7 @@ namespace CloacaInterpreter
                         case ByteCodes.STORE_GLOBAL:
                             {
                                 context.Cursor += 1;
-                                var globalIdx = context.CodeBytes.GetUShort(context.Cursor);
+                                var globalIdx = instruction.Operand;
                                 var globalName = context.Function.Code.Names[globalIdx];
                                 var toAssign = context.DataStack.Pop();
 
@@ -853,12 +1084,12 @@ namespace CloacaInterpreter
                                 // and then reassign it, ruining it for others. :p
                                 if(builtins.ContainsKey(globalName))
                                 {
-                                    builtins[globalName] = toAssign;
+                                    Namespaces.Set(builtins, globalName, toAssign);
                                 }
                                 else
                                 {
                                     // This always wins. We add a new global if it's not already defined. Make sure you spelled it right!
-                                    context.callStack.Peek().Globals.AddOrSet(globalName, toAssign);
+                                    Namespaces.Set(context.callStack.Peek().Globals, globalName, toAssign);
                                 }
 
                                 context.Cursor += 2;
@@ -867,7 +1098,7 @@ namespace CloacaInterpreter
                         case ByteCodes.LOAD_DEREF:
                             {
                                 context.Cursor += 1;
-                                var cellVarIdx = context.CodeBytes.GetUShort(context.Cursor);
+                                var cellVarIdx = instruction.Operand;
                                 context.DataStack.Push(context.Cells[cellVarIdx].ob_ref);
                                 context.Cursor += 2;
                                 break;
@@ -877,7 +1108,7 @@ namespace CloacaInterpreter
                                 // TODO: [AttributeError] Error recovery when attribute is not found.
                                 {
                                     context.Cursor += 1;
-                                    var nameIdx = context.CodeBytes.GetUShort(context.Cursor);
+                                    var nameIdx = instruction.Operand;
                                     var attrName = context.Function.Code.Names[nameIdx];
                                     var rawObj = context.DataStack.Pop();
                                     var val = context.DataStack.Pop();
@@ -900,45 +1131,44 @@ namespace CloacaInterpreter
                             break;
                         case ByteCodes.LOAD_NAME:
                             {
+                                var nameOffset = context.Cursor;
                                 context.Cursor += 1;
-                                string name = context.LocalNames[context.CodeBytes.GetUShort(context.Cursor)];
-                                context.DataStack.Push(context.GetVariable(name));
+                                string name = context.LocalNames[instruction.Operand];
+
+                                // Same order as FrameContext.GetVariable(), but the globals and builtins go through the
+                                // name cache.
+                                object value;
+                                if(!context.Locals.TryGetValue(name, out value) &&
+                                    !NameCache.TryLoad(context.CodeBytes, nameOffset, name, context.Globals, context.Builtins, out value))
+                                {
+                                    throw new Exception("'" + name + "' not found in local, global, nor built-in namespaces.");
+                                }
+                                context.DataStack.Push(value);
                             }
                             context.Cursor += 2;
                             break;
                         case ByteCodes.LOAD_FAST:
                             {
                                 context.Cursor += 1;
-                                var fastIdx = context.CodeBytes.GetUShort(context.Cursor);
+                                var fastIdx = instruction.Operand;
                                 context.DataStack.Push(context.LocalFasts[fastIdx]);
                             }
                             context.Cursor += 2;
                             break;
                         case ByteCodes.LOAD_GLOBAL:
                             {
+                                var globalOffset = context.Cursor;
                                 context.Cursor += 1;
-                                var globalIdx = context.CodeBytes.GetUShort(context.Cursor);
+                                var globalIdx = instruction.Operand;
                                 var globalName = context.Function.Code.Names[globalIdx];
-
-                                if(context.callStack.Peek().HasGlobal(globalName))
-                                {
-                                    context.DataStack.Push(context.callStack.Peek().GetGlobal(globalName));
-                                }
-                                else if (builtins.ContainsKey(globalName))
-                                {
-                                    context.DataStack.Push(builtins[globalName]);
-                                }
-                                else
-                                {
-                                    throw new Exception("Global '" + globalName + "' was not found!");
-                                }
+                                context.DataStack.Push(LoadGlobal(context, globalOffset, globalName));
                                 context.Cursor += 2;
                                 break;
                             }
                         case ByteCodes.STORE_DEREF:
                             {
                                 context.Cursor += 1;
-                                var cellVarIdx = context.CodeBytes.GetUShort(context.Cursor);
+                                var cellVarIdx = instruction.Operand;
                                 context.Cells[cellVarIdx].ob_ref = context.DataStack.Pop();
                                 context.Cursor += 2;
 
@@ -971,12 +1201,50 @@ namespace CloacaInterpreter
                             }
                         case ByteCodes.LOAD_ATTR:
                             {
-                                // TODO: [AttributeError] Error recovery when attribute is not found.
+                                Specializer.Count(context, instruction);
+                                var attrOffset = context.Cursor;
                                 context.Cursor += 1;
-                                var nameIdx = context.CodeBytes.GetUShort(context.Cursor);
+                                var nameIdx = instruction.Operand;
                                 var attrName = context.Function.Code.Names[nameIdx];
                                 var rawObj = context.DataStack.Pop();
-                                context.DataStack.Push(ObjectResolver.GetValue(attrName, rawObj));
+                                object attr;
+                                if (AttributeCache.TryGetValue(context.CodeBytes, attrOffset, attrName, rawObj, out attr))
+                                {
+                                    context.DataStack.Push(attr);
+                                }
+                                else
+                                {
+                                    context.CurrentException = ObjectResolver.NoAttributeError(attrName, rawObj);
+                                }
+                            }
+                            context.Cursor += 2;
+                            break;
+                        case ByteCodes.LOAD_METHOD:
+                            {
+                                var methodOffset = context.Cursor;
+                                context.Cursor += 1;
+                                var methodName = context.Function.Code.Names[instruction.Operand];
+                                var rawObj = context.DataStack.Pop();
+
+                                // Methods go on the stack unbound with the object after them as self. That saves creating
+                                // a PyMethod just for CALL_METHOD to take it apart again. Anything else goes on top of a
+                                // null like LOAD_ATTR would have given it.
+                                object method;
+                                bool unbound;
+                                if (!AttributeCache.TryGetMethod(context.CodeBytes, methodOffset, methodName, rawObj, out method, out unbound))
+                                {
+                                    context.CurrentException = ObjectResolver.NoAttributeError(methodName, rawObj);
+                                }
+                                else if (unbound)
+                                {
+                                    context.DataStack.Push(method);
+                                    context.DataStack.Push(rawObj);
+                                }
+                                else
+                                {
+                                    context.DataStack.Push(null);
+                                    context.DataStack.Push(method);
+                                }
                             }
                             context.Cursor += 2;
                             break;
@@ -988,12 +1256,20 @@ namespace CloacaInterpreter
                             break;
                         case ByteCodes.COMPARE_OP:
                             {
+                                Specializer.Count(context, instruction);
                                 context.Cursor += 1;
-                                var compare_op = (CompareOps)context.Function.Code.Code.GetUShort(context.Cursor);
-                                dynamic right = context.DataStack.Pop();
-                                dynamic left = context.DataStack.Pop();
+                                var compare_op = (CompareOps)instruction.Operand;
+                                var right = context.DataStack.Pop();
+                                var left = context.DataStack.Pop();
 
-                                if (left is PyObject && right is PyObject)
+                                // Plain ints, floats, and strings get compared directly instead of looking up and
+                                // calling their dunders.
+                                var nativeResult = Specializer.TryCompare(compare_op, left, right);
+                                if (nativeResult != null)
+                                {
+                                    context.DataStack.Push(nativeResult);
+                                }
+                                else if (left is PyObject && right is PyObject)
                                 {
                                     var leftObj = left as PyObject;
                                     var rightObj = right as PyObject;
@@ -1031,10 +1307,10 @@ namespace CloacaInterpreter
                                             rightObj = swapTemp;
                                             break;
                                         case CompareOps.Is:
-                                            context.DataStack.Push(new PyBool(left.GetType() == right.GetType() && left == right));
+                                            context.DataStack.Push(PyBool.Create(ReferenceEquals(left, right)));
                                             break;
                                         case CompareOps.IsNot:
-                                            context.DataStack.Push(new PyBool(left.GetType() != right.GetType() || left != right));
+                                            context.DataStack.Push(PyBool.Create(!ReferenceEquals(left, right)));
                                             break;
                                         case CompareOps.ExceptionMatch:
                                             {
@@ -1049,8 +1325,8 @@ namespace CloacaInterpreter
                                                 else
                                                 {
                                                     var leftObject = left as PyObject;
-                                                    bool match = Builtins.issubclass(leftObject, right);
-                                                    context.DataStack.Push(new PyBool(match));
+                                                    bool match = Builtins.issubclass(leftObject, rightType);
+                                                    context.DataStack.Push(PyBool.Create(match));
                                                 }
                                                 break;
                                             }
@@ -1069,45 +1345,47 @@ namespace CloacaInterpreter
                                             }
                                             else
                                             {
-                                                context.DataStack.Push((PyBool)returned);
+                                                context.DataStack.Push(returned);
                                             }
                                         }
                                     }
                                 }
                                 else
                                 {
+                                    dynamic dynamicLeft = left;
+                                    dynamic dynamicRight = right;
                                     switch (compare_op)
                                     {
                                         case CompareOps.Lt:
-                                            context.DataStack.Push(new PyBool(left < right));
+                                            context.DataStack.Push(PyBool.Create(dynamicLeft < dynamicRight));
                                             break;
                                         case CompareOps.Gt:
-                                            context.DataStack.Push(new PyBool(left > right));
+                                            context.DataStack.Push(PyBool.Create(dynamicLeft > dynamicRight));
                                             break;
                                         case CompareOps.Eq:
-                                            context.DataStack.Push(new PyBool(left == right));
+                                            context.DataStack.Push(PyBool.Create(dynamicLeft == dynamicRight));
                                             break;
                                         case CompareOps.Ge:
-                                            context.DataStack.Push(new PyBool(left >= right));
+                                            context.DataStack.Push(PyBool.Create(dynamicLeft >= dynamicRight));
                                             break;
                                         case CompareOps.Le:
-                                            context.DataStack.Push(new PyBool(left <= right));
+                                            context.DataStack.Push(PyBool.Create(dynamicLeft <= dynamicRight));
                                             break;
                                         case CompareOps.LtGt:
-                                            context.DataStack.Push(new PyBool(left < right || left > right));
+                                            context.DataStack.Push(PyBool.Create(dynamicLeft < dynamicRight || dynamicLeft > dynamicRight));
                                             break;
                                         case CompareOps.Ne:
-                                            context.DataStack.Push(new PyBool(left != right));
+                                            context.DataStack.Push(PyBool.Create(dynamicLeft != dynamicRight));
                                             break;
                                         case CompareOps.In:
                                             throw new NotImplementedException("'In' comparison operation");
                                         case CompareOps.NotIn:
                                             throw new NotImplementedException("'Not In' comparison operation");
                                         case CompareOps.Is:
-                                            context.DataStack.Push(new PyBool(left.GetType() == right.GetType() && left == right));
+                                            context.DataStack.Push(PyBool.Create(left.GetType() == right.GetType() && dynamicLeft == dynamicRight));
                                             break;
                                         case CompareOps.IsNot:
-                                            context.DataStack.Push(new PyBool(left.GetType() != right.GetType() || left != right));
+                                            context.DataStack.Push(PyBool.Create(left.GetType() != right.GetType() || dynamicLeft != dynamicRight));
                                             break;
                                         case CompareOps.ExceptionMatch:
                                             {
@@ -1121,7 +1399,7 @@ namespace CloacaInterpreter
                                                 else
                                                 {
                                                     var leftObject = left as PyObject;
-                                                    context.DataStack.Push(leftObject.__class__ == right);
+                                                    context.DataStack.Push(PyBool.Create(leftObject.__class__ == rightType));
                                                 }
                                                 break;
                                             }
@@ -1135,9 +1413,14 @@ namespace CloacaInterpreter
                         case ByteCodes.JUMP_IF_TRUE:
                             {
                                 context.Cursor += 1;
-                                var jumpPosition = context.CodeBytes.GetUShort(context.Cursor);
-                                var conditional = (PyBool)context.DataStack.Peek();
-                                if (conditional)
+                                var jumpPosition = instruction.Operand;
+                                var truth = await IsTrue(context, context.DataStack.Peek());
+                                if (context.CurrentException != null)
+                                {
+                                    context.Cursor += 2;
+                                    break;
+                                }
+                                if (truth)
                                 {
                                     context.Cursor = jumpPosition;
                                     continue;
@@ -1148,9 +1431,14 @@ namespace CloacaInterpreter
                         case ByteCodes.JUMP_IF_FALSE:
                             {
                                 context.Cursor += 1;
-                                var jumpPosition = context.CodeBytes.GetUShort(context.Cursor);
-                                var conditional = (PyBool)context.DataStack.Peek();
-                                if (!conditional)
+                                var jumpPosition = instruction.Operand;
+                                var truth = await IsTrue(context, context.DataStack.Peek());
+                                if (context.CurrentException != null)
+                                {
+                                    context.Cursor += 2;
+                                    break;
+                                }
+                                if (!truth)
                                 {
                                     context.Cursor = jumpPosition;
                                     continue;
@@ -1161,9 +1449,14 @@ namespace CloacaInterpreter
                         case ByteCodes.JUMP_IF_FALSE_OR_POP:
                             {
                                 context.Cursor += 1;
-                                var jumpPosition = context.CodeBytes.GetUShort(context.Cursor);
-                                var conditional = (PyBool)context.DataStack.Peek();
-                                if (!conditional)
+                                var jumpPosition = instruction.Operand;
+                                var truth = await IsTrue(context, context.DataStack.Peek());
+                                if (context.CurrentException != null)
+                                {
+                                    context.Cursor += 2;
+                                    break;
+                                }
+                                if (!truth)
                                 {
                                     context.Cursor = jumpPosition;
                                     continue;
@@ -1178,9 +1471,14 @@ namespace CloacaInterpreter
                         case ByteCodes.POP_JUMP_IF_TRUE:
                             {
                                 context.Cursor += 1;
-                                var jumpPosition = context.CodeBytes.GetUShort(context.Cursor);
-                                var conditional = (PyBool)context.DataStack.Pop();
-                                if (conditional)
+                                var jumpPosition = instruction.Operand;
+                                var truth = await IsTrue(context, context.DataStack.Pop());
+                                if (context.CurrentException != null)
+                                {
+                                    context.Cursor += 2;
+                                    break;
+                                }
+                                if (truth)
                                 {
                                     context.Cursor = jumpPosition;
                                     continue;
@@ -1191,9 +1489,14 @@ namespace CloacaInterpreter
                         case ByteCodes.JUMP_IF_TRUE_OR_POP:
                             {
                                 context.Cursor += 1;
-                                var jumpPosition = context.CodeBytes.GetUShort(context.Cursor);
-                                var conditional = (PyBool)context.DataStack.Peek();
-                                if (conditional)
+                                var jumpPosition = instruction.Operand;
+                                var truth = await IsTrue(context, context.DataStack.Peek());
+                                if (context.CurrentException != null)
+                                {
+                                    context.Cursor += 2;
+                                    break;
+                                }
+                                if (truth)
                                 {
                                     context.Cursor = jumpPosition;
                                     continue;
@@ -1208,9 +1511,14 @@ namespace CloacaInterpreter
                         case ByteCodes.POP_JUMP_IF_FALSE:
                             {
                                 context.Cursor += 1;
-                                var jumpPosition = context.CodeBytes.GetUShort(context.Cursor);
-                                var conditional = (PyBool)context.DataStack.Pop();
-                                if (!conditional)
+                                var jumpPosition = instruction.Operand;
+                                var truth = await IsTrue(context, context.DataStack.Pop());
+                                if (context.CurrentException != null)
+                                {
+                                    context.Cursor += 2;
+                                    break;
+                                }
+                                if (!truth)
                                 {
                                     context.Cursor = jumpPosition;
                                     continue;
@@ -1221,7 +1529,7 @@ namespace CloacaInterpreter
                         case ByteCodes.UNPACK_SEQUENCE:
                             { 
                                 context.Cursor += 1;
-                                var unpack_count = context.CodeBytes.GetUShort(context.Cursor);
+                                var unpack_count = instruction.Operand;
 
                                 object[] iterable = null;
                                 var unpackee = context.DataStack.Pop();
@@ -1286,7 +1594,7 @@ namespace CloacaInterpreter
                         case ByteCodes.SETUP_LOOP:
                             {
                                 context.Cursor += 1;
-                                var loopResumptionPoint = context.CodeBytes.GetUShort(context.Cursor);
+                                var loopResumptionPoint = instruction.Operand;
                                 context.Cursor += 2;
                                 context.BlockStack.Push(new Block(ByteCodes.SETUP_LOOP, context.Cursor, loopResumptionPoint, context.DataStack.Count));
                             }
@@ -1312,7 +1620,7 @@ namespace CloacaInterpreter
                         case ByteCodes.SETUP_EXCEPT:
                             {
                                 context.Cursor += 1;
-                                var exceptionCatchPoint = context.CodeBytes.GetUShort(context.Cursor);
+                                var exceptionCatchPoint = instruction.Operand;
                                 context.Cursor += 2;
                                 context.BlockStack.Push(new Block(ByteCodes.SETUP_EXCEPT, context.Cursor, context.Cursor + exceptionCatchPoint, context.DataStack.Count));
                             }
@@ -1320,7 +1628,7 @@ namespace CloacaInterpreter
                         case ByteCodes.SETUP_FINALLY:
                             {
                                 context.Cursor += 1;
-                                var finallyClausePoint = context.CodeBytes.GetUShort(context.Cursor);
+                                var finallyClausePoint = instruction.Operand;
                                 context.Cursor += 2;
                                 context.BlockStack.Push(new Block(ByteCodes.SETUP_FINALLY, context.Cursor, context.Cursor + finallyClausePoint, context.DataStack.Count));
                             }
@@ -1328,14 +1636,20 @@ namespace CloacaInterpreter
                         case ByteCodes.JUMP_ABSOLUTE:
                             {
                                 context.Cursor += 1;
-                                var jumpPosition = context.CodeBytes.GetUShort(context.Cursor);
+                                var jumpPosition = instruction.Operand;
+
+                                // Jumping back means we're looping, which counts toward compiling the code.
+                                if (jumpPosition < context.Cursor)
+                                {
+                                    context.Function.Code.Hotness += 1;
+                                }
                                 context.Cursor = jumpPosition;
                                 continue;
                             }
                         case ByteCodes.JUMP_FORWARD:
                             {
                                 context.Cursor += 1;
-                                var jumpOffset = context.CodeBytes.GetUShort(context.Cursor);
+                                var jumpOffset = instruction.Operand;
 
                                 // Offset is based off of the NEXT instruction so add one.
                                 context.Cursor += jumpOffset + 2;
@@ -1355,10 +1669,15 @@ namespace CloacaInterpreter
                                 var tos = context.DataStack.Pop();
                                 var asPyObject = tos as PyObject;
                                 var enumerableType = tos as IEnumerable;
-                                if (asPyObject != null)
+                                var builtinIterator = IteratorMaker.GetBuiltinIterator(tos);
+                                object __iter__ = null;
+                                if (builtinIterator != null)
                                 {
-                                    var __call__ = asPyObject.__getattribute__("__iter__");
-                                    var functionToRun = (IPyCallable)__call__;
+                                    context.DataStack.Push(builtinIterator);
+                                }
+                                else if (asPyObject != null && asPyObject.TryGetAttribute("__iter__", out __iter__))
+                                {
+                                    var functionToRun = (IPyCallable)__iter__;
 
                                     var returned = await functionToRun.Call(this, context, new object[0]);
                                     if (returned != null && !(returned is FutureVoidAwaiter))
@@ -1378,6 +1697,10 @@ namespace CloacaInterpreter
                                 {
                                     context.DataStack.Push(enumerableType.GetEnumerator());
                                 }
+                                else if(asPyObject != null)
+                                {
+                                    context.CurrentException = TypeErrorClass.Create("TypeError: '" + typeName(tos) + "' object is not iterable");
+                                }
                                 else
                                 {
                                     throw new InvalidCastException("Could not extract an iterator from an object of type " + tos.GetType().Name);
@@ -1390,15 +1713,31 @@ namespace CloacaInterpreter
                                 // (leaving the iterator below it). If the iterator indicates it is exhausted TOS is popped, and the
                                 // byte code counter is incremented by delta.
                                 context.Cursor += 1;
-                                var jumpOffset = context.CodeBytes.GetUShort(context.Cursor);
+                                var jumpOffset = instruction.Operand;
 
                                 var iterator = context.DataStack.Pop();
                                 var asPyObject = iterator as PyObject;
                                 var asEnumerator = iterator as IEnumerator;
-                                if (asPyObject != null)
+                                var asNative = iterator as INativeIterator;
+                                object __next__ = null;
+                                if (asNative != null && asNative.IsNative)
+                                {
+                                    // Builtin iterators tell us they're done instead of raising StopIteration.
+                                    object next;
+                                    if (asNative.TryNext(out next))
+                                    {
+                                        context.DataStack.Push(iterator);   // Make sure that iterator gets put back on top!
+                                        context.DataStack.Push(next);
+                                        context.Cursor += 2;
+                                    }
+                                    else
+                                    {
+                                        context.Cursor += jumpOffset + 2;
+                                    }
+                                }
+                                else if (asPyObject != null && asPyObject.TryGetAttribute("__next__", out __next__))
                                 {
-                                    var __call__ = asPyObject.__getattribute__("__next__");
-                                    var functionToRun = (IPyCallable)__call__;
+                                    var functionToRun = (IPyCallable)__next__;
 
                                     try
                                     {
@@ -1458,6 +1797,11 @@ namespace CloacaInterpreter
                                         context.Cursor += 2;
                                     }
                                 }
+                                else if (asPyObject != null)
+                                {
+                                    context.CurrentException = TypeErrorClass.Create("TypeError: '" + typeName(iterator) + "' object is not an iterator");
+                                    context.Cursor += 2;
+                                }
                                 else
                                 {
                                     throw new InvalidCastException("Could not extract an iterator from an object of type " + iterator.GetType().Name);
@@ -1469,7 +1813,7 @@ namespace CloacaInterpreter
                                 // TOS-1 is the code object
                                 // TOS is the function's qualified name
                                 context.Cursor += 1;
-                                var functionOpcode = context.CodeBytes.GetUShort(context.Cursor);             // Currently not using.
+                                var functionOpcode = instruction.Operand;             // Currently not using.
                                 object nameString = context.DataStack.Pop();
                                 string qualifiedName = null;
                                 if (nameString as PyString != null)
@@ -1491,7 +1835,7 @@ namespace CloacaInterpreter
                         case ByteCodes.CALL_FUNCTION_KW:
                             {
                                 context.Cursor += 1;
-                                var argCount = context.CodeBytes.GetUShort(context.Cursor);
+                                var argCount = instruction.Operand;
                                 var argsLeft = argCount;        // Arguments left after pre-processing defaults.
 
                                 // Expectation: There's a tuple on the top of the stack that has the names we have to assign in the
@@ -1525,7 +1869,7 @@ namespace CloacaInterpreter
                         case ByteCodes.CALL_FUNCTION:
                             {
                                 context.Cursor += 1;
-                                var argCount = context.CodeBytes.GetUShort(context.Cursor);
+                                var argCount = instruction.Operand;
 
                                 // This is annoying. The arguments are at the top of the stack while
                                 // the function is under them, but we need the function to assign the
@@ -1540,6 +1884,38 @@ namespace CloacaInterpreter
                                 await commonCallFunction(context, args);
                                 break;
                             }
+                        case ByteCodes.CALL_METHOD:
+                            {
+                                context.Cursor += 1;
+                                var argCount = instruction.Operand;
+
+                                // Leave room up front for self.
+                                var args = new object[argCount + 1];
+                                for (int argIdx = argCount; argIdx > 0; --argIdx)
+                                {
+                                    args[argIdx] = context.DataStack.Pop();
+                                }
+                                var selfOrCallable = context.DataStack.Pop();
+                                var method = context.DataStack.Pop();
+
+                                if (method == null)
+                                {
+                                    // LOAD_METHOD gave us a plain attribute, so this is just a CALL_FUNCTION.
+                                    context.DataStack.Push(selfOrCallable);
+                                    var functionArgs = new List<object>(argCount);
+                                    for (int argIdx = 1; argIdx <= argCount; ++argIdx)
+                                    {
+                                        functionArgs.Add(args[argIdx]);
+                                    }
+                                    await commonCallFunction(context, functionArgs);
+                                }
+                                else
+                                {
+                                    args[0] = selfOrCallable;
+                                    await callMethod(context, (IPyCallable)method, args);
+                                }
+                                break;
+                            }
                         case ByteCodes.RETURN_VALUE:
                             {
                                 Frame returningFrame = context.callStack.Pop();
@@ -1567,7 +1943,7 @@ namespace CloacaInterpreter
                         case ByteCodes.BUILD_TUPLE:
                             {
                                 context.Cursor += 1;
-                                var tupleCount = context.CodeBytes.GetUShort(context.Cursor);
+                                var tupleCount = instruction.Operand;
                                 context.Cursor += 2;
                                 var tupleObj = await PyTupleClass.Instance.Call(this, context, new object[0]);
                                 var tuple = (PyTuple)tupleObj;
@@ -1586,7 +1962,7 @@ namespace CloacaInterpreter
                         case ByteCodes.BUILD_MAP:
                             {
                                 context.Cursor += 1;
-                                var dictSize = context.CodeBytes.GetUShort(context.Cursor);
+                                var dictSize = instruction.Operand;
                                 context.Cursor += 2;
                                 var dictObj = await PyDictClass.Instance.Call(this, context, new object[0]);
                                 var dict = (PyDict) dictObj;
@@ -1612,7 +1988,7 @@ namespace CloacaInterpreter
                         case ByteCodes.BUILD_SET:
                             {
                                 context.Cursor += 1;
-                                var setSize = context.CodeBytes.GetUShort(context.Cursor);
+                                var setSize = instruction.Operand;
                                 context.Cursor += 2;
                                 var anonymousSetObj = await PySetClass.Instance.Call(this, context, new object[0]);
                                 var setObj = (PySet)anonymousSetObj;
@@ -1629,7 +2005,7 @@ namespace CloacaInterpreter
                                 // Top of a stack is the tuple for keys. Operand is how many values to pop off of the
                                 // stack, which is kind of interesting since the tuple length should imply that...
                                 context.Cursor += 1;
-                                var dictSize = context.CodeBytes.GetUShort(context.Cursor);
+                                var dictSize = instruction.Operand;
                                 context.Cursor += 2;
                                 var dict = new Dictionary<object, object>();
                                 var keyTuple = (PyTuple)context.DataStack.Pop();
@@ -1643,7 +2019,7 @@ namespace CloacaInterpreter
                         case ByteCodes.BUILD_LIST:
                             {
                                 context.Cursor += 1;
-                                var listSize = context.CodeBytes.GetUShort(context.Cursor);
+                                var listSize = instruction.Operand;
                                 context.Cursor += 2;
                                 var listObj = await PyListClass.Instance.Call(this, context, new object[0]);
                                 var list = (PyList)listObj;
@@ -1660,16 +2036,17 @@ namespace CloacaInterpreter
                             {
                                 // TODO [.NET PYCONTAINERS] Container types should be able to accept object type, not just PyObject. We could use .NET objects for a keys in a PyDict, for example.
                                 context.Cursor += 1;
-                                var list_offset = context.CodeBytes.GetUShort(context.Cursor);
+                                var list_offset = instruction.Operand;
                                 context.Cursor += 2;
 
-                                var appendList = (PyList) context.DataStack.ElementAt(list_offset);
+                                var appendList = (PyList) context.DataStack.Peek(list_offset);
                                 var toAppend = (PyObject)context.DataStack.Pop();
                                 PyListClass.append(appendList, toAppend);
                             }
                             break;
                         case ByteCodes.BINARY_SUBSCR:
                             {
+                                Specializer.Count(context, instruction);
                                 context.Cursor += 1;
                                 var index = context.DataStack.Pop();
                                 var container = context.DataStack.Pop();
@@ -1679,6 +2056,7 @@ namespace CloacaInterpreter
                             break;
                         case ByteCodes.STORE_SUBSCR:
                             {
+                                Specializer.Count(context, instruction);
                                 context.Cursor += 1;
                                 var rawIndex = context.DataStack.Pop();
                                 var rawContainer = context.DataStack.Pop();
@@ -1709,7 +2087,7 @@ namespace CloacaInterpreter
                                 // 0: raise (re-raise previous exception)
                                 // 1: raise TOS(raise exception instance or type at TOS)
                                 // 2: raise TOS1 from TOS (raise exception instance or type at TOS1 with __cause__ set to TOS)
-                                var argCountIgnored = context.CodeBytes.GetUShort(context.Cursor);
+                                var argCountIgnored = instruction.Operand;
                                 if (argCountIgnored != 1)
                                 {
                                     throw new NotImplementedException("RAISE_VARARGS with none-one fields not yet implemented.");
@@ -1776,13 +2154,18 @@ namespace CloacaInterpreter
 
                                 var fromlist = context.DataStack.Pop();
                                 var import_level = context.DataStack.Pop();
-                                var import_name_i = context.Function.Code.Code.GetUShort(context.Cursor);
+                                var import_name_i = instruction.Operand;
                                 var module_name = context.LocalNames[import_name_i];
 
                                 PyModule foundModule = null;
-                                if (context.SysModules.ContainsKey(module_name))
+                                if (context.SysModules.TryGetValue(module_name, out foundModule))
                                 {
-                                    foundModule = context.SysModules[module_name];
+                                    context.DataStack.Push(foundModule);
+                                }
+                                else if ((foundModule = await SysModules.WaitForModule(Scheduler, context, module_name)) != null)
+                                {
+                                    // Another task already imported it.
+                                    context.SysModules[module_name] = foundModule;
                                     context.DataStack.Push(foundModule);
                                 }
                                 else
@@ -1803,11 +2186,28 @@ namespace CloacaInterpreter
                                     }
                                     else
                                     {
-                                        var toImport = await spec.Loader.Load(this, context, spec);
+                                        var pendingImport = SysModules.BeginImport(context, module_name, spec);
+                                        object toImport = null;
+                                        try
+                                        {
+                                            toImport = await spec.Loader.Load(this, context, spec);
+                                        }
+                                        finally
+                                        {
+                                            // Modules that failed to run aren't shared. CLR namespaces aren't either since what's in them
+                                            // depends on the assemblies the importing context referenced.
+                                            var shared = toImport as PyModule;
+                                            if(context.CurrentException != null || shared is ClrNamespaceModule)
+                                            {
+                                                shared = null;
+                                            }
+                                            SysModules.EndImport(pendingImport, shared);
+                                        }
+
                                         context.DataStack.Push(toImport);
                                         if(toImport is PyModule)
                                         {
-                                            context.SysModules.Add(module_name, toImport as PyModule);
+                                            context.SysModules[module_name] = toImport as PyModule;
                                         }
                                     }
                                 }
@@ -1822,7 +2222,7 @@ namespace CloacaInterpreter
                                 context.Cursor += 1;
                                 var fromModule = context.DataStack.Peek();      // Module is kept on the stack for subsequent IMPORT_FROM. Removed with a POP_TOP.
 
-                                var importName_i = context.Function.Code.Code.GetUShort(context.Cursor);
+                                var importName_i = instruction.Operand;
                                 var fromName = (PyString) context.Function.Code.Constants[importName_i];
 
                                 // TODO: Import from .NET modules
@@ -1847,6 +2247,14 @@ namespace CloacaInterpreter
                                 // loading all names. This opcode implements from module import *.
                                 context.Cursor += 1;
                                 var fromModule = (PyModule) context.DataStack.Pop();
+
+                                // .NET namespaces only fill in their types when they're looked up, so get all of them now.
+                                var asClrModule = fromModule as ClrNamespaceModule;
+                                if(asClrModule != null)
+                                {
+                                    asClrModule.ResolveAll();
+                                }
+
                                 foreach(var starImported in fromModule.__dict__)
                                 {
                                     if (!starImported.Key.StartsWith("_"))
@@ -1860,7 +2268,7 @@ namespace CloacaInterpreter
                                             varIndex = context.LocalNames.AddGetIndex(starImported.Key);
                                         }
 
-                                        context.Locals.AddOrSet(context.LocalNames[varIndex], starImported.Value);
+                                        Namespaces.Set(context.Locals, context.LocalNames[varIndex], starImported.Value);
                                     }
                                 }
                                 break;
@@ -1885,7 +2293,7 @@ namespace CloacaInterpreter
                         case ByteCodes.BUILD_SLICE:
                             {
                                 context.Cursor += 1;
-                                var arg_count = context.Function.Code.Code.GetUShort(context.Cursor);
+                                var arg_count = instruction.Operand;
                                 context.Cursor += 2;
 
                                 if(arg_count > 3)
@@ -1916,6 +2324,36 @@ namespace CloacaInterpreter
                                 context.DataStack.Push(PySlice.Create(startFromStack, stopFromStack, stepFromStack));
                             }
                             break;
+                        case ByteCodes.BINARY_ADD_INT:
+                        case ByteCodes.BINARY_SUBTRACT_INT:
+                        case ByteCodes.BINARY_MULTIPLY_INT:
+                        case ByteCodes.BINARY_FLOOR_DIVIDE_INT:
+                        case ByteCodes.BINARY_MODULO_INT:
+                        case ByteCodes.BINARY_TRUE_DIVIDE_INT:
+                        case ByteCodes.INPLACE_ADD_INT:
+                        case ByteCodes.INPLACE_SUBTRACT_INT:
+                        case ByteCodes.BINARY_ADD_FLOAT:
+                        case ByteCodes.BINARY_SUBTRACT_FLOAT:
+                        case ByteCodes.BINARY_MULTIPLY_FLOAT:
+                        case ByteCodes.BINARY_TRUE_DIVIDE_FLOAT:
+                        case ByteCodes.INPLACE_ADD_FLOAT:
+                        case ByteCodes.INPLACE_SUBTRACT_FLOAT:
+                        case ByteCodes.COMPARE_OP_INT:
+                        case ByteCodes.COMPARE_OP_FLOAT:
+                        case ByteCodes.COMPARE_OP_STR:
+                        case ByteCodes.BINARY_SUBSCR_LIST_INT:
+                        case ByteCodes.BINARY_SUBSCR_DICT_STR:
+                        case ByteCodes.STORE_SUBSCR_LIST_INT:
+                        case ByteCodes.STORE_SUBSCR_DICT_STR:
+                        case ByteCodes.LOAD_ATTR_INSTANCE_VALUE:
+                            if (!Specializer.TryRun(context, instruction))
+                            {
+                                // The guard failed. Put the generic instruction back and run that instead.
+                                context.CodeBytes.Deoptimize(context.Cursor);
+                                ranOne = false;
+                                continue;
+                            }
+                            break;
                         default:
                             throw new Exception("Unexpected opcode: " + opcode);
                     }
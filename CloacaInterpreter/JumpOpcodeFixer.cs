@@ -22,12 +22,12 @@ namespace CloacaInterpreter
     /// (emit the byte code that the JUMP_FORWARD would go to)
     /// 
     /// This is encapsulating some quirks. The constructor is getting the location of the
-    /// opcode AFTER the one to patch. All the opcodes that cause jumps are consistent sizes
-    /// we can figure which byte is the one we meant.
+    /// opcode AFTER the one to patch. All the opcodes that cause jumps take an operand, so they
+    /// are all Instruction.OperandSize long and we can figure which instruction is the one we meant.
     /// </summary>
     public class JumpOpcodeFixer
     {
-        private List<int> fixupByteOffsets;
+        private List<int> fixupInstructionOffsets;
         private CodeBuilder builder;
         public int InstructionLocation
         {
@@ -36,7 +36,7 @@ namespace CloacaInterpreter
 
         public JumpOpcodeFixer(CodeBuilder builder)
         {
-            fixupByteOffsets = new List<int>();
+            fixupInstructionOffsets = new List<int>();
             this.builder = builder;
             InstructionLocation = builder.Count;
         }
@@ -48,24 +48,24 @@ namespace CloacaInterpreter
 
         public void Add(int codeByteIndexAfterInstruction)
         {
-            fixupByteOffsets.Add(codeByteIndexAfterInstruction - 2);
+            fixupInstructionOffsets.Add(codeByteIndexAfterInstruction - Instruction.OperandSize);
         }
 
         public void Fixup(int jumpPoint)
         {
             // Fixup offset is relative to the location AFTER the instruction (it is fully fetched and 
             // we are pointing at the next instruction when we jump).
-            foreach(var sourceJump in fixupByteOffsets)
+            foreach(var sourceJump in fixupInstructionOffsets)
             {
-                builder.SetUShort(sourceJump, jumpPoint - sourceJump - 2);
+                builder.SetOperand(sourceJump, jumpPoint - sourceJump - Instruction.OperandSize);
             }            
         }
 
         public void FixupAbsolute(int absoluteJumpPoint)
         {
-            foreach (var sourceJump in fixupByteOffsets)
+            foreach (var sourceJump in fixupInstructionOffsets)
             {
-                builder.SetUShort(sourceJump, absoluteJumpPoint);
+                builder.SetOperand(sourceJump, absoluteJumpPoint);
             }
         }
     }
@@ -0,0 +1,165 @@
+﻿using System;
+using System.IO;
+using System.Security.Cryptography;
+using System.Text;
+
+using LanguageImplementation;
+
+namespace CloacaInterpreter.ModuleImporting
+{
+    /// <summary>
+    /// Saves compiled modules to disk so the next load doesn't have to parse them again; think .pyc files. They all go
+    /// in the cache directory given to the constructor. Nothing is ever written next to the scripts themselves, since
+    /// an embedding application shouldn't find new directories showing up in its script folders.
+    ///
+    /// A cache file is only used if it was written from the same source text by the same build of the interpreter.
+    /// Anything wrong with a cache file just counts as a miss, and failing to write one (read-only script directories
+    /// and so on) is ignored; the module compiles like it would have without the cache.
+    /// </summary>
+    public class BytecodeCache
+    {
+        public const string CacheFileExtension = ".cloaca.pyc";
+
+        // "CPYC"
+        private const int Magic = 0x43595043;
+
+        // The compiler and the bytecode it generates change with the interpreter, so cache files written by a different
+        // build are thrown out. The module version IDs change with every build of the assemblies.
+        private static readonly string InterpreterStamp =
+            typeof(CodeObject).Module.ModuleVersionId.ToString() + "/" +
+            typeof(ByteCodeCompiler).Module.ModuleVersionId.ToString() + "/" +
+            CodeObjectSerializer.FormatVersion;
+
+        /// <summary>
+        /// Where cache files are written.
+        /// </summary>
+        public string CacheDirectory
+        {
+            get; private set;
+        }
+
+        public BytecodeCache(string cacheDirectory)
+        {
+            if(cacheDirectory == null)
+            {
+                throw new ArgumentNullException("cacheDirectory");
+            }
+            CacheDirectory = cacheDirectory;
+        }
+
+        public string GetCachePath(string sourcePath)
+        {
+            var fullPath = Path.GetFullPath(sourcePath);
+            var stem = Path.GetFileNameWithoutExtension(fullPath);
+
+            // Everything shares one directory, so tell apart same-named modules from different places.
+            var pathHash = hash(fullPath.ToLowerInvariant());
+            return Path.Combine(CacheDirectory, stem + "." + BitConverter.ToString(pathHash, 0, 4).Replace("-", "") + CacheFileExtension);
+        }
+
+        /// <summary>
+        /// Gets the cached code for a module if there is a valid cache file for it.
+        /// </summary>
+        /// <param name="sourcePath">Path to the module's source file.</param>
+        /// <param name="source">The module's source text.</param>
+        /// <returns>The module's code, or null if there isn't a usable cache file.</returns>
+        public CodeObject TryLoad(string sourcePath, string source)
+        {
+            var cachePath = GetCachePath(sourcePath);
+            if(!File.Exists(cachePath))
+            {
+                return null;
+            }
+
+            try
+            {
+                using(var stream = File.OpenRead(cachePath))
+                using(var reader = new BinaryReader(stream, Encoding.UTF8, true))
+                {
+                    if(reader.ReadInt32() != Magic || reader.ReadString() != InterpreterStamp)
+                    {
+                        return null;
+                    }
+
+                    var sourceHash = hash(source);
+                    var cachedHash = reader.ReadBytes(sourceHash.Length);
+                    if(cachedHash.Length != sourceHash.Length)
+                    {
+                        return null;
+                    }
+                    for(int i = 0; i < sourceHash.Length; ++i)
+                    {
+                        if(cachedHash[i] != sourceHash[i])
+                        {
+                            return null;
+                        }
+                    }
+
+                    return CodeObjectSerializer.Read(stream);
+                }
+            }
+            catch(Exception e) when (e is IOException || e is UnauthorizedAccessException || e is InvalidDataException || e is ArgumentException)
+            {
+                return null;
+            }
+        }
+
+        /// <summary>
+        /// Writes a cache file for the module's code. Nothing is written if the code holds something the serializer
+        /// can't handle.
+        /// </summary>
+        /// <param name="sourcePath">Path to the module's source file.</param>
+        /// <param name="source">The source text the code was compiled from.</param>
+        /// <param name="code">The compiled module code.</param>
+        /// <returns>True if the cache file was written.</returns>
+        public bool TryStore(string sourcePath, string source, CodeObject code)
+        {
+            if(!CodeObjectSerializer.CanSerialize(code))
+            {
+                return false;
+            }
+
+            var cachePath = GetCachePath(sourcePath);
+            var tempPath = cachePath + "." + Guid.NewGuid().ToString("N") + ".tmp";
+            try
+            {
+                Directory.CreateDirectory(Path.GetDirectoryName(cachePath));
+
+                // Written to the side and copied in so nobody reads a half-written file.
+                using(var stream = File.Create(tempPath))
+                using(var writer = new BinaryWriter(stream, Encoding.UTF8, true))
+                {
+                    writer.Write(Magic);
+                    writer.Write(InterpreterStamp);
+                    writer.Write(hash(source));
+                    writer.Flush();
+                    CodeObjectSerializer.Write(stream, code);
+                }
+                File.Copy(tempPath, cachePath, true);
+                return true;
+            }
+            catch(Exception e) when (e is IOException || e is UnauthorizedAccessException)
+            {
+                return false;
+            }
+            finally
+            {
+                try
+                {
+                    File.Delete(tempPath);
+                }
+                catch(Exception e) when (e is IOException || e is UnauthorizedAccessException)
+                {
+                }
+            }
+        }
+
+        private static byte[] hash(string text)
+        {
+            using(var sha = SHA256.Create())
+            {
+                return sha.ComputeHash(Encoding.UTF8.GetBytes(text));
+            }
+        }
+    }
+}
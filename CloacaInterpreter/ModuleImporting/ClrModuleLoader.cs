@@ -1,4 +1,6 @@
-﻿using System.Collections.Generic;
+﻿using System;
+using System.Collections.Concurrent;
+using System.Collections.Generic;
 using System.Reflection;
 using System.Threading.Tasks;
 using LanguageImplementation;
@@ -6,6 +8,231 @@ using LanguageImplementation.DataTypes;
 
 namespace CloacaInterpreter.ModuleImporting
 {
+    /// <summary>
+    /// Namespace and type name lookups for an assembly's types. Imports used to walk assembly.GetTypes() every time, and
+    /// for something like mscorlib that was most of the startup time of a script importing from System. Each assembly is
+    /// indexed once and shared by every interpreter.
+    /// </summary>
+    public class ClrTypeIndex
+    {
+        private static ConcurrentDictionary<Assembly, ClrTypeIndex> indices = new ConcurrentDictionary<Assembly, ClrTypeIndex>();
+
+        // Namespace -> name -> type. Generic types are listed under their CLR name (List`1) so different arities stay
+        // distinct, and also under the name without the arity (List). That shorter name goes to the non-generic type if
+        // there is one and otherwise to the generic with the fewest type parameters.
+        private Dictionary<string, Dictionary<string, Type>> namespaces;
+
+        // Short names that have been taken by a generic type, with that type's arity. These can be replaced by a
+        // non-generic type or a generic one with fewer type parameters.
+        private Dictionary<Tuple<string, string>, int> collapsedArities;
+
+        // Type.Name -> first type with that name, for when something being imported is a type and not a namespace.
+        private Dictionary<string, Type> typesByName;
+
+        public static ClrTypeIndex Get(Assembly assembly)
+        {
+            // Dynamic assemblies can still be getting new types defined, so don't hang on to what we found.
+            if(assembly.IsDynamic)
+            {
+                return new ClrTypeIndex(assembly);
+            }
+
+            ClrTypeIndex index;
+            if(!indices.TryGetValue(assembly, out index))
+            {
+                index = indices.GetOrAdd(assembly, new ClrTypeIndex(assembly));
+            }
+            return index;
+        }
+
+        private ClrTypeIndex(Assembly assembly)
+        {
+            namespaces = new Dictionary<string, Dictionary<string, Type>>();
+            collapsedArities = new Dictionary<Tuple<string, string>, int>();
+            typesByName = new Dictionary<string, Type>();
+
+            Type[] types;
+            try
+            {
+                types = assembly.GetTypes();
+            }
+            catch(ReflectionTypeLoadException e)
+            {
+                types = e.Types;
+            }
+
+            foreach(var type in types)
+            {
+                if(type == null)
+                {
+                    continue;
+                }
+
+                if(!typesByName.ContainsKey(type.Name))
+                {
+                    typesByName.Add(type.Name, type);
+                }
+
+                // Types without a namespace can only be imported by name.
+                if(type.Namespace == null)
+                {
+                    continue;
+                }
+
+                Dictionary<string, Type> namespaceTypes;
+                if(!namespaces.TryGetValue(type.Namespace, out namespaceTypes))
+                {
+                    namespaceTypes = new Dictionary<string, Type>();
+                    namespaces.Add(type.Namespace, namespaceTypes);
+                }
+
+                if(!namespaceTypes.ContainsKey(type.Name))
+                {
+                    namespaceTypes.Add(type.Name, type);
+                }
+
+                // TODO: [DISAMBIGUATE GENERIC IMPORTS] The arity-qualified names keep Type<T> and Type<T, K> apart, but
+                // scripts can't spell List`1 in an import. Something like Python.NET's List[T] would be nicer.
+                var genericParamQualifierIdx = type.Name.IndexOf("`");
+                if(genericParamQualifierIdx >= 0)
+                {
+                    var collapsedName = type.Name.Substring(0, genericParamQualifierIdx);
+                    var arity = type.GetGenericArguments().Length;
+                    var arityKey = new Tuple<string, string>(type.Namespace, collapsedName);
+                    int takenArity;
+                    if(!namespaceTypes.ContainsKey(collapsedName))
+                    {
+                        namespaceTypes.Add(collapsedName, type);
+                        collapsedArities.Add(arityKey, arity);
+                    }
+                    else if(collapsedArities.TryGetValue(arityKey, out takenArity) && arity < takenArity)
+                    {
+                        namespaceTypes[collapsedName] = type;
+                        collapsedArities[arityKey] = arity;
+                    }
+                }
+                else
+                {
+                    // Non-generic types take the short name from any generic that got there first.
+                    var arityKey = new Tuple<string, string>(type.Namespace, type.Name);
+                    if(collapsedArities.Remove(arityKey))
+                    {
+                        namespaceTypes[type.Name] = type;
+                    }
+                }
+            }
+        }
+
+        public bool HasNamespace(string namespaceName)
+        {
+            return namespaces.ContainsKey(namespaceName);
+        }
+
+        public bool TryGetType(string namespaceName, string name, out Type type)
+        {
+            Dictionary<string, Type> namespaceTypes;
+            if(namespaces.TryGetValue(namespaceName, out namespaceTypes))
+            {
+                return namespaceTypes.TryGetValue(name, out type);
+            }
+            type = null;
+            return false;
+        }
+
+        public bool TryGetTypeByName(string name, out Type type)
+        {
+            return typesByName.TryGetValue(name, out type);
+        }
+
+        /// <summary>
+        /// All the names importable from the namespace, without the arity suffixes on generics.
+        /// </summary>
+        public IEnumerable<KeyValuePair<string, Type>> GetCollapsedNames(string namespaceName)
+        {
+            Dictionary<string, Type> namespaceTypes;
+            if(!namespaces.TryGetValue(namespaceName, out namespaceTypes))
+            {
+                yield break;
+            }
+
+            foreach(var pair in namespaceTypes)
+            {
+                if(pair.Key.IndexOf("`") < 0)
+                {
+                    yield return pair;
+                }
+            }
+        }
+    }
+
+    /// <summary>
+    /// Module standing in for a .NET namespace. Types are looked up when they're first accessed instead of filling the
+    /// module with the whole namespace when it's imported.
+    /// </summary>
+    public class ClrNamespaceModule : PyModule
+    {
+        private List<Assembly> references;
+
+        public string Namespace
+        {
+            get; private set;
+        }
+
+        public ClrNamespaceModule()
+        {
+        }
+
+        public static ClrNamespaceModule Create(string namespaceName, List<Assembly> references)
+        {
+            var createdModule = PyTypeObject.DefaultNew<ClrNamespaceModule>(PyModuleClass.Instance);
+            createdModule.__dict__.Add("__name__", namespaceName);
+            createdModule.__dict__.Add("__doc__", "");
+            createdModule.Namespace = namespaceName;
+
+            // Copy these so later clr.AddReference() calls don't change what was imported.
+            createdModule.references = new List<Assembly>(references);
+            return createdModule;
+        }
+
+        public override bool TryGetUnboundAttribute(string name, out object value)
+        {
+            if(base.TryGetUnboundAttribute(name, out value))
+            {
+                return true;
+            }
+
+            foreach(var assembly in references)
+            {
+                Type found;
+                if(ClrTypeIndex.Get(assembly).TryGetType(Namespace, name, out found))
+                {
+                    __dict__[name] = found;
+                    value = found;
+                    return true;
+                }
+            }
+            return false;
+        }
+
+        /// <summary>
+        /// Puts every type in the namespace into the module's __dict__. This is for when something needs everything
+        /// at once, like import *.
+        /// </summary>
+        public void ResolveAll()
+        {
+            foreach(var assembly in references)
+            {
+                foreach(var pair in ClrTypeIndex.Get(assembly).GetCollapsedNames(Namespace))
+                {
+                    if(!__dict__.ContainsKey(pair.Key))
+                    {
+                        __dict__.Add(pair.Key, pair.Value);
+                    }
+                }
+            }
+        }
+    }
+
 
     public class ClrModuleFinder : ISpecFinder
     {
@@ -28,28 +255,17 @@ namespace CloacaInterpreter.ModuleImporting
 
         private PyModuleSpec findInAssemblies(string name, List<Assembly> assemblies, ClrContext loaderContext)
         {
-            // TODO: Try to find a faster way to do these lookups.
             foreach (var assembly in assemblies)
             {
-                foreach (var type in assembly.GetTypes())
-                {
-                    if (type.Namespace == name)
-                    {
-                        var spec = PyModuleSpec.Create(name, loader, "", null);
-                        spec.LoaderState = loaderContext;
-                        return spec;
-                    }
-                }
+                var index = ClrTypeIndex.Get(assembly);
+                Type ignored;
 
-                // Still here? Maybe it's an actual type, not an assembly!
-                foreach (var type in assembly.GetTypes())
+                // It's either a namespace or maybe it's an actual type, not an assembly!
+                if (index.HasNamespace(name) || index.TryGetTypeByName(name, out ignored))
                 {
-                    if (type.Name == name)
-                    {
-                        var spec = PyModuleSpec.Create(name, loader, "", null);
-                        spec.LoaderState = loaderContext;
-                        return spec;
-                    }
+                    var spec = PyModuleSpec.Create(name, loader, "", null);
+                    spec.LoaderState = loaderContext;
+                    return spec;
                 }
             }
             return null;
@@ -99,42 +315,19 @@ namespace CloacaInterpreter.ModuleImporting
         /// </summary>
         /// <param name="spec">The module spec we will load.</param>
         /// <returns>The loaded asset... which might be a PyModule wrapper if this is a namespace. Otherwise, the asset itself.</returns>
-        public async Task<object> Load(IInterpreter interpreter, FrameContext context, PyModuleSpec spec)
+        public Task<object> Load(IInterpreter interpreter, FrameContext context, PyModuleSpec spec)
         {
             // Don't get too fixated on this being a module at the end of the day.
-            var module = PyModule.Create(spec.Name);
             var clrContext = (ClrContext) spec.LoaderState;
 
-            // TODO: [CLR - OPTIMIZE GETATTR] Create a .NET PyModule interface overridding __getattr__ to do these lookups instead of stuffing the
-            // module with everything. Tackle that once this has settled down a bit and we know exactly what we're trying to do.
-
-            // Some LINQ magic could probably do this but I think I want to be able to step through it.
+            // Types in the namespace are resolved as they're accessed; see ClrNamespaceModule.
             bool foundAny = false;
             foreach(var assembly in clrContext.AddedReferences)
             {
-                foreach(var type in assembly.GetTypes())
+                if(ClrTypeIndex.Get(assembly).HasNamespace(spec.Name))
                 {
-                    if(type.Namespace == spec.Name)
-                    {
-                        // TODO: [DISAMBIGUATE GENERIC IMPORTS] Replace clr generic type import with a more robust system that can manage Type<T> and Type<T, K>
-                        // As it stands, they will collide here since we're removing the `# designator at the end. It would normally be:
-                        // Type<T> -> Type`1
-                        // Type<T, K> -> Type`2
-                        //
-                        // But we're collapsing them into just "Type"
-                        var collapsedName = type.Name;
-                        var genericParamQualifierIdx = collapsedName.IndexOf("`");
-                        if(genericParamQualifierIdx >= 0)
-                        {
-                            collapsedName = collapsedName.Substring(0, genericParamQualifierIdx);
-                        }
-
-                        if(!module.__dict__.ContainsKey(collapsedName))
-                        {
-                            foundAny = true;
-                            module.__dict__.Add(collapsedName, type);
-                        }
-                    }
+                    foundAny = true;
+                    break;
                 }
             }
 
@@ -143,17 +336,15 @@ namespace CloacaInterpreter.ModuleImporting
             {
                 foreach (var assembly in clrContext.AddedReferences)
                 {
-                    foreach (var type in assembly.GetTypes())
+                    Type type;
+                    if (ClrTypeIndex.Get(assembly).TryGetTypeByName(spec.Name, out type))
                     {
-                        if (type.Name == spec.Name)
-                        {
-                            return type;
-                        }
+                        return Task.FromResult<object>(type);
                     }
                 }
             }
 
-            return module;
+            return Task.FromResult<object>(ClrNamespaceModule.Create(spec.Name, clrContext.AddedReferences));
         }
     }
 }
@@ -88,23 +88,60 @@ namespace CloacaInterpreter.ModuleImporting
     /// Loader of FileBasedModuleFinder PyModuleSpecs. This will actually load the module
     /// from disk. It will then execute the code inside that module file. The final module is a fresh
     /// module created from scratch that is populated with the executed code's namespace.
+    ///
+    /// Modules are compiled from source every time unless a BytecodeCache is given. Caching is opt-in because it
+    /// writes files, and it only ever writes them in the cache's own directory.
     /// </summary>
     public class FileBasedModuleLoader : ISpecLoader
     {
+        /// <summary>
+        /// Compiled modules are saved here and reused as long as their source doesn't change. By default this is
+        /// null, and modules always compile from source.
+        /// </summary>
+        public BytecodeCache Cache;
+
+        public FileBasedModuleLoader() : this(null)
+        {
+        }
+
+        public FileBasedModuleLoader(BytecodeCache cache)
+        {
+            Cache = cache;
+        }
 
         public async Task<object> Load(IInterpreter interpreter, FrameContext context, PyModuleSpec spec)
         {
             var foundPath = (string)spec.LoaderState;
             var inFile = File.ReadAllText(foundPath);
 
+            // Created before running anything so a circular import can get at it through the spec. It's filled in once
+            // the module's code has run.
+            var module = PyModule.Create(spec.Name);
+            spec.Module = module;
+
             var moduleGlobals = new Dictionary<string, object>();
             moduleGlobals.Add("__name__", spec.Name);
 
-            // TODO [VARIABLE RESOLUTION]: Pipe in builtins here separately.
-            var moduleCode = await ByteCodeCompiler.Compile(inFile,
-                new Dictionary<string, object>(),
-                moduleGlobals,
-                interpreter.Scheduler);
+            PyFunction moduleCode;
+            var cachedCode = Cache != null ? Cache.TryLoad(foundPath, inFile) : null;
+            if(cachedCode != null)
+            {
+                moduleCode = PyFunction.Create(cachedCode, new Dictionary<string, object>());
+            }
+            else
+            {
+                // TODO [VARIABLE RESOLUTION]: Pipe in builtins here separately.
+                moduleCode = await ByteCodeCompiler.Compile(inFile,
+                    new Dictionary<string, object>(),
+                    moduleGlobals,
+                    interpreter.Scheduler,
+                    (interpreter as Interpreter)?.CompileCache);
+
+                if(Cache != null)
+                {
+                    Cache.TryStore(foundPath, inFile, moduleCode.Code);
+                }
+            }
 
             // This has been unused awhile but I will keep it at the ready.
             //string modulename = spec.Origin.Length == 0 ? spec.Name : spec.Origin + "." + spec.Name;
@@ -117,7 +154,6 @@ namespace CloacaInterpreter.ModuleImporting
             }
 
             var moduleFrame = context.callStack.Pop();
-            var module = PyModule.Create(spec.Name);
             
             for(int local_i = 0; local_i < moduleFrame.LocalNames.Count; ++local_i)
             {
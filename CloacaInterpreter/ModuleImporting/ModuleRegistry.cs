@@ -0,0 +1,233 @@
+﻿using System.Collections.Generic;
+using System.Threading.Tasks;
+
+using LanguageImplementation;
+using LanguageImplementation.DataTypes;
+
+namespace CloacaInterpreter.ModuleImporting
+{
+    /// <summary>
+    /// The interpreter-wide analogue of sys.modules. Each FrameContext still keeps its own SysModules, but without
+    /// this every scheduled task would find and load (and compile, and run) the same modules all over again.
+    ///
+    /// Imports that are still running are tracked so another task importing the same module waits for that import
+    /// to finish instead of loading its own copy. The registry does not run the loaders itself; IMPORT_NAME calls
+    /// BeginImport before loading and EndImport afterwards.
+    ///
+    /// Circular imports can't wait. If task A is importing X and X imports Y, while task B is importing Y and Y
+    /// imports X, each would wait on the other forever. The registry keeps track of what every task is waiting on.
+    /// When waiting would close a loop like that, the importer gets the partly initialized module instead, the same
+    /// as a circular import within one task.
+    /// </summary>
+    public class ModuleRegistry
+    {
+        public class PendingImport
+        {
+            public string Name
+            {
+                get; private set;
+            }
+
+            /// <summary>
+            /// The context doing the import. A module importing itself circularly would otherwise wait on itself.
+            /// </summary>
+            public FrameContext Importer
+            {
+                get; private set;
+            }
+
+            /// <summary>
+            /// The spec being loaded, if it was given to BeginImport.
+            /// </summary>
+            public PyModuleSpec Spec
+            {
+                get; private set;
+            }
+
+            /// <summary>
+            /// The module as far as it has been loaded, or null if the loader hasn't created it yet.
+            /// </summary>
+            public PyModule Module
+            {
+                get
+                {
+                    return Spec != null ? Spec.Module : null;
+                }
+            }
+
+            public List<FutureVoidAwaiter> Waiters
+            {
+                get; private set;
+            }
+
+            public PendingImport(string name, FrameContext importer, PyModuleSpec spec)
+            {
+                Name = name;
+                Importer = importer;
+                Spec = spec;
+                Waiters = new List<FutureVoidAwaiter>();
+            }
+        }
+
+        private object registryLock;
+        private Dictionary<string, PyModule> modules;
+        private Dictionary<string, PendingImport> pending;
+
+        // The import each blocked context is waiting on.
+        private Dictionary<FrameContext, PendingImport> waiting;
+
+        public ModuleRegistry()
+        {
+            registryLock = new object();
+            modules = new Dictionary<string, PyModule>();
+            pending = new Dictionary<string, PendingImport>();
+            waiting = new Dictionary<FrameContext, PendingImport>();
+        }
+
+        public bool TryGetModule(string name, out PyModule module)
+        {
+            lock(registryLock)
+            {
+                return modules.TryGetValue(name, out module);
+            }
+        }
+
+        public void AddModule(string name, PyModule module)
+        {
+            lock(registryLock)
+            {
+                modules[name] = module;
+            }
+        }
+
+        public bool RemoveModule(string name)
+        {
+            lock(registryLock)
+            {
+                return modules.Remove(name);
+            }
+        }
+
+        /// <summary>
+        /// Follows what the importer of a pending import is waiting on, and what that one's importer is waiting on, and
+        /// so on. Waiting on the import is a deadlock if that comes back around to the given context.
+        /// </summary>
+        private bool wouldDeadlock(FrameContext context, PendingImport inProgress)
+        {
+            var importer = inProgress.Importer;
+            while(importer != context)
+            {
+                PendingImport importerWaitsOn;
+                if(!waiting.TryGetValue(importer, out importerWaitsOn))
+                {
+                    return false;
+                }
+                importer = importerWaitsOn.Importer;
+            }
+            return true;
+        }
+
+        /// <summary>
+        /// Gets a module that has been imported already. If another context is in the middle of importing it, this
+        /// blocks the calling script until that import finishes. It doesn't block for circular imports, where that
+        /// import is waiting on this context, directly or not; those get the partly initialized module.
+        /// </summary>
+        /// <param name="scheduler">The scheduler running the script in the given context.</param>
+        /// <param name="context">The context doing the import.</param>
+        /// <param name="name">The full name of the module.</param>
+        /// <returns>The module, or null if it hasn't been imported. It will also be null if it was being imported
+        /// by another context and that failed, or if it's a circular import and the loader hasn't created the module
+        /// yet. The caller should try the import itself in either case.</returns>
+        public async Task<PyModule> WaitForModule(IScheduler scheduler, FrameContext context, string name)
+        {
+            FutureVoidAwaiter waiter = null;
+            lock(registryLock)
+            {
+                PyModule module;
+                if(modules.TryGetValue(name, out module))
+                {
+                    return module;
+                }
+
+                PendingImport inProgress;
+                if(!pending.TryGetValue(name, out inProgress))
+                {
+                    return null;
+                }
+
+                if(wouldDeadlock(context, inProgress))
+                {
+                    return inProgress.Module;
+                }
+
+                waiter = new FutureVoidAwaiter(scheduler, context);
+                inProgress.Waiters.Add(waiter);
+                waiting[context] = inProgress;
+            }
+
+            scheduler.NotifyBlocked(context, waiter);
+            await waiter;
+
+            lock(registryLock)
+            {
+                waiting.Remove(context);
+            }
+
+            PyModule imported;
+            TryGetModule(name, out imported);
+            return imported;
+        }
+
+        /// <summary>
+        /// Marks the module as being imported by the given context. Returns null if somebody is already importing it;
+        /// that only happens for circular imports since WaitForModule would have waited for anybody else.
+        /// </summary>
+        /// <param name="context">The context doing the import.</param>
+        /// <param name="name">The full name of the module.</param>
+        /// <param name="spec">The spec being loaded. Circular imports get the module its loader creates.</param>
+        public PendingImport BeginImport(FrameContext context, string name, PyModuleSpec spec = null)
+        {
+            lock(registryLock)
+            {
+                if(pending.ContainsKey(name))
+                {
+                    return null;
+                }
+
+                var inProgress = new PendingImport(name, context, spec);
+                pending.Add(name, inProgress);
+                return inProgress;
+            }
+        }
+
+        /// <summary>
+        /// Finishes an import started with BeginImport and wakes up anybody waiting on it.
+        /// </summary>
+        /// <param name="inProgress">What BeginImport returned. Null is ignored.</param>
+        /// <param name="module">The module to register, or null if the import failed or the module shouldn't be
+        /// shared with other contexts.</param>
+        public void EndImport(PendingImport inProgress, PyModule module)
+        {
+            if(inProgress == null)
+            {
+                return;
+            }
+
+            List<FutureVoidAwaiter> waiters;
+            lock(registryLock)
+            {
+                if(module != null)
+                {
+                    modules[inProgress.Name] = module;
+                }
+                pending.Remove(inProgress.Name);
+                waiters = inProgress.Waiters;
+            }
+
+            foreach(var waiter in waiters)
+            {
+                waiter.SignalDone();
+            }
+        }
+    }
+}
@@ -58,6 +58,12 @@ namespace CloacaInterpreter.ModuleImporting
         public async Task<object> Load(IInterpreter interpreter, FrameContext context, PyModuleSpec spec)
         {
             var code = lookup[(string)spec.LoaderState];
+
+            // Created before running anything so a circular import can get at it through the spec. It's filled in once
+            // the module's code has run.
+            var module = PyModule.Create(spec.Name);
+            spec.Module = module;
+
             var moduleGlobals = new Dictionary<string, object>();
             moduleGlobals.Add("__name__", spec.Name);
 
@@ -65,7 +71,8 @@ namespace CloacaInterpreter.ModuleImporting
             var moduleCode = await ByteCodeCompiler.Compile(code,
                 moduleGlobals,
                 interpreter.GetBuiltins(),
-                interpreter.Scheduler);
+                interpreter.Scheduler,
+                (interpreter as Interpreter)?.CompileCache);
 
             // Time to make the frame ourselves so we can tie locals to globals! At the root of a module, locals==globals.
             var nextFrame = Frame.PrepareModuleFrame(moduleCode, context, moduleGlobals);
@@ -85,7 +92,6 @@ namespace CloacaInterpreter.ModuleImporting
 
             ////////////
             var moduleFrame = context.callStack.Pop();
-            var module = PyModule.Create(spec.Name);
 
             for (int local_i = 0; local_i < moduleFrame.LocalNames.Count; ++local_i)
             {
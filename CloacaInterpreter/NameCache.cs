@@ -0,0 +1,110 @@
+﻿using System.Collections.Generic;
+
+using LanguageImplementation;
+
+namespace CloacaInterpreter
+{
+    /// <summary>
+    /// Inline cache for LOAD_GLOBAL and LOAD_NAME. Each site remembers the value it found last time, which of the
+    /// globals or builtins it came from, and the versions of both namespaces at the time.
+    ///
+    /// While neither namespace has changed at all, the cached value is used without touching either dictionary. If
+    /// something was rebound but no names were added or removed, the name still lives in the same dictionary, so that
+    /// one gets read again. Anything else looks the name up from scratch. The versions come from Namespaces, which is
+    /// how everything that changes globals and builtins has to do it.
+    /// </summary>
+    public class NameCache
+    {
+        private readonly Dictionary<string, object> globals;
+        private readonly Dictionary<string, object> builtins;
+        private readonly NamespaceVersion globalsVersion;
+        private readonly NamespaceVersion builtinsVersion;
+        private readonly int globalsKeys;
+        private readonly int builtinsKeys;
+        private readonly Dictionary<string, object> owner;
+
+        // Refreshed in place when only values changed, so module-level code that keeps storing names doesn't make
+        // a new cache every time around a loop.
+        private int globalsValues;
+        private int builtinsValues;
+        private object value;
+
+        private NameCache(Dictionary<string, object> globals, Dictionary<string, object> builtins,
+            NamespaceVersion globalsVersion, NamespaceVersion builtinsVersion, int globalsKeys, int builtinsKeys,
+            int globalsValues, int builtinsValues, Dictionary<string, object> owner, object value)
+        {
+            this.globals = globals;
+            this.builtins = builtins;
+            this.globalsVersion = globalsVersion;
+            this.builtinsVersion = builtinsVersion;
+            this.globalsKeys = globalsKeys;
+            this.builtinsKeys = builtinsKeys;
+            this.globalsValues = globalsValues;
+            this.builtinsValues = builtinsValues;
+            this.owner = owner;
+            this.value = value;
+        }
+
+        /// <summary>
+        /// Looks up a name in the globals and then the builtins for the instruction at the given offset.
+        /// </summary>
+        /// <param name="code">The code the instruction is in.</param>
+        /// <param name="offset">Where the instruction is in the code.</param>
+        /// <param name="name">The name to look up.</param>
+        /// <param name="globals">The globals to search first.</param>
+        /// <param name="builtins">The builtins to search if the globals don't have it.</param>
+        /// <param name="value">The value bound to the name.</param>
+        /// <returns>True if the name was found.</returns>
+        public static bool TryLoad(CodeByteArray code, int offset, string name,
+            Dictionary<string, object> globals, Dictionary<string, object> builtins, out object value)
+        {
+            var cache = code.GetInlineCache(offset) as NameCache;
+            if(cache != null && cache.globals == globals && cache.builtins == builtins)
+            {
+                if(cache.globalsValues == cache.globalsVersion.Values && cache.builtinsValues == cache.builtinsVersion.Values)
+                {
+                    value = cache.value;
+                    return true;
+                }
+
+                if(cache.globalsKeys == cache.globalsVersion.Keys && cache.builtinsKeys == cache.builtinsVersion.Keys)
+                {
+                    // Take the versions before reading so a change in the middle gets read again next time.
+                    int globalsValues = cache.globalsVersion.Values;
+                    int builtinsValues = cache.builtinsVersion.Values;
+                    cache.owner.TryGetValue(name, out value);
+                    cache.value = value;
+                    cache.globalsValues = globalsValues;
+                    cache.builtinsValues = builtinsValues;
+                    return true;
+                }
+            }
+
+            // Same as above: versions first, then the lookup.
+            var globalsVersion = Namespaces.VersionOf(globals);
+            var builtinsVersion = Namespaces.VersionOf(builtins);
+            int newGlobalsKeys = globalsVersion.Keys;
+            int newBuiltinsKeys = builtinsVersion.Keys;
+            int newGlobalsValues = globalsVersion.Values;
+            int newBuiltinsValues = builtinsVersion.Values;
+
+            Dictionary<string, object> owner;
+            if(globals.TryGetValue(name, out value))
+            {
+                owner = globals;
+            }
+            else if(builtins.TryGetValue(name, out value))
+            {
+                owner = builtins;
+            }
+            else
+            {
+                return false;
+            }
+
+            code.SetInlineCache(offset, new NameCache(globals, builtins, globalsVersion, builtinsVersion,
+                newGlobalsKeys, newBuiltinsKeys, newGlobalsValues, newBuiltinsValues, owner, value));
+            return true;
+        }
+    }
+}
@@ -1,6 +1,8 @@
 ﻿using System;
+using System.Collections.Concurrent;
 using System.Collections.Generic;
 using System.Linq;
+using System.Linq.Expressions;
 using System.Reflection;
 using System.Runtime.CompilerServices;
 using LanguageImplementation;
@@ -38,6 +40,182 @@ namespace CloacaInterpreter
 
     public class ObjectResolver
     {
+        private enum MemberKind
+        {
+            Missing,
+            Property,
+            Field,
+            Method,
+            Event,
+            Other
+        }
+
+        /// <summary>
+        /// What a name resolves to on a .NET type, worked out once per (Type, name) and cached. GetMember() and friends
+        /// were getting called on every attribute access on a .NET object, which is most of the cost of poking at them
+        /// from a script. Properties and fields get compiled accessors, and methods keep a template WrappedCodeObject
+        /// that is cloned onto the instance being accessed.
+        /// </summary>
+        private class ResolvedMember
+        {
+            public MemberKind Kind;
+            public Type MemberType;
+
+            // Properties: compiled through the property's accessor methods.
+            public CompiledInvoker Getter;
+            public CompiledInvoker Setter;
+            public PropertyInfo Property;
+
+            // Fields: compiled directly where we can, otherwise null and we use the FieldInfo.
+            public FieldInfo Field;
+            public Func<object, object> FieldGetter;
+            public Action<object, object> FieldSetter;
+
+            // Methods: all the overloads under the name, wrapped without an instance.
+            public WrappedCodeObject MethodGroup;
+
+            // Shared across assignments so the conversion delegate cache actually gets reused.
+            public ParameterConverter ValueConverter;
+        }
+
+        private static ConcurrentDictionary<Tuple<Type, string>, ResolvedMember> resolvedMembers =
+            new ConcurrentDictionary<Tuple<Type, string>, ResolvedMember>();
+
+        private static ResolvedMember resolve(Type objType, string attrName)
+        {
+            var key = new Tuple<Type, string>(objType, attrName);
+            ResolvedMember resolved;
+            if(!resolvedMembers.TryGetValue(key, out resolved))
+            {
+                resolved = resolvedMembers.GetOrAdd(key, resolveUncached(objType, attrName));
+            }
+            return resolved;
+        }
+
+        private static ResolvedMember resolveUncached(Type objType, string attrName)
+        {
+            var resolved = new ResolvedMember();
+            var member = objType.GetMember(attrName);
+            if (member.Length == 0)
+            {
+                resolved.Kind = MemberKind.Missing;
+            }
+            else if (member[0].MemberType == System.Reflection.MemberTypes.Property)
+            {
+                resolved.Kind = MemberKind.Property;
+                resolved.Property = objType.GetProperty(attrName);
+                resolved.MemberType = resolved.Property.PropertyType;
+                resolved.ValueConverter = new ParameterConverter(resolved.MemberType);
+
+                // Non-public or missing accessors stay on PropertyInfo so we get its exceptions.
+                if (resolved.Property.GetMethod != null && resolved.Property.GetMethod.IsPublic)
+                {
+                    resolved.Getter = CompiledInvoker.Get(resolved.Property.GetMethod);
+                }
+                if (resolved.Property.SetMethod != null && resolved.Property.SetMethod.IsPublic)
+                {
+                    resolved.Setter = CompiledInvoker.Get(resolved.Property.SetMethod);
+                }
+            }
+            else if (member[0].MemberType == System.Reflection.MemberTypes.Field)
+            {
+                resolved.Kind = MemberKind.Field;
+                resolved.Field = objType.GetField(attrName);
+                resolved.MemberType = resolved.Field.FieldType;
+                resolved.ValueConverter = new ParameterConverter(resolved.MemberType);
+                compileFieldAccessors(resolved);
+            }
+            else if (member[0].MemberType == System.Reflection.MemberTypes.Method)
+            {
+                // If there's only one method for the given name (most common), then
+                // let's skip all of this filtering.
+                if (member.Length == 1)
+                {
+                    resolved.MethodGroup = new WrappedCodeObject(member[0].Name, objType.GetMethod(attrName), null);
+                }
+                else
+                {
+                    var allMethods = objType.GetMethods();
+                    var overloads = new MethodInfo[member.Length];
+                    int overload_i = 0;
+                    foreach (var methodInfo in allMethods)
+                    {
+                        if (methodInfo.Name == member[0].Name)
+                        {
+                            overloads[overload_i] = methodInfo;
+                            overload_i += 1;
+                        }
+                    }
+                    resolved.MethodGroup = new WrappedCodeObject(member[0].Name, overloads, null);
+                }
+                resolved.Kind = MemberKind.Method;
+            }
+            else if (member[0].MemberType == System.Reflection.MemberTypes.Event)
+            {
+                resolved.Kind = MemberKind.Event;
+            }
+            else
+            {
+                resolved.Kind = MemberKind.Other;
+            }
+            return resolved;
+        }
+
+        private static void compileFieldAccessors(ResolvedMember resolved)
+        {
+            var field = resolved.Field;
+
+            // Constants aren't real fields and writing through an unboxed copy of a struct would lose the write, so those
+            // stay on reflection. Readonly fields can still be read through a compiled getter, but FieldInfo.SetValue is
+            // the only thing that will write them.
+            if (field.IsLiteral || field.DeclaringType.IsValueType || field.DeclaringType.ContainsGenericParameters)
+            {
+                return;
+            }
+
+            try
+            {
+                var instanceParam = Expression.Parameter(typeof(object), "instance");
+                var valueParam = Expression.Parameter(typeof(object), "value");
+                var fieldAccess = field.IsStatic ?
+                    Expression.Field(null, field) :
+                    Expression.Field(Expression.Convert(instanceParam, field.DeclaringType), field);
+
+                resolved.FieldGetter = Expression.Lambda<Func<object, object>>(
+                    Expression.Convert(fieldAccess, typeof(object)), instanceParam).Compile();
+
+                if (!field.IsInitOnly)
+                {
+                    Expression value = Expression.Convert(valueParam, field.FieldType);
+                    if (field.FieldType.IsValueType && Nullable.GetUnderlyingType(field.FieldType) == null)
+                    {
+                        value = Expression.Condition(Expression.ReferenceEqual(valueParam, Expression.Constant(null)),
+                            Expression.Default(field.FieldType),
+                            value);
+                    }
+                    resolved.FieldSetter = Expression.Lambda<Action<object, object>>(
+                        Expression.Assign(fieldAccess, value), instanceParam, valueParam).Compile();
+                }
+            }
+            catch (Exception)
+            {
+                resolved.FieldGetter = null;
+                resolved.FieldSetter = null;
+            }
+        }
+
+        // The compiled field accessors cast straight to the declaring type, so only use them when that cast will work.
+        // Otherwise reflection gets to throw whatever it would have thrown before.
+        private static bool canUseCompiledField(ResolvedMember resolved, object rawObject)
+        {
+            return resolved.Field.IsStatic || resolved.Field.DeclaringType.IsInstanceOfType(rawObject);
+        }
+
+        private static bool canSetDirectly(ResolvedMember resolved, object convertedValue)
+        {
+            return convertedValue == null || resolved.MemberType.IsInstanceOfType(convertedValue);
+        }
+
         public static void SetValue(string attrName, object rawObject, object value)
         {
             var asPyObj = rawObject as PyObject;
@@ -58,27 +236,41 @@ namespace CloacaInterpreter
                     }
 
                     // Try it as a field and then as a property.
-                    var member = objType.GetMember(attrName);
-                    if (member.Length == 0)
+                    var resolved = resolve(objType, attrName);
+                    if (resolved.Kind == MemberKind.Missing)
                     {
                         // We have a catch for ArgumentException but it also looks like GetMember will just return an empty list if the attribute is not found.
                         throw new EscapedPyException(new AttributeError("'" + objType.Name + "' object has no attribute named '" + attrName + "'"));
                     }
-                    if (member[0].MemberType == System.Reflection.MemberTypes.Property)
+                    if (resolved.Kind == MemberKind.Property)
                     {
-                        var property = objType.GetProperty(attrName);
-                        property.SetValue(rawObject, PyNetConverter.Convert(value, property.PropertyType));
+                        var converted = resolved.ValueConverter.Convert(value);
+                        if (resolved.Setter != null && canSetDirectly(resolved, converted))
+                        {
+                            resolved.Setter.Invoke(rawObject, new object[] { converted });
+                        }
+                        else
+                        {
+                            resolved.Property.SetValue(rawObject, converted);
+                        }
                     }
-                    else if (member[0].MemberType == System.Reflection.MemberTypes.Field)
+                    else if (resolved.Kind == MemberKind.Field)
                     {
-                        var field = objType.GetField(attrName);
-                        field.SetValue(rawObject, PyNetConverter.Convert(value, field.FieldType));
+                        var converted = resolved.ValueConverter.Convert(value);
+                        if (resolved.FieldSetter != null && canUseCompiledField(resolved, rawObject) && canSetDirectly(resolved, converted))
+                        {
+                            resolved.FieldSetter(rawObject, converted);
+                        }
+                        else
+                        {
+                            resolved.Field.SetValue(rawObject, converted);
+                        }
                     }
-                    else if (member[0].MemberType == System.Reflection.MemberTypes.Method)
+                    else if (resolved.Kind == MemberKind.Method)
                     {
                         throw new EscapedPyException(new AttributeError("'" + objType.Name + "' is a .NET object and its methods cannot be reassigned"));
                     }
-                    else if (member[0].MemberType == System.Reflection.MemberTypes.Event)
+                    else if (resolved.Kind == MemberKind.Event)
                     {
                         throw new EscapedPyException(new AttributeError("'" + objType.Name + "' is a .NET object and its events cannot be reassigned"));
                     }
@@ -97,48 +289,168 @@ namespace CloacaInterpreter
 
         #region Extension Method Resolution
         // Original inspiration: https://stackoverflow.com/questions/299515/reflection-to-identify-extension-methods
-        private static MethodInfo[] GetExtensionMethods(Type t)
+        //
+        // Extension methods are indexed by the type they extend and then by name. The index is built the first time we
+        // need it and assemblies loaded after that get added as they come in, so a lookup never has to scan the AppDomain.
+        private static object extensionIndexLock = new object();
+        private static Dictionary<Type, Dictionary<string, MethodInfo>> extensionIndex;
+        private static HashSet<Assembly> indexedAssemblies;
+
+        private static void ensureExtensionIndex()
         {
-            List<Type> AssTypes = new List<Type>();
+            lock (extensionIndexLock)
+            {
+                if (extensionIndex != null)
+                {
+                    return;
+                }
+
+                extensionIndex = new Dictionary<Type, Dictionary<string, MethodInfo>>();
+                indexedAssemblies = new HashSet<Assembly>();
 
-            foreach (Assembly item in AppDomain.CurrentDomain.GetAssemblies())
+                // Subscribe before scanning so nothing loaded in between gets missed. The set of indexed assemblies
+                // keeps us from adding anything twice.
+                AppDomain.CurrentDomain.AssemblyLoad += onAssemblyLoad;
+                foreach (Assembly assembly in AppDomain.CurrentDomain.GetAssemblies())
+                {
+                    indexAssembly(assembly);
+                }
+            }
+        }
+
+        private static void onAssemblyLoad(object sender, AssemblyLoadEventArgs args)
+        {
+            lock (extensionIndexLock)
+            {
+                indexAssembly(args.LoadedAssembly);
+            }
+        }
+
+        // Caller must hold extensionIndexLock.
+        private static void indexAssembly(Assembly assembly)
+        {
+            if (!indexedAssemblies.Add(assembly))
+            {
+                return;
+            }
+
+            Type[] types;
+            try
+            {
+                types = assembly.GetTypes();
+            }
+            catch (ReflectionTypeLoadException e)
+            {
+                // Take whatever did load.
+                types = e.Types;
+            }
+            catch (NotSupportedException)
             {
-                AssTypes.AddRange(item.GetTypes());
+                // Some dynamic assemblies won't enumerate their types.
+                return;
             }
 
-            var query = from type in AssTypes
-                        where type.IsSealed && !type.IsGenericType && !type.IsNested
-                        from method in type.GetMethods(BindingFlags.Static | BindingFlags.Public | BindingFlags.NonPublic)
-                        where method.IsDefined(typeof(ExtensionAttribute), false)
-                        where method.GetParameters()[0].ParameterType == t
-                        select method;
-            return query.ToArray<MethodInfo>();
+            foreach (var type in types)
+            {
+                if (type == null || !type.IsSealed || type.IsGenericType || type.IsNested)
+                {
+                    continue;
+                }
+
+                foreach (var method in type.GetMethods(BindingFlags.Static | BindingFlags.Public | BindingFlags.NonPublic))
+                {
+                    if (!method.IsDefined(typeof(ExtensionAttribute), false))
+                    {
+                        continue;
+                    }
+
+                    var extendedType = method.GetParameters()[0].ParameterType;
+                    Dictionary<string, MethodInfo> byName;
+                    if (!extensionIndex.TryGetValue(extendedType, out byName))
+                    {
+                        byName = new Dictionary<string, MethodInfo>();
+                        extensionIndex.Add(extendedType, byName);
+                    }
+
+                    // First one found wins, like the old linear search.
+                    if (!byName.ContainsKey(method.Name))
+                    {
+                        byName.Add(method.Name, method);
+                    }
+                }
+            }
+        }
+
+        // Caller must hold extensionIndexLock.
+        private static MethodInfo lookupExtensionMethod(Type t, string MethodName)
+        {
+            Dictionary<string, MethodInfo> byName;
+            MethodInfo found;
+            if (extensionIndex.TryGetValue(t, out byName) && byName.TryGetValue(MethodName, out found))
+            {
+                return found;
+            }
+            return null;
         }
 
         /// <summary>
-        /// Search for an extension method.
+        /// Search for an extension method. Extension methods on the type itself are preferred, then its base classes
+        /// from nearest to farthest, and then its interfaces.
         /// </summary>
         /// <param name="MethodName">Name of the Methode</param>
         /// <returns>the found Method or null</returns>
         private static MethodInfo GetExtensionMethod(Type t, string MethodName)
         {
-            var mi = from methode in GetExtensionMethods(t)
-                     where methode.Name == MethodName
-                     select methode;
-            if (mi.Count<MethodInfo>() <= 0)
-                return null;
-            else
-                return mi.First<MethodInfo>();
+            ensureExtensionIndex();
+            lock (extensionIndexLock)
+            {
+                for (var current = t; current != null; current = current.BaseType)
+                {
+                    var found = lookupExtensionMethod(current, MethodName);
+                    if (found != null)
+                    {
+                        return found;
+                    }
+                }
+
+                foreach (var iface in t.GetInterfaces())
+                {
+                    var found = lookupExtensionMethod(iface, MethodName);
+                    if (found != null)
+                    {
+                        return found;
+                    }
+                }
+            }
+            return null;
         }
         #endregion Extension Method Resolution
 
         public static object GetValue(string attrName, object rawObject)
         {
+            object value;
+            if (!TryGetValue(attrName, rawObject, out value))
+            {
+                throw new EscapedPyException(NoAttributeError(attrName, rawObject));
+            }
+            return value;
+        }
+
+        /// <summary>
+        /// Gets an attribute the same way as GetValue(), but returns false instead of throwing when the object doesn't
+        /// have it. .NET members that exist but can't be read still throw.
+        /// </summary>
+        /// <param name="attrName">The attribute to get.</param>
+        /// <param name="rawObject">The object to get it from.</param>
+        /// <param name="value">The attribute, or null if it wasn't found.</param>
+        /// <returns>True if the attribute was found.</returns>
+        public static bool TryGetValue(string attrName, object rawObject, out object value)
+        {
+            value = null;
             var asPyObj = rawObject as PyObject;
             if (asPyObj != null)
             {
-                var val = asPyObj.__getattribute__(attrName);
-                return val;
+                return asPyObj.TryGetAttribute(attrName, out value);
             }
             else
             {
@@ -153,67 +465,82 @@ namespace CloacaInterpreter
                     }
 
                     // Try it as a field and then as a property.
-                    var member = objType.GetMember(attrName);
-                    if(member.Length == 0)
+                    var resolved = resolve(objType, attrName);
+                    if(resolved.Kind == MemberKind.Missing)
                     {
                         // We couldn't find this as a member of the class. However, it could be an extension method. Hooray!
                         var extensionMethod = GetExtensionMethod(objType, attrName);
                         if (extensionMethod == null)
                         {
                             // We have a catch for ArgumentException but it also looks like GetMember will just return an empty list if the attribute is not found.
-                            throw new EscapedPyException(new AttributeError("'" + objType.Name + "' object has no attribute named '" + attrName + "'"));
+                            return false;
                         }
                         else
                         {
-                            return new WrappedCodeObject(attrName, extensionMethod, rawObject);
+                            value = new WrappedCodeObject(attrName, extensionMethod, rawObject);
                         }
                     }
-                    if (member[0].MemberType == System.Reflection.MemberTypes.Property)
-                    {
-                        return objType.GetProperty(attrName).GetValue(rawObject);
-                    }
-                    else if (member[0].MemberType == System.Reflection.MemberTypes.Field)
+                    else if (resolved.Kind == MemberKind.Property)
                     {
-                        return objType.GetField(attrName).GetValue(rawObject);
+                        if (resolved.Getter != null)
+                        {
+                            value = resolved.Getter.Invoke(rawObject, null);
+                        }
+                        else
+                        {
+                            value = resolved.Property.GetValue(rawObject);
+                        }
                     }
-                    else if(member[0].MemberType == System.Reflection.MemberTypes.Method)
+                    else if (resolved.Kind == MemberKind.Field)
                     {
-                        // If there's only one method for the given name (most common), then
-                        // let's skip all of this filtering.
-                        if(member.Length == 1)
+                        if (resolved.FieldGetter != null && canUseCompiledField(resolved, rawObject))
                         {
-                            return new WrappedCodeObject(member[0].Name, objType.GetMethod(attrName), rawObject);
+                            value = resolved.FieldGetter(rawObject);
                         }
                         else
                         {
-                            var allMethods = objType.GetMethods();
-                            var overloads = new MethodInfo[member.Length];
-                            int overload_i = 0;
-                            foreach (var methodInfo in allMethods)
-                            {
-                                if (methodInfo.Name == member[0].Name)
-                                {
-                                    overloads[overload_i] = methodInfo;
-                                    overload_i += 1;
-                                }
-                            }
-                            return new WrappedCodeObject(member[0].Name, overloads, rawObject);
+                            value = resolved.Field.GetValue(rawObject);
                         }
                     }
-                    else if(member[0].MemberType == System.Reflection.MemberTypes.Event)
+                    else if(resolved.Kind == MemberKind.Method)
+                    {
+                        value = resolved.MethodGroup.CloneForInstance(rawObject);
+                    }
+                    else if(resolved.Kind == MemberKind.Event)
                     {
-                        return new EventInstance(rawObject, attrName);
+                        value = new EventInstance(rawObject, attrName);
                     }
                     else
                     {
                         throw new EscapedPyException(new NotImplementedError("'" + objType.Name + "' object attribute named '" + attrName + "' is neither a field, method, event, nor property."));
                     }
+                    return true;
                 }
                 catch (ArgumentException e)
                 {
-                    throw new EscapedPyException(new AttributeError("'" + rawObject.GetType().Name + "' object has no attribute named '" + attrName + "'"));
+                    value = null;
+                    return false;
                 }
             }
         }
+
+        /// <summary>
+        /// The AttributeError for looking up an attribute the object doesn't have.
+        /// </summary>
+        public static AttributeError NoAttributeError(string attrName, object rawObject)
+        {
+            var asPyObj = rawObject as PyObject;
+            if (asPyObj != null)
+            {
+                return PyClass.NoAttributeError(asPyObj, attrName);
+            }
+
+            var objType = rawObject as Type;
+            if (objType == null)
+            {
+                objType = rawObject.GetType();
+            }
+            return new AttributeError("'" + objType.Name + "' object has no attribute named '" + attrName + "'");
+        }
     }
 }
@@ -0,0 +1,841 @@
+﻿using System;
+using System.Collections.Generic;
+using System.Numerics;
+
+using LanguageImplementation;
+using LanguageImplementation.DataTypes;
+
+namespace CloacaInterpreter
+{
+    /// <summary>
+    /// Cleans up the byte code the visitor generates once it's completely done (after PostProcess). The visitor
+    /// emits code pretty naively and every instruction we can get rid of is one less trip through the interpreter
+    /// loop. This does:
+    ///
+    /// * Constant folding of arithmetic and comparisons between number literals: 2 * 3 becomes LOAD_CONST 6.
+    /// * Tuples of constants become a single LOAD_CONST of the tuple.
+    /// * Jumps to unconditional jumps go straight to the final destination.
+    /// * Code that can't be reached (after a RETURN_VALUE or unconditional jump) is removed.
+    /// * LOAD_CONST/POP_TOP pairs (like a docstring) are removed.
+    ///
+    /// Folding calls the same int and float implementations the interpreter would have called at runtime. If that
+    /// throws, the code is left alone so the error still happens when the script runs. Like CPython, results that
+    /// would come out big are left alone too. Something like 2 ** 10 ** 8 would otherwise be computed while
+    /// compiling, even in code that never runs.
+    ///
+    /// The code is decoded into a list of instructions with their source lines. Jumps point at their target
+    /// instructions instead of offsets, and everything is encoded again at the end, so jump offsets and the line
+    /// number table come out right for the new code.
+    /// </summary>
+    public class PeepholeOptimizer
+    {
+        private class Op
+        {
+            public ByteCodes Opcode;
+            public int Operand;
+            public int Line;
+
+            // The instruction this one jumps to, if it jumps at all.
+            public Op Target;
+
+            // Where jumps to this instruction go once it has been removed.
+            public Op Forward;
+            public bool Removed;
+
+            public int Offset;
+
+            public int Size
+            {
+                get
+                {
+                    return Instruction.HasOperand(Opcode) ? Instruction.OperandSize : Instruction.NoOperandSize;
+                }
+            }
+        }
+
+        private static readonly Dictionary<ByteCodes, string> binaryDunders = new Dictionary<ByteCodes, string>
+        {
+            { ByteCodes.BINARY_ADD, "__add__" },
+            { ByteCodes.BINARY_SUBTRACT, "__sub__" },
+            { ByteCodes.BINARY_MULTIPLY, "__mul__" },
+            { ByteCodes.BINARY_POWER, "__pow__" },
+            { ByteCodes.BINARY_TRUE_DIVIDE, "__truediv__" },
+            { ByteCodes.BINARY_FLOOR_DIVIDE, "__floordiv__" },
+            { ByteCodes.BINARY_MODULO, "__mod__" },
+            { ByteCodes.BINARY_AND, "__and__" },
+            { ByteCodes.BINARY_OR, "__or__" },
+            { ByteCodes.BINARY_XOR, "__xor__" },
+            { ByteCodes.BINARY_RSHIFT, "__rshift__" },
+            { ByteCodes.BINARY_LSHIFT, "__lshift__" },
+        };
+
+        private static readonly Dictionary<CompareOps, string> compareDunders = new Dictionary<CompareOps, string>
+        {
+            { CompareOps.Lt, "__lt__" },
+            { CompareOps.Gt, "__gt__" },
+            { CompareOps.Eq, "__eq__" },
+            { CompareOps.Ge, "__ge__" },
+            { CompareOps.Le, "__le__" },
+            { CompareOps.LtGt, "__ltgt__" },
+            { CompareOps.Ne, "__ne__" },
+        };
+
+        // What the interpreter would call for a dunder on a left operand of the given type.
+        private static readonly Dictionary<Type, Dictionary<string, Func<PyObject, PyObject, PyObject>>> foldableOperations =
+            new Dictionary<Type, Dictionary<string, Func<PyObject, PyObject, PyObject>>>
+        {
+            {
+                typeof(PyInteger), new Dictionary<string, Func<PyObject, PyObject, PyObject>>
+                {
+                    { "__add__", PyIntegerClass.__add__ },
+                    { "__sub__", PyIntegerClass.__sub__ },
+                    { "__mul__", PyIntegerClass.__mul__ },
+                    { "__pow__", PyIntegerClass.__pow__ },
+                    { "__truediv__", PyIntegerClass.__truediv__ },
+                    { "__floordiv__", PyIntegerClass.__floordiv__ },
+                    { "__mod__", PyIntegerClass.__mod__ },
+                    { "__and__", PyIntegerClass.__and__ },
+                    { "__or__", PyIntegerClass.__or__ },
+                    { "__xor__", PyIntegerClass.__xor__ },
+                    { "__rshift__", PyIntegerClass.__rshift__ },
+                    { "__lshift__", PyIntegerClass.__lshift__ },
+                    { "__lt__", PyIntegerClass.__lt__ },
+                    { "__gt__", PyIntegerClass.__gt__ },
+                    { "__eq__", PyIntegerClass.__eq__ },
+                    { "__ge__", PyIntegerClass.__ge__ },
+                    { "__le__", PyIntegerClass.__le__ },
+                    { "__ltgt__", PyIntegerClass.__ltgt__ },
+                    { "__ne__", PyIntegerClass.__ne__ },
+                }
+            },
+            {
+                typeof(PyFloat), new Dictionary<string, Func<PyObject, PyObject, PyObject>>
+                {
+                    { "__add__", PyFloatClass.__add__ },
+                    { "__sub__", PyFloatClass.__sub__ },
+                    { "__mul__", PyFloatClass.__mul__ },
+                    { "__pow__", PyFloatClass.__pow__ },
+                    { "__truediv__", PyFloatClass.__truediv__ },
+                    { "__floordiv__", PyFloatClass.__floordiv__ },
+                    { "__mod__", PyFloatClass.__mod__ },
+                    { "__lt__", PyFloatClass.__lt__ },
+                    { "__gt__", PyFloatClass.__gt__ },
+                    { "__eq__", PyFloatClass.__eq__ },
+                    { "__ge__", PyFloatClass.__ge__ },
+                    { "__le__", PyFloatClass.__le__ },
+                    { "__ltgt__", PyFloatClass.__ltgt__ },
+                    { "__ne__", PyFloatClass.__ne__ },
+                }
+            },
+        };
+
+        // Biggest folded results we'll keep. Anything bigger gets computed at runtime, if the code ever runs.
+        private const int MaxFoldedIntBits = 128;
+        private const int MaxFoldedTupleLength = 256;
+
+        private CodeObjectBuilder code;
+        private List<Op> ops;
+
+        // Stands in for the end of the code so jumps there have something to point at.
+        private Op end;
+
+        private PeepholeOptimizer(CodeObjectBuilder code)
+        {
+            this.code = code;
+            end = new Op();
+        }
+
+        /// <summary>
+        /// Optimizes the code in place, along with all the code objects nested in its constants.
+        /// </summary>
+        public static void Optimize(CodeObjectBuilder code)
+        {
+            foreach(var constant in code.Constants)
+            {
+                var asBuilder = constant as CodeObjectBuilder;
+                if(asBuilder != null)
+                {
+                    Optimize(asBuilder);
+                }
+            }
+
+            var optimizer = new PeepholeOptimizer(code);
+            if(!optimizer.decode())
+            {
+                // Not something we understand well enough to rewrite safely, so leave it be.
+                return;
+            }
+
+            var passes = new Func<bool>[]
+            {
+                optimizer.foldConstants,
+                optimizer.threadJumps,
+                optimizer.removeUnreachable,
+                optimizer.removeLoadPopPairs,
+            };
+
+            // Each pass can open up more work for the others, so keep going until nothing changes.
+            bool changed = false;
+            bool roundChanged;
+            do
+            {
+                roundChanged = false;
+                foreach(var pass in passes)
+                {
+                    if(pass())
+                    {
+                        optimizer.compact();
+                        roundChanged = true;
+                    }
+                }
+                changed |= roundChanged;
+            } while(roundChanged);
+
+            if(changed)
+            {
+                optimizer.encode();
+            }
+        }
+
+        private static bool isAbsoluteJump(ByteCodes opcode)
+        {
+            switch(opcode)
+            {
+                case ByteCodes.JUMP_ABSOLUTE:
+                case ByteCodes.JUMP_IF_FALSE:
+                case ByteCodes.JUMP_IF_TRUE:
+                case ByteCodes.POP_JUMP_IF_FALSE:
+                case ByteCodes.POP_JUMP_IF_TRUE:
+                case ByteCodes.JUMP_IF_FALSE_OR_POP:
+                case ByteCodes.JUMP_IF_TRUE_OR_POP:
+                case ByteCodes.CONTINUE_LOOP:
+                    return true;
+                default:
+                    return false;
+            }
+        }
+
+        // Operand is an offset from the end of the instruction.
+        private static bool isRelativeJump(ByteCodes opcode)
+        {
+            switch(opcode)
+            {
+                case ByteCodes.JUMP_FORWARD:
+                case ByteCodes.FOR_ITER:
+                case ByteCodes.SETUP_LOOP:
+                case ByteCodes.SETUP_EXCEPT:
+                case ByteCodes.SETUP_FINALLY:
+                    return true;
+                default:
+                    return false;
+            }
+        }
+
+        private static bool isUnconditionalJump(ByteCodes opcode)
+        {
+            return opcode == ByteCodes.JUMP_ABSOLUTE || opcode == ByteCodes.JUMP_FORWARD;
+        }
+
+        // Execution never continues to the next instruction after these.
+        private static bool endsFlow(ByteCodes opcode)
+        {
+            switch(opcode)
+            {
+                case ByteCodes.RETURN_VALUE:
+                case ByteCodes.JUMP_ABSOLUTE:
+                case ByteCodes.JUMP_FORWARD:
+                case ByteCodes.BREAK_LOOP:
+                case ByteCodes.RAISE_VARARGS:
+                    return true;
+                default:
+                    return false;
+            }
+        }
+
+        private bool decode()
+        {
+            var bytes = code.Code;
+            ops = new List<Op>();
+            var opsByOffset = new Dictionary<int, Op>();
+            int cursor = 0;
+            while(cursor < bytes.Count)
+            {
+                var op = new Op();
+                op.Opcode = (ByteCodes)bytes[cursor];
+                op.Offset = cursor;
+                if(Instruction.HasOperand(op.Opcode))
+                {
+                    if(cursor + Instruction.OperandSize > bytes.Count)
+                    {
+                        return false;
+                    }
+                    op.Operand = (bytes[cursor + 1] << 8) | bytes[cursor + 2];
+                }
+                ops.Add(op);
+                opsByOffset.Add(cursor, op);
+                cursor += op.Size;
+            }
+            end.Offset = cursor;
+            opsByOffset.Add(cursor, end);
+
+            foreach(var op in ops)
+            {
+                int targetOffset;
+                if(isAbsoluteJump(op.Opcode))
+                {
+                    targetOffset = op.Operand;
+                }
+                else if(isRelativeJump(op.Opcode))
+                {
+                    targetOffset = op.Offset + op.Size + op.Operand;
+                }
+                else
+                {
+                    continue;
+                }
+
+                if(!opsByOffset.TryGetValue(targetOffset, out op.Target))
+                {
+                    return false;
+                }
+            }
+
+            return decodeLines();
+        }
+
+        // lnotab is the first line's byte count followed by (line increment, byte count) pairs.
+        private bool decodeLines()
+        {
+            var lnotab = code.GetLineNumberTable();
+            if(lnotab.Length == 0)
+            {
+                foreach(var op in ops)
+                {
+                    op.Line = -1;
+                }
+                return true;
+            }
+
+            int line = code.FirstLine;
+            int segmentEnd = lnotab[0];
+            int tableIdx = 1;
+            foreach(var op in ops)
+            {
+                while(op.Offset >= segmentEnd)
+                {
+                    if(tableIdx + 1 >= lnotab.Length)
+                    {
+                        return false;
+                    }
+                    line += lnotab[tableIdx];
+                    segmentEnd += lnotab[tableIdx + 1];
+                    tableIdx += 2;
+                }
+                op.Line = line;
+            }
+
+            // If the table doesn't cover exactly the code then some of it was added without line information, and
+            // we can't tell which part.
+            for(; tableIdx + 1 < lnotab.Length; tableIdx += 2)
+            {
+                segmentEnd += lnotab[tableIdx + 1];
+            }
+            return segmentEnd == end.Offset;
+        }
+
+        private void encode()
+        {
+            int offset = 0;
+            foreach(var op in ops)
+            {
+                op.Offset = offset;
+                offset += op.Size;
+            }
+            end.Offset = offset;
+
+            var bytes = code.Code;
+            bytes.Clear();
+            foreach(var op in ops)
+            {
+                if(op.Target != null)
+                {
+                    if(isAbsoluteJump(op.Opcode))
+                    {
+                        op.Operand = op.Target.Offset;
+                    }
+                    else
+                    {
+                        // Threading can send a JUMP_FORWARD backwards.
+                        if(op.Opcode == ByteCodes.JUMP_FORWARD && op.Target.Offset < op.Offset + op.Size)
+                        {
+                            op.Opcode = ByteCodes.JUMP_ABSOLUTE;
+                            op.Operand = op.Target.Offset;
+                        }
+                        else
+                        {
+                            op.Operand = op.Target.Offset - op.Offset - op.Size;
+                        }
+                    }
+                }
+
+                bytes.AddByte((byte)op.Opcode);
+                if(Instruction.HasOperand(op.Opcode))
+                {
+                    bytes.AddUShort(op.Operand);
+                }
+            }
+
+            encodeLines();
+        }
+
+        // Writes the line table the same way CodeObjectBuilder builds it while the code is generated.
+        private void encodeLines()
+        {
+            if(ops.Count == 0 || ops[0].Line < 0)
+            {
+                code.SetLineNumberTable(code.FirstLine, new byte[0]);
+                return;
+            }
+
+            var table = new List<byte>();
+            int line = ops[0].Line;
+            int segmentBytes = 0;
+            foreach(var op in ops)
+            {
+                if(op.Line != line)
+                {
+                    addSegmentBytes(table, segmentBytes);
+                    int lineDiff = op.Line - line;
+                    while(lineDiff > 255)
+                    {
+                        table.Add(255);
+                        table.Add(0);
+                        lineDiff -= 255;
+                    }
+                    table.Add((byte)lineDiff);
+                    line = op.Line;
+                    segmentBytes = 0;
+                }
+                segmentBytes += op.Size;
+            }
+            addSegmentBytes(table, segmentBytes);
+
+            code.SetLineNumberTable(ops[0].Line, table.ToArray());
+        }
+
+        private static void addSegmentBytes(List<byte> table, int segmentBytes)
+        {
+            // Anything too long for one byte continues on the same line.
+            while(segmentBytes > 255)
+            {
+                table.Add(255);
+                table.Add(0);
+                segmentBytes -= 255;
+            }
+            table.Add((byte)segmentBytes);
+        }
+
+        private HashSet<Op> findJumpTargets()
+        {
+            var targets = new HashSet<Op>();
+            foreach(var op in ops)
+            {
+                if(op.Target != null)
+                {
+                    targets.Add(op.Target);
+                }
+            }
+            return targets;
+        }
+
+        private void remove(Op op)
+        {
+            op.Removed = true;
+        }
+
+        /// <summary>
+        /// Stricter than Equals: 1, 1.0 and True are all equal in Python but are different constants. So are 0.0 and
+        /// -0.0.
+        /// </summary>
+        private static bool sameConstant(object left, object right)
+        {
+            if(left.GetType() != right.GetType())
+            {
+                return false;
+            }
+
+            var leftFloat = left as PyFloat;
+            if(leftFloat != null)
+            {
+                return BitConverter.DoubleToInt64Bits(leftFloat.InternalValue) ==
+                    BitConverter.DoubleToInt64Bits(((PyFloat)right).InternalValue);
+            }
+
+            var leftTuple = left as PyTuple;
+            if(leftTuple != null)
+            {
+                var rightTuple = (PyTuple)right;
+                if(leftTuple.Values.Length != rightTuple.Values.Length)
+                {
+                    return false;
+                }
+                for(int i = 0; i < leftTuple.Values.Length; ++i)
+                {
+                    if(!sameConstant(leftTuple.Values[i], rightTuple.Values[i]))
+                    {
+                        return false;
+                    }
+                }
+                return true;
+            }
+            return left.Equals(right);
+        }
+
+        private int addConstant(object constant)
+        {
+            for(int i = 0; i < code.Constants.Count; ++i)
+            {
+                if(isFoldableConstant(code.Constants[i]) && sameConstant(code.Constants[i], constant))
+                {
+                    return i;
+                }
+            }
+            code.Constants.Add(constant);
+            return code.Constants.Count - 1;
+        }
+
+        private static bool isFoldableConstant(object constant)
+        {
+            return constant is PyInteger || constant is PyFloat || constant is PyBool || constant is PyString ||
+                constant is NonePyObject || constant is PyTuple;
+        }
+
+        private static PyObject tryFoldBinary(object left, object right, string dunder)
+        {
+            var leftObj = left as PyObject;
+            var rightObj = right as PyObject;
+            if(leftObj == null || rightObj == null)
+            {
+                return null;
+            }
+
+            Dictionary<string, Func<PyObject, PyObject, PyObject>> operations;
+            Func<PyObject, PyObject, PyObject> operation;
+            if(!foldableOperations.TryGetValue(left.GetType(), out operations) ||
+               !foldableOperations.ContainsKey(right.GetType()) ||
+               !operations.TryGetValue(dunder, out operation))
+            {
+                return null;
+            }
+
+            if(!isSmallResult(leftObj, rightObj, dunder))
+            {
+                return null;
+            }
+
+            try
+            {
+                return operation(leftObj, rightObj);
+            }
+            catch(Exception)
+            {
+                // Division by zero and friends. Let it happen at runtime where it can be caught.
+                return null;
+            }
+        }
+
+        private static int bitLength(BigInteger value)
+        {
+            var bytes = BigInteger.Abs(value).ToByteArray();
+            int top = bytes.Length - 1;
+            while(top > 0 && bytes[top] == 0)
+            {
+                --top;
+            }
+
+            int bits = top * 8;
+            for(int topByte = bytes[top]; topByte != 0; topByte >>= 1)
+            {
+                ++bits;
+            }
+            return bits;
+        }
+
+        /// <summary>
+        /// Checks that an int operation won't blow up before running it. Powers and left shifts are the ones that can
+        /// turn small operands into an enormous result. Everything else is checked afterwards by isSmallConstant.
+        /// </summary>
+        private static bool isSmallResult(PyObject left, PyObject right, string dunder)
+        {
+            var leftInt = left as PyInteger;
+            var rightInt = right as PyInteger;
+            if(leftInt == null || rightInt == null)
+            {
+                return true;
+            }
+
+            if(dunder == "__pow__")
+            {
+                var exponent = rightInt.InternalValue;
+                if(exponent.Sign <= 0)
+                {
+                    return true;
+                }
+                return exponent <= MaxFoldedIntBits &&
+                    (long) bitLength(leftInt.InternalValue) * (long) exponent <= MaxFoldedIntBits;
+            }
+            else if(dunder == "__lshift__")
+            {
+                var shift = rightInt.InternalValue;
+                if(shift.Sign < 0)
+                {
+                    // Negative shifts are an error. Leave them for runtime where it can be caught.
+                    return false;
+                }
+                return shift <= MaxFoldedIntBits && bitLength(leftInt.InternalValue) + (int) shift <= MaxFoldedIntBits;
+            }
+            return true;
+        }
+
+        private static bool isSmallConstant(PyObject folded)
+        {
+            var asInt = folded as PyInteger;
+            if(asInt != null)
+            {
+                return bitLength(asInt.InternalValue) <= MaxFoldedIntBits;
+            }
+
+            var asTuple = folded as PyTuple;
+            if(asTuple != null)
+            {
+                return asTuple.Values.Length <= MaxFoldedTupleLength;
+            }
+            return true;
+        }
+
+        private bool foldConstants()
+        {
+            bool changed = false;
+            var targets = findJumpTargets();
+            for(int i = 0; i < ops.Count; ++i)
+            {
+                var op = ops[i];
+                if(op.Removed || op.Opcode != ByteCodes.LOAD_CONST)
+                {
+                    continue;
+                }
+
+                // Run of constants starting here, up until something that is jumped to.
+                int constCount = 1;
+                while(i + constCount < ops.Count && ops[i + constCount].Opcode == ByteCodes.LOAD_CONST &&
+                      !targets.Contains(ops[i + constCount]))
+                {
+                    ++constCount;
+                }
+
+                if(i + constCount >= ops.Count || targets.Contains(ops[i + constCount]))
+                {
+                    continue;
+                }
+
+                var next = ops[i + constCount];
+                PyObject folded = null;
+                int foldedCount = 0;
+                if(next.Opcode == ByteCodes.BUILD_TUPLE && next.Operand <= constCount)
+                {
+                    var values = new object[next.Operand];
+                    bool allConstant = true;
+                    for(int valueIdx = 0; valueIdx < values.Length; ++valueIdx)
+                    {
+                        values[valueIdx] = code.Constants[ops[i + constCount - values.Length + valueIdx].Operand];
+                        allConstant &= isFoldableConstant(values[valueIdx]);
+                    }
+                    if(allConstant)
+                    {
+                        folded = PyTuple.Create(values);
+                        foldedCount = values.Length;
+                    }
+                }
+                else if(binaryDunders.ContainsKey(next.Opcode) && constCount >= 2)
+                {
+                    folded = tryFoldBinary(code.Constants[ops[i + constCount - 2].Operand],
+                        code.Constants[ops[i + constCount - 1].Operand], binaryDunders[next.Opcode]);
+                    foldedCount = 2;
+                }
+                else if(next.Opcode == ByteCodes.COMPARE_OP && constCount >= 2 && compareDunders.ContainsKey((CompareOps)next.Operand))
+                {
+                    folded = tryFoldBinary(code.Constants[ops[i + constCount - 2].Operand],
+                        code.Constants[ops[i + constCount - 1].Operand], compareDunders[(CompareOps)next.Operand]);
+                    foldedCount = 2;
+                }
+                else if(next.Opcode == ByteCodes.UNARY_NEGATIVE && code.Constants[ops[i + constCount - 1].Operand] is PyInteger)
+                {
+                    folded = PyIntegerClass.__neg__((PyInteger)code.Constants[ops[i + constCount - 1].Operand]);
+                    foldedCount = 1;
+                }
+
+                if(folded == null || !isSmallConstant(folded))
+                {
+                    // Only the end of the run matters for folding, so starting later in the run won't help.
+                    i += constCount - 1;
+                    continue;
+                }
+
+                // The first of the folded loads becomes the load of the result. It keeps that load's line and
+                // anything jumping to it.
+                var first = ops[i + constCount - foldedCount];
+                if(foldedCount == 0)
+                {
+                    // Empty tuple: the BUILD_TUPLE itself becomes the load.
+                    first = next;
+                }
+                else
+                {
+                    for(int removeIdx = i + constCount - foldedCount + 1; removeIdx <= i + constCount; ++removeIdx)
+                    {
+                        remove(ops[removeIdx]);
+                    }
+                }
+                first.Opcode = ByteCodes.LOAD_CONST;
+                first.Operand = addConstant(folded);
+                changed = true;
+
+                // Anything this fold enables gets picked up on the next round.
+                i += constCount;
+            }
+            return changed;
+        }
+
+        private bool threadJumps()
+        {
+            bool changed = false;
+            for(int i = 0; i < ops.Count; ++i)
+            {
+                var op = ops[i];
+
+                // The setup and FOR_ITER targets stay put; they're relative and threading could send them backwards.
+                if(op.Target == null || !(isAbsoluteJump(op.Opcode) || op.Opcode == ByteCodes.JUMP_FORWARD))
+                {
+                    continue;
+                }
+
+                var target = op.Target;
+                for(int hops = 0; hops < ops.Count && target != op && isUnconditionalJump(target.Opcode) && target.Target != target; ++hops)
+                {
+                    target = target.Target;
+                }
+                if(target != op.Target)
+                {
+                    op.Target = target;
+                    changed = true;
+                }
+
+                // A jump to the very next instruction does nothing.
+                if(isUnconditionalJump(op.Opcode) && (i + 1 < ops.Count ? ops[i + 1] : end) == op.Target)
+                {
+                    remove(op);
+                    changed = true;
+                }
+            }
+            return changed;
+        }
+
+        private bool removeUnreachable()
+        {
+            var reachable = new HashSet<Op>();
+            var indices = new Dictionary<Op, int>();
+            for(int i = 0; i < ops.Count; ++i)
+            {
+                indices.Add(ops[i], i);
+            }
+
+            var toVisit = new Stack<int>();
+            if(ops.Count > 0)
+            {
+                toVisit.Push(0);
+            }
+            while(toVisit.Count > 0)
+            {
+                int i = toVisit.Pop();
+                while(i < ops.Count && reachable.Add(ops[i]))
+                {
+                    var op = ops[i];
+                    if(op.Target != null && op.Target != end)
+                    {
+                        toVisit.Push(indices[op.Target]);
+                    }
+                    if(endsFlow(op.Opcode))
+                    {
+                        break;
+                    }
+                    ++i;
+                }
+            }
+
+            bool changed = false;
+            foreach(var op in ops)
+            {
+                if(!reachable.Contains(op))
+                {
+                    remove(op);
+                    changed = true;
+                }
+            }
+            return changed;
+        }
+
+        private bool removeLoadPopPairs()
+        {
+            bool changed = false;
+            var targets = findJumpTargets();
+            for(int i = 0; i + 1 < ops.Count; ++i)
+            {
+                if((ops[i].Opcode == ByteCodes.LOAD_CONST || ops[i].Opcode == ByteCodes.DUP_TOP) && !ops[i].Removed &&
+                   ops[i + 1].Opcode == ByteCodes.POP_TOP && !ops[i + 1].Removed && !targets.Contains(ops[i + 1]))
+                {
+                    remove(ops[i]);
+                    remove(ops[i + 1]);
+                    changed = true;
+                    ++i;
+                }
+            }
+            return changed;
+        }
+
+        // Takes out everything that was removed and points jumps that went to removed instructions at whatever
+        // came after them.
+        private void compact()
+        {
+            var kept = new List<Op>(ops.Count);
+            var pending = new List<Op>();
+            foreach(var op in ops)
+            {
+                if(op.Removed)
+                {
+                    pending.Add(op);
+                    continue;
+                }
+
+                foreach(var removed in pending)
+                {
+                    removed.Forward = op;
+                }
+                pending.Clear();
+                kept.Add(op);
+            }
+            foreach(var removed in pending)
+            {
+                removed.Forward = end;
+            }
+
+            ops = kept;
+            foreach(var op in ops)
+            {
+                while(op.Target != null && op.Target.Removed)
+                {
+                    op.Target = op.Target.Forward;
+                }
+            }
+        }
+    }
+}
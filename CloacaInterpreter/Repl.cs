@@ -140,6 +140,10 @@ namespace CloacaInterpreter
     {
         private ReplParseErrorListener errorListener;
 
+        /// <summary>
+        /// The variables scripts run with. Use SetVariable to change them instead of writing to the dictionary;
+        /// scripts cache the names they look up and won't see direct writes.
+        /// </summary>
         public Dictionary<string, object> ContextVariables
         {
             get; private set;
@@ -166,11 +170,30 @@ namespace CloacaInterpreter
             Scheduler.SetInterpreter(Interpreter);
         }
 
+        /// <summary>
+        /// The interpreter's builtins. Use SetBuiltin to change them; see IInterpreter.GetBuiltins.
+        /// </summary>
         public Dictionary<string, object> GetBuiltins()
         {
             return Interpreter.GetBuiltins();
         }
 
+        /// <summary>
+        /// Sets a variable for scripts to use, in a way they see even if they're already running.
+        /// </summary>
+        public void SetVariable(string name, object value)
+        {
+            Namespaces.Set(ContextVariables, name, value);
+        }
+
+        /// <summary>
+        /// Adds or replaces a built-in, in a way scripts see even if they're already running.
+        /// </summary>
+        public void SetBuiltin(string name, object value)
+        {
+            Interpreter.SetBuiltin(name, value);
+        }
+
         /// <summary>
         /// Set from Interpret() if the output is the secondary prompt used to get more information. This is
         /// a helper indicator to declare for certain that we're entering the secondary prompt. It gets
@@ -269,6 +292,7 @@ namespace CloacaInterpreter
             var visitor = new CloacaBytecodeVisitor(varVisitor.RootNode, ContextVariables, true);
             visitor.Visit(antlrVisitorContext);
             await visitor.PostProcess(Scheduler);
+            PeepholeOptimizer.Optimize(visitor.RootProgram);
 
             PyFunction compiledFunction = visitor.RootProgram.Build(ContextVariables);
 
@@ -320,7 +344,7 @@ namespace CloacaInterpreter
                 if (!(stack_var is NoneType))
                 { 
                     var stack_var_obj = stack_var as PyObject;
-                    if (stack_var_obj == null || !stack_var_obj.__dict__.ContainsKey(PyClass.__REPR__))
+                    if (stack_var_obj == null || !stack_var_obj.HasUnboundAttribute(PyClass.__REPR__))
                     {
                         stack_output.Append(stack_var.ToString());
                     }
@@ -168,7 +168,9 @@ namespace CloacaInterpreter
         /// in order to do any other housekeeping like inject variables into it.
         /// </summary>
         /// <param name="program">The code to schedule.</param>
-        /// <param name="globals">Additional root-level globals to introduce to the program from the outside.</param>
+        /// <param name="globals">Additional root-level globals to introduce to the program from the outside. Change them
+        /// afterwards with FrameContext.SetVariable or Namespaces.Set, not by writing to the dictionary; see
+        /// IInterpreter.GetBuiltins.</param>
         /// <returns>The context the interpreter will use to maintain the program's state while it runs.</returns>
         public TaskEventRecord Schedule(PyFunction function, Dictionary<string, object> globals)
         {
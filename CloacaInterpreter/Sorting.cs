@@ -80,7 +80,7 @@ namespace CloacaInterpreter
                 pyright = (PyObject)await keyfunc.Call(interpreter, context, new object[] { pyright });
             }
 
-            var comp_func = pyleft.__dict__.GetDefault(comp_func_name, null) as IPyCallable;
+            var comp_func = pyleft.GetUnboundAttribute(comp_func_name) as IPyCallable;
             if (comp_func == null)
             {
                 throw new Exception(pyleft.__class__.Name + " does not have a working, callable " + comp_func_name + " implementation");
@@ -0,0 +1,472 @@
+﻿using System;
+
+using LanguageImplementation;
+using LanguageImplementation.DataTypes;
+
+namespace CloacaInterpreter
+{
+    /// <summary>
+    /// Quickens hot instructions into forms specialized for the operand types they keep seeing.
+    ///
+    /// The generic arithmetic, comparison, subscript, and attribute instructions look the dunder up on the operand's
+    /// class, bind it, and marshal the arguments through a WrappedCodeObject every single time. That's a lot of work
+    /// to add two ints. Instead, the generic forms count how often they run. Once one is warm, we look at the operands
+    /// it has right then and rewrite the instruction in the decoded stream into a specialized form for those types.
+    /// The specialized form checks the types every time it runs (its guard) and calls the builtin implementation
+    /// directly. If the guard fails, the interpreter reverts the instruction to its generic form and runs that
+    /// instead, so the specialized forms never have to deal with anything unusual themselves.
+    ///
+    /// Guards check for the exact builtin class. A user class deriving from int, say, could override the dunders.
+    /// </summary>
+    public class Specializer
+    {
+        // Indexed by CompareOps. Comparisons that aren't here (in, is, exception matching...) don't get specialized.
+        private static readonly Func<PyObject, PyObject, PyBool>[] intCompares = compareTable(
+            PyIntegerClass.__eq__, PyIntegerClass.__ne__, PyIntegerClass.__lt__,
+            PyIntegerClass.__gt__, PyIntegerClass.__le__, PyIntegerClass.__ge__);
+
+        private static readonly Func<PyObject, PyObject, PyBool>[] floatCompares = compareTable(
+            PyFloatClass.__eq__, PyFloatClass.__ne__, PyFloatClass.__lt__,
+            PyFloatClass.__gt__, PyFloatClass.__le__, PyFloatClass.__ge__);
+
+        private static readonly Func<PyObject, PyObject, PyBool>[] stringCompares = compareTable(
+            PyStringClass.__eq__, PyStringClass.__ne__, PyStringClass.__lt__,
+            PyStringClass.__gt__, PyStringClass.__le__, PyStringClass.__ge__);
+
+        private static Func<PyObject, PyObject, PyBool>[] compareTable(
+            Func<PyObject, PyObject, PyBool> eq, Func<PyObject, PyObject, PyBool> ne,
+            Func<PyObject, PyObject, PyBool> lt, Func<PyObject, PyObject, PyBool> gt,
+            Func<PyObject, PyObject, PyBool> le, Func<PyObject, PyObject, PyBool> ge)
+        {
+            var table = new Func<PyObject, PyObject, PyBool>[(int)CompareOps.Ge + 1];
+            table[(int)CompareOps.Eq] = eq;
+            table[(int)CompareOps.Ne] = ne;
+            table[(int)CompareOps.Lt] = lt;
+            table[(int)CompareOps.Gt] = gt;
+            table[(int)CompareOps.Le] = le;
+            table[(int)CompareOps.Ge] = ge;
+            return table;
+        }
+
+        private static Func<PyObject, PyObject, PyBool> getCompare(Func<PyObject, PyObject, PyBool>[] table, ushort compareOp)
+        {
+            return compareOp < table.Length ? table[compareOp] : null;
+        }
+
+        /// <summary>
+        /// Compares two plain ints, floats, or strings directly. The generic COMPARE_OP tries this before it goes
+        /// looking for dunders.
+        /// </summary>
+        /// <returns>PyBool.True or PyBool.False, or null if the operands or the comparison aren't ones this handles.</returns>
+        public static PyBool TryCompare(CompareOps compareOp, object left, object right)
+        {
+            Func<PyObject, PyObject, PyBool> compare;
+            if(asExactInt(left) != null && asExactInt(right) != null)
+            {
+                compare = getCompare(intCompares, (ushort)compareOp);
+            }
+            else if(asExactFloat(left) != null && asExactFloat(right) != null)
+            {
+                compare = getCompare(floatCompares, (ushort)compareOp);
+            }
+            else if(asExactString(left) != null && asExactString(right) != null)
+            {
+                compare = getCompare(stringCompares, (ushort)compareOp);
+            }
+            else
+            {
+                return null;
+            }
+            return compare == null ? null : compare((PyObject)left, (PyObject)right);
+        }
+
+        private static PyInteger asExactInt(object obj)
+        {
+            var asInt = obj as PyInteger;
+            return asInt != null && asInt.__class__ == PyIntegerClass.Instance ? asInt : null;
+        }
+
+        private static PyFloat asExactFloat(object obj)
+        {
+            var asFloat = obj as PyFloat;
+            return asFloat != null && asFloat.__class__ == PyFloatClass.Instance ? asFloat : null;
+        }
+
+        private static PyString asExactString(object obj)
+        {
+            var asString = obj as PyString;
+            return asString != null && asString.__class__ == PyStringClass.Instance ? asString : null;
+        }
+
+        private static PyList asExactList(object obj)
+        {
+            var asList = obj as PyList;
+            return asList != null && asList.__class__ == PyListClass.Instance ? asList : null;
+        }
+
+        private static PyDict asExactDict(object obj)
+        {
+            var asDict = obj as PyDict;
+            return asDict != null && asDict.__class__ == PyDictClass.Instance ? asDict : null;
+        }
+
+        /// <summary>
+        /// Counts a run of a generic instruction that has specialized forms, and rewrites it into one when it's warm
+        /// and its current operands suit one. Call this before the instruction touches the data stack or the cursor.
+        /// </summary>
+        public static void Count(FrameContext context, Instruction instruction)
+        {
+            if(!context.CodeBytes.CountTowardSpecializing(context.Cursor))
+            {
+                return;
+            }
+
+            var stack = context.DataStack;
+            var specialized = instruction.Opcode;
+            if(instruction.Opcode == ByteCodes.LOAD_ATTR)
+            {
+                specialized = specializeLoadAttr(context, instruction, stack.Peek());
+            }
+            else
+            {
+                var top = stack.Pop();
+                var second = stack.Peek();
+                stack.Push(top);
+                specialized = specializeBinary(instruction, second, top);
+            }
+
+            if(specialized != instruction.Opcode)
+            {
+                context.CodeBytes.Specialize(context.Cursor, specialized);
+            }
+        }
+
+        private static ByteCodes specializeLoadAttr(FrameContext context, Instruction instruction, object target)
+        {
+            var obj = target as PyObject;
+            object value;
+            if(obj != null && obj.GetType() == typeof(PyObject) &&
+                obj.TryGetInstanceAttribute(context.Function.Code.Names[instruction.Operand], out value) &&
+                !(value is IPyCallable))
+            {
+                return ByteCodes.LOAD_ATTR_INSTANCE_VALUE;
+            }
+            return instruction.Opcode;
+        }
+
+        // second and top are the two topmost stack items, in that order. For the subscripts, that's the container and
+        // the index.
+        private static ByteCodes specializeBinary(Instruction instruction, object second, object top)
+        {
+            bool ints = asExactInt(second) != null && asExactInt(top) != null;
+            bool floats = !ints && asExactFloat(second) != null && asExactFloat(top) != null;
+
+            switch(instruction.Opcode)
+            {
+                case ByteCodes.BINARY_ADD:
+                    return ints ? ByteCodes.BINARY_ADD_INT : floats ? ByteCodes.BINARY_ADD_FLOAT : instruction.Opcode;
+                case ByteCodes.BINARY_SUBTRACT:
+                    return ints ? ByteCodes.BINARY_SUBTRACT_INT : floats ? ByteCodes.BINARY_SUBTRACT_FLOAT : instruction.Opcode;
+                case ByteCodes.BINARY_MULTIPLY:
+                    return ints ? ByteCodes.BINARY_MULTIPLY_INT : floats ? ByteCodes.BINARY_MULTIPLY_FLOAT : instruction.Opcode;
+                case ByteCodes.BINARY_TRUE_DIVIDE:
+                    return ints ? ByteCodes.BINARY_TRUE_DIVIDE_INT : floats ? ByteCodes.BINARY_TRUE_DIVIDE_FLOAT : instruction.Opcode;
+                case ByteCodes.BINARY_FLOOR_DIVIDE:
+                    return ints ? ByteCodes.BINARY_FLOOR_DIVIDE_INT : instruction.Opcode;
+                case ByteCodes.BINARY_MODULO:
+                    return ints ? ByteCodes.BINARY_MODULO_INT : instruction.Opcode;
+                case ByteCodes.INPLACE_ADD:
+                    return ints ? ByteCodes.INPLACE_ADD_INT : floats ? ByteCodes.INPLACE_ADD_FLOAT : instruction.Opcode;
+                case ByteCodes.INPLACE_SUBTRACT:
+                    return ints ? ByteCodes.INPLACE_SUBTRACT_INT : floats ? ByteCodes.INPLACE_SUBTRACT_FLOAT : instruction.Opcode;
+                case ByteCodes.COMPARE_OP:
+                    if(ints && getCompare(intCompares, instruction.Operand) != null)
+                    {
+                        return ByteCodes.COMPARE_OP_INT;
+                    }
+                    else if(floats && getCompare(floatCompares, instruction.Operand) != null)
+                    {
+                        return ByteCodes.COMPARE_OP_FLOAT;
+                    }
+                    else if(asExactString(second) != null && asExactString(top) != null &&
+                        getCompare(stringCompares, instruction.Operand) != null)
+                    {
+                        return ByteCodes.COMPARE_OP_STR;
+                    }
+                    return instruction.Opcode;
+                case ByteCodes.BINARY_SUBSCR:
+                case ByteCodes.STORE_SUBSCR:
+                    if(asExactList(second) != null && asExactInt(top) != null)
+                    {
+                        return instruction.Opcode == ByteCodes.BINARY_SUBSCR ?
+                            ByteCodes.BINARY_SUBSCR_LIST_INT : ByteCodes.STORE_SUBSCR_LIST_INT;
+                    }
+                    else if(asExactDict(second) != null && asExactString(top) != null)
+                    {
+                        return instruction.Opcode == ByteCodes.BINARY_SUBSCR ?
+                            ByteCodes.BINARY_SUBSCR_DICT_STR : ByteCodes.STORE_SUBSCR_DICT_STR;
+                    }
+                    return instruction.Opcode;
+                default:
+                    return instruction.Opcode;
+            }
+        }
+
+        /// <summary>
+        /// Runs a specialized instruction if its guard passes. This leaves the data stack and cursor alone if it
+        /// fails, so the caller can deoptimize the instruction and run the generic form in its place.
+        /// </summary>
+        /// <returns>True if the instruction ran.</returns>
+        public static bool TryRun(FrameContext context, Instruction instruction)
+        {
+            var stack = context.DataStack;
+            if(instruction.Opcode == ByteCodes.LOAD_ATTR_INSTANCE_VALUE)
+            {
+                var value = TryLoadInstanceValue(stack.Peek(), context.Function.Code.Names[instruction.Operand]);
+                if(value == null)
+                {
+                    return false;
+                }
+                stack.Pop();
+                stack.Push(value);
+                context.Cursor += instruction.Size;
+                return true;
+            }
+
+            var top = stack.Pop();
+            var second = stack.Pop();
+            if(instruction.Opcode == ByteCodes.STORE_SUBSCR_LIST_INT || instruction.Opcode == ByteCodes.STORE_SUBSCR_DICT_STR)
+            {
+                // The value to store sits under the container and index.
+                if(!TryStoreSubscript(instruction.Opcode, second, top, stack.Peek()))
+                {
+                    stack.Push(second);
+                    stack.Push(top);
+                    return false;
+                }
+                stack.Pop();
+            }
+            else
+            {
+                var result = TryEvaluate(instruction, second, top);
+                if(result == null)
+                {
+                    stack.Push(second);
+                    stack.Push(top);
+                    return false;
+                }
+                stack.Push(result);
+            }
+            context.Cursor += instruction.Size;
+            return true;
+        }
+
+        /// <summary>
+        /// Evaluates a specialized arithmetic, comparison, or subscript load on its two operands.
+        /// </summary>
+        /// <param name="instruction">The specialized instruction.</param>
+        /// <param name="second">The second item on the stack; the left operand or the container.</param>
+        /// <param name="top">The top of the stack; the right operand or the index.</param>
+        /// <returns>The result, or null if the guard failed.</returns>
+        public static object TryEvaluate(Instruction instruction, object second, object top)
+        {
+            try
+            {
+                return runBinary(instruction, second, top);
+            }
+            catch(Exception)
+            {
+                // Overflows and the like. The generic form will raise it properly.
+                return null;
+            }
+        }
+
+        /// <summary>
+        /// Loads an attribute the way LOAD_ATTR_INSTANCE_VALUE does.
+        /// </summary>
+        /// <returns>The attribute, or null if the guard failed.</returns>
+        public static object TryLoadInstanceValue(object target, string name)
+        {
+            var obj = target as PyObject;
+            object value;
+            if(obj == null || obj.GetType() != typeof(PyObject) || !obj.TryGetInstanceAttribute(name, out value) ||
+                value is IPyCallable)
+            {
+                return null;
+            }
+            return value;
+        }
+
+        // Returns null if the guard fails.
+        private static object runBinary(Instruction instruction, object second, object top)
+        {
+            switch(instruction.Opcode)
+            {
+                case ByteCodes.BINARY_ADD_INT:
+                case ByteCodes.BINARY_SUBTRACT_INT:
+                case ByteCodes.BINARY_MULTIPLY_INT:
+                case ByteCodes.BINARY_FLOOR_DIVIDE_INT:
+                case ByteCodes.BINARY_MODULO_INT:
+                case ByteCodes.BINARY_TRUE_DIVIDE_INT:
+                case ByteCodes.INPLACE_ADD_INT:
+                case ByteCodes.INPLACE_SUBTRACT_INT:
+                    {
+                        var left = asExactInt(second);
+                        var right = asExactInt(top);
+                        if(left == null || right == null)
+                        {
+                            return null;
+                        }
+                        return runInt(instruction.Opcode, left, right);
+                    }
+                case ByteCodes.BINARY_ADD_FLOAT:
+                case ByteCodes.BINARY_SUBTRACT_FLOAT:
+                case ByteCodes.BINARY_MULTIPLY_FLOAT:
+                case ByteCodes.BINARY_TRUE_DIVIDE_FLOAT:
+                case ByteCodes.INPLACE_ADD_FLOAT:
+                case ByteCodes.INPLACE_SUBTRACT_FLOAT:
+                    {
+                        var left = asExactFloat(second);
+                        var right = asExactFloat(top);
+                        if(left == null || right == null)
+                        {
+                            return null;
+                        }
+                        return runFloat(instruction.Opcode, left, right);
+                    }
+                case ByteCodes.COMPARE_OP_INT:
+                    if(asExactInt(second) == null || asExactInt(top) == null)
+                    {
+                        return null;
+                    }
+                    return intCompares[instruction.Operand]((PyObject)second, (PyObject)top);
+                case ByteCodes.COMPARE_OP_FLOAT:
+                    if(asExactFloat(second) == null || asExactFloat(top) == null)
+                    {
+                        return null;
+                    }
+                    return floatCompares[instruction.Operand]((PyObject)second, (PyObject)top);
+                case ByteCodes.COMPARE_OP_STR:
+                    if(asExactString(second) == null || asExactString(top) == null)
+                    {
+                        return null;
+                    }
+                    return stringCompares[instruction.Operand]((PyObject)second, (PyObject)top);
+                case ByteCodes.BINARY_SUBSCR_LIST_INT:
+                    {
+                        var list = asExactList(second);
+                        var index = asExactInt(top);
+                        if(list == null || index == null)
+                        {
+                            return null;
+                        }
+
+                        // Out-of-range indices go the generic way so it can raise the IndexError.
+                        var i = index.InternalValue;
+                        if(i < 0)
+                        {
+                            i += list.list.Count;
+                        }
+                        if(i < 0 || i >= list.list.Count)
+                        {
+                            return null;
+                        }
+                        return list.list[(int)i];
+                    }
+                case ByteCodes.BINARY_SUBSCR_DICT_STR:
+                    {
+                        var dict = asExactDict(second);
+                        var key = asExactString(top);
+                        object value;
+                        if(dict == null || key == null || !dict.InternalDict.TryGetValue(key, out value))
+                        {
+                            return null;
+                        }
+                        return value;
+                    }
+                default:
+                    throw new Exception("Unexpected specialized opcode: " + instruction.Opcode);
+            }
+        }
+
+        // The in-place forms take the top of the stack as their left operand like the generic ones do.
+        private static PyObject runInt(ByteCodes opcode, PyInteger second, PyInteger top)
+        {
+            switch(opcode)
+            {
+                case ByteCodes.BINARY_ADD_INT:
+                    return PyIntegerClass.__add__(second, top);
+                case ByteCodes.BINARY_SUBTRACT_INT:
+                    return PyIntegerClass.__sub__(second, top);
+                case ByteCodes.BINARY_MULTIPLY_INT:
+                    return PyIntegerClass.__mul__(second, top);
+                case ByteCodes.BINARY_FLOOR_DIVIDE_INT:
+                    return top.InternalValue.IsZero ? null : PyIntegerClass.__floordiv__(second, top);
+                case ByteCodes.BINARY_MODULO_INT:
+                    return top.InternalValue.IsZero ? null : PyIntegerClass.__mod__(second, top);
+                case ByteCodes.BINARY_TRUE_DIVIDE_INT:
+                    return top.InternalValue.IsZero ? null : PyIntegerClass.__truediv__(second, top);
+                case ByteCodes.INPLACE_ADD_INT:
+                    return PyIntegerClass.__add__(top, second);
+                case ByteCodes.INPLACE_SUBTRACT_INT:
+                    return PyIntegerClass.__sub__(top, second);
+                default:
+                    throw new Exception("Unexpected specialized opcode: " + opcode);
+            }
+        }
+
+        private static PyObject runFloat(ByteCodes opcode, PyFloat second, PyFloat top)
+        {
+            switch(opcode)
+            {
+                case ByteCodes.BINARY_ADD_FLOAT:
+                    return PyFloatClass.__add__(second, top);
+                case ByteCodes.BINARY_SUBTRACT_FLOAT:
+                    return PyFloatClass.__sub__(second, top);
+                case ByteCodes.BINARY_MULTIPLY_FLOAT:
+                    return PyFloatClass.__mul__(second, top);
+                case ByteCodes.BINARY_TRUE_DIVIDE_FLOAT:
+                    return PyFloatClass.__truediv__(second, top);
+                case ByteCodes.INPLACE_ADD_FLOAT:
+                    return PyFloatClass.__add__(top, second);
+                case ByteCodes.INPLACE_SUBTRACT_FLOAT:
+                    return PyFloatClass.__sub__(top, second);
+                default:
+                    throw new Exception("Unexpected specialized opcode: " + opcode);
+            }
+        }
+
+        /// <summary>
+        /// Runs a specialized subscript store.
+        /// </summary>
+        /// <returns>True if it ran, or false if the guard failed.</returns>
+        public static bool TryStoreSubscript(ByteCodes opcode, object container, object index, object value)
+        {
+            if(opcode == ByteCodes.STORE_SUBSCR_LIST_INT)
+            {
+                var list = asExactList(container);
+                var asInt = asExactInt(index);
+
+                // list.__setitem__ doesn't wrap negative indices, so leave those to the generic form too.
+                if(list == null || asInt == null || !(value is PyObject) ||
+                    asInt.InternalValue < 0 || asInt.InternalValue >= list.list.Count)
+                {
+                    return false;
+                }
+                list.list[(int)asInt.InternalValue] = value;
+                return true;
+            }
+            else
+            {
+                var dict = asExactDict(container);
+                var key = asExactString(index);
+                if(dict == null || key == null)
+                {
+                    return false;
+                }
+                PyDictClass.__setitem__(dict, key, value);
+                return true;
+            }
+        }
+    }
+}
@@ -52,23 +52,39 @@ namespace CloacaInterpreter
             return container[intIndex];
         }
 
-        private static object LoadSubscriptIDict(IDictionary container, object index)
+        private static object LoadSubscriptIDict(FrameContext context, IDictionary container, object index)
         {
-            try
-            {
-                return container[index];
-            } 
-            catch(KeyNotFoundException)
+            if(!container.Contains(index))
             {
-                throw new Exception("KeyError: " + index);
+                context.CurrentException = KeyErrorClass.Create("KeyError: " + index);
+                return null;
             }
+            return container[index];
         }
 
         private static async Task<object> LoadSubscriptPyObject(Interpreter interpreter, FrameContext context, PyObject container, object index)
         {
+            // Plain dictionaries don't need to go through __getitem__.
+            var asDict = container as PyDict;
+            if (asDict != null && asDict.__class__ == PyDictClass.Instance)
+            {
+                object value;
+                if (!asDict.TryGetItem(index, out value))
+                {
+                    context.CurrentException = KeyErrorClass.Create("KeyError: " + index);
+                    return null;
+                }
+                return value;
+            }
+
             try
             {
-                var getter = container.__getattribute__("__getitem__");
+                object getter;
+                if (!container.TryGetAttribute("__getitem__", out getter))
+                {
+                    context.CurrentException = TypeErrorClass.Create("TypeError: '" + container.__class__.Name + "' object is not subscriptable");
+                    return null;
+                }
                 var functionToRun = getter as IPyCallable;
 
                 if (functionToRun == null)
@@ -131,7 +147,7 @@ namespace CloacaInterpreter
                 }
                 else if(container is IDictionary)
                 {
-                    return LoadSubscriptIDict(container as IDictionary, index);
+                    return LoadSubscriptIDict(context, container as IDictionary, index);
                 }
                 else
                 {
@@ -158,7 +174,12 @@ namespace CloacaInterpreter
         {
             try
             {
-                var setter = container.__getattribute__("__setitem__");
+                object setter;
+                if (!container.TryGetAttribute("__setitem__", out setter))
+                {
+                    context.CurrentException = TypeErrorClass.Create("TypeError: '" + container.__class__.Name + "' object does not support item assignment");
+                    return;
+                }
                 var functionToRun = setter as IPyCallable;
 
                 if (functionToRun == null)
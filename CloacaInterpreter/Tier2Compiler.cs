@@ -0,0 +1,648 @@
+﻿using System;
+using System.Collections.Generic;
+using System.Linq.Expressions;
+using System.Threading.Tasks;
+
+using LanguageImplementation;
+using LanguageImplementation.DataTypes;
+
+namespace CloacaInterpreter
+{
+    /// <summary>
+    /// Second tier of execution for hot code. This compiles a code object's bytecode into a .NET delegate using
+    /// expression trees, which the runtime then compiles down to IL.
+    ///
+    /// Fast locals and the data stack live in .NET locals in the compiled code. The stack depth at every instruction is
+    /// worked out ahead of time, so each stack slot gets its own local. Loads, stores, constants, globals, jumps,
+    /// returns, FOR_ITER over builtin iterators, and the quickened forms from the Specializer are compiled directly.
+    /// The quickened forms keep their guards; the compiled code is only as specialized as the interpreter had made the
+    /// code when it got hot.
+    ///
+    /// Everything else is handed to the interpreter one instruction at a time. The compiled code writes its locals
+    /// and stack back into the frame, has the interpreter run the instruction, and then picks its state back up and
+    /// continues if the instruction ended where expected. Otherwise (a suspension point like WAIT or a pending
+    /// FutureAwaiter, a raised exception, a jump we didn't anticipate) it leaves the frame with the interpreter, which
+    /// finishes it with Run(). Instructions that mess with the block stack or exception handling aren't handed over at
+    /// all; the compiled code just leaves the frame with the interpreter when it reaches one.
+    /// </summary>
+    public class Tier2Compiler
+    {
+        /// <summary>
+        /// How many calls plus loop iterations a code object needs before it gets compiled.
+        /// </summary>
+        public const int HotThreshold = 1000;
+
+        /// <summary>
+        /// How many times compiled code can hand its frame back to the interpreter before we stop using it.
+        /// </summary>
+        public const int DeoptLimit = 64;
+
+        // What an instruction does to the data stack and where it can go next.
+        private enum Kind
+        {
+            Native,         // Compiled directly.
+            Interpreted,    // Run by the interpreter, then compiled code continues.
+            Exit,           // Leaves the frame with the interpreter.
+        }
+
+        private struct Flow
+        {
+            public Kind Kind;
+            public bool FallsThrough;
+            public int FallEffect;
+            public int JumpTarget;          // -1 if the instruction doesn't jump.
+            public int JumpEffect;
+            public int Pops;                // How much has to be on the stack already.
+
+            public static Flow Next(Kind kind, int effect, int pops)
+            {
+                return new Flow { Kind = kind, FallsThrough = true, FallEffect = effect, JumpTarget = -1, Pops = pops };
+            }
+
+            public static Flow Exit()
+            {
+                return new Flow { Kind = Kind.Exit, JumpTarget = -1 };
+            }
+        }
+
+        // Handed back by interpret() when compiled code should carry on.
+        private static readonly Task resumeCompiled = Task.FromResult(true);
+
+        private CodeObject code;
+        private Instruction[] instructions;
+        private int[] depths;
+        private LabelTarget[] labels;
+
+        private ParameterExpression interpreter;
+        private ParameterExpression context;
+        private ParameterExpression frame;
+        private ParameterExpression[] locals;
+        private ParameterExpression[] stack;
+        private ParameterExpression scratch;
+        private ParameterExpression handedBack;
+        private LabelTarget returnLabel;
+
+        private Tier2Compiler(CodeObject code)
+        {
+            this.code = code;
+            this.instructions = code.Code.Instructions;
+        }
+
+        /// <summary>
+        /// Compiles the code into its Tier2 field, or sets Tier2Rejected if it can't be compiled.
+        /// </summary>
+        public static void Compile(CodeObject code)
+        {
+            code.Tier2 = new Tier2Compiler(code).compile();
+            code.Tier2Rejected = code.Tier2 == null;
+        }
+
+        private static bool isGenericBinary(ByteCodes opcode)
+        {
+            switch(opcode)
+            {
+                case ByteCodes.BINARY_POWER:
+                case ByteCodes.BINARY_MULTIPLY:
+                case ByteCodes.BINARY_MODULO:
+                case ByteCodes.BINARY_ADD:
+                case ByteCodes.BINARY_SUBTRACT:
+                case ByteCodes.BINARY_FLOOR_DIVIDE:
+                case ByteCodes.BINARY_TRUE_DIVIDE:
+                case ByteCodes.BINARY_LSHIFT:
+                case ByteCodes.BINARY_RSHIFT:
+                case ByteCodes.BINARY_AND:
+                case ByteCodes.BINARY_XOR:
+                case ByteCodes.BINARY_OR:
+                case ByteCodes.INPLACE_POWER:
+                case ByteCodes.INPLACE_MULTIPLY:
+                case ByteCodes.INPLACE_MODULO:
+                case ByteCodes.INPLACE_ADD:
+                case ByteCodes.INPLACE_SUBTRACT:
+                case ByteCodes.INPLACE_FLOOR_DIVIDE:
+                case ByteCodes.INPLACE_TRUE_DIVIDE:
+                case ByteCodes.INPLACE_LSHIFT:
+                case ByteCodes.INPLACE_RSHIFT:
+                case ByteCodes.INPLACE_AND:
+                case ByteCodes.INPLACE_XOR:
+                case ByteCodes.INPLACE_OR:
+                case ByteCodes.COMPARE_OP:
+                case ByteCodes.BINARY_SUBSCR:
+                    return true;
+                default:
+                    return false;
+            }
+        }
+
+        private Flow describe(int offset, Instruction instruction)
+        {
+            int next = offset + instruction.Size;
+            int operand = instruction.Operand;
+            switch(instruction.Opcode)
+            {
+                case ByteCodes.LOAD_FAST:
+                case ByteCodes.LOAD_CONST:
+                case ByteCodes.LOAD_GLOBAL:
+                    return Flow.Next(Kind.Native, 1, 0);
+                case ByteCodes.DUP_TOP:
+                    return Flow.Next(Kind.Native, 1, 1);
+                case ByteCodes.STORE_FAST:
+                case ByteCodes.POP_TOP:
+                    return Flow.Next(Kind.Native, -1, 1);
+                case ByteCodes.LOAD_ATTR_INSTANCE_VALUE:
+                    return Flow.Next(Kind.Native, 0, 1);
+                case ByteCodes.STORE_SUBSCR_LIST_INT:
+                case ByteCodes.STORE_SUBSCR_DICT_STR:
+                    return Flow.Next(Kind.Native, -3, 3);
+                case ByteCodes.POP_JUMP_IF_FALSE:
+                case ByteCodes.POP_JUMP_IF_TRUE:
+                    return new Flow { Kind = Kind.Native, FallsThrough = true, FallEffect = -1, JumpTarget = operand, JumpEffect = -1, Pops = 1 };
+                case ByteCodes.JUMP_IF_FALSE_OR_POP:
+                case ByteCodes.JUMP_IF_TRUE_OR_POP:
+                    return new Flow { Kind = Kind.Native, FallsThrough = true, FallEffect = -1, JumpTarget = operand, JumpEffect = 0, Pops = 1 };
+                case ByteCodes.JUMP_ABSOLUTE:
+                    return new Flow { Kind = Kind.Native, JumpTarget = operand };
+                case ByteCodes.JUMP_FORWARD:
+                    return new Flow { Kind = Kind.Native, JumpTarget = next + operand };
+                case ByteCodes.RETURN_VALUE:
+                    return new Flow { Kind = Kind.Native, JumpTarget = -1, Pops = 1 };
+
+                case ByteCodes.SETUP_LOOP:
+                case ByteCodes.POP_BLOCK:
+                case ByteCodes.GET_ITER:
+                case ByteCodes.LOAD_ATTR:
+                case ByteCodes.UNARY_POSITIVE:
+                case ByteCodes.UNARY_NEGATIVE:
+                case ByteCodes.UNARY_NOT:
+                case ByteCodes.UNARY_INVERT:
+                case ByteCodes.WAIT:
+                    return Flow.Next(Kind.Interpreted, 0, 0);
+                case ByteCodes.LOAD_NAME:
+                case ByteCodes.LOAD_DEREF:
+                case ByteCodes.LOAD_METHOD:
+                    return Flow.Next(Kind.Interpreted, 1, 0);
+                case ByteCodes.STORE_NAME:
+                case ByteCodes.STORE_DEREF:
+                    return Flow.Next(Kind.Interpreted, -1, 0);
+                case ByteCodes.STORE_ATTR:
+                    return Flow.Next(Kind.Interpreted, -2, 0);
+                case ByteCodes.STORE_SUBSCR:
+                    return Flow.Next(Kind.Interpreted, -3, 0);
+                case ByteCodes.CALL_FUNCTION:
+                    return Flow.Next(Kind.Interpreted, -operand, 0);
+                case ByteCodes.CALL_METHOD:
+                    return Flow.Next(Kind.Interpreted, -operand - 1, 0);
+                case ByteCodes.BUILD_LIST:
+                case ByteCodes.BUILD_TUPLE:
+                    return Flow.Next(Kind.Interpreted, 1 - operand, 0);
+                case ByteCodes.UNPACK_SEQUENCE:
+                    return Flow.Next(Kind.Interpreted, operand - 1, 0);
+                case ByteCodes.FOR_ITER:
+                    return new Flow { Kind = Kind.Native, FallsThrough = true, FallEffect = 1, JumpTarget = next + operand, JumpEffect = -1, Pops = 1 };
+                default:
+                    if(isGenericBinary(instruction.Opcode))
+                    {
+                        return Flow.Next(Kind.Interpreted, -1, 0);
+                    }
+                    else if(Instruction.GetGenericOpcode(instruction.Opcode) != instruction.Opcode &&
+                        isGenericBinary(Instruction.GetGenericOpcode(instruction.Opcode)))
+                    {
+                        // The quickened arithmetic, comparisons, and subscript loads.
+                        return Flow.Next(Kind.Native, -1, 2);
+                    }
+                    return Flow.Exit();
+            }
+        }
+
+        // Works out the stack depth at every reachable instruction. Returns false if the code does anything we can't
+        // keep track of.
+        private bool findDepths()
+        {
+            depths = new int[instructions.Length];
+            for(int i = 0; i < depths.Length; ++i)
+            {
+                depths[i] = -1;
+            }
+
+            var pending = new Stack<int>();
+            Func<int, int, bool> reach = (offset, depth) =>
+            {
+                if(offset < 0 || offset > instructions.Length || depth < 0)
+                {
+                    return false;
+                }
+                if(offset == instructions.Length)
+                {
+                    // Running off the end. The interpreter just stops there.
+                    return true;
+                }
+                if(depths[offset] < 0)
+                {
+                    depths[offset] = depth;
+                    pending.Push(offset);
+                    return true;
+                }
+                return depths[offset] == depth;
+            };
+
+            if(instructions.Length == 0 || !reach(0, 0))
+            {
+                return false;
+            }
+
+            while(pending.Count > 0)
+            {
+                int offset = pending.Pop();
+                var instruction = instructions[offset];
+                var flow = describe(offset, instruction);
+                int depth = depths[offset];
+                if(depth < flow.Pops)
+                {
+                    return false;
+                }
+
+                if(flow.FallsThrough && !reach(offset + instruction.Size, depth + flow.FallEffect))
+                {
+                    return false;
+                }
+                if(flow.JumpTarget >= 0 && !reach(flow.JumpTarget, depth + flow.JumpEffect))
+                {
+                    return false;
+                }
+            }
+
+            // The jump targets have to land on instructions.
+            for(int offset = 0; offset < instructions.Length; offset += instructions[offset].Size)
+            {
+                if(depths[offset] >= 0)
+                {
+                    var flow = describe(offset, instructions[offset]);
+                    if(flow.JumpTarget >= 0 && flow.JumpTarget < instructions.Length && !isInstructionStart(flow.JumpTarget))
+                    {
+                        return false;
+                    }
+                }
+            }
+            return true;
+        }
+
+        private bool isInstructionStart(int target)
+        {
+            for(int offset = 0; offset < instructions.Length; offset += instructions[offset].Size)
+            {
+                if(offset == target)
+                {
+                    return true;
+                }
+                if(offset > target)
+                {
+                    return false;
+                }
+            }
+            return false;
+        }
+
+        private Tier2Code compile()
+        {
+            if((code.Flags & CodeObject.CO_FLAGS_GENERATOR) != 0 || !findDepths())
+            {
+                return null;
+            }
+
+            int localCount = code.ArgVarNames.Count + code.VarNames.Count;
+            int maxDepth = 0;
+            for(int offset = 0; offset < instructions.Length; offset += instructions[offset].Size)
+            {
+                if(depths[offset] < 0)
+                {
+                    continue;
+                }
+
+                var instruction = instructions[offset];
+                var flow = describe(offset, instruction);
+                maxDepth = Math.Max(maxDepth, depths[offset] + Math.Max(0, flow.FallEffect));
+                if((instruction.Opcode == ByteCodes.LOAD_FAST || instruction.Opcode == ByteCodes.STORE_FAST) &&
+                    instruction.Operand >= localCount)
+                {
+                    return null;
+                }
+            }
+
+            interpreter = Expression.Parameter(typeof(IInterpreter), "interpreter");
+            context = Expression.Parameter(typeof(FrameContext), "context");
+            frame = Expression.Parameter(typeof(Frame), "frame");
+            scratch = Expression.Variable(typeof(object), "scratch");
+            handedBack = Expression.Variable(typeof(Task), "handedBack");
+            returnLabel = Expression.Label(typeof(Task), "return");
+
+            locals = new ParameterExpression[localCount];
+            for(int i = 0; i < localCount; ++i)
+            {
+                locals[i] = Expression.Variable(typeof(object), "local" + i);
+            }
+            stack = new ParameterExpression[maxDepth];
+            for(int i = 0; i < maxDepth; ++i)
+            {
+                stack[i] = Expression.Variable(typeof(object), "stack" + i);
+            }
+
+            labels = new LabelTarget[instructions.Length + 1];
+            for(int offset = 0; offset < instructions.Length; offset += instructions[offset].Size)
+            {
+                labels[offset] = Expression.Label("at" + offset);
+            }
+            labels[instructions.Length] = Expression.Label("end");
+
+            var body = new List<Expression>();
+            var fastsField = Expression.Field(frame, "LocalFasts");
+            for(int i = 0; i < localCount; ++i)
+            {
+                body.Add(Expression.Assign(locals[i], Expression.ArrayAccess(fastsField, Expression.Constant(i))));
+            }
+
+            for(int offset = 0; offset < instructions.Length; offset += instructions[offset].Size)
+            {
+                if(depths[offset] < 0)
+                {
+                    continue;
+                }
+                body.Add(Expression.Label(labels[offset]));
+                emit(body, offset);
+            }
+
+            // Running off the end of the code. Let the interpreter see that for itself.
+            body.Add(Expression.Label(labels[instructions.Length]));
+            body.Add(handBack(instructions.Length, 0));
+
+            var escaped = Expression.Parameter(typeof(Exception), "escaped");
+            var variables = new List<ParameterExpression>(locals);
+            variables.AddRange(stack);
+            variables.Add(scratch);
+            variables.Add(handedBack);
+
+            // .NET exceptions escape the same way they do out of Interpreter.Run().
+            var guarded = Expression.TryCatch(
+                Expression.Block(typeof(void), body),
+                Expression.Catch(escaped, Expression.Block(typeof(void),
+                    Expression.Assign(Expression.Field(context, "EscapedDotNetException"), escaped),
+                    Expression.Return(returnLabel, Expression.Constant(null, typeof(Task))))));
+
+            var lambda = Expression.Lambda<Tier2Code>(
+                Expression.Block(typeof(Task), variables,
+                    guarded,
+                    Expression.Label(returnLabel, Expression.Constant(null, typeof(Task)))),
+                code.Name + "$tier2", new[] { interpreter, context, frame });
+            return lambda.Compile();
+        }
+
+        private void emit(List<Expression> body, int offset)
+        {
+            var instruction = instructions[offset];
+            var flow = describe(offset, instruction);
+            int depth = depths[offset];
+            int next = offset + instruction.Size;
+
+            switch(flow.Kind)
+            {
+                case Kind.Exit:
+                    body.Add(handBack(offset, depth));
+                    return;
+                case Kind.Interpreted:
+                    emitInterpreted(body, offset, flow);
+                    return;
+            }
+
+            switch(instruction.Opcode)
+            {
+                case ByteCodes.LOAD_FAST:
+                    body.Add(Expression.Assign(stack[depth], locals[instruction.Operand]));
+                    break;
+                case ByteCodes.STORE_FAST:
+                    body.Add(Expression.Assign(locals[instruction.Operand], stack[depth - 1]));
+                    break;
+                case ByteCodes.LOAD_CONST:
+                    body.Add(Expression.Assign(stack[depth], Expression.Constant(code.Constants[instruction.Operand], typeof(object))));
+                    break;
+                case ByteCodes.LOAD_GLOBAL:
+                    body.Add(Expression.Assign(stack[depth], Expression.Call(typeof(Tier2Compiler).GetMethod("LoadGlobal"),
+                        interpreter, context, Expression.Constant(offset), Expression.Constant(code.Names[instruction.Operand]))));
+                    break;
+                case ByteCodes.DUP_TOP:
+                    body.Add(Expression.Assign(stack[depth], stack[depth - 1]));
+                    break;
+                case ByteCodes.POP_TOP:
+                    break;
+                case ByteCodes.LOAD_ATTR_INSTANCE_VALUE:
+                    body.Add(Expression.Assign(scratch, Expression.Call(typeof(Specializer).GetMethod("TryLoadInstanceValue"),
+                        stack[depth - 1], Expression.Constant(code.Names[instruction.Operand]))));
+                    body.Add(Expression.IfThenElse(Expression.Equal(scratch, Expression.Constant(null)),
+                        interpretBlock(offset, flow),
+                        Expression.Assign(stack[depth - 1], scratch)));
+                    break;
+                case ByteCodes.STORE_SUBSCR_LIST_INT:
+                case ByteCodes.STORE_SUBSCR_DICT_STR:
+                    body.Add(Expression.IfThen(
+                        Expression.Not(Expression.Call(typeof(Specializer).GetMethod("TryStoreSubscript"),
+                            Expression.Constant(instruction.Opcode), stack[depth - 2], stack[depth - 1], stack[depth - 3])),
+                        interpretBlock(offset, flow)));
+                    break;
+                case ByteCodes.POP_JUMP_IF_FALSE:
+                case ByteCodes.JUMP_IF_FALSE_OR_POP:
+                    emitConditionalJump(body, offset, flow, PyBool.False);
+                    break;
+                case ByteCodes.POP_JUMP_IF_TRUE:
+                case ByteCodes.JUMP_IF_TRUE_OR_POP:
+                    emitConditionalJump(body, offset, flow, PyBool.True);
+                    break;
+                case ByteCodes.FOR_ITER:
+                    // Iterators with their own __next__ are run by the interpreter.
+                    body.Add(Expression.Assign(scratch, Expression.Call(typeof(Tier2Compiler).GetMethod("ForIterNext"), stack[depth - 1])));
+                    body.Add(Expression.IfThenElse(Expression.Equal(scratch, Expression.Constant(null)),
+                        interpretBlock(offset, flow),
+                        Expression.IfThenElse(Expression.ReferenceEqual(scratch, Expression.Constant(IterationDone)),
+                            Expression.Goto(labels[flow.JumpTarget]),
+                            Expression.Assign(stack[depth], scratch))));
+                    break;
+                case ByteCodes.JUMP_ABSOLUTE:
+                case ByteCodes.JUMP_FORWARD:
+                    body.Add(Expression.Goto(labels[flow.JumpTarget]));
+                    return;
+                case ByteCodes.RETURN_VALUE:
+                    // Same as the interpreter: drop the frame and leave the return value on the caller's stack.
+                    body.Add(Expression.Call(Expression.Field(context, "callStack"), "Pop", null));
+                    body.Add(Expression.Call(Expression.Property(context, "DataStack"), "Push", null, stack[depth - 1]));
+                    body.Add(Expression.Return(returnLabel, Expression.Constant(null, typeof(Task))));
+                    return;
+                default:
+                    // The quickened arithmetic, comparisons, and subscript loads.
+                    body.Add(Expression.Assign(scratch, Expression.Call(typeof(Specializer).GetMethod("TryEvaluate"),
+                        Expression.Constant(instruction), stack[depth - 2], stack[depth - 1])));
+                    body.Add(Expression.IfThenElse(Expression.Equal(scratch, Expression.Constant(null)),
+                        interpretBlock(offset, flow),
+                        Expression.Assign(stack[depth - 2], scratch)));
+                    break;
+            }
+
+            // The next instruction in the code might have been left out as unreachable.
+            if(flow.FallsThrough && next < instructions.Length && depths[next] < 0)
+            {
+                body.Add(handBack(next, depth + flow.FallEffect));
+            }
+        }
+
+        // Objects with their own __bool__ or __len__ can't be tested in here, so the interpreter runs the jump for them.
+        private void emitConditionalJump(List<Expression> body, int offset, Flow flow, PyBool jumpsWhen)
+        {
+            int depth = depths[offset];
+            body.Add(Expression.Assign(scratch, Expression.Call(typeof(Tier2Compiler).GetMethod("IsTrue"), stack[depth - 1])));
+            body.Add(Expression.IfThenElse(Expression.Equal(scratch, Expression.Constant(null)),
+                interpretBlock(offset, flow),
+                Expression.IfThen(Expression.ReferenceEqual(scratch, Expression.Constant(jumpsWhen, typeof(object))),
+                    Expression.Goto(labels[flow.JumpTarget]))));
+        }
+
+        private void emitInterpreted(List<Expression> body, int offset, Flow flow)
+        {
+            body.Add(interpretBlock(offset, flow));
+        }
+
+        // Writes the compiled code's state back into the frame so the interpreter can pick it up at the given offset.
+        private List<Expression> writeBack(int offset, int depth)
+        {
+            var expressions = new List<Expression>();
+            var fastsField = Expression.Field(frame, "LocalFasts");
+            for(int i = 0; i < locals.Length; ++i)
+            {
+                expressions.Add(Expression.Assign(Expression.ArrayAccess(fastsField, Expression.Constant(i)), locals[i]));
+            }
+
+            var dataStack = Expression.Field(frame, "DataStack");
+            for(int i = 0; i < depth; ++i)
+            {
+                expressions.Add(Expression.Call(dataStack, "Push", null, stack[i]));
+            }
+            expressions.Add(Expression.Assign(Expression.Field(frame, "Cursor"), Expression.Constant(offset)));
+            return expressions;
+        }
+
+        // Leaves the rest of the frame to the interpreter.
+        private Expression handBack(int offset, int depth)
+        {
+            var expressions = writeBack(offset, depth);
+            expressions.Add(Expression.Return(returnLabel, Expression.Constant(Task.CompletedTask, typeof(Task))));
+            return Expression.Block(typeof(void), expressions);
+        }
+
+        // Has the interpreter run the instruction at offset, then carries on in compiled code if it ended up at one of
+        // the places we expected with the stack we expected.
+        private Expression interpretBlock(int offset, Flow flow)
+        {
+            int depth = depths[offset];
+            var expressions = writeBack(offset, depth);
+            expressions.Add(Expression.Assign(handedBack,
+                Expression.Call(typeof(Tier2Compiler).GetMethod("Interpret"), interpreter, context)));
+            expressions.Add(Expression.IfThen(
+                Expression.NotEqual(handedBack, Expression.Constant(resumeCompiled, typeof(Task))),
+                Expression.Return(returnLabel, handedBack)));
+
+            var cursor = Expression.Field(frame, "Cursor");
+            var stackCount = Expression.Property(Expression.Field(frame, "DataStack"), "Count");
+            if(flow.FallsThrough)
+            {
+                expressions.Add(resumeAt(cursor, stackCount, offset + instructions[offset].Size, depth + flow.FallEffect));
+            }
+            if(flow.JumpTarget >= 0)
+            {
+                expressions.Add(resumeAt(cursor, stackCount, flow.JumpTarget, depth + flow.JumpEffect));
+            }
+
+            // Somewhere else entirely. The interpreter can have it.
+            expressions.Add(Expression.Return(returnLabel, Expression.Constant(Task.CompletedTask, typeof(Task))));
+            return Expression.Block(typeof(void), expressions);
+        }
+
+        private Expression resumeAt(Expression cursor, Expression stackCount, int target, int depth)
+        {
+            var reload = new List<Expression>();
+            var dataStack = Expression.Field(frame, "DataStack");
+            for(int i = depth - 1; i >= 0; --i)
+            {
+                reload.Add(Expression.Assign(stack[i], Expression.Call(dataStack, "Pop", null)));
+            }
+            reload.Add(Expression.Goto(labels[target]));
+
+            return Expression.IfThen(
+                Expression.AndAlso(
+                    Expression.Equal(cursor, Expression.Constant(target)),
+                    Expression.Equal(stackCount, Expression.Constant(depth))),
+                Expression.Block(typeof(void), reload));
+        }
+
+        /// <summary>
+        /// Used by compiled code to look up a global.
+        /// </summary>
+        public static object LoadGlobal(IInterpreter interpreter, FrameContext context, int offset, string name)
+        {
+            return ((Interpreter)interpreter).LoadGlobal(context, offset, name);
+        }
+
+        /// <summary>
+        /// Used by compiled code to test a condition the same way the interpreter's conditional jumps do.
+        /// </summary>
+        /// <returns>PyBool.True or PyBool.False, or null if the condition's __bool__ or __len__ has to be called.</returns>
+        public static PyBool IsTrue(object condition)
+        {
+            bool truth;
+            if(!PyBool.TryGetTruth(condition, out truth))
+            {
+                return null;
+            }
+            return PyBool.Create(truth);
+        }
+
+        /// <summary>
+        /// What ForIterNext returns when the iterator is exhausted.
+        /// </summary>
+        public static readonly object IterationDone = new object();
+
+        /// <summary>
+        /// Used by compiled code to advance a builtin iterator the same way FOR_ITER does.
+        /// </summary>
+        /// <returns>The next item, IterationDone if there isn't one, or null if the iterator's __next__ has to be
+        /// called.</returns>
+        public static object ForIterNext(object iterator)
+        {
+            var asNative = iterator as INativeIterator;
+            if(asNative == null || !asNative.IsNative)
+            {
+                return null;
+            }
+
+            object next;
+            return asNative.TryNext(out next) ? next : IterationDone;
+        }
+
+        /// <summary>
+        /// Used by compiled code to have the interpreter run the instruction at the frame's cursor.
+        /// </summary>
+        /// <returns>A marker task if compiled code can continue, null if a .NET exception escaped, or otherwise
+        /// a task to finish before the interpreter takes over the frame.</returns>
+        public static Task Interpret(IInterpreter interpreter, FrameContext context)
+        {
+            var pending = ((Interpreter)interpreter).RunOneInstruction(context);
+            if(!pending.IsCompleted)
+            {
+                return pending;
+            }
+            else if(context.EscapedDotNetException != null)
+            {
+                return null;
+            }
+            else if(context.CurrentException != null)
+            {
+                // Let the interpreter unwind it.
+                return Task.CompletedTask;
+            }
+            return resumeCompiled;
+        }
+    }
+}
@@ -131,6 +131,15 @@ public class CloacaBytecodeVisitor : CloacaBaseVisitor<object>
     public bool IsRootProgram => codeStack.IsRootProgram;
     public CodeObjectBuilder RootProgram => codeStack.RootProgram;
 
+    /// <summary>
+    /// True if any default argument value was calculated from a name (a global, a function call, and so on) instead of
+    /// just literals. Those defaults depend on what was in the globals when this was compiled.
+    /// </summary>
+    public bool DefaultsReadNames
+    {
+        get; private set;
+    }
+
     public CloacaBytecodeVisitor(bool replMode = false)
     {
         codeStack = new CodeObjectBuilderStack();
@@ -1645,6 +1654,10 @@ public class CloacaBytecodeVisitor : CloacaBaseVisitor<object>
 
                     PopCode();
                     currentNameScope = backupNameNode;
+                    if(defaultBuilder.Names.Count > 0)
+                    {
+                        DefaultsReadNames = true;
+                    }
 
                     var currentTask = scheduler.GetCurrentTask();
                     var defaultPrecalcCode = defaultBuilder.Build(namespaceGlobals);
@@ -1775,6 +1788,7 @@ public class CloacaBytecodeVisitor : CloacaBaseVisitor<object>
             // So we have to determine if we're looking at arguments to a function or a continuation of
             // object attribute lookups.
             Visit(context.atom());
+            bool methodCall = false;
             for (int trailer_i = 0; trailer_i < context.trailer().Length; ++trailer_i)
             {
                 var trailer = context.trailer(trailer_i);
@@ -1782,14 +1796,20 @@ public class CloacaBytecodeVisitor : CloacaBaseVisitor<object>
                 {
                     var attrName = trailer.NAME().GetText();
                     var attrIdx = codeStack.ActiveProgram.Names.AddGetIndex(attrName);
-                    codeStack.ActiveProgram.AddInstruction(ByteCodes.LOAD_ATTR, attrIdx, context);
+
+                    // obj.method(args) gets LOAD_METHOD/CALL_METHOD so the interpreter doesn't have to make a bound
+                    // method just to call it. Keyword arguments still go through CALL_FUNCTION_KW.
+                    methodCall = trailer_i + 1 < context.trailer().Length &&
+                        isCallTrailer(context.trailer(trailer_i + 1)) &&
+                        !hasKeywordArguments(context.trailer(trailer_i + 1));
+                    codeStack.ActiveProgram.AddInstruction(methodCall ? ByteCodes.LOAD_METHOD : ByteCodes.LOAD_ATTR, attrIdx, context);
 
                 }
 
                 // A function that doesn't take any arguments doesn't have an arglist, but that is what 
                 // got triggered. The only way I know to make sure we trigger on it is to see if we match
                 // parentheses. There has to be a better way...
-                else if (trailer.arglist() != null || trailer.GetText() == "()")
+                else if (isCallTrailer(trailer))
                 {
                     // Keyword argument names. Start setting this up if we run into a "foo=bar" argument.
                     List<object> specifiedKeywords = null;
@@ -1821,10 +1841,15 @@ public class CloacaBytecodeVisitor : CloacaBaseVisitor<object>
                         codeStack.ActiveProgram.AddInstruction(ByteCodes.LOAD_CONST, keywordTupleIdx, context);
                         codeStack.ActiveProgram.AddInstruction(ByteCodes.CALL_FUNCTION_KW, argIdx, context);
                     }
+                    else if (methodCall)
+                    {
+                        codeStack.ActiveProgram.AddInstruction(ByteCodes.CALL_METHOD, argIdx, context);
+                    }
                     else
                     {
                         codeStack.ActiveProgram.AddInstruction(ByteCodes.CALL_FUNCTION, argIdx, context);
                     }
+                    methodCall = false;
                 }
                 else
                 {
@@ -1835,6 +1860,23 @@ public class CloacaBytecodeVisitor : CloacaBaseVisitor<object>
         return null;
     }
 
+    private static bool isCallTrailer(CloacaParser.TrailerContext trailer)
+    {
+        return trailer.arglist() != null || trailer.GetText() == "()";
+    }
+
+    private static bool hasKeywordArguments(CloacaParser.TrailerContext trailer)
+    {
+        for (int argIdx = 0; trailer.arglist() != null && trailer.arglist().argument(argIdx) != null; ++argIdx)
+        {
+            if (trailer.arglist().argument(argIdx).test().Length > 1)
+            {
+                return true;
+            }
+        }
+        return false;
+    }
+
     public override object VisitComparison([NotNull] CloacaParser.ComparisonContext context)
     {
         // This might just be a pass-through to greener pastures (atoms). If no operator
@@ -42,6 +42,33 @@ namespace CloacaTests
             Assert.That(unrelated_obj_class, Is.False);
         }
 
+        [Test]
+        public async Task IsInstanceFollowsMRO()
+        {
+            var context = await runProgram("class Base:\n" +
+                                           "   x = 1\n" +
+                                           "\n" +
+                                           "class Left(Base):\n" +
+                                           "   pass\n" +
+                                           "\n" +
+                                           "class Right(Base):\n" +
+                                           "   x = 2\n" +
+                                           "\n" +
+                                           "class Diamond(Left, Right):\n" +
+                                           "   pass\n" +
+                                           "\n" +
+                                           "d = Diamond()\n" +
+                                           "x = d.x\n" +
+                                           "is_base = isinstance(d, Base)\n" +
+                                           "is_right = isinstance(d, Right)\n" +
+                                           "left_right = issubclass(Left, Right)\n", new Dictionary<string, object>(), 1);
+            var variables = new VariableMultimap(context);
+            Assert.That(variables.Get("x"), Is.EqualTo(PyInteger.Create(2)));
+            Assert.That((bool)variables.Get("is_base"), Is.True);
+            Assert.That((bool)variables.Get("is_right"), Is.True);
+            Assert.That((bool)variables.Get("left_right"), Is.False);
+        }
+
         [Test]
         public async Task NumericStringConversions()
         {
@@ -259,6 +259,481 @@ namespace CloacaTests
 
     }
 
+    [TestFixture]
+    public class InstructionDecodingTests
+    {
+        [Test]
+        public void DecodesOperandsAtInstructionOffsets()
+        {
+            var builder = new CodeBuilder();
+            builder.AddByte((byte)ByteCodes.LOAD_CONST);
+            builder.AddUShort(0x0102);
+            builder.AddByte((byte)ByteCodes.POP_TOP);
+            builder.AddByte((byte)ByteCodes.JUMP_ABSOLUTE);
+            builder.AddUShort(300);
+            builder.AddByte((byte)ByteCodes.WAIT);
+
+            var code = new CodeByteArray(builder.ToArray());
+            var instructions = code.Instructions;
+            Assert.That(instructions.Length, Is.EqualTo(code.Bytes.Length));
+            Assert.That(instructions[0], Is.EqualTo(new Instruction(ByteCodes.LOAD_CONST, 0x0102)));
+            Assert.That(instructions[3], Is.EqualTo(new Instruction(ByteCodes.POP_TOP, 0)));
+            Assert.That(instructions[4], Is.EqualTo(new Instruction(ByteCodes.JUMP_ABSOLUTE, 300)));
+            Assert.That(instructions[7], Is.EqualTo(new Instruction(ByteCodes.WAIT, 0)));
+            Assert.That(code.GetUShort(5), Is.EqualTo(300));
+        }
+
+        [Test]
+        public void PatchingBytesRedecodes()
+        {
+            var builder = new CodeBuilder();
+            builder.AddByte((byte)ByteCodes.JUMP_FORWARD);
+            builder.AddUShort(0);
+            var fixer = new JumpOpcodeFixer(builder, builder.Count);
+            builder.AddByte((byte)ByteCodes.POP_TOP);
+            fixer.Fixup(builder.Count);
+
+            var code = new CodeByteArray(builder.ToArray());
+            Assert.That(code.Instructions[0].Operand, Is.EqualTo(1));
+
+            code[2] = 5;
+            Assert.That(code.Instructions[0].Operand, Is.EqualTo(5));
+        }
+    }
+
+    [TestFixture]
+    public class NameCacheTests
+    {
+        private CodeByteArray code;
+        private Dictionary<string, object> globals;
+        private Dictionary<string, object> builtins;
+
+        [SetUp]
+        public void makeNamespaces()
+        {
+            code = new CodeByteArray(new byte[] { (byte)ByteCodes.LOAD_GLOBAL, 0, 0 });
+            globals = new Dictionary<string, object> { { "a", PyInteger.Create(1) } };
+            builtins = new Dictionary<string, object> { { "len", PyString.Create("builtin") } };
+        }
+
+        private object load(string name)
+        {
+            object value;
+            Assert.That(NameCache.TryLoad(code, 0, name, globals, builtins, out value), Is.True);
+            return value;
+        }
+
+        [Test]
+        public void SeesRebinding()
+        {
+            Assert.That(load("a"), Is.EqualTo(PyInteger.Create(1)));
+            Namespaces.Set(globals, "a", PyInteger.Create(2));
+            Assert.That(load("a"), Is.EqualTo(PyInteger.Create(2)));
+        }
+
+        /// <summary>
+        /// Removing one global and adding another leaves the count the same. That still has to count as a change.
+        /// </summary>
+        [Test]
+        public void GlobalShadowsBuiltinAfterRemove()
+        {
+            Assert.That(load("len"), Is.EqualTo(PyString.Create("builtin")));
+            Namespaces.Remove(globals, "a");
+            Namespaces.Set(globals, "len", PyString.Create("global"));
+            Assert.That(globals.Count, Is.EqualTo(1));
+            Assert.That(load("len"), Is.EqualTo(PyString.Create("global")));
+        }
+
+        [Test]
+        public void SeesSetBuiltin()
+        {
+            var interpreter = new Interpreter(new Scheduler());
+            builtins = interpreter.GetBuiltins();
+            var originalLen = load("len");
+            interpreter.SetBuiltin("len", PyString.Create("replaced"));
+            Assert.That(load("len"), Is.Not.SameAs(originalLen));
+            Assert.That(load("len"), Is.EqualTo(PyString.Create("replaced")));
+        }
+
+        [Test]
+        public void ChangedAfterDirectEdit()
+        {
+            Assert.That(load("len"), Is.EqualTo(PyString.Create("builtin")));
+            builtins["len"] = PyString.Create("edited");
+            Namespaces.Changed(builtins);
+            Assert.That(load("len"), Is.EqualTo(PyString.Create("edited")));
+        }
+    }
+
+    [TestFixture]
+    public class CompileCacheTests : RunCodeTest
+    {
+        private static CompileCacheKey key(string program, params string[] globalNames)
+        {
+            return new CompileCacheKey(program, globalNames, new string[0]);
+        }
+
+        [Test]
+        public void EvictsLeastRecentlyUsed()
+        {
+            var cache = new CompileCache(2);
+            cache.Add(key("a = 1\n"), new CodeObjectBuilder());
+            cache.Add(key("b = 1\n"), new CodeObjectBuilder());
+
+            CodeObjectBuilder found;
+            Assert.That(cache.TryGet(key("a = 1\n"), out found), Is.True);
+            cache.Add(key("c = 1\n"), new CodeObjectBuilder());
+
+            Assert.That(cache.TryGet(key("b = 1\n"), out found), Is.False);
+            Assert.That(cache.TryGet(key("a = 1\n"), out found), Is.True);
+            Assert.That(cache.TryGet(key("c = 1\n"), out found), Is.True);
+            Assert.That(cache.Count, Is.EqualTo(2));
+            Assert.That(cache.Hits, Is.EqualTo(3));
+            Assert.That(cache.Misses, Is.EqualTo(1));
+            Assert.That(cache.Evictions, Is.EqualTo(1));
+        }
+
+        [Test]
+        public void KeyIncludesNames()
+        {
+            Assert.That(key("a = b\n", "b", "c"), Is.EqualTo(key("a = b\n", "c", "b")));
+            Assert.That(key("a = b\n", "b"), Is.Not.EqualTo(key("a = b\n")));
+            Assert.That(new CompileCacheKey("a = b\n", new string[0], new string[] { "b" }), Is.Not.EqualTo(key("a = b\n", "b")));
+        }
+
+        [Test]
+        public async Task CompileHitBuildsSeparateCode()
+        {
+            var program = "def compile_cache_hit(x=2):\n" +
+                          "   return x\n";
+            var scheduler = new Scheduler();
+            var interpreter = new Interpreter(scheduler);
+            scheduler.SetInterpreter(interpreter);
+
+            var first = await compileProgram(program, new Dictionary<string, object>(), interpreter, scheduler);
+            var second = await compileProgram(program, new Dictionary<string, object>(), interpreter, scheduler);
+
+            Assert.That(interpreter.CompileCache.Hits, Is.EqualTo(1));
+            Assert.That(second, Is.Not.SameAs(first));
+            Assert.That(second.Code.Code.Bytes, Is.EqualTo(first.Code.Code.Bytes));
+            Assert.That(second.Code.Names, Is.Not.SameAs(first.Code.Names));
+
+            // The function's code, defaults included, comes out of the cache as a copy too.
+            var firstFunction = (CodeObjectBuilder)first.Code.Constants.Find(constant => constant is CodeObjectBuilder);
+            var secondFunction = (CodeObjectBuilder)second.Code.Constants.Find(constant => constant is CodeObjectBuilder);
+            Assert.That(secondFunction, Is.Not.SameAs(firstFunction));
+            Assert.That(secondFunction.Defaults, Is.Not.SameAs(firstFunction.Defaults));
+            Assert.That(secondFunction.Defaults, Is.EqualTo(new List<object> { PyInteger.Create(2) }));
+        }
+
+        [Test]
+        public async Task InterpretersHaveSeparateCaches()
+        {
+            var program = "a = 1\n";
+            var scheduler = new Scheduler();
+            var interpreter = new Interpreter(scheduler);
+            scheduler.SetInterpreter(interpreter);
+            var otherScheduler = new Scheduler();
+            var otherInterpreter = new Interpreter(otherScheduler);
+            otherScheduler.SetInterpreter(otherInterpreter);
+
+            await compileProgram(program, new Dictionary<string, object>(), interpreter, scheduler);
+            await compileProgram(program, new Dictionary<string, object>(), otherInterpreter, otherScheduler);
+
+            Assert.That(interpreter.CompileCache.Hits, Is.EqualTo(0));
+            Assert.That(otherInterpreter.CompileCache.Hits, Is.EqualTo(0));
+            Assert.That(otherInterpreter.CompileCache.Misses, Is.EqualTo(1));
+        }
+    }
+
+    [TestFixture]
+    public class PeepholeOptimizerTests : RunCodeTest
+    {
+        private static async Task<PyFunction> compile(string program)
+        {
+            var scheduler = new Scheduler();
+            var interpreter = new Interpreter(scheduler);
+            scheduler.SetInterpreter(interpreter);
+            return await compileProgram(program, new Dictionary<string, object>(), interpreter, scheduler);
+        }
+
+        [Test]
+        public async Task FoldsConstants()
+        {
+            var program = "a = 2 * 3 + 1\n" +
+                          "b = 1 < 2\n" +
+                          "c = (1, -2)\n";
+
+            var compiled = await compile(program);
+            Assert.That(opcodes(compiled.Code), Is.EqualTo(new ByteCodes[]
+            {
+                ByteCodes.LOAD_CONST, ByteCodes.STORE_NAME,
+                ByteCodes.LOAD_CONST, ByteCodes.STORE_NAME,
+                ByteCodes.LOAD_CONST, ByteCodes.STORE_NAME,
+            }));
+
+            await runBasicTest(program, new VariableMultimap(new TupleList<string, object>
+            {
+                { "a", PyInteger.Create(7) },
+                { "b", PyBool.True },
+                { "c", PyTuple.Create(new object[] { PyInteger.Create(1), PyInteger.Create(-2) }) },
+            }), 1);
+        }
+
+        [Test]
+        public async Task ReusesFoldedConstants()
+        {
+            var program = "a = 1 + 2\n" +
+                          "b = 2 + 1\n" +
+                          "c = 1.5 + 1.5\n";
+
+            // Both ints fold to the same constant, but the float is kept apart since 3 and 3.0 aren't interchangeable.
+            var compiled = await compile(program);
+            Assert.That(compiled.Code.Constants.FindAll(constant => constant is PyInteger && constant.Equals(PyInteger.Create(3))).Count,
+                Is.EqualTo(1));
+            Assert.That(compiled.Code.Constants.FindAll(constant => constant is PyFloat && constant.Equals(PyFloat.Create(3.0))).Count,
+                Is.EqualTo(1));
+
+            await runBasicTest(program, new VariableMultimap(new TupleList<string, object>
+            {
+                { "a", PyInteger.Create(3) },
+                { "b", PyInteger.Create(3) },
+                { "c", PyFloat.Create(3.0) },
+            }), 1);
+        }
+
+        [Test]
+        public async Task LeavesErrorsForRuntime()
+        {
+            var compiled = await compile("a = 1 // 0\n");
+            Assert.That(opcodes(compiled.Code), Contains.Item(ByteCodes.BINARY_FLOOR_DIVIDE));
+        }
+
+        /// <summary>
+        /// Huge results stay as code. Folding them would make compiling slow even if the line never runs.
+        /// </summary>
+        [Test]
+        public async Task LeavesHugeResultsForRuntime()
+        {
+            var compiled = await compile("if False:\n" +
+                                         "   a = 2 ** 10 ** 8\n" +
+                                         "   b = 1 << 10 ** 9\n" +
+                                         "c = 2 ** 10\n");
+            var found = opcodes(compiled.Code);
+            Assert.That(found, Contains.Item(ByteCodes.BINARY_POWER));
+            Assert.That(found, Contains.Item(ByteCodes.BINARY_LSHIFT));
+            Assert.That(compiled.Code.Constants, Contains.Item(PyInteger.Create(1024)));
+        }
+
+        [Test]
+        public async Task RemovesUnreachableCode()
+        {
+            var compiled = await compile("def f():\n" +
+                                         "   return 1\n" +
+                                         "   a = 2\n");
+            var f = ((CodeObjectBuilder)compiled.Code.Constants.Find(constant => constant is CodeObjectBuilder)).Build();
+            Assert.That(opcodes(f.Code), Is.EqualTo(new ByteCodes[] { ByteCodes.LOAD_CONST, ByteCodes.RETURN_VALUE }));
+        }
+
+        [Test]
+        public async Task KeepsLineNumbers()
+        {
+            var compiled = await compile("a = 1\n" +
+                                         "'docstring'\n" +
+                                         "b = a + 2 * 3\n");
+            Assert.That(opcodes(compiled.Code), Is.EqualTo(new ByteCodes[]
+            {
+                ByteCodes.LOAD_CONST, ByteCodes.STORE_NAME,
+                ByteCodes.LOAD_NAME, ByteCodes.LOAD_CONST, ByteCodes.BINARY_ADD, ByteCodes.STORE_NAME,
+            }));
+
+            // The docstring's line is gone entirely and everything after it is still on line 3.
+            var disassembly = Dis.dis(compiled.Code);
+            Assert.That(disassembly, Does.Not.Contain("\n  2 "));
+            Assert.That(disassembly, Does.Contain("\n  3           6  LOAD_NAME"));
+        }
+    }
+
+    [TestFixture]
+    public class SpecializerTests : RunCodeTest
+    {
+        private static async Task<PyFunction> run(string program, Dictionary<string, object> variables)
+        {
+            var scheduler = new Scheduler();
+            var interpreter = new Interpreter(scheduler);
+            scheduler.SetInterpreter(interpreter);
+            var compiled = await compileProgram(program, variables, interpreter, scheduler);
+            var receipt = scheduler.Schedule(compiled, variables);
+            await scheduler.RunUntilDone();
+            if(receipt.EscapedExceptionInfo != null)
+            {
+                receipt.EscapedExceptionInfo.Throw();
+            }
+            return compiled;
+        }
+
+        [Test]
+        public async Task SpecializesHotSites()
+        {
+            var variables = new Dictionary<string, object>();
+            var compiled = await run("class Point:\n" +
+                                     "   def __init__(self):\n" +
+                                     "      self.x = 2\n" +
+                                     "\n" +
+                                     "p = Point()\n" +
+                                     "lst = [0, 0, 0]\n" +
+                                     "d = {'a': 1}\n" +
+                                     "total = 0\n" +
+                                     "i = 0\n" +
+                                     "while i < 20:\n" +
+                                     "   total += i * p.x\n" +
+                                     "   lst[i % 3] = lst[i % 3] + i\n" +
+                                     "   d['a'] = d['a'] + 1\n" +
+                                     "   i = i + 1\n", variables);
+
+            Assert.That(variables["total"], Is.EqualTo(PyInteger.Create(380)));
+            Assert.That(variables["lst"], Is.EqualTo(PyList.Create(new List<object>
+            {
+                PyInteger.Create(63), PyInteger.Create(70), PyInteger.Create(57)
+            })));
+            Assert.That(PyDictClass.__getitem__(new FrameContext(), (PyDict)variables["d"], PyString.Create("a")), Is.EqualTo(PyInteger.Create(21)));
+
+            Assert.That(opcodes(compiled.Code), Is.SupersetOf(new ByteCodes[]
+            {
+                ByteCodes.COMPARE_OP_INT,
+                ByteCodes.INPLACE_ADD_INT,
+                ByteCodes.BINARY_MULTIPLY_INT,
+                ByteCodes.LOAD_ATTR_INSTANCE_VALUE,
+                ByteCodes.BINARY_SUBSCR_LIST_INT,
+                ByteCodes.STORE_SUBSCR_LIST_INT,
+                ByteCodes.BINARY_SUBSCR_DICT_STR,
+                ByteCodes.STORE_SUBSCR_DICT_STR,
+            }));
+
+            // Disassembly still shows what the code was compiled into.
+            Assert.That(Dis.dis(compiled.Code), Does.Not.Contain("_INT"));
+        }
+
+        [Test]
+        public async Task DeoptimizesWhenTypesChange()
+        {
+            var variables = new Dictionary<string, object>();
+            var compiled = await run("vals = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 'a', 'b']\n" +
+                                     "i = 0\n" +
+                                     "while i < 14:\n" +
+                                     "   last = vals[i] * 2\n" +
+                                     "   i += 1\n", variables);
+
+            Assert.That(variables["last"], Is.EqualTo(PyString.Create("bb")));
+            Assert.That(opcodes(compiled.Code), Contains.Item(ByteCodes.BINARY_MULTIPLY));
+            Assert.That(opcodes(compiled.Code), Does.Not.Contain(ByteCodes.BINARY_MULTIPLY_INT));
+        }
+
+        [Test]
+        public async Task GuardLeavesErrorsToGenericPath()
+        {
+            var variables = new Dictionary<string, object>();
+            await run("lst = [1, 2, 3]\n" +
+                      "total = 0\n" +
+                      "caught = False\n" +
+                      "i = 0\n" +
+                      "try:\n" +
+                      "   while i < 20:\n" +
+                      "      idx = i % 3\n" +
+                      "      if i == 15:\n" +
+                      "         idx = 7\n" +
+                      "      total += lst[idx]\n" +
+                      "      i += 1\n" +
+                      "except Exception:\n" +
+                      "   caught = True\n", variables);
+
+            Assert.That(variables["caught"], Is.EqualTo(PyBool.True));
+            Assert.That(variables["total"], Is.EqualTo(PyInteger.Create(30)));
+        }
+    }
+
+    [TestFixture]
+    public class Tier2CompilerTests : RunCodeTest
+    {
+        private static async Task run(string program, Dictionary<string, object> variables, bool tier2Enabled)
+        {
+            var scheduler = new Scheduler();
+            var interpreter = new Interpreter(scheduler);
+            interpreter.Tier2Enabled = tier2Enabled;
+            scheduler.SetInterpreter(interpreter);
+            var compiled = await compileProgram(program, variables, interpreter, scheduler);
+            var receipt = scheduler.Schedule(compiled, variables);
+            await scheduler.RunUntilDone();
+            if(receipt.EscapedExceptionInfo != null)
+            {
+                receipt.EscapedExceptionInfo.Throw();
+            }
+        }
+
+        private const string hotFunction =
+            "def f(a, n):\n" +
+            "   total = 0\n" +
+            "   i = 0\n" +
+            "   while i < n:\n" +
+            "      total += a[i % 3] * i\n" +
+            "      i += 1\n" +
+            "   return total\n" +
+            "\n";
+
+        [Test]
+        public async Task CompilesHotFunctions()
+        {
+            var variables = new Dictionary<string, object>();
+            await run(hotFunction +
+                      "s = 0\n" +
+                      "j = 0\n" +
+                      "while j < 1100:\n" +
+                      "   s += f([2, 3, 5], j % 7)\n" +
+                      "   j += 1\n", variables, true);
+
+            Assert.That(variables["s"], Is.EqualTo(PyInteger.Create(19154)));
+            Assert.That(((PyFunction)variables["f"]).Code.Tier2, Is.Not.Null);
+        }
+
+        [Test]
+        public async Task CanBeTurnedOff()
+        {
+            var variables = new Dictionary<string, object>();
+            await run(hotFunction +
+                      "s = 0\n" +
+                      "j = 0\n" +
+                      "while j < 1100:\n" +
+                      "   s += f([2, 3, 5], j % 7)\n" +
+                      "   j += 1\n", variables, false);
+
+            Assert.That(variables["s"], Is.EqualTo(PyInteger.Create(19154)));
+            Assert.That(((PyFunction)variables["f"]).Code.Tier2, Is.Null);
+        }
+
+        [Test]
+        public async Task FallsBackToInterpreter()
+        {
+            var variables = new Dictionary<string, object>();
+            await run(hotFunction +
+                      "s = 0\n" +
+                      "j = 0\n" +
+                      "while j < 1100:\n" +
+                      "   a = [2, 3, 5]\n" +
+                      "   if j >= 1050:\n" +
+                      "      a = {0: 2, 1: 3, 2: 5}\n" +
+                      "   s += f(a, j % 7)\n" +
+                      "   j += 1\n" +
+                      "caught = False\n" +
+                      "try:\n" +
+                      "   f([2, 3], 3)\n" +
+                      "except Exception:\n" +
+                      "   caught = True\n", variables, true);
+
+            Assert.That(variables["s"], Is.EqualTo(PyInteger.Create(19154)));
+            Assert.That(variables["caught"], Is.EqualTo(PyBool.True));
+        }
+    }
+
     public class DotNetBindingTestFunctions
     {
         public static object[] NoArgs()
@@ -664,6 +1139,93 @@ namespace CloacaTests
             }), 1);
         }
 
+        /// <summary>
+        /// Integers live in a long until they don't fit anymore. Make sure going over that gives exact answers and
+        /// coming back under it still compares equal.
+        /// </summary>
+        [Test]
+        public async Task BigIntegerArithmetic()
+        {
+            await runBasicTest(
+                "a = 2 ** 100\n" +
+                "b = a - 2 ** 100 + 1\n" +
+                "c = 9223372036854775807 + 1\n" +
+                "d = c * c\n" +
+                "e = 2 ** -1\n"
+                , new VariableMultimap(new TupleList<string, object>
+            {
+                { "a", PyInteger.Create(BigInteger.Pow(2, 100)) },
+                { "b", PyInteger.Create(1) },
+                { "c", PyInteger.Create(new BigInteger(long.MaxValue) + 1) },
+                { "d", PyInteger.Create((new BigInteger(long.MaxValue) + 1) * (new BigInteger(long.MaxValue) + 1)) },
+                { "e", PyFloat.Create(0.5) }
+            }), 1);
+
+            Assert.Throws<DivideByZeroException>(() => PyIntegerClass.__pow__(PyInteger.Create(0), PyInteger.Create(-1)));
+        }
+
+        [Test]
+        public async Task FloorDivisionAndModuloNegative()
+        {
+            // Python rounds toward negative infinity. The constants are folded at compile time and the names aren't,
+            // so this covers both.
+            await runBasicTest(
+                "a = -7 // 2\n" +
+                "b = -7 % 3\n" +
+                "c = 7 // -2\n" +
+                "d = 7 % -3\n" +
+                "e = -7 // -2\n" +
+                "f = -7 % -3\n" +
+                "g = 6 % -3\n" +
+                "x = -7\n" +
+                "h = x // 2\n" +
+                "i = x % 3\n" +
+                "j = x % 3.0\n" +
+                "big = -(2 ** 70) - 1\n" +
+                "k = big // 2 ** 35\n" +
+                "l = big % 2 ** 35\n"
+                , new VariableMultimap(new TupleList<string, object>
+            {
+                { "a", PyInteger.Create(-4) },
+                { "b", PyInteger.Create(2) },
+                { "c", PyInteger.Create(-4) },
+                { "d", PyInteger.Create(-2) },
+                { "e", PyInteger.Create(3) },
+                { "f", PyInteger.Create(-1) },
+                { "g", PyInteger.Create(0) },
+                { "x", PyInteger.Create(-7) },
+                { "h", PyInteger.Create(-4) },
+                { "i", PyInteger.Create(2) },
+                { "j", PyFloat.Create(2.0) },
+                { "big", PyInteger.Create(-BigInteger.Pow(2, 70) - 1) },
+                { "k", PyInteger.Create(-BigInteger.Pow(2, 35) - 1) },
+                { "l", PyInteger.Create(BigInteger.Pow(2, 35) - 1) }
+            }), 1);
+        }
+
+        [Test]
+        public async Task MixedIntFloatArithmetic()
+        {
+            await runBasicTest(
+                "a = 2 - 1.0\n" +
+                "b = 3 * 0.5\n" +
+                "c = True + 1.5\n" +
+                "d = 1 < 1.5\n" +
+                "e = -7.0 % 3\n" +
+                "f = str(0.1 + 0.2)\n" +
+                "g = 3 + True\n"
+                , new VariableMultimap(new TupleList<string, object>
+            {
+                { "a", PyFloat.Create(1.0) },
+                { "b", PyFloat.Create(1.5) },
+                { "c", PyFloat.Create(2.5) },
+                { "d", PyBool.True },
+                { "e", PyFloat.Create(2.0) },
+                { "f", PyString.Create("0.30000000000000004") },
+                { "g", PyInteger.Create(4) }
+            }), 1);
+        }
+
         [Test]
         public async Task AssignmentOperators()
         {
@@ -893,6 +1455,60 @@ namespace CloacaTests
             }), 1);
         }
 
+        /// <summary>
+        /// Conditionals and not have to work on anything, not just bools: numbers, containers, and objects that
+        /// define __bool__ or __len__.
+        /// </summary>
+        [Test]
+        public async Task ConditionalTruthiness()
+        {
+            await runBasicTest(
+                "class Empty:\n" +
+                "   def __len__(self):\n" +
+                "      return 0\n" +
+                "class Falsy:\n" +
+                "   def __bool__(self):\n" +
+                "      return False\n" +
+                "a = 0\n" +
+                "if 3:\n" +
+                "   a = 1\n" +
+                "b = not []\n" +
+                "c = not Empty()\n" +
+                "d = 0\n" +
+                "if Falsy():\n" +
+                "   d = 1\n" +
+                "e = 0\n" +
+                "if 'x' and [1]:\n" +
+                "   e = 1\n", new VariableMultimap(new TupleList<string, object>
+            {
+                { "a", PyInteger.Create(1) },
+                { "b", PyBool.True },
+                { "c", PyBool.True },
+                { "d", PyInteger.Create(0) },
+                { "e", PyInteger.Create(1) }
+            }), 1, new string[] { "Empty", "Falsy" });
+        }
+
+        /// <summary>
+        /// The class defines __len__ for its instances. That doesn't make the class object itself false.
+        /// </summary>
+        [Test]
+        public async Task ClassObjectTruthiness()
+        {
+            await runBasicTest(
+                "class Empty:\n" +
+                "   def __len__(self):\n" +
+                "      return 0\n" +
+                "a = 0\n" +
+                "if Empty:\n" +
+                "   a = 1\n" +
+                "b = not Empty()\n", new VariableMultimap(new TupleList<string, object>
+            {
+                { "a", PyInteger.Create(1) },
+                { "b", PyBool.True }
+            }), 1, new string[] { "Empty" });
+        }
+
         [Test]
         public async Task IfElseInvert()
         {
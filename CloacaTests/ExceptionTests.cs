@@ -212,6 +212,26 @@ namespace CloacaTests
             Assert.That(a, Is.EqualTo(PyInteger.Create(1)));
         }
 
+        [Test]
+        public async Task TryExceptIntermediateBase()
+        {
+            var context = await runProgram(
+                "class MeowException(Exception):\n" +
+                "  def __init__(self, number):\n" +
+                "    self.number = number\n" +
+                "class PurrException(MeowException):\n" +
+                "  def __init__(self, number):\n" +
+                "    self.number = number\n" +
+                "a = 0\n" +
+                "try:\n" +
+                "  raise PurrException(2)\n" +
+                "except MeowException as e:\n" +
+                "  a = e.number\n", new Dictionary<string, object>(), 1);
+            var variables = new VariableMultimap(context);
+            var a = (PyInteger)variables.Get("a");
+            Assert.That(a, Is.EqualTo(PyInteger.Create(2)));
+        }
+
         [Test]
         public async Task TryExceptTwoExceptionsLessSpecificFirst()
         {
@@ -249,6 +269,41 @@ namespace CloacaTests
             var a = (PyInteger)variables.Get("a");
             Assert.That(a, Is.EqualTo(PyInteger.Create(1)));
         }
+
+        /// <summary>
+        /// Missing dictionary keys get reported as a KeyError the script can catch instead of a .NET exception.
+        /// </summary>
+        [Test]
+        public async Task CatchKeyError()
+        {
+            var context = await runProgram(
+                "d = {'a': 1}\n" +
+                "a = 0\n" +
+                "try:\n" +
+                "  a = d['b']\n" +
+                "except KeyError:\n" +
+                "  a = 10\n", new Dictionary<string, object>(), 1);
+            var variables = new VariableMultimap(context);
+            var a = (PyInteger)variables.Get("a");
+            Assert.That(a, Is.EqualTo(PyInteger.Create(10)));
+        }
+
+        [Test]
+        public async Task CatchMissingAttribute()
+        {
+            var context = await runProgram(
+                "class Foo:\n" +
+                "  pass\n" +
+                "f = Foo()\n" +
+                "a = 0\n" +
+                "try:\n" +
+                "  a = f.missing\n" +
+                "except Exception:\n" +
+                "  a = 10\n", new Dictionary<string, object>(), 1);
+            var variables = new VariableMultimap(context);
+            var a = (PyInteger)variables.Get("a");
+            Assert.That(a, Is.EqualTo(PyInteger.Create(10)));
+        }
     }
 
     /// <summary>
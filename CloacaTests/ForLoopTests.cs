@@ -100,6 +100,49 @@ namespace CloacaTests
             }), 1);
         }
 
+        [Test]
+        public async Task ForInTuple()
+        {
+            await runBasicTest(
+                "a = 0\n" +
+                "for i in (1, 2, 3):\n" +
+                "   a += i\n", new VariableMultimap(new TupleList<string, object>
+            {
+                { "a", PyInteger.Create(1 + 2 + 3) }
+            }), 1);
+        }
+
+        [Test]
+        public async Task ForInString()
+        {
+            await runBasicTest(
+                "a = ''\n" +
+                "for c in 'abc':\n" +
+                "   a = c + a\n", new VariableMultimap(new TupleList<string, object>
+            {
+                { "a", PyString.Create("cba") }
+            }), 1);
+        }
+
+        /// <summary>
+        /// Enumerate and zip advance the iterators they wrap themselves when they can. Make sure they still stop at the
+        /// end of the shortest one.
+        /// </summary>
+        [Test]
+        public async Task ForInZipOfEnumerate()
+        {
+            await runBasicTest(
+                "a = 0\n" +
+                "b = ''\n" +
+                "for pair, c in zip(enumerate([10, 20, 30]), 'xy'):\n" +
+                "   a += pair[0] + pair[1]\n" +
+                "   b += c\n", new VariableMultimap(new TupleList<string, object>
+            {
+                { "a", PyInteger.Create(0 + 10 + 1 + 20) },
+                { "b", PyString.Create("xy") }
+            }), 1);
+        }
+
         [Test]
         public async Task ForInDictKeys()
         {
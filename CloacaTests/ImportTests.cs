@@ -42,6 +42,121 @@ namespace CloacaTests
         }
     }
 
+    [TestFixture]
+    public class BytecodeCacheTests
+    {
+        private string cacheDirectory;
+
+        [SetUp]
+        public void makeCacheDirectory()
+        {
+            cacheDirectory = Path.Combine(Path.GetTempPath(), "cloaca_cache_" + Guid.NewGuid().ToString("N"));
+        }
+
+        [TearDown]
+        public void removeCacheDirectory()
+        {
+            if(Directory.Exists(cacheDirectory))
+            {
+                Directory.Delete(cacheDirectory, true);
+            }
+        }
+
+        [Test]
+        public async Task LoadsFromCacheSecondTime()
+        {
+            var repoRoots = new List<string>();
+            var fake_module_root = Path.Combine(Path.GetDirectoryName(typeof(FileImporterTests).Assembly.Location),
+                "fake_module_root");
+            repoRoots.Add(fake_module_root);
+
+            var scheduler = new Scheduler();
+            var interpreter = new Interpreter(scheduler);
+
+            var cache = new BytecodeCache(cacheDirectory);
+            var loader = new FileBasedModuleLoader(cache);
+            var repo = new FileBasedModuleFinder(repoRoots, loader);
+            var spec = repo.find_spec(null, "test", null, null);
+
+            var firstModule = await spec.Loader.Load(interpreter, new FrameContext(new Dictionary<string, object>()), spec) as PyModule;
+            Assert.That(File.Exists(cache.GetCachePath((string)spec.LoaderState)), Is.True);
+
+            var secondModule = await spec.Loader.Load(interpreter, new FrameContext(new Dictionary<string, object>()), spec) as PyModule;
+            Assert.That(secondModule, Is.Not.SameAs(firstModule));
+            Assert.That(secondModule.__dict__["a_string"], Is.EqualTo(PyString.Create("Yay!")));
+        }
+
+        /// <summary>
+        /// Loaders only cache when given a cache, so importing a module doesn't leave files lying around next to it.
+        /// </summary>
+        [Test]
+        public async Task NoCacheFilesByDefault()
+        {
+            var moduleRoot = Path.Combine(cacheDirectory, "scripts");
+            Directory.CreateDirectory(moduleRoot);
+            File.WriteAllText(Path.Combine(moduleRoot, "uncached.py"), "a = 1\n");
+
+            var scheduler = new Scheduler();
+            var interpreter = new Interpreter(scheduler);
+
+            var loader = new FileBasedModuleLoader();
+            var repo = new FileBasedModuleFinder(new List<string> { moduleRoot }, loader);
+            var spec = repo.find_spec(null, "uncached", null, null);
+            var module = await spec.Loader.Load(interpreter, new FrameContext(new Dictionary<string, object>()), spec) as PyModule;
+
+            Assert.That(module.__dict__["a"], Is.EqualTo(PyInteger.Create(1)));
+            Assert.That(Directory.GetFileSystemEntries(moduleRoot), Is.EqualTo(new string[] { Path.Combine(moduleRoot, "uncached.py") }));
+        }
+
+        [Test]
+        public void ChangedSourceMisses()
+        {
+            var builder = new CodeObjectBuilder();
+            builder.AssertContextGiven = false;
+            builder.Constants.Add(PyInteger.Create(1));
+            builder.AddInstruction(ByteCodes.LOAD_CONST, 0);
+            builder.AddInstruction(ByteCodes.RETURN_VALUE);
+            var code = builder.Build().Code;
+
+            var cache = new BytecodeCache(cacheDirectory);
+            Assert.That(cache.TryStore("foo.py", "a = 1\n", code), Is.True);
+            Assert.That(cache.TryLoad("foo.py", "a = 2\n"), Is.Null);
+            Assert.That(cache.TryLoad("foo.py", "a = 1\n"), Is.Not.Null);
+        }
+
+        [Test]
+        public void SerializerRoundTrip()
+        {
+            var inner = new CodeObjectBuilder();
+            inner.Name = "inner";
+            inner.ArgVarNames.Add("x");
+            inner.ArgCount = 1;
+            inner.Defaults = new List<object> { PyInteger.Create(3) };
+
+            var outer = new CodeObjectBuilder();
+            outer.Names.Add("inner");
+            outer.Constants.Add(inner);
+            outer.Constants.Add("inner");
+            outer.Constants.Add(PyTuple.Create(new object[] { PyString.Create("a"), PyFloat.Create(1.5), NoneType.Instance, PyBool.True }));
+            var code = outer.Build().Code;
+
+            var stream = new MemoryStream();
+            CodeObjectSerializer.Write(stream, code);
+            stream.Position = 0;
+            var read = CodeObjectSerializer.Read(stream);
+
+            Assert.That(read.Names, Is.EqualTo(code.Names));
+            Assert.That(read.Constants[1], Is.EqualTo("inner"));
+            Assert.That(read.Constants[2], Is.EqualTo(code.Constants[2]));
+
+            var readInner = read.Constants[0] as CodeObjectBuilder;
+            Assert.That(readInner, Is.Not.Null);
+            Assert.That(readInner.Name, Is.EqualTo("inner"));
+            Assert.That(readInner.ArgVarNames, Is.EqualTo(new List<string> { "x" }));
+            Assert.That(readInner.Defaults[0], Is.EqualTo(PyInteger.Create(3)));
+        }
+    }
+
     [TestFixture]
     public class StringCodeImporterTests
     {
@@ -64,6 +179,84 @@ namespace CloacaTests
         }
     }
 
+    [TestFixture]
+    public class ModuleRegistryTests
+    {
+        [Test]
+        public async Task SharesFinishedImport()
+        {
+            var registry = new ModuleRegistry();
+            var importer = new FrameContext(new Dictionary<string, object>());
+            var other = new FrameContext(new Dictionary<string, object>());
+            var fooModule = PyModule.Create("foo");
+
+            Assert.That(await registry.WaitForModule(null, other, "foo"), Is.Null);
+
+            var pending = registry.BeginImport(importer, "foo");
+            Assert.That(pending, Is.Not.Null);
+            registry.EndImport(pending, fooModule);
+
+            Assert.That(await registry.WaitForModule(null, other, "foo"), Is.SameAs(fooModule));
+        }
+
+        [Test]
+        public async Task CircularImportDoesNotWaitOnItself()
+        {
+            var registry = new ModuleRegistry();
+            var importer = new FrameContext(new Dictionary<string, object>());
+
+            var pending = registry.BeginImport(importer, "foo");
+            Assert.That(await registry.WaitForModule(null, importer, "foo"), Is.Null);
+            Assert.That(registry.BeginImport(importer, "foo"), Is.Null);
+            registry.EndImport(pending, null);
+        }
+
+        [Test]
+        public void FailedImportIsNotShared()
+        {
+            var registry = new ModuleRegistry();
+            var importer = new FrameContext(new Dictionary<string, object>());
+
+            var pending = registry.BeginImport(importer, "foo");
+            registry.EndImport(pending, null);
+
+            PyModule found;
+            Assert.That(registry.TryGetModule("foo", out found), Is.False);
+            Assert.That(registry.BeginImport(importer, "foo"), Is.Not.Null);
+        }
+
+        [Test]
+        public async Task CircularImportAcrossTasks()
+        {
+            // Each task starts importing its own module, and then each module imports the other's. The waits make
+            // sure both imports are in progress before either module gets to its own import.
+            var scheduler = new Scheduler();
+            var interpreter = new Interpreter(scheduler);
+            scheduler.SetInterpreter(interpreter);
+
+            var repo = new StringCodeModuleFinder();
+            repo.CodeLookup.Add("circ_x", "wait\nimport circ_y\nx_value = 1\n");
+            repo.CodeLookup.Add("circ_y", "wait\nimport circ_x\ny_value = 2\n");
+            interpreter.AddModuleFinder(repo);
+
+            var variablesA = new Dictionary<string, object>();
+            var variablesB = new Dictionary<string, object>();
+            var programA = await ByteCodeCompiler.Compile("import circ_x\na = circ_x.x_value\n", variablesA, interpreter.GetBuiltins(), scheduler);
+            var programB = await ByteCodeCompiler.Compile("import circ_y\nb = circ_y.y_value\n", variablesB, interpreter.GetBuiltins(), scheduler);
+
+            var receiptA = scheduler.Schedule(programA, variablesA);
+            var receiptB = scheduler.Schedule(programB, variablesB);
+            await scheduler.RunUntilDone();
+
+            Assert.That(receiptA.EscapedExceptionInfo, Is.Null);
+            Assert.That(receiptB.EscapedExceptionInfo, Is.Null);
+            Assert.That(receiptA.Completed, Is.True);
+            Assert.That(receiptB.Completed, Is.True);
+            Assert.That(receiptA.Frame.GetVariable("a"), Is.EqualTo(PyInteger.Create(1)));
+            Assert.That(receiptB.Frame.GetVariable("b"), Is.EqualTo(PyInteger.Create(2)));
+        }
+    }
+
     [TestFixture]
     public class InjectedImporterTests
     {
@@ -214,6 +407,28 @@ namespace CloacaTests
             Assert.That(module.Name, Is.EqualTo("System"));
         }
 
+        [Test]
+        public async Task NamespaceTypesResolvedOnAccess()
+        {
+            var finder = new ClrModuleFinder();
+            var mockStack = new Stack<Frame>();
+            var mockFrame = new Frame();
+            mockFrame.Function = PyFunction.Create(new CodeObject(new byte[0]), new Dictionary<string, object>());
+            mockStack.Push(mockFrame);
+            var mockContext = new FrameContext(mockStack, new Dictionary<string, object>());
+            var clrLoader = new ClrModuleInternals();
+            clrLoader.AddReference(mockContext, "mscorlib");
+
+            var spec = finder.find_spec(mockContext, "System.Collections.Generic", null, null);
+            var module = await spec.Loader.Load(null, mockContext, spec) as PyModule;
+            Assert.That(module.__dict__.ContainsKey("List"), Is.False);
+
+            // Arity-qualified names stay distinct while the short name still gets you the generic type.
+            Assert.That(PyClass.__getattribute__(module, "List"), Is.EqualTo(typeof(List<>)));
+            Assert.That(PyClass.__getattribute__(module, "Dictionary`2"), Is.EqualTo(typeof(Dictionary<,>)));
+            Assert.That(module.__dict__.ContainsKey("List"), Is.True);
+        }
+
         [Test]
         public async Task NoNamespace()
         {
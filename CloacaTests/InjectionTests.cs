@@ -3,6 +3,7 @@
 using NUnit.Framework;
 
 using LanguageImplementation;
+using LanguageImplementation.DataTypes;
 using CloacaInterpreter;
 using System.Reflection;
 using System;
@@ -42,6 +43,11 @@ namespace CloacaTests
 
         }
 
+        public void WantsArgAndDefaultFunction(IInterpreter interpreter, int i, string name = "default")
+        {
+
+        }
+
         Interpreter interpreter;
         FrameContext context;
         Injector injector;
@@ -129,5 +135,35 @@ namespace CloacaTests
             Assert.That(out_args[3], Is.Null);
         }
 
+        [Test]
+        public void Inject2DefaultsAndOverrides()
+        {
+            var method = typeof(InjectionTests).GetMethod(nameof(WantsArgAndDefaultFunction));
+
+            var out_args = injector.Inject2(method, new object[1] { 1 });
+            Assert.That(out_args, Is.EqualTo(new object[] { interpreter, 1, "default" }));
+
+            out_args = injector.Inject2(method, new object[2] { 1, "positional" });
+            Assert.That(out_args, Is.EqualTo(new object[] { interpreter, 1, "positional" }));
+
+            out_args = injector.Inject2(method, new object[1] { 1 }, overrides: new Dictionary<string, object> { { "name", "override" } });
+            Assert.That(out_args, Is.EqualTo(new object[] { interpreter, 1, "override" }));
+        }
+
+        [Test]
+        public void Inject2ConvertsChangingArgumentTypes()
+        {
+            // The binding plan is reused between calls, so make sure it doesn't get stuck converting from the first type it saw.
+            var method = typeof(InjectionTests).GetMethod(nameof(WantsBothAndArgAndParamFunction));
+
+            var out_args = injector.Inject2(method, new object[2] { PyInteger.Create(1), "Yay!" });
+            Assert.That(out_args[2], Is.EqualTo(1));
+            Assert.That((string[])out_args[3], Is.EqualTo(new string[] { "Yay!" }));
+
+            out_args = injector.Inject2(method, new object[3] { 2, PyString.Create("Yay!"), 3 });
+            Assert.That(out_args[2], Is.EqualTo(2));
+            Assert.That((string[])out_args[3], Is.EqualTo(new string[] { "Yay!", "3" }));
+        }
+
     }
 }
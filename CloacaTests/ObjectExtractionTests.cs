@@ -7,10 +7,15 @@ namespace CloacaTests
 {
     public delegate void SomeEventType(int aNumber);
 
-    public class TestExtractClass
+    public interface ITestExtractInterface
+    {
+    }
+
+    public class TestExtractClass : ITestExtractInterface
     {
         public event SomeEventType SomeEvent;
         public int SomeField;
+        public int SomeProperty { get; set; }
 
         public static int StaticInt = 0;
 
@@ -35,6 +40,10 @@ namespace CloacaTests
         }
     }
 
+    public class TestExtractSubclass : TestExtractClass
+    {
+    }
+
     // Add an extension method to TestExtractClass so we can test that too
     public static class TestExtractClassExtensions
     {
@@ -47,6 +56,11 @@ namespace CloacaTests
         {
             return testClass.SomeField;
         }
+
+        public static int AnInterfaceExtensionMethod(this ITestExtractInterface testInterface)
+        {
+            return 1;
+        }
     }
 
     [TestFixture]
@@ -87,6 +101,20 @@ namespace CloacaTests
             Assert.IsNotNull(extracted);
         }
 
+        [Test]
+        public void ExtractBaseClassExtensionMethod()
+        {
+            var extracted = ObjectResolver.GetValue("AnExtensionMethod", new TestExtractSubclass());
+            Assert.IsNotNull(extracted);
+        }
+
+        [Test]
+        public void ExtractInterfaceExtensionMethod()
+        {
+            var extracted = ObjectResolver.GetValue("AnInterfaceExtensionMethod", new TestExtractClass());
+            Assert.IsNotNull(extracted);
+        }
+
         [Test]
         public void ExtractEvent()
         {
@@ -120,5 +148,27 @@ namespace CloacaTests
             ObjectResolver.SetValue("SomeField", testInstance, 3);
             Assert.That(testInstance.SomeField, Is.EqualTo(3));
         }
+
+        [Test]
+        public void RepeatedAccessUsesEachInstance()
+        {
+            // Member lookups are cached per type, so make sure the cached accessors don't hang on to the first object.
+            var first = new TestExtractClass();
+            var second = new TestExtractClass();
+            ObjectResolver.SetValue("SomeProperty", first, 1);
+            ObjectResolver.SetValue("SomeProperty", second, 2);
+            ObjectResolver.SetValue("SomeField", first, 10);
+            ObjectResolver.SetValue("SomeField", second, 20);
+
+            Assert.That(ObjectResolver.GetValue("SomeProperty", first), Is.EqualTo(1));
+            Assert.That(ObjectResolver.GetValue("SomeProperty", second), Is.EqualTo(2));
+            Assert.That(ObjectResolver.GetValue("SomeField", first), Is.EqualTo(10));
+            Assert.That(ObjectResolver.GetValue("SomeField", second), Is.EqualTo(20));
+
+            var firstMethod = (LanguageImplementation.WrappedCodeObject)ObjectResolver.GetValue("OverloadedMethod", first);
+            var secondMethod = (LanguageImplementation.WrappedCodeObject)ObjectResolver.GetValue("OverloadedMethod", second);
+            Assert.That(firstMethod, Is.Not.SameAs(secondMethod));
+            Assert.That(firstMethod.MethodBases.Length, Is.EqualTo(2));
+        }
     }
 }
@@ -224,6 +224,33 @@ namespace CloacaTests
             Assert.That(testing, Is.EqualTo(PyBool.True));
         }
 
+        [Test]
+        public async Task InstanceDictOnlyHasOwnAttributes()
+        {
+            var context = await runProgram("class Foo:\n" +
+                                           "   def __init__(self):\n" +
+                                           "      self.a = 1\n" +
+                                           "\n" +
+                                           "   def change_a(self, new_a):\n" +
+                                           "      self.a = new_a\n" +
+                                           "\n" +
+                                           "bar = Foo()\n" +
+                                           "bar.change_a(2)\n", new Dictionary<string, object>(), 1);
+            var variables = new VariableMultimap(context);
+            var bar = (PyObject)variables.Get("bar");
+            Assert.That(bar.__dict__.Keys, Is.EquivalentTo(new string[] { "a" }));
+            Assert.That(bar.HasUnboundAttribute("change_a"));
+        }
+
+        [Test]
+        public void BuiltinValuesHaveNoInstanceDict()
+        {
+            var pyInt = PyInteger.Create(1);
+            Assert.That(pyInt.HasInstanceDict, Is.False);
+            Assert.That(pyInt.__class__, Is.SameAs(PyIntegerClass.Instance));
+            Assert.That(pyInt.HasUnboundAttribute("__add__"));
+        }
+
         [Test]
         public async Task IntCallsBaseMethods()
         {
@@ -233,5 +260,79 @@ namespace CloacaTests
             var testing = variables.Get("lt");
             Assert.That(testing, Is.Not.Null);
         }
+
+        [Test]
+        public async Task AttributeLookupSeesClassChanges()
+        {
+            var context = await runProgram("class Foo:\n" +
+                                           "   def get(self):\n" +
+                                           "      return 1\n" +
+                                           "\n" +
+                                           "class Bar(Foo):\n" +
+                                           "   pass\n" +
+                                           "\n" +
+                                           "def get_ten(self):\n" +
+                                           "   return 10\n" +
+                                           "\n" +
+                                           "bar = Bar()\n" +
+                                           "total = 0\n" +
+                                           "i = 0\n" +
+                                           "while i < 4:\n" +
+                                           "   total += bar.get()\n" +
+                                           "   if i == 1:\n" +
+                                           "      Foo.get = get_ten\n" +
+                                           "   i += 1\n", new Dictionary<string, object>(), 1);
+            var variables = new VariableMultimap(context);
+            var reference = new VariableMultimap(new TupleList<string, object> {
+                { "total", PyInteger.Create(22) }
+            });
+            Assert.DoesNotThrow(() => variables.AssertSubsetEquals(reference));
+        }
+
+        [Test]
+        public async Task MethodCalls()
+        {
+            var context = await runProgram("class Foo:\n" +
+                                           "   def __init__(self):\n" +
+                                           "      self.a = 1\n" +
+                                           "\n" +
+                                           "   def add(self, x, y=10):\n" +
+                                           "      return self.a + x + y\n" +
+                                           "\n" +
+                                           "foo = Foo()\n" +
+                                           "r1 = foo.add(2)\n" +
+                                           "r2 = foo.add(2, y=3)\n" +
+                                           "lst = []\n" +
+                                           "lst.append(r1)\n" +
+                                           "r3 = len(lst)\n", new Dictionary<string, object>(), 1);
+            var variables = new VariableMultimap(context);
+            var reference = new VariableMultimap(new TupleList<string, object> {
+                { "r1", PyInteger.Create(13) },
+                { "r2", PyInteger.Create(6) },
+                { "r3", PyInteger.Create(1) }
+            });
+            Assert.DoesNotThrow(() => variables.AssertSubsetEquals(reference));
+        }
+
+        [Test]
+        public async Task InstanceAttributeShadowsCachedClassAttribute()
+        {
+            var context = await runProgram("class Foo:\n" +
+                                           "   a = 1\n" +
+                                           "\n" +
+                                           "foo = Foo()\n" +
+                                           "total = 0\n" +
+                                           "i = 0\n" +
+                                           "while i < 4:\n" +
+                                           "   total += foo.a\n" +
+                                           "   if i == 1:\n" +
+                                           "      foo.a = 10\n" +
+                                           "   i += 1\n", new Dictionary<string, object>(), 1);
+            var variables = new VariableMultimap(context);
+            var reference = new VariableMultimap(new TupleList<string, object> {
+                { "total", PyInteger.Create(22) }
+            });
+            Assert.DoesNotThrow(() => variables.AssertSubsetEquals(reference));
+        }
     }
 }
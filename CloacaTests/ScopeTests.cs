@@ -142,6 +142,27 @@ namespace CloacaTests
             }), 1);
         }
 
+        /// <summary>
+        /// Lookups cache where they found a name. A global defined after the first call has to start shadowing the
+        /// builtin that was found before.
+        /// </summary>
+        [Test]
+        public async Task GlobalShadowsBuiltin()
+        {
+            await runBasicTest(
+                "def get():\n" +
+                "  return len([1, 2])\n" +
+                "a = get()\n" +
+                "def len(x):\n" +
+                "  return 5\n" +
+                "b = get()\n"
+                , new VariableMultimap(new TupleList<string, object>
+            {
+                { "a", PyInteger.Create(2) },
+                { "b", PyInteger.Create(5) },
+            }), 1, new string[] { "get", "len" });
+        }
+
         /// <summary>
         /// We found out that globals were not being bound to their modules correctly. If you called a function
         /// in a module that called another function inside that module, we couldn't resolve it because the
@@ -257,5 +278,28 @@ namespace CloacaTests
                     { "bar2", PyInteger.Create(201) }
                 }), 1);
         }
+
+        /// <summary>
+        /// Frames get reused once their call returns. Recursion has a bunch of frames for the same code live at once,
+        /// so this makes sure none of them get handed out while still in use.
+        /// </summary>
+        [Test]
+        public async Task Recursion()
+        {
+            string program =
+                "def fib(n):\n" +
+                "  if n < 2:\n" +
+                "    return n\n" +
+                "  return fib(n - 1) + fib(n - 2)\n" +
+                "a = fib(15)\n" +
+                "b = fib(10)\n";
+
+            await runBasicTest(program,
+                new VariableMultimap(new TupleList<string, object>
+                {
+                    { "a", PyInteger.Create(610) },
+                    { "b", PyInteger.Create(55) }
+                }), 1, new string[] { "fib" });
+        }
     }
 }
@@ -56,7 +56,8 @@ namespace CloacaTests
                 // This is awaitable now but relies on the scheduler. We'll tick the scheduler
                 // awhile until this resolves.
                 var globals = new Dictionary<string, object>(variablesIn);
-                compiledTask = ByteCodeCompiler.Compile(program, globals, scheduler.Interpreter.GetBuiltins(), scheduler);
+                compiledTask = ByteCodeCompiler.Compile(program, globals, scheduler.Interpreter.GetBuiltins(), scheduler,
+                    interpreter.CompileCache);
             }
             catch (CloacaParseException parseFailed)
             {
@@ -153,5 +154,36 @@ namespace CloacaTests
         {
             await runBasicTest(program, new Dictionary<string, object>(), expectedVariables, expectedIterations, ignoreVariables);
         }
+
+        /// <summary>
+        /// Compiles a program without running it. Default arguments are calculated by running code on the scheduler,
+        /// so this ticks it until compiling finishes. The scheduler has to have the interpreter set.
+        /// </summary>
+        protected static async Task<PyFunction> compileProgram(string program, Dictionary<string, object> globals,
+            Interpreter interpreter, Scheduler scheduler)
+        {
+            var compiledTask = ByteCodeCompiler.Compile(program, globals, interpreter.GetBuiltins(), scheduler,
+                interpreter.CompileCache);
+            for(int tries = 0; tries < 1000 && !compiledTask.IsCompleted; ++tries)
+            {
+                await scheduler.Tick();
+            }
+            Assert.That(compiledTask.IsCompleted, Is.True, "Compilation did not finish after 1,000 scheduler ticks");
+            return await compiledTask;
+        }
+
+        /// <summary>
+        /// The opcodes in the code, in order, without their arguments.
+        /// </summary>
+        protected static List<ByteCodes> opcodes(CodeObject code)
+        {
+            var found = new List<ByteCodes>();
+            var instructions = code.Code.Instructions;
+            for(int cursor = 0; cursor < instructions.Length; cursor += instructions[cursor].Size)
+            {
+                found.Add(instructions[cursor].Opcode);
+            }
+            return found;
+        }
     }
 }
@@ -1,8 +1,12 @@
-﻿using NUnit.Framework;
+﻿using System;
+using System.Reflection;
+
+using NUnit.Framework;
 
 using CloacaInterpreter;
 using LanguageImplementation;
 using LanguageImplementation.DataTypes;
+using LanguageImplementation.DataTypes.Exceptions;
 
 namespace CloacaTests
 {
@@ -31,6 +35,26 @@ namespace CloacaTests
         {
             self.TestInt += 1;
         }
+
+        public static int add_ints(int a, long b)
+        {
+            return a + (int)b;
+        }
+
+        public static void throws_stop_iteration()
+        {
+            throw new StopIterationException();
+        }
+
+        public static string overloaded(int a)
+        {
+            return "int";
+        }
+
+        public static string overloaded(string a)
+        {
+            return "string";
+        }
     }
 
     class TestPythonObject : PyObject
@@ -55,6 +79,48 @@ namespace CloacaTests
             var instance = PyTypeObject.DefaultNew<TestPythonObject>(TestPythonClass.Instance);
             var method = instance.__getattribute__("hello_void") as IPyCallable;
             method.Call(mockInterpreter, mockFrame, new object[0]);
+            Assert.That(instance.TestInt, Is.EqualTo(1));
+        }
+
+        [Test]
+        public void CompiledInvokerMatchesReflection()
+        {
+            var addInts = typeof(TestPythonClass).GetMethod("add_ints");
+            Assert.That(CompiledInvoker.Invoke(addInts, null, new object[] { 1, 2L }), Is.EqualTo(3));
+
+            // Reflection widens int to long but a compiled cast wouldn't. This has to fall back instead of failing.
+            Assert.That(CompiledInvoker.Invoke(addInts, null, new object[] { 1, 2 }), Is.EqualTo(3));
+
+            // Null becomes the default value like it does with MethodBase.Invoke.
+            Assert.That(CompiledInvoker.Invoke(addInts, null, new object[] { null, 2L }), Is.EqualTo(2));
+        }
+
+        [Test]
+        public void CompiledInvokerWrapsExceptions()
+        {
+            var throws = typeof(TestPythonClass).GetMethod("throws_stop_iteration");
+            var thrown = Assert.Throws<TargetInvocationException>(() => CompiledInvoker.Invoke(throws, null, new object[0]));
+            Assert.That(thrown.InnerException, Is.InstanceOf<StopIterationException>());
+        }
+
+        [Test]
+        public void OverloadResolutionCachedByArgumentTypes()
+        {
+            var overloadMethods = new MethodBase[]
+            {
+                typeof(TestPythonClass).GetMethod("overloaded", new Type[] { typeof(int) }),
+                typeof(TestPythonClass).GetMethod("overloaded", new Type[] { typeof(string) }),
+            };
+            var overloads = new WrappedCodeObject(overloadMethods);
+            var intMatch = overloads.FindBestMethodMatch(new object[] { 1 });
+            var stringMatch = overloads.FindBestMethodMatch(new object[] { "one" });
+            Assert.That(intMatch.FoundMethodInformation.GetParameters()[0].ParameterType, Is.EqualTo(typeof(int)));
+            Assert.That(stringMatch.FoundMethodInformation.GetParameters()[0].ParameterType, Is.EqualTo(typeof(string)));
+
+            // Same shapes should come right back out of the cache, even from another wrapper around the same methods.
+            Assert.That(overloads.FindBestMethodMatch(new object[] { 2 }), Is.SameAs(intMatch));
+            var otherWrapper = new WrappedCodeObject((MethodBase[])overloadMethods.Clone());
+            Assert.That(otherWrapper.FindBestMethodMatch(new object[] { "two" }), Is.SameAs(stringMatch));
         }
     }
 }
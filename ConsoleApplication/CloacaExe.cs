@@ -89,7 +89,8 @@ namespace ConsoleApplication
             var compiledFunctionTask = ByteCodeCompiler.Compile(program,
                 new Dictionary<string, object>(),
                 new Dictionary<string, object>(),
-                scheduler);
+                scheduler,
+                interpreter.CompileCache);
             ScheduleLoop(scheduler, cmdline_args[0]);
 
             var compiledFunction = await compiledFunctionTask;
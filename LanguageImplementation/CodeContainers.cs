@@ -20,12 +20,9 @@ namespace LanguageImplementation
 
         public void AddUShort(ushort newShort)
         {
-            var asBytes = BitConverter.GetBytes(newShort);
-            if(BitConverter.IsLittleEndian)
-            {
-                Array.Reverse(asBytes);
-            }
-            AddBytes(asBytes);
+            // Operands are stored big-endian regardless of the host.
+            Add((byte)(newShort >> 8));
+            Add((byte)(newShort & 0xFF));
         }
 
         public void AddUShort(int asInt)
@@ -35,29 +32,288 @@ namespace LanguageImplementation
 
         public void SetUShort(int index, ushort newShort)
         {
-            var asBytes = BitConverter.GetBytes(newShort);
-            if (BitConverter.IsLittleEndian)
+            this[index] = (byte)(newShort >> 8);
+            this[index+1] = (byte)(newShort & 0xFF);
+        }
+
+        public void SetUShort(int index, int newShort)
+        {
+            SetUShort(index, (ushort)newShort);
+        }
+
+        /// <summary>
+        /// Patches the operand of the instruction starting at the given byte offset.
+        /// </summary>
+        public void SetOperand(int instructionOffset, int operand)
+        {
+            SetUShort(instructionOffset + Instruction.NoOperandSize, (ushort)operand);
+        }
+    }
+
+    /// <summary>
+    /// A single decoded instruction: the opcode and its operand (zero if the opcode takes none).
+    /// This is what the interpreter and disassembler actually read; the raw bytes are only decoded once.
+    /// </summary>
+    public struct Instruction
+    {
+        /// <summary>
+        /// Size of an instruction without an operand in the raw byte stream.
+        /// </summary>
+        public const int NoOperandSize = 1;
+
+        /// <summary>
+        /// Size of an instruction with its big-endian ushort operand in the raw byte stream.
+        /// </summary>
+        public const int OperandSize = 3;
+
+        public ByteCodes Opcode;
+        public ushort Operand;
+
+        public Instruction(ByteCodes opcode, ushort operand)
+        {
+            Opcode = opcode;
+            Operand = operand;
+        }
+
+        /// <summary>
+        /// Size of this instruction in the raw byte stream.
+        /// </summary>
+        public int Size
+        {
+            get
             {
-                Array.Reverse(asBytes);
+                return HasOperand(Opcode) ? OperandSize : NoOperandSize;
             }
+        }
 
-            this[index] = asBytes[0];
-            this[index+1] = asBytes[1];
+        /// <summary>
+        /// Returns true if the given opcode is followed by a two-byte operand. Like CPython, everything from
+        /// STORE_NAME upwards takes an operand; LIST_APPEND, LOAD_ASSERTION_ERROR, and WAIT are the exceptions.
+        /// Specialized opcodes answer for the instruction they were specialized from.
+        /// </summary>
+        public static bool HasOperand(ByteCodes opcode)
+        {
+            opcode = GetGenericOpcode(opcode);
+            switch(opcode)
+            {
+                case ByteCodes.LIST_APPEND:
+                    return true;
+                case ByteCodes.LOAD_ASSERTION_ERROR:
+                case ByteCodes.WAIT:
+                    return false;
+                default:
+                    return opcode >= ByteCodes.STORE_NAME;
+            }
         }
 
-        public void SetUShort(int index, int newShort)
+        /// <summary>
+        /// Maps a specialized opcode back to the instruction it was specialized from. Anything else maps to itself.
+        /// </summary>
+        public static ByteCodes GetGenericOpcode(ByteCodes opcode)
         {
-            SetUShort(index, (ushort)newShort);
+            switch(opcode)
+            {
+                case ByteCodes.BINARY_ADD_INT:
+                case ByteCodes.BINARY_ADD_FLOAT:
+                    return ByteCodes.BINARY_ADD;
+                case ByteCodes.BINARY_SUBTRACT_INT:
+                case ByteCodes.BINARY_SUBTRACT_FLOAT:
+                    return ByteCodes.BINARY_SUBTRACT;
+                case ByteCodes.BINARY_MULTIPLY_INT:
+                case ByteCodes.BINARY_MULTIPLY_FLOAT:
+                    return ByteCodes.BINARY_MULTIPLY;
+                case ByteCodes.BINARY_FLOOR_DIVIDE_INT:
+                    return ByteCodes.BINARY_FLOOR_DIVIDE;
+                case ByteCodes.BINARY_MODULO_INT:
+                    return ByteCodes.BINARY_MODULO;
+                case ByteCodes.BINARY_TRUE_DIVIDE_INT:
+                case ByteCodes.BINARY_TRUE_DIVIDE_FLOAT:
+                    return ByteCodes.BINARY_TRUE_DIVIDE;
+                case ByteCodes.INPLACE_ADD_INT:
+                case ByteCodes.INPLACE_ADD_FLOAT:
+                    return ByteCodes.INPLACE_ADD;
+                case ByteCodes.INPLACE_SUBTRACT_INT:
+                case ByteCodes.INPLACE_SUBTRACT_FLOAT:
+                    return ByteCodes.INPLACE_SUBTRACT;
+                case ByteCodes.COMPARE_OP_INT:
+                case ByteCodes.COMPARE_OP_FLOAT:
+                case ByteCodes.COMPARE_OP_STR:
+                    return ByteCodes.COMPARE_OP;
+                case ByteCodes.BINARY_SUBSCR_LIST_INT:
+                case ByteCodes.BINARY_SUBSCR_DICT_STR:
+                    return ByteCodes.BINARY_SUBSCR;
+                case ByteCodes.STORE_SUBSCR_LIST_INT:
+                case ByteCodes.STORE_SUBSCR_DICT_STR:
+                    return ByteCodes.STORE_SUBSCR;
+                case ByteCodes.LOAD_ATTR_INSTANCE_VALUE:
+                    return ByteCodes.LOAD_ATTR;
+                default:
+                    return opcode;
+            }
+        }
+
+        /// <summary>
+        /// How much the instruction grows (or shrinks) the data stack when it falls through to the next instruction.
+        /// Conditional jumps that leave their condition on the stack when jumping are counted for falling through.
+        /// SETUP_EXCEPT and SETUP_FINALLY count the exception their handler gets pushed.
+        /// </summary>
+        public static int StackEffect(ByteCodes opcode, int operand)
+        {
+            switch(GetGenericOpcode(opcode))
+            {
+                case ByteCodes.DUP_TOP:
+                case ByteCodes.LOAD_CONST:
+                case ByteCodes.LOAD_NAME:
+                case ByteCodes.LOAD_GLOBAL:
+                case ByteCodes.LOAD_FAST:
+                case ByteCodes.LOAD_DEREF:
+                case ByteCodes.LOAD_CLOSURE:
+                case ByteCodes.LOAD_METHOD:
+                case ByteCodes.LOAD_ASSERTION_ERROR:
+                case ByteCodes.IMPORT_FROM:
+                case ByteCodes.FOR_ITER:
+                case ByteCodes.BUILD_CLASS:
+                case ByteCodes.SETUP_EXCEPT:
+                case ByteCodes.SETUP_FINALLY:
+                    return 1;
+
+                case ByteCodes.POP_TOP:
+                case ByteCodes.BINARY_POWER:
+                case ByteCodes.BINARY_MULTIPLY:
+                case ByteCodes.BINARY_DIVIDE:
+                case ByteCodes.BINARY_MODULO:
+                case ByteCodes.BINARY_ADD:
+                case ByteCodes.BINARY_SUBTRACT:
+                case ByteCodes.BINARY_SUBSCR:
+                case ByteCodes.BINARY_FLOOR_DIVIDE:
+                case ByteCodes.BINARY_TRUE_DIVIDE:
+                case ByteCodes.BINARY_LSHIFT:
+                case ByteCodes.BINARY_RSHIFT:
+                case ByteCodes.BINARY_AND:
+                case ByteCodes.BINARY_XOR:
+                case ByteCodes.BINARY_OR:
+                case ByteCodes.INPLACE_FLOOR_DIVIDE:
+                case ByteCodes.INPLACE_TRUE_DIVIDE:
+                case ByteCodes.INPLACE_ADD:
+                case ByteCodes.INPLACE_SUBTRACT:
+                case ByteCodes.INPLACE_MULTIPLY:
+                case ByteCodes.INPLACE_DIVIDE:
+                case ByteCodes.INPLACE_MODULO:
+                case ByteCodes.INPLACE_POWER:
+                case ByteCodes.INPLACE_LSHIFT:
+                case ByteCodes.INPLACE_RSHIFT:
+                case ByteCodes.INPLACE_AND:
+                case ByteCodes.INPLACE_XOR:
+                case ByteCodes.INPLACE_OR:
+                case ByteCodes.COMPARE_OP:
+                case ByteCodes.LIST_APPEND:
+                case ByteCodes.PRINT_EXPR:
+                case ByteCodes.RETURN_VALUE:
+                case ByteCodes.IMPORT_STAR:
+                case ByteCodes.IMPORT_NAME:
+                case ByteCodes.MAKE_FUNCTION:
+                case ByteCodes.STORE_NAME:
+                case ByteCodes.STORE_GLOBAL:
+                case ByteCodes.STORE_FAST:
+                case ByteCodes.STORE_DEREF:
+                case ByteCodes.DELETE_ATTR:
+                case ByteCodes.POP_JUMP_IF_FALSE:
+                case ByteCodes.POP_JUMP_IF_TRUE:
+                case ByteCodes.JUMP_IF_FALSE_OR_POP:
+                case ByteCodes.JUMP_IF_TRUE_OR_POP:
+                    return -1;
+
+                case ByteCodes.STORE_ATTR:
+                case ByteCodes.DELETE_SUBSCR:
+                    return -2;
+                case ByteCodes.STORE_SUBSCR:
+                    return -3;
+
+                case ByteCodes.UNPACK_SEQUENCE:
+                    return operand - 1;
+                case ByteCodes.BUILD_TUPLE:
+                case ByteCodes.BUILD_LIST:
+                case ByteCodes.BUILD_SET:
+                case ByteCodes.BUILD_SLICE:
+                    return 1 - operand;
+                case ByteCodes.BUILD_MAP:
+                    return 1 - 2 * operand;
+                case ByteCodes.BUILD_CONST_KEY_MAP:
+                    return -operand;
+                case ByteCodes.RAISE_VARARGS:
+                case ByteCodes.CALL_FUNCTION:
+                    return -operand;
+                case ByteCodes.CALL_FUNCTION_KW:
+                case ByteCodes.CALL_FUNCTION_VAR:
+                case ByteCodes.CALL_METHOD:
+                    return -operand - 1;
+                case ByteCodes.CALL_FUNCTION_VAR_KW:
+                    return -operand - 2;
+
+                default:
+                    return 0;
+            }
+        }
+
+        /// <summary>
+        /// Works out how deep the data stack gets running the given code. This goes through the instructions in
+        /// order instead of following the jumps, which overestimates a little after loops and conditional
+        /// expressions but never needs to look at anything twice. Frames size their data stack from this.
+        /// </summary>
+        public static int GetStackSize(byte[] bytes)
+        {
+            int depth = 0;
+            int maxDepth = 0;
+            int offset = 0;
+            while(offset < bytes.Length)
+            {
+                var opcode = (ByteCodes)bytes[offset];
+                int operand = 0;
+                if(HasOperand(opcode) && offset + OperandSize <= bytes.Length)
+                {
+                    operand = (bytes[offset + 1] << 8) | bytes[offset + 2];
+                    offset += OperandSize;
+                }
+                else
+                {
+                    offset += NoOperandSize;
+                }
+
+                depth = Math.Max(0, depth + StackEffect(opcode, operand));
+                maxDepth = Math.Max(maxDepth, depth);
+            }
+            return maxDepth;
         }
     }
 
     public class CodeByteArray
     {
+        /// <summary>
+        /// How many times an instruction has to run in its generic form before the interpreter tries to specialize it
+        /// for the operand types it sees.
+        /// </summary>
+        public const short SpecializeThreshold = 8;
+
+        /// <summary>
+        /// How many more generic runs a specialized instruction has to sit through after its guard failed before it
+        /// is considered again. This keeps sites that see mixed types from flipping back and forth.
+        /// </summary>
+        public const short DeoptimizeBackoff = 64;
+
         public byte[] Bytes;
+        private Instruction[] instructions;
+
+        // Per-instruction warmup counters for specialization, indexed like instructions. Only allocated once
+        // something asks to be counted.
+        private short[] counters;
+
+        // Per-instruction inline caches, indexed like instructions. Each instruction decides what it keeps in its slot.
+        private object[] inlineCaches;
 
         public CodeByteArray(byte[] bytes)
         {
             this.Bytes = bytes;
+            this.instructions = Decode(bytes);
         }
 
         public byte this[int i]
@@ -69,20 +325,129 @@ namespace LanguageImplementation
             set
             {
                 Bytes[i] = value;
+
+                // Patching the raw code invalidates the decoded stream. It will get rebuilt on next access, and
+                // anything it learned about operand types goes with it.
+                instructions = null;
+                counters = null;
+                inlineCaches = null;
+            }
+        }
+
+        /// <summary>
+        /// The decoded instruction stream. This is indexed by byte offset so jump targets, block handler
+        /// offsets, and lnotab all continue to work in terms of the raw code. Only the offsets where an
+        /// instruction starts are meaningful; the slots covering operand bytes are left empty.
+        /// </summary>
+        public Instruction[] Instructions
+        {
+            get
+            {
+                if(instructions == null)
+                {
+                    instructions = Decode(Bytes);
+                }
+                return instructions;
+            }
+        }
+
+        /// <summary>
+        /// Counts a run of the generic instruction at the given offset. Returns true every SpecializeThreshold runs,
+        /// which is when the caller should look at its operands and decide on a specialized form.
+        /// </summary>
+        public bool CountTowardSpecializing(int offset)
+        {
+            if(counters == null)
+            {
+                counters = new short[Bytes.Length];
+            }
+
+            counters[offset] += 1;
+            if(counters[offset] < SpecializeThreshold)
+            {
+                return false;
             }
+            counters[offset] = 0;
+            return true;
+        }
+
+        /// <summary>
+        /// Rewrites the instruction at the given offset into a specialized form. The operand stays the same.
+        /// </summary>
+        public void Specialize(int offset, ByteCodes specialized)
+        {
+            Instructions[offset].Opcode = specialized;
+        }
+
+        /// <summary>
+        /// Reverts a specialized instruction to its generic form after its guard failed, and backs off before it
+        /// can be specialized again.
+        /// </summary>
+        public void Deoptimize(int offset)
+        {
+            Instructions[offset].Opcode = Instruction.GetGenericOpcode(Instructions[offset].Opcode);
+            if(counters == null)
+            {
+                counters = new short[Bytes.Length];
+            }
+            counters[offset] = -DeoptimizeBackoff;
+        }
+
+        /// <summary>
+        /// Gets whatever the instruction at the given offset cached about its last run, or null if it hasn't cached
+        /// anything.
+        /// </summary>
+        public object GetInlineCache(int offset)
+        {
+            var caches = inlineCaches;
+            return caches != null ? caches[offset] : null;
+        }
+
+        /// <summary>
+        /// Sets what the instruction at the given offset wants to remember for its next run.
+        /// </summary>
+        public void SetInlineCache(int offset, object cache)
+        {
+            if(inlineCaches == null)
+            {
+                inlineCaches = new object[Bytes.Length];
+            }
+            inlineCaches[offset] = cache;
         }
 
         public ushort GetUShort(int byteIdx)
         {
-            if(BitConverter.IsLittleEndian)
+            return (ushort)((Bytes[byteIdx] << 8) | Bytes[byteIdx + 1]);
+        }
+
+        /// <summary>
+        /// Lowers raw byte code into decoded instructions. This is done once per code object so the interpreter
+        /// doesn't have to assemble operands out of the raw bytes on every instruction.
+        /// </summary>
+        public static Instruction[] Decode(byte[] bytes)
+        {
+            if(bytes == null)
             {
-                var shortBytes = new byte[] { Bytes[byteIdx + 1], Bytes[byteIdx] };
-                return BitConverter.ToUInt16(shortBytes, 0);
+                return new Instruction[0];
             }
-            else
+
+            var decoded = new Instruction[bytes.Length];
+            int cursor = 0;
+            while(cursor < bytes.Length)
             {
-                return BitConverter.ToUInt16(Bytes, byteIdx);
+                var opcode = (ByteCodes)bytes[cursor];
+                if(Instruction.HasOperand(opcode) && cursor + Instruction.OperandSize <= bytes.Length)
+                {
+                    decoded[cursor] = new Instruction(opcode, (ushort)((bytes[cursor + 1] << 8) | bytes[cursor + 2]));
+                    cursor += Instruction.OperandSize;
+                }
+                else
+                {
+                    decoded[cursor] = new Instruction(opcode, 0);
+                    cursor += Instruction.NoOperandSize;
+                }
             }
+            return decoded;
         }
     }
 }
@@ -6,6 +6,14 @@ using LanguageImplementation.DataTypes;
 
 namespace LanguageImplementation
 {
+    /// <summary>
+    /// A code object compiled by the interpreter's tier-2 compiler. It runs a freshly entered frame of the code. It
+    /// returns null once the frame has returned (or a .NET exception escaped, the same as Interpreter.Run). Otherwise
+    /// it has handed the frame back to the interpreter: the frame's cursor, data stack, and locals are all written
+    /// back, and the interpreter picks up from there once the returned task finishes.
+    /// </summary>
+    public delegate Task Tier2Code(IInterpreter interpreter, FrameContext context, Frame frame);
+
     public class CodeObject
     {
         //'co_argcount', 'co_cellvars', 'co_code', 'co_consts', 'co_filename',
@@ -43,6 +51,8 @@ namespace LanguageImplementation
         // 2
         public int ArgCount;            // co_argcount
         public int KWOnlyArgCount;      // co_kwonlyargcount
+        public int NLocals;             // co_nlocals: ArgVarNames and VarNames, which is how many fasts a frame gets.
+        public int StackSize;           // co_stacksize: how deep the data stack gets. Frames start their stack this big.
 
         public List<string> VarNames;   // co_varnames (not really; this should be a tuple used by LOAD_FAST/STORE_FAST
         public List<string> ArgVarNames;// This will collapse into co_varnames when we start using LOAD_FAST/STORE_FAST
@@ -62,6 +72,26 @@ namespace LanguageImplementation
         public List<object> Defaults;       // __defaults__
         public List<object> KWDefaults;     // __kwdefaults__: Keyword-only defaults.
 
+        // Tier-2 compiler bookkeeping. The interpreter counts calls and loop iterations in Hotness and compiles
+        // the code once it is hot enough. Tier2 is the compiled form. Tier2Rejected is set if the code can't be
+        // compiled or kept handing itself back to the interpreter. See CloacaInterpreter.Tier2Compiler.
+        public int Hotness;
+        public Tier2Code Tier2;
+        public bool Tier2Rejected;
+        public int Tier2Deopts;
+
+        // Set once frames for this code have had all the VarNames added to their names. See Interpreter.CallInto.
+        public bool VarNamesAdded;
+
+        // Frame setup bookkeeping. See GetArgumentSlots() and Frame.Rent().
+        private int[] argumentSlots;
+        internal FramePool FramePool;
+
+        /// <summary>
+        /// Slot given by GetArgumentSlots() for arguments that are free variables. Those aren't set from the arguments.
+        /// </summary>
+        public const int FreeArgumentSlot = int.MinValue;
+
         // co_flag settings
         // The following flag bits are defined for co_flags: bit 0x04 is set if the function uses the *arguments syntax to
         // accept an arbitrary number of positional arguments; bit 0x08 is set if the function uses the **keywords syntax
@@ -89,6 +119,53 @@ namespace LanguageImplementation
             Flags = 0;
         }
 
+        /// <summary>
+        /// Works out NLocals and StackSize from the names and code. Anything putting together a code object by hand
+        /// should call this once it's done.
+        /// </summary>
+        public void UpdateFrameSizes()
+        {
+            NLocals = ArgVarNames.Count + VarNames.Count;
+            StackSize = Instruction.GetStackSize(Code.Bytes);
+        }
+
+        /// <summary>
+        /// Gets where each positional argument goes in a new frame. Arguments normally go into the next fast local.
+        /// Arguments that are cell variables have -1 - (their index in the cells) instead, and arguments that are
+        /// free variables have FreeArgumentSlot. This is worked out the first time it is asked for.
+        /// </summary>
+        public int[] GetArgumentSlots()
+        {
+            var slots = argumentSlots;
+            if(slots == null)
+            {
+                slots = new int[ArgVarNames.Count];
+                int fastIdx = 0;
+                for(int argIdx = 0; argIdx < slots.Length; ++argIdx)
+                {
+                    var argName = ArgVarNames[argIdx];
+                    var cellIdx = CellNames.IndexOf(argName);
+                    if(cellIdx >= 0)
+                    {
+                        // Cells still use up a fast local even though nothing goes in it.
+                        slots[argIdx] = -1 - cellIdx;
+                        ++fastIdx;
+                    }
+                    else if(FreeNames.Contains(argName))
+                    {
+                        slots[argIdx] = FreeArgumentSlot;
+                    }
+                    else
+                    {
+                        slots[argIdx] = fastIdx;
+                        ++fastIdx;
+                    }
+                }
+                argumentSlots = slots;
+            }
+            return slots;
+        }
+
         public bool HasVargs
         {
             get
@@ -272,6 +349,74 @@ namespace LanguageImplementation
             return Code.Count;
         }
 
+        /// <summary>
+        /// The first source line of the code, or -1 if nothing with line information has been added yet.
+        /// </summary>
+        public int FirstLine
+        {
+            get
+            {
+                return firstLine;
+            }
+        }
+
+        /// <summary>
+        /// Gets the line number table built up so far. This is what Build() will give the code object as its lnotab.
+        /// </summary>
+        public byte[] GetLineNumberTable()
+        {
+            return lnotab_builder.ToArray();
+        }
+
+        /// <summary>
+        /// Replaces the line number information wholesale. This is for restoring a builder that was saved off
+        /// (see CodeObjectSerializer), not for code generation.
+        /// </summary>
+        /// <param name="firstLine">The first source line of the code.</param>
+        /// <param name="lnotab">The line number table.</param>
+        public void SetLineNumberTable(int firstLine, byte[] lnotab)
+        {
+            this.firstLine = firstLine;
+            trackingLine = firstLine;
+            lnotab_builder = new List<byte>(lnotab);
+        }
+
+        /// <summary>
+        /// Copies the builder along with every code object builder nested in its constants. The names, constants, and
+        /// defaults lists are all new, so running code built from the copy won't change the original. The constants
+        /// themselves aren't copied.
+        /// </summary>
+        public CodeObjectBuilder DeepCopy()
+        {
+            var copy = new CodeObjectBuilder();
+            copy.Code.AddRange(Code);
+            copy.firstLine = firstLine;
+            copy.trackingLine = trackingLine;
+            copy.lnotab_builder = new List<byte>(lnotab_builder);
+            copy.AssertContextGiven = AssertContextGiven;
+
+            copy.ArgCount = ArgCount;
+            copy.KWOnlyArgCount = KWOnlyArgCount;
+            copy.Filename = Filename;
+            copy.Name = Name;
+            copy.Flags = Flags;
+            copy.VarNames = new List<string>(VarNames);
+            copy.ArgVarNames = new List<string>(ArgVarNames);
+            copy.Names = new List<string>(Names);
+            copy.FreeNames = new List<string>(FreeNames);
+            copy.CellNames = new List<string>(CellNames);
+            copy.Defaults = Defaults != null ? new List<object>(Defaults) : null;
+            copy.KWDefaults = KWDefaults != null ? new List<object>(KWDefaults) : null;
+
+            copy.Constants = new List<object>(Constants.Count);
+            foreach(var constant in Constants)
+            {
+                var asBuilder = constant as CodeObjectBuilder;
+                copy.Constants.Add(asBuilder != null ? asBuilder.DeepCopy() : constant);
+            }
+            return copy;
+        }
+
         // Converts into a regular code object using byte arrays.
         // context is used to pass along parent function and cell variables for functions-inside-functions
         // that share information.
@@ -299,6 +444,7 @@ namespace LanguageImplementation
 
             newCodeObj.firstlineno = firstLine;
             newCodeObj.lnotab = lnotab_builder.ToArray();
+            newCodeObj.UpdateFrameSizes();
 
             var func = PyFunction.Create(newCodeObj, globals);
 
@@ -0,0 +1,388 @@
+﻿using System;
+using System.Collections.Generic;
+using System.IO;
+using System.Numerics;
+using System.Text;
+
+using LanguageImplementation.DataTypes;
+
+namespace LanguageImplementation
+{
+    /// <summary>
+    /// Binary format for compiled code objects. This is what gets written into bytecode cache files so modules can be
+    /// loaded without parsing them again.
+    ///
+    /// Code objects nested in the constants (functions, classes, comprehensions) are CodeObjectBuilders since
+    /// MAKE_FUNCTION builds them at runtime, so they are written with their builder state and read back as builders.
+    /// Constants and defaults can only be the plain values the compiler puts in there. Defaults are evaluated while
+    /// compiling, so they could be just about anything; use CanSerialize() first.
+    ///
+    /// Bump FormatVersion whenever the layout changes.
+    /// </summary>
+    public class CodeObjectSerializer
+    {
+        public const int FormatVersion = 2;
+
+        // "CCOB"
+        private const int Magic = 0x424F4343;
+
+        private enum ConstantTag : byte
+        {
+            Null,
+            None,
+            Bool,
+            Integer,
+            Float,
+            PyString,
+            String,
+            Tuple,
+            CodeObject,
+            CodeObjectBuilder
+        }
+
+        /// <summary>
+        /// True if everything in the code object, including nested code objects, can be written by Write().
+        /// </summary>
+        public static bool CanSerialize(CodeObject code)
+        {
+            return canSerializeValues(code.Constants) && canSerializeValues(code.Defaults) && canSerializeValues(code.KWDefaults);
+        }
+
+        private static bool canSerializeValues(List<object> values)
+        {
+            if(values == null)
+            {
+                return true;
+            }
+
+            foreach(var value in values)
+            {
+                if(!canSerializeValue(value))
+                {
+                    return false;
+                }
+            }
+            return true;
+        }
+
+        private static bool canSerializeValue(object value)
+        {
+            if(value == null || value is NonePyObject || value is PyBool || value is PyInteger || value is PyFloat ||
+               value is PyString || value is string)
+            {
+                return true;
+            }
+
+            var asTuple = value as PyTuple;
+            if(asTuple != null)
+            {
+                foreach(var element in asTuple.Values)
+                {
+                    if(!canSerializeValue(element))
+                    {
+                        return false;
+                    }
+                }
+                return true;
+            }
+
+            var asCode = value as CodeObject;
+            if(asCode != null)
+            {
+                return CanSerialize(asCode);
+            }
+
+            return false;
+        }
+
+        public static void Write(Stream stream, CodeObject code)
+        {
+            using(var writer = new BinaryWriter(stream, Encoding.UTF8, true))
+            {
+                writer.Write(Magic);
+                writer.Write(FormatVersion);
+                writeCode(writer, code);
+            }
+        }
+
+        /// <summary>
+        /// Reads back a code object written by Write().
+        /// </summary>
+        /// <exception cref="InvalidDataException">The data isn't a code object in this version of the format.</exception>
+        public static CodeObject Read(Stream stream)
+        {
+            using(var reader = new BinaryReader(stream, Encoding.UTF8, true))
+            {
+                if(reader.ReadInt32() != Magic)
+                {
+                    throw new InvalidDataException("Not a serialized code object");
+                }
+
+                var version = reader.ReadInt32();
+                if(version != FormatVersion)
+                {
+                    throw new InvalidDataException("Serialized code object is format version " + version + " but expected " + FormatVersion);
+                }
+
+                var tag = (ConstantTag)reader.ReadByte();
+                if(tag != ConstantTag.CodeObject && tag != ConstantTag.CodeObjectBuilder)
+                {
+                    throw new InvalidDataException("Serialized data does not start with a code object");
+                }
+                return readCode(reader, tag);
+            }
+        }
+
+        private static void writeCode(BinaryWriter writer, CodeObject code)
+        {
+            var asBuilder = code as CodeObjectBuilder;
+
+            byte[] bytes;
+            byte[] lnotab;
+            int firstLine;
+            if(asBuilder != null)
+            {
+                writer.Write((byte)ConstantTag.CodeObjectBuilder);
+                bytes = asBuilder.Code.ToArray();
+                lnotab = asBuilder.GetLineNumberTable();
+                firstLine = asBuilder.FirstLine;
+            }
+            else
+            {
+                writer.Write((byte)ConstantTag.CodeObject);
+                bytes = code.Code.Bytes ?? new byte[0];
+                lnotab = code.lnotab ?? new byte[0];
+                firstLine = code.firstlineno;
+            }
+
+            writer.Write(code.Name);
+            writer.Write(code.Filename);
+            writer.Write(code.ArgCount);
+            writer.Write(code.KWOnlyArgCount);
+            writer.Write(code.Flags);
+            writer.Write(firstLine);
+
+            writer.Write(bytes.Length);
+            writer.Write(bytes);
+            writer.Write(lnotab.Length);
+            writer.Write(lnotab);
+
+            writeNames(writer, code.VarNames);
+            writeNames(writer, code.ArgVarNames);
+            writeNames(writer, code.Names);
+            writeNames(writer, code.FreeNames);
+            writeNames(writer, code.CellNames);
+
+            writeValues(writer, code.Constants);
+            writeValues(writer, code.Defaults);
+            writeValues(writer, code.KWDefaults);
+        }
+
+        private static CodeObject readCode(BinaryReader reader, ConstantTag tag)
+        {
+            var name = reader.ReadString();
+            var filename = reader.ReadString();
+            var argCount = reader.ReadInt32();
+            var kwOnlyArgCount = reader.ReadInt32();
+            var flags = reader.ReadInt32();
+            var firstLine = reader.ReadInt32();
+
+            var bytes = readByteArray(reader);
+            var lnotab = readByteArray(reader);
+
+            CodeObject code;
+            if(tag == ConstantTag.CodeObjectBuilder)
+            {
+                var builder = new CodeObjectBuilder();
+                builder.Code.AddBytes(bytes);
+                builder.SetLineNumberTable(firstLine, lnotab);
+                code = builder;
+            }
+            else
+            {
+                code = new CodeObject(bytes);
+                code.firstlineno = firstLine;
+                code.lnotab = lnotab;
+            }
+
+            code.Name = name;
+            code.Filename = filename;
+            code.ArgCount = argCount;
+            code.KWOnlyArgCount = kwOnlyArgCount;
+            code.Flags = flags;
+
+            code.VarNames = readNames(reader);
+            code.ArgVarNames = readNames(reader);
+            code.Names = readNames(reader);
+            code.FreeNames = readNames(reader);
+            code.CellNames = readNames(reader);
+
+            code.Constants = readValues(reader);
+            code.Defaults = readValues(reader);
+            code.KWDefaults = readValues(reader);
+            if(tag != ConstantTag.CodeObjectBuilder)
+            {
+                code.UpdateFrameSizes();
+            }
+            return code;
+        }
+
+        // BinaryReader.ReadBytes just comes up short at the end of the stream, so check that we actually got everything.
+        private static byte[] readByteArray(BinaryReader reader)
+        {
+            var length = reader.ReadInt32();
+            var bytes = reader.ReadBytes(length);
+            if(bytes.Length != length)
+            {
+                throw new InvalidDataException("Serialized code object is truncated");
+            }
+            return bytes;
+        }
+
+        private static void writeNames(BinaryWriter writer, List<string> names)
+        {
+            writer.Write(names.Count);
+            foreach(var name in names)
+            {
+                writer.Write(name);
+            }
+        }
+
+        private static List<string> readNames(BinaryReader reader)
+        {
+            var count = reader.ReadInt32();
+            var names = new List<string>(count);
+            for(int i = 0; i < count; ++i)
+            {
+                names.Add(reader.ReadString());
+            }
+            return names;
+        }
+
+        // A null list is written with a -1 count so it comes back as null. Builders leave Defaults null when a
+        // function doesn't declare any.
+        private static void writeValues(BinaryWriter writer, List<object> values)
+        {
+            if(values == null)
+            {
+                writer.Write(-1);
+                return;
+            }
+
+            writer.Write(values.Count);
+            foreach(var value in values)
+            {
+                writeValue(writer, value);
+            }
+        }
+
+        private static List<object> readValues(BinaryReader reader)
+        {
+            var count = reader.ReadInt32();
+            if(count < 0)
+            {
+                return null;
+            }
+
+            var values = new List<object>(count);
+            for(int i = 0; i < count; ++i)
+            {
+                values.Add(readValue(reader));
+            }
+            return values;
+        }
+
+        private static void writeValue(BinaryWriter writer, object value)
+        {
+            if(value == null)
+            {
+                writer.Write((byte)ConstantTag.Null);
+            }
+            else if(value is NonePyObject)
+            {
+                writer.Write((byte)ConstantTag.None);
+            }
+            else if(value is PyBool)
+            {
+                writer.Write((byte)ConstantTag.Bool);
+                writer.Write(((PyBool)value).InternalValue);
+            }
+            else if(value is PyInteger)
+            {
+                writer.Write((byte)ConstantTag.Integer);
+                var intBytes = ((PyInteger)value).InternalValue.ToByteArray();
+                writer.Write(intBytes.Length);
+                writer.Write(intBytes);
+            }
+            else if(value is PyFloat)
+            {
+                writer.Write((byte)ConstantTag.Float);
+                writer.Write(((PyFloat)value).InternalValue);
+            }
+            else if(value is PyString)
+            {
+                writer.Write((byte)ConstantTag.PyString);
+                writer.Write(((PyString)value).InternalValue);
+            }
+            else if(value is string)
+            {
+                writer.Write((byte)ConstantTag.String);
+                writer.Write((string)value);
+            }
+            else if(value is PyTuple)
+            {
+                var tupleValues = ((PyTuple)value).Values;
+                writer.Write((byte)ConstantTag.Tuple);
+                writer.Write(tupleValues.Length);
+                foreach(var element in tupleValues)
+                {
+                    writeValue(writer, element);
+                }
+            }
+            else if(value is CodeObject)
+            {
+                writeCode(writer, (CodeObject)value);
+            }
+            else
+            {
+                throw new InvalidDataException("Cannot serialize constant of type " + value.GetType().Name);
+            }
+        }
+
+        private static object readValue(BinaryReader reader)
+        {
+            var tag = (ConstantTag)reader.ReadByte();
+            switch(tag)
+            {
+                case ConstantTag.Null:
+                    return null;
+                case ConstantTag.None:
+                    return NoneType.Instance;
+                case ConstantTag.Bool:
+                    return PyBool.Create(reader.ReadBoolean());
+                case ConstantTag.Integer:
+                    return PyInteger.Create(new BigInteger(readByteArray(reader)));
+                case ConstantTag.Float:
+                    return PyFloat.Create(reader.ReadDouble());
+                case ConstantTag.PyString:
+                    return PyString.Create(reader.ReadString());
+                case ConstantTag.String:
+                    return reader.ReadString();
+                case ConstantTag.Tuple:
+                    {
+                        var tupleValues = new object[reader.ReadInt32()];
+                        for(int i = 0; i < tupleValues.Length; ++i)
+                        {
+                            tupleValues[i] = readValue(reader);
+                        }
+                        return PyTuple.Create(tupleValues);
+                    }
+                case ConstantTag.CodeObject:
+                case ConstantTag.CodeObjectBuilder:
+                    return readCode(reader, tag);
+                default:
+                    throw new InvalidDataException("Unknown constant tag " + (byte)tag + " in serialized code object");
+            }
+        }
+    }
+}
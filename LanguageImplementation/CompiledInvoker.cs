@@ -0,0 +1,190 @@
+﻿using System;
+using System.Collections.Concurrent;
+using System.Linq.Expressions;
+using System.Reflection;
+
+namespace LanguageImplementation
+{
+    /// <summary>
+    /// Calls a MethodBase through a delegate compiled from an expression tree instead of MethodBase.Invoke.
+    /// Builtin dunders and embedded .NET methods get called constantly, and reflection invocation was most of
+    /// the cost of calling them. Each MethodBase is compiled once on first use and cached.
+    ///
+    /// This tries to be a drop-in for MethodBase.Invoke. Exceptions thrown by the callee still come out
+    /// wrapped in a TargetInvocationException, since code like FOR_ITER peels StopIterationException out of
+    /// those. If the arguments wouldn't pass straight through a cast (reflection tolerates some widening that
+    /// a compiled cast won't), or the method is something we don't compile (ref/out parameters, methods on
+    /// value types, open generics), we fall back to reflection.
+    /// </summary>
+    public class CompiledInvoker
+    {
+        private static ConcurrentDictionary<MethodBase, CompiledInvoker> invokers = new ConcurrentDictionary<MethodBase, CompiledInvoker>();
+
+        private MethodBase methodBase;
+        private Type[] parameterTypes;
+        private Func<object, object[], object> compiled;
+
+        public static CompiledInvoker Get(MethodBase methodBase)
+        {
+            CompiledInvoker invoker;
+            if(!invokers.TryGetValue(methodBase, out invoker))
+            {
+                invoker = invokers.GetOrAdd(methodBase, new CompiledInvoker(methodBase));
+            }
+            return invoker;
+        }
+
+        /// <summary>
+        /// Invokes the method like MethodBase.Invoke would. For constructors, the instance is ignored and the new
+        /// object is returned.
+        /// </summary>
+        /// <param name="methodBase">The method or constructor to invoke.</param>
+        /// <param name="instance">The object to call the method on. Ignored for static methods and constructors.</param>
+        /// <param name="args">The arguments to pass, already converted to the method's parameter types.</param>
+        /// <returns>Whatever the method returned, boxed. Void methods return null.</returns>
+        public static object Invoke(MethodBase methodBase, object instance, object[] args)
+        {
+            return Get(methodBase).Invoke(instance, args);
+        }
+
+        private CompiledInvoker(MethodBase methodBase)
+        {
+            this.methodBase = methodBase;
+            var parameters = methodBase.GetParameters();
+            parameterTypes = new Type[parameters.Length];
+            for(int i = 0; i < parameters.Length; ++i)
+            {
+                parameterTypes[i] = parameters[i].ParameterType;
+            }
+
+            try
+            {
+                compiled = compile(methodBase, parameterTypes);
+            }
+            catch(Exception)
+            {
+                // Anything the expression compiler chokes on just stays on reflection.
+                compiled = null;
+            }
+        }
+
+        public object Invoke(object instance, object[] args)
+        {
+            if(compiled == null || !canPassDirectly(instance, args))
+            {
+                return reflectionInvoke(instance, args);
+            }
+
+            try
+            {
+                return compiled(instance, args);
+            }
+            catch(Exception e)
+            {
+                throw new TargetInvocationException(e);
+            }
+        }
+
+        private object reflectionInvoke(object instance, object[] args)
+        {
+            var asConstructor = methodBase as ConstructorInfo;
+            if(asConstructor != null)
+            {
+                return asConstructor.Invoke(args);
+            }
+            return methodBase.Invoke(instance, args);
+        }
+
+        private bool canPassDirectly(object instance, object[] args)
+        {
+            if(args == null ? parameterTypes.Length != 0 : args.Length != parameterTypes.Length)
+            {
+                return false;
+            }
+
+            if(!methodBase.IsStatic && !methodBase.IsConstructor && !methodBase.DeclaringType.IsInstanceOfType(instance))
+            {
+                return false;
+            }
+
+            for(int i = 0; i < parameterTypes.Length; ++i)
+            {
+                // Nulls are fine: compiled code turns them into default values for value types like reflection does.
+                if(args[i] != null && !parameterTypes[i].IsInstanceOfType(args[i]))
+                {
+                    return false;
+                }
+            }
+            return true;
+        }
+
+        private static Func<object, object[], object> compile(MethodBase methodBase, Type[] parameterTypes)
+        {
+            if(methodBase.ContainsGenericParameters || methodBase.DeclaringType.IsValueType)
+            {
+                return null;
+            }
+
+            var instanceParam = Expression.Parameter(typeof(object), "instance");
+            var argsParam = Expression.Parameter(typeof(object[]), "args");
+
+            var argExpressions = new Expression[parameterTypes.Length];
+            for(int i = 0; i < parameterTypes.Length; ++i)
+            {
+                var paramType = parameterTypes[i];
+                if(paramType.IsByRef || paramType.IsPointer)
+                {
+                    return null;
+                }
+
+                Expression arg = Expression.ArrayIndex(argsParam, Expression.Constant(i));
+                if(paramType.IsValueType && Nullable.GetUnderlyingType(paramType) == null)
+                {
+                    arg = Expression.Condition(Expression.ReferenceEqual(arg, Expression.Constant(null)),
+                        Expression.Default(paramType),
+                        Expression.Convert(arg, paramType));
+                }
+                else
+                {
+                    arg = Expression.Convert(arg, paramType);
+                }
+                argExpressions[i] = arg;
+            }
+
+            Expression body;
+            var asConstructor = methodBase as ConstructorInfo;
+            if(asConstructor != null)
+            {
+                if(asConstructor.IsStatic || asConstructor.DeclaringType.IsAbstract)
+                {
+                    return null;
+                }
+                body = Expression.New(asConstructor, argExpressions);
+            }
+            else
+            {
+                var asMethodInfo = (MethodInfo)methodBase;
+                if(asMethodInfo.IsStatic)
+                {
+                    body = Expression.Call(asMethodInfo, argExpressions);
+                }
+                else
+                {
+                    body = Expression.Call(Expression.Convert(instanceParam, asMethodInfo.DeclaringType), asMethodInfo, argExpressions);
+                }
+
+                if(asMethodInfo.ReturnType == typeof(void))
+                {
+                    body = Expression.Block(body, Expression.Constant(null));
+                }
+            }
+
+            if(body.Type != typeof(object))
+            {
+                body = Expression.Convert(body, typeof(object));
+            }
+
+            return Expression.Lambda<Func<object, object[], object>>(body, instanceParam, argsParam).Compile();
+        }
+    }
+}
@@ -222,6 +222,49 @@ namespace LanguageImplementation.DataTypes.Exceptions
         }
     }
 
+    public class KeyError : PyException
+    {
+        public KeyError() : base()
+        {
+
+        }
+
+        public KeyError(string msg) : base(msg)
+        {
+
+        }
+
+    }
+
+    public class KeyErrorClass : PyExceptionClass
+    {
+        public KeyErrorClass() :
+            base("KeyError", null, new PyClass[] { PyExceptionClass.Instance })
+        {
+
+        }
+
+        private static KeyErrorClass __instance;
+        public static new KeyErrorClass Instance
+        {
+            get
+            {
+                if (__instance == null)
+                {
+                    __instance = new KeyErrorClass();
+                }
+                return __instance;
+            }
+        }
+
+        public static KeyError Create(string message)
+        {
+            var exc = PyTypeObject.DefaultNew<KeyError>(KeyErrorClass.Instance);
+            exc.Message = message;
+            return exc;
+        }
+    }
+
 
     public class ValueError : PyException
     {
@@ -0,0 +1,90 @@
+﻿using System;
+
+namespace LanguageImplementation.DataTypes
+{
+    /// <summary>
+    /// How bools, ints, and floats get mixed together in arithmetic. Python treats a bool as an int, and if either side
+    /// of an operation is a float then both sides become floats. The numeric types all come through here to line up
+    /// their operands instead of each one having its own idea of what it can mix with.
+    /// </summary>
+    public static class NumberCoercion
+    {
+        /// <summary>
+        /// True if the operation has to be done in floating point because one of its operands is a float.
+        /// </summary>
+        public static bool NeedsFloat(PyObject a, PyObject b)
+        {
+            return a is PyFloat || b is PyFloat;
+        }
+
+        /// <summary>
+        /// Gets an int or a bool as an int.
+        /// </summary>
+        /// <param name="obj">The object to convert.</param>
+        /// <param name="asInt">The object as a PyInteger. Bools come back as 0 or 1.</param>
+        /// <returns>True if the object could be used as an int.</returns>
+        public static bool TryGetInteger(PyObject obj, out PyInteger asInt)
+        {
+            asInt = obj as PyInteger;
+            if(asInt != null)
+            {
+                return true;
+            }
+
+            var asBool = obj as PyBool;
+            if(asBool != null)
+            {
+                asInt = PyInteger.Create(asBool.InternalValue ? 1 : 0);
+                return true;
+            }
+
+            return false;
+        }
+
+        /// <summary>
+        /// Gets a float, int, or bool as a double.
+        /// </summary>
+        /// <param name="obj">The object to convert.</param>
+        /// <param name="asDouble">The object's value as a double.</param>
+        /// <returns>True if the object could be used as a float.</returns>
+        public static bool TryGetDouble(PyObject obj, out double asDouble)
+        {
+            var asFloat = obj as PyFloat;
+            if(asFloat != null)
+            {
+                asDouble = asFloat.InternalValue;
+                return true;
+            }
+
+            var asInt = obj as PyInteger;
+            if(asInt != null)
+            {
+                asDouble = (double) asInt;
+                return true;
+            }
+
+            var asBool = obj as PyBool;
+            if(asBool != null)
+            {
+                asDouble = asBool.InternalValue ? 1.0 : 0.0;
+                return true;
+            }
+
+            asDouble = 0.0;
+            return false;
+        }
+
+        /// <summary>
+        /// Gets a float, int, or bool as a double, or throws if it isn't a number.
+        /// </summary>
+        public static double ToDouble(PyObject obj, string operation)
+        {
+            double asDouble;
+            if(!TryGetDouble(obj, out asDouble))
+            {
+                throw new Exception("TypeError: unsupported operand(s) for " + operation + ": 'float' and '" + obj.__class__.Name + "'");
+            }
+            return asDouble;
+        }
+    }
+}
@@ -1,4 +1,5 @@
 ﻿using System;
+using System.Collections;
 using System.Linq.Expressions;
 using System.Numerics;
 
@@ -43,62 +44,70 @@ namespace LanguageImplementation.DataTypes
             }
             else
             {
-                // TODO: Handle at least FLOAT
-                throw new Exception("boolean type can currently only do math with int and bool types");
+                // Floats are handled by checking NumberCoercion.NeedsFloat before getting here.
+                throw new Exception("boolean type can currently only do math with int, float, and bool types");
             }
         }
 
         [ClassMember]
         public static PyObject __add__(PyObject self, PyObject other)
         {
-            if (other is PyInteger)
+            if (NumberCoercion.NeedsFloat(self, other))
             {
-                return PyInteger.Create(extractInt(self) + extractInt(other));
+                return PyFloat.Create(PyFloatClass.ExtractAsDouble(self) + PyFloatClass.ExtractAsDouble(other));
             }
             else
             {
-                return PyFloat.Create(PyFloatClass.ExtractAsDecimal(self) + PyFloatClass.ExtractAsDecimal(other));
+                return PyInteger.Create(extractInt(self) + extractInt(other));
             }
         }
 
         [ClassMember]
         public static PyObject __mul__(PyObject self, PyObject other)
         {
-            if (other is PyInteger)
+            if (NumberCoercion.NeedsFloat(self, other))
             {
-                return PyInteger.Create(extractInt(self) * extractInt(other));
+                return PyFloat.Create(PyFloatClass.ExtractAsDouble(self) * PyFloatClass.ExtractAsDouble(other));
             }
             else
             {
-                return PyFloat.Create(PyFloatClass.ExtractAsDecimal(self) * PyFloatClass.ExtractAsDecimal(other));
+                return PyInteger.Create(extractInt(self) * extractInt(other));
             }
         }
 
         [ClassMember]
         public static PyObject __sub__(PyObject self, PyObject other)
         {
-            if (other is PyInteger)
+            if (NumberCoercion.NeedsFloat(self, other))
             {
-                return PyInteger.Create(extractInt(self) - extractInt(other));
+                return PyFloat.Create(PyFloatClass.ExtractAsDouble(self) - PyFloatClass.ExtractAsDouble(other));
             }
             else
             {
-                return PyFloat.Create(PyFloatClass.ExtractAsDecimal(self) - PyFloatClass.ExtractAsDecimal(other));
+                return PyInteger.Create(extractInt(self) - extractInt(other));
             }
         }
 
         [ClassMember]
         public static PyObject __truediv__(PyObject self, PyObject other)
         {
-            var newPyFloat = PyFloat.Create((decimal) extractInt(self) / PyFloatClass.ExtractAsDecimal(other));
+            var divisor = PyFloatClass.ExtractAsDouble(other);
+            if(divisor == 0.0)
+            {
+                throw new DivideByZeroException("division by zero");
+            }
+            var newPyFloat = PyFloat.Create(PyFloatClass.ExtractAsDouble(self) / divisor);
             return newPyFloat;
         }
 
         [ClassMember]
         public static PyObject __floordiv__(PyObject self, PyObject other)
         {
-            var newPyInteger = PyInteger.Create((BigInteger) ((decimal)extractInt(self) / PyFloatClass.ExtractAsDecimal(other)));
-            return newPyInteger;
+            if (NumberCoercion.NeedsFloat(self, other))
+            {
+                return PyFloatClass.__floordiv__(PyFloat.Create(PyFloatClass.ExtractAsDouble(self)), other);
+            }
+            return PyIntegerClass.__floordiv__(PyInteger.Create(extractInt(self)), other);
         }
                 
         [ClassMember]
@@ -125,42 +134,70 @@ namespace LanguageImplementation.DataTypes
         [ClassMember]
         public static PyBool __lt__(PyObject self, PyObject other)
         {
+            if (NumberCoercion.NeedsFloat(self, other))
+            {
+                return PyFloatClass.__lt__(PyFloat.Create(PyFloatClass.ExtractAsDouble(self)), other);
+            }
             return extractInt(self) < extractInt(other);
         }
 
         [ClassMember]
         public static PyBool __gt__(PyObject self, PyObject other)
         {
+            if (NumberCoercion.NeedsFloat(self, other))
+            {
+                return PyFloatClass.__gt__(PyFloat.Create(PyFloatClass.ExtractAsDouble(self)), other);
+            }
             return extractInt(self) > extractInt(other);
         }
 
         [ClassMember]
         public static PyBool __le__(PyObject self, PyObject other)
         {
+            if (NumberCoercion.NeedsFloat(self, other))
+            {
+                return PyFloatClass.__le__(PyFloat.Create(PyFloatClass.ExtractAsDouble(self)), other);
+            }
             return extractInt(self) <= extractInt(other);
         }
 
         [ClassMember]
         public static PyBool __ge__(PyObject self, PyObject other)
         {
+            if (NumberCoercion.NeedsFloat(self, other))
+            {
+                return PyFloatClass.__ge__(PyFloat.Create(PyFloatClass.ExtractAsDouble(self)), other);
+            }
             return extractInt(self) >= extractInt(other);
         }
 
         [ClassMember]
         public static PyBool __eq__(PyObject self, PyObject other)
         {
+            if (NumberCoercion.NeedsFloat(self, other))
+            {
+                return PyFloatClass.__eq__(PyFloat.Create(PyFloatClass.ExtractAsDouble(self)), other);
+            }
             return extractInt(self) == extractInt(other);
         }
 
         [ClassMember]
         public static PyBool __ne__(PyObject self, PyObject other)
         {
+            if (NumberCoercion.NeedsFloat(self, other))
+            {
+                return PyFloatClass.__ne__(PyFloat.Create(PyFloatClass.ExtractAsDouble(self)), other);
+            }
             return extractInt(self) != extractInt(other);
         }
 
         [ClassMember]
         public static PyBool __ltgt__(PyObject self, PyObject other)
         {
+            if (NumberCoercion.NeedsFloat(self, other))
+            {
+                return PyFloatClass.__ltgt__(PyFloat.Create(PyFloatClass.ExtractAsDouble(self)), other);
+            }
             var a = extractInt(self);
             var b = extractInt(other);
             return a < b && a > b;
@@ -279,6 +316,128 @@ namespace LanguageImplementation.DataTypes
             }
         }
 
+        /// <summary>
+        /// Works out if an object is true without calling into any Python code. This covers None, bools, and the
+        /// builtin numbers and containers, as well as plain .NET values. Anything else could have its own __bool__ or
+        /// __len__ that has to be called to find out.
+        ///
+        /// The builtin types are only handled when they're exactly that type, since a subclass could override
+        /// __bool__ or __len__.
+        /// </summary>
+        /// <param name="value">The object to test.</param>
+        /// <param name="truth">Whether the object is true.</param>
+        /// <returns>True if the truth could be determined here. False means its __bool__ or __len__ needs calling.</returns>
+        public static bool TryGetTruth(object value, out bool truth)
+        {
+            truth = false;
+            if(value == null || value is NonePyObject)
+            {
+                return true;
+            }
+
+            var asPyObject = value as PyObject;
+            if(asPyObject == null)
+            {
+                return tryGetDotNetTruth(value, out truth);
+            }
+
+            var asPyBool = value as PyBool;
+            if(asPyBool != null)
+            {
+                truth = asPyBool.InternalValue;
+                return true;
+            }
+
+            var pyClass = asPyObject.__class__;
+            if(pyClass == PyIntegerClass.Instance)
+            {
+                var asInt = (PyInteger) value;
+                truth = asInt.IsSmall ? asInt.SmallValue != 0 : !asInt.InternalValue.IsZero;
+                return true;
+            }
+            else if(pyClass == PyFloatClass.Instance)
+            {
+                truth = ((PyFloat) value).InternalValue != 0.0;
+                return true;
+            }
+            else if(pyClass == PyStringClass.Instance)
+            {
+                truth = ((PyString) value).InternalValue.Length > 0;
+                return true;
+            }
+            else if(pyClass == PyListClass.Instance && value is PyList)
+            {
+                truth = ((PyList) value).list.Count > 0;
+                return true;
+            }
+            else if(pyClass == PyTupleClass.Instance && value is PyTuple)
+            {
+                truth = ((PyTuple) value).Values.Length > 0;
+                return true;
+            }
+            else if(pyClass == PyDictClass.Instance && value is PyDict)
+            {
+                truth = ((PyDict) value).InternalDict.Count > 0;
+                return true;
+            }
+            else if(pyClass == PySetClass.Instance && value is PySet)
+            {
+                truth = ((PySet) value).set.Count > 0;
+                return true;
+            }
+            return false;
+        }
+
+        private static bool tryGetDotNetTruth(object value, out bool truth)
+        {
+            if(value is bool)
+            {
+                truth = (bool) value;
+                return true;
+            }
+
+            var asString = value as string;
+            if(asString != null)
+            {
+                truth = asString.Length > 0;
+                return true;
+            }
+
+            var asCollection = value as ICollection;
+            if(asCollection != null)
+            {
+                truth = asCollection.Count > 0;
+                return true;
+            }
+
+            switch(Type.GetTypeCode(value.GetType()))
+            {
+                case TypeCode.SByte:
+                case TypeCode.Byte:
+                case TypeCode.Int16:
+                case TypeCode.UInt16:
+                case TypeCode.Int32:
+                case TypeCode.UInt32:
+                case TypeCode.Int64:
+                case TypeCode.UInt64:
+                case TypeCode.Single:
+                case TypeCode.Double:
+                case TypeCode.Decimal:
+                    truth = Convert.ToDouble(value) != 0.0;
+                    return true;
+            }
+
+            if(value is BigInteger)
+            {
+                truth = !((BigInteger) value).IsZero;
+                return true;
+            }
+
+            // Any other .NET object is true, same as a Python object without __bool__ or __len__.
+            truth = true;
+            return true;
+        }
+
         #region Cast Conversions
         public static explicit operator sbyte(PyBool pybool) => (sbyte) (pybool.InternalValue ? 1 : 0);
         public static explicit operator byte(PyBool pybool) => (byte)(pybool.InternalValue ? 1 : 0);
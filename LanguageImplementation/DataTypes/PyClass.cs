@@ -1,6 +1,8 @@
 ﻿using LanguageImplementation.DataTypes.Exceptions;
 using System;
+using System.Collections.Concurrent;
 using System.Collections.Generic;
+using System.Threading;
 
 namespace LanguageImplementation.DataTypes
 {
@@ -8,10 +10,235 @@ namespace LanguageImplementation.DataTypes
     {
         public PyClass[] __bases__;
 
+        private static int lastVersionTag;
+
+        // Classes that have this one in their __bases__. They're held weakly so a base class doesn't keep every class
+        // ever derived from it alive.
+        private List<WeakReference<PyClass>> subclasses;
+        private readonly object subclassesLock = new object();
+
+        // What an attribute name resolved to on the way down the MRO. DefiningClass is null if nothing had it.
+        private struct ResolvedAttribute
+        {
+            public PyClass DefiningClass;
+            public object Value;
+        }
+
+        // Everything worked out from the class hierarchy. This gets thrown out as a whole whenever the class or one
+        // of its bases is modified, and then worked out again the next time somebody asks.
+        private class Resolution
+        {
+            public PyClass[] MRO;
+            public HashSet<PyClass> MROMembers;
+            public ConcurrentDictionary<string, ResolvedAttribute> Attributes;
+        }
+
+        private Resolution resolution;
+
+        /// <summary>
+        /// Changes whenever this class or one of its bases has its attributes changed. Attribute caches remember the
+        /// tag they saw and throw out what they learned when it doesn't match anymore.
+        /// </summary>
+        public int VersionTag
+        {
+            get; private set;
+        }
+
         public PyClass(string name, PyFunction __init__, PyClass[] bases) :
             base(name, __init__)
         {
             __bases__ = bases;
+            if(bases != null)
+            {
+                foreach(var parentClass in bases)
+                {
+                    parentClass.addSubclass(this);
+                }
+            }
+            Modified();
+        }
+
+        private void addSubclass(PyClass subclass)
+        {
+            lock(subclassesLock)
+            {
+                if(subclasses == null)
+                {
+                    subclasses = new List<WeakReference<PyClass>>();
+                }
+                subclasses.RemoveAll(reference =>
+                {
+                    PyClass live;
+                    return !reference.TryGetTarget(out live);
+                });
+                subclasses.Add(new WeakReference<PyClass>(subclass));
+            }
+        }
+
+        /// <summary>
+        /// Gives this class and everything derived from it a new VersionTag. __setattr__ does this already; call it
+        /// after changing a class's __dict__ directly.
+        /// </summary>
+        public void Modified()
+        {
+            VersionTag = Interlocked.Increment(ref lastVersionTag);
+            resolution = null;
+
+            List<PyClass> liveSubclasses = null;
+            lock(subclassesLock)
+            {
+                if(subclasses != null)
+                {
+                    liveSubclasses = new List<PyClass>();
+                    foreach(var reference in subclasses)
+                    {
+                        PyClass subclass;
+                        if(reference.TryGetTarget(out subclass))
+                        {
+                            liveSubclasses.Add(subclass);
+                        }
+                    }
+                }
+            }
+
+            if(liveSubclasses != null)
+            {
+                foreach(var subclass in liveSubclasses)
+                {
+                    subclass.Modified();
+                }
+            }
+        }
+
+        private Resolution getResolution()
+        {
+            var current = resolution;
+            if(current == null)
+            {
+                int versionTag = VersionTag;
+                var mro = linearize();
+                current = new Resolution
+                {
+                    MRO = mro,
+                    MROMembers = new HashSet<PyClass>(mro),
+                    Attributes = new ConcurrentDictionary<string, ResolvedAttribute>()
+                };
+
+                // Don't keep it if the hierarchy changed while we were working it out.
+                if(versionTag == VersionTag)
+                {
+                    resolution = current;
+                }
+            }
+            return current;
+        }
+
+        /// <summary>
+        /// The method resolution order: this class followed by its bases in the order attributes are looked up in
+        /// them. This is the C3 linearization Python uses.
+        /// </summary>
+        public PyClass[] __mro__
+        {
+            get
+            {
+                return getResolution().MRO;
+            }
+        }
+
+        /// <summary>
+        /// True if the other class is in this class's MRO. A class counts as a subclass of itself.
+        /// </summary>
+        public bool IsSubclassOf(PyClass other)
+        {
+            return other != null && getResolution().MROMembers.Contains(other);
+        }
+
+        private PyClass[] linearize()
+        {
+            if(__bases__ == null || __bases__.Length == 0)
+            {
+                return new PyClass[] { this };
+            }
+
+            // C3: merge the bases' MROs and the list of bases, always taking the first head that isn't in the tail of
+            // any of the lists.
+            var sequences = new List<List<PyClass>>();
+            foreach(var parentClass in __bases__)
+            {
+                sequences.Add(new List<PyClass>(parentClass.__mro__));
+            }
+            sequences.Add(new List<PyClass>(__bases__));
+
+            var linearized = new List<PyClass> { this };
+            while(true)
+            {
+                sequences.RemoveAll(sequence => sequence.Count == 0);
+                if(sequences.Count == 0)
+                {
+                    return linearized.ToArray();
+                }
+
+                PyClass next = null;
+                foreach(var sequence in sequences)
+                {
+                    var candidate = sequence[0];
+                    bool inTail = false;
+                    foreach(var other in sequences)
+                    {
+                        if(other.IndexOf(candidate, 1) >= 0)
+                        {
+                            inTail = true;
+                            break;
+                        }
+                    }
+                    if(!inTail)
+                    {
+                        next = candidate;
+                        break;
+                    }
+                }
+
+                if(next == null)
+                {
+                    // Python refuses to create a class like this. We never checked for it, so keep looking things up
+                    // in the order we always did instead of breaking code that used to work.
+                    return linearizeDepthFirst();
+                }
+
+                linearized.Add(next);
+                foreach(var sequence in sequences)
+                {
+                    if(sequence[0] == next)
+                    {
+                        sequence.RemoveAt(0);
+                    }
+                }
+            }
+        }
+
+        private PyClass[] linearizeDepthFirst()
+        {
+            var linearized = new List<PyClass>();
+            var seen = new HashSet<PyClass>();
+            var toVisit = new Stack<PyClass>();
+            toVisit.Push(this);
+            while(toVisit.Count > 0)
+            {
+                var visiting = toVisit.Pop();
+                if(!seen.Add(visiting))
+                {
+                    continue;
+                }
+                linearized.Add(visiting);
+                if(visiting.__bases__ != null)
+                {
+                    for(int base_i = visiting.__bases__.Length - 1; base_i >= 0; --base_i)
+                    {
+                        toVisit.Push(visiting.__bases__[base_i]);
+                    }
+                }
+            }
+            return linearized.ToArray();
         }
 
         public const string __REPR__ = "__repr__";
@@ -35,51 +262,91 @@ namespace LanguageImplementation.DataTypes
             throw new NotImplementedException();
         }
 
-        private static object __getattribute__(PyClass testClass, string name, out bool found)
+        internal static object __getattribute__(PyClass testClass, string name, out bool found)
         {
-            found = false;
-            if (testClass.__dict__.ContainsKey(name))
-            {
-                found = true;
-                return testClass.__dict__[name];
-            }
-            else
+            var classResolution = testClass.getResolution();
+            ResolvedAttribute resolved;
+            if(!classResolution.Attributes.TryGetValue(name, out resolved))
             {
-                foreach (var parentClass in testClass.__bases__)
+                foreach(var mroClass in classResolution.MRO)
                 {
-                    var parentResult = __getattribute__(parentClass, name, out found);
-                    if (found)
+                    object value;
+                    if(mroClass.__dict__.TryGetValue(name, out value))
                     {
-                        return parentResult;
+                        resolved.DefiningClass = mroClass;
+                        resolved.Value = value;
+                        break;
                     }
                 }
+                classResolution.Attributes[name] = resolved;
+            }
+
+            found = resolved.DefiningClass != null;
+            return resolved.Value;
+        }
+
+        /// <summary>
+        /// Looks up an attribute in the __dict__ of each class in the MRO. This is where attribute lookups on instances
+        /// go after the instance's own attributes. Results are cached until the class or one of its bases is modified.
+        /// </summary>
+        public bool TryGetClassAttribute(string name, out object value)
+        {
+            bool found;
+            value = __getattribute__(this, name, out found);
+            return found;
+        }
+
+        /// <summary>
+        /// A class's own __dict__ holds its members, so looking something up on the class itself has to walk its
+        /// bases too before giving up.
+        /// </summary>
+        public override bool TryGetUnboundAttribute(string name, out object value)
+        {
+            bool found;
+            value = __getattribute__(this, name, out found);
+            if(found)
+            {
+                return true;
             }
-            return null;
+            return base.TryGetUnboundAttribute(name, out value);
         }
 
         [ClassMember]
         public static object __getattribute__(PyObject self, string name)
         {
-            // Python data model states that PyMethods are created EACH TIME we look one up.
-            // https://docs.python.org/3/reference/datamodel.html ("instance methods")
-            object retval = null;
-            if (!self.__dict__.ContainsKey(name))
+            object retval;
+            if (!TryGetAttribute(self, name, out retval))
             {
-                bool found = false;
-                var fromClasses = __getattribute__(self.__class__, name, out found);
-                if (!found)
-                {
-                    var className = self.__class__ != null ? self.__class__.Name : "(Null Class!)";
-                    throw new EscapedPyException(new AttributeError("'" + className + "' object has no attribute named '" + name + "'"));
-                }
-                else
-                {
-                    retval = fromClasses;
-                }
+                throw new EscapedPyException(NoAttributeError(self, name));
             }
-            else
+            return retval;
+        }
+
+        /// <summary>
+        /// The AttributeError for looking up an attribute the object doesn't have.
+        /// </summary>
+        public static AttributeError NoAttributeError(PyObject self, string name)
+        {
+            var className = self.__class__ != null ? self.__class__.Name : "(Null Class!)";
+            return new AttributeError("'" + className + "' object has no attribute named '" + name + "'");
+        }
+
+        /// <summary>
+        /// Looks up an attribute the same way __getattribute__ does, but returns false instead of throwing when the
+        /// attribute is missing. The interpreter uses this so it only raises AttributeError when the script would
+        /// actually see it.
+        /// </summary>
+        /// <param name="self">The object to look in.</param>
+        /// <param name="name">The attribute name.</param>
+        /// <param name="retval">The attribute, bound into a PyMethod if it's callable.</param>
+        /// <returns>True if the attribute was found.</returns>
+        public static bool TryGetAttribute(PyObject self, string name, out object retval)
+        {
+            // Python data model states that PyMethods are created EACH TIME we look one up.
+            // https://docs.python.org/3/reference/datamodel.html ("instance methods")
+            if (!self.TryGetUnboundAttribute(name, out retval))
             {
-                retval = self.__dict__[name];
+                return false;
             }
 
             // Fun technicality here: We don't want to wrap up __call__ when it's being invoked
@@ -96,12 +363,9 @@ namespace LanguageImplementation.DataTypes
             var asCallable = retval as IPyCallable;
             if (self as PyModule == null && asCallable != null && name != "__call__")
             {
-                return new PyMethod(self, asCallable);
-            }
-            else
-            {
-                return retval;
+                retval = new PyMethod(self, asCallable);
             }
+            return true;
         }
     
         [ClassMember]
@@ -115,6 +379,12 @@ namespace LanguageImplementation.DataTypes
             {
                 self.__dict__.Add(name, value);
             }
+
+            var asClass = self as PyClass;
+            if(asClass != null)
+            {
+                asClass.Modified();
+            }
         }
 
         [ClassMember]
@@ -60,31 +60,24 @@ namespace LanguageImplementation.DataTypes
         }
 
         [ClassMember]
-        public static void __delitem__(PyDict self, object k)
+        public static void __delitem__(FrameContext context, PyDict self, object k)
         {
-            try
+            if (!self.dict.Remove(k))
             {
-                self.dict.Remove(k);
-            }
-            catch (KeyNotFoundException)
-            {
-                // TODO: Represent as a more natural Python exception;
-                throw new Exception("KeyError: " + k);
+                context.CurrentException = KeyErrorClass.Create("KeyError: " + k);
             }
         }
 
         [ClassMember]
-        public static object __getitem__(PyDict self, object k)
+        public static object __getitem__(FrameContext context, PyDict self, object k)
         {
-            try
-            {
-                return self.dict[k];
-            }
-            catch (KeyNotFoundException)
+            object value;
+            if (!self.TryGetItem(k, out value))
             {
-                // TODO: Represent as a more natural Python exception;
-                throw new Exception("KeyError: " + k);
+                context.CurrentException = KeyErrorClass.Create("KeyError: " + k);
+                return null;
             }
+            return value;
         }
 
         [ClassMember]
@@ -371,6 +364,17 @@ namespace LanguageImplementation.DataTypes
             return pyDict;
         }
 
+        /// <summary>
+        /// Looks up a key without raising KeyError if it's missing.
+        /// </summary>
+        /// <param name="key">The key to look up.</param>
+        /// <param name="value">The value for the key, or null if it isn't in the dictionary.</param>
+        /// <returns>True if the key is in the dictionary.</returns>
+        public bool TryGetItem(object key, out object value)
+        {
+            return dict.TryGetValue(key, out value);
+        }
+
         public override bool Equals(object obj)
         {
             var asList = obj as PyDict;
@@ -430,24 +434,43 @@ namespace LanguageImplementation.DataTypes
         }
 
         [ClassMember]
-        public static object __next__(PyObject self)
+        public static object __next__(FrameContext context, PyObject self)
         {
             var asKeyIterator = self as PyKeyIterator;
-            if (!asKeyIterator.Keys.MoveNext())
+            object next;
+            if (!asKeyIterator.TryNext(out next))
             {
-                throw new StopIterationException();
-            }
-            else
-            {
-                return (PyObject)asKeyIterator.Keys.Current;
+                context.CurrentException = new StopIteration();
+                return null;
             }
+            return (PyObject)next;
         }
     }
 
-    public class PyKeyIterator : PyObject
+    public class PyKeyIterator : PyObject, INativeIterator
     {
         public IEnumerator Keys;
 
+        public bool IsNative
+        {
+            get
+            {
+                return true;
+            }
+        }
+
+        public bool TryNext(out object next)
+        {
+            if (!Keys.MoveNext())
+            {
+                next = null;
+                return false;
+            }
+
+            next = Keys.Current;
+            return true;
+        }
+
         public PyKeyIterator() : base(PyKeyIteratorClass.Instance)
         {
         }
@@ -557,26 +580,44 @@ namespace LanguageImplementation.DataTypes
         }
 
         [ClassMember]
-        public static object __next__(PyObject self)
+        public static object __next__(FrameContext context, PyObject self)
         {
             var asKeyIterator = self as PyDictKeysIterator;
-            if (!asKeyIterator.Keys.MoveNext())
+            object key;
+            if (!asKeyIterator.TryNext(out key))
             {
-                throw new StopIterationException();
-            }
-            else
-            {
-                // TODO: [SORTED KEYS] Keys would be expected to by sorted to mimick Python 3.6+
-                var key = (object)asKeyIterator.Keys.Current;
-                return key;
+                context.CurrentException = new StopIteration();
+                return null;
             }
+            // TODO: [SORTED KEYS] Keys would be expected to by sorted to mimick Python 3.6+
+            return key;
         }
     }
-    public class PyDictKeysIterator : PyObject
+    public class PyDictKeysIterator : PyObject, INativeIterator
     {
         public IEnumerator Keys;
         public PyDict Dict;
 
+        public bool IsNative
+        {
+            get
+            {
+                return true;
+            }
+        }
+
+        public bool TryNext(out object next)
+        {
+            if (!Keys.MoveNext())
+            {
+                next = null;
+                return false;
+            }
+
+            next = Keys.Current;
+            return true;
+        }
+
         public PyDictKeysIterator() : base(PyDictKeysIteratorClass.Instance)
         {
         }
@@ -673,26 +714,44 @@ namespace LanguageImplementation.DataTypes
         }
 
         [ClassMember]
-        public static object __next__(PyObject self)
+        public static object __next__(FrameContext context, PyObject self)
         {
             var asKeyIterator = self as PyDictItemsIterator;
-            if (!asKeyIterator.Keys.MoveNext())
-            {
-                throw new StopIterationException();
-            }
-            else
+            object item;
+            if (!asKeyIterator.TryNext(out item))
             {
-                var key = (object) asKeyIterator.Keys.Current;
-                return PyTuple.Create(new object[] { key, PyDictClass.__getitem__(asKeyIterator.Dict, key) });
+                context.CurrentException = new StopIteration();
+                return null;
             }
+            return item;
         }
     }
 
-    public class PyDictItemsIterator : PyObject
+    public class PyDictItemsIterator : PyObject, INativeIterator
     {
         public IEnumerator Keys;
         public PyDict Dict;
 
+        public bool IsNative
+        {
+            get
+            {
+                return true;
+            }
+        }
+
+        public bool TryNext(out object next)
+        {
+            if (!Keys.MoveNext())
+            {
+                next = null;
+                return false;
+            }
+
+            next = PyTuple.Create(new object[] { Keys.Current, Dict.dict[Keys.Current] });
+            return true;
+        }
+
         public PyDictItemsIterator() : base(PyDictItemsIteratorClass.Instance)
         {
         }
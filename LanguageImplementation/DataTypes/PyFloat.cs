@@ -1,6 +1,8 @@
 ﻿using System;
+using System.Globalization;
 using System.Linq.Expressions;
 using System.Numerics;
+using System.Text;
 
 namespace LanguageImplementation.DataTypes
 {
@@ -31,140 +33,108 @@ namespace LanguageImplementation.DataTypes
             }
         }
 
-        public static decimal ExtractAsDecimal(PyObject var)
+        /// <summary>
+        /// Gets a float, int, or bool as a double.
+        /// </summary>
+        public static double ExtractAsDouble(PyObject var)
         {
-            var rightFloat = var as PyFloat;
-            if (rightFloat != null)
-            {
-                return rightFloat.InternalValue;
-            }
-
-            var rightInt = var as PyInteger;
-            if (rightInt != null)
-            {
-                return (decimal) rightInt.InternalValue;
-            }
-
-            var rightBool = var as PyBool;
-            if (rightBool != null)
-            {
-                return rightBool.InternalValue ? (decimal) 1.0 : (decimal) 0.0;
-            }
-
-            var rightStr = var as PyString;
-            if (rightStr != null)
-            {
-                return Decimal.Parse(rightStr.InternalValue);
-            }
-
-            else
+            double asDouble;
+            if(!NumberCoercion.TryGetDouble(var, out asDouble))
             {
                 throw new InvalidCastException("TypeError: could not convert " + var + " to a floating-point type.");
             }
+            return asDouble;
         }
 
-        private static void castOperands(PyObject self, PyObject other, out PyFloat selfOut, out PyFloat otherOut, string operation)
+        private static void castOperands(PyObject self, PyObject other, out double selfOut, out double otherOut, string operation)
         {
-            selfOut = self as PyFloat;
-            if (selfOut == null)
+            var selfFloat = self as PyFloat;
+            if (selfFloat == null)
             {
                 throw new Exception("Tried to use a non-PyFloat for lvalue of: " + operation);
             }
+            selfOut = selfFloat.InternalValue;
+            otherOut = NumberCoercion.ToDouble(other, operation);
+        }
 
-            var rightFloat = other as PyFloat;
-            if (rightFloat != null)
-            {
-                otherOut = rightFloat;
-                return;
-            }
-
-            var rightInt = other as PyInteger;
-            if (rightInt != null)
-            {
-                otherOut = PyFloat.Create((decimal)rightInt.InternalValue);
-                return;
-            }
-
-            var rightBool = other as PyBool;
-            if (rightBool != null)
-            {
-                otherOut = PyFloat.Create(rightBool.InternalValue ? 1.0 : 0.0);
-                return;
-            }
-
-            var rightStr = other as PyString;
-            if (rightStr != null)
-            {
-                otherOut = PyFloat.Create(Decimal.Parse(rightStr.InternalValue));
-                return;
-            }
-
-            else
+        private static void checkDivisor(double divisor, string operation)
+        {
+            // Doubles would happily make infinity here, but Python raises instead.
+            if(divisor == 0.0)
             {
-                throw new Exception("TypeError: unsupported operand(s) for " + operation + " 'float' and '" + other.__class__.Name + "'");
+                throw new DivideByZeroException("float " + operation + " by zero");
             }
         }
 
         [ClassMember]
         public static PyObject __add__(PyObject self, PyObject other)
         {
-            PyFloat a, b;
+            double a, b;
             castOperands(self, other, out a, out b, "addition");
-            var newPyFloat = PyFloat.Create(a.InternalValue + b.InternalValue);
+            var newPyFloat = PyFloat.Create(a + b);
             return newPyFloat;
         }
 
         [ClassMember]
         public static PyObject __mul__(PyObject self, PyObject other)
         {
-            PyFloat a, b;
+            double a, b;
             castOperands(self, other, out a, out b, "multiplication");
-            var newPyFloat = PyFloat.Create(a.InternalValue * b.InternalValue);
+            var newPyFloat = PyFloat.Create(a * b);
             return newPyFloat;
         }
 
         [ClassMember]
         public static PyObject __sub__(PyObject self, PyObject other)
         {
-            PyFloat a, b;
+            double a, b;
             castOperands(self, other, out a, out b, "subtract");
-            var newPyFloat = PyFloat.Create(a.InternalValue - b.InternalValue);
+            var newPyFloat = PyFloat.Create(a - b);
             return newPyFloat;
         }
 
         [ClassMember]
         public static PyObject __truediv__(PyObject self, PyObject other)
         {
-            PyFloat a, b;
+            double a, b;
             castOperands(self, other, out a, out b, "division");
-            var newPyFloat = PyFloat.Create(a.InternalValue / b.InternalValue);
+            checkDivisor(b, "division");
+            var newPyFloat = PyFloat.Create(a / b);
             return newPyFloat;
         }
 
         [ClassMember]
         public static PyObject __floordiv__(PyObject self, PyObject other)
         {
-            PyFloat a, b;
+            double a, b;
             castOperands(self, other, out a, out b, "floor division");
-            var newPyInteger = PyFloat.Create(Math.Floor(a.InternalValue / b.InternalValue));
+            checkDivisor(b, "floor division");
+            var newPyInteger = PyFloat.Create(Math.Floor(a / b));
             return newPyInteger;
         }
         
         [ClassMember]
         public static PyObject __mod__(PyObject self, PyObject other)
         {
-            PyFloat a, b;
+            double a, b;
             castOperands(self, other, out a, out b, "modulo");
-            var newPyInteger = PyFloat.Create(a.InternalValue % b.InternalValue);
-            return newPyInteger;
+            checkDivisor(b, "modulo");
+
+            // Python's modulo takes the sign of the divisor where .NET's takes the sign of the dividend.
+            double mod = a % b;
+            if(mod != 0.0 && (mod < 0.0) != (b < 0.0))
+            {
+                mod += b;
+            }
+            return PyFloat.Create(mod);
         }
 
         [ClassMember]
         public static PyObject __pow__(PyObject self, PyObject other)
         {
-            PyFloat a, b;
+            double a, b;
             castOperands(self, other, out a, out b, "exponent");
-            double doubleExp = Math.Pow((double)a.InternalValue, (double)b.InternalValue);
+            double doubleExp = Math.Pow(a, b);
             var newPyFloat = PyFloat.Create(doubleExp);
             return newPyFloat;
         }
@@ -172,57 +142,57 @@ namespace LanguageImplementation.DataTypes
         [ClassMember]
         public static PyBool __lt__(PyObject self, PyObject other)
         {
-            PyFloat a, b;
+            double a, b;
             castOperands(self, other, out a, out b, "less-than");
-            return a.InternalValue < b.InternalValue;
+            return a < b;
         }
 
         [ClassMember]
         public static PyBool __gt__(PyObject self, PyObject other)
         {
-            PyFloat a, b;
+            double a, b;
             castOperands(self, other, out a, out b, "greater-than");
-            return a.InternalValue > b.InternalValue;
+            return a > b;
         }
 
         [ClassMember]
         public static PyBool __le__(PyObject self, PyObject other)
         {
-            PyFloat a, b;
+            double a, b;
             castOperands(self, other, out a, out b, "less-than-equal");
-            return a.InternalValue <= b.InternalValue;
+            return a <= b;
         }
 
         [ClassMember]
         public static PyBool __ge__(PyObject self, PyObject other)
         {
-            PyFloat a, b;
+            double a, b;
             castOperands(self, other, out a, out b, "greater-than-equal");
-            return a.InternalValue >= b.InternalValue;
+            return a >= b;
         }
 
         [ClassMember]
         public static PyBool __eq__(PyObject self, PyObject other)
         {
-            PyFloat a, b;
+            double a, b;
             castOperands(self, other, out a, out b, "equality");
-            return a.InternalValue == b.InternalValue;
+            return a == b;
         }
 
         [ClassMember]
         public static PyBool __ne__(PyObject self, PyObject other)
         {
-            PyFloat a, b;
+            double a, b;
             castOperands(self, other, out a, out b, "non-equality");
-            return a.InternalValue != b.InternalValue;
+            return a != b;
         }
 
         [ClassMember]
         public static PyBool __ltgt__(PyObject self, PyObject other)
         {
-            PyFloat a, b;
+            double a, b;
             castOperands(self, other, out a, out b, "less-than-greater-than");
-            return a.InternalValue < b.InternalValue && a.InternalValue > b.InternalValue;
+            return a < b && a > b;
         }
 
         [ClassMember]
@@ -240,20 +210,20 @@ namespace LanguageImplementation.DataTypes
 
     public class PyFloat : PyObject
     {
-        public Decimal InternalValue;
+        public double InternalValue;
         public PyFloat(Decimal num) : base(PyFloatClass.Instance)
         {
-            InternalValue = num;
+            InternalValue = (double) num;
         }
 
         public PyFloat(double num) : base(PyFloatClass.Instance)
         {
-            InternalValue = new Decimal(num);
+            InternalValue = num;
         }
 
         public PyFloat()
         {
-            InternalValue = 0;
+            InternalValue = 0.0;
         }
 
         public static PyFloat Create()
@@ -263,15 +233,13 @@ namespace LanguageImplementation.DataTypes
 
         public static PyFloat Create(Decimal value)
         {
-            var pyFloat = PyTypeObject.DefaultNew<PyFloat>(PyFloatClass.Instance);
-            pyFloat.InternalValue = value;
-            return pyFloat;
+            return Create((double) value);
         }
 
         public static PyFloat Create(double value)
         {
             var pyFloat = PyTypeObject.DefaultNew<PyFloat>(PyFloatClass.Instance);
-            pyFloat.InternalValue = new Decimal(value);
+            pyFloat.InternalValue = value;
             return pyFloat;
         }
 
@@ -293,9 +261,101 @@ namespace LanguageImplementation.DataTypes
             return InternalValue.GetHashCode();
         }
 
+        /// <summary>
+        /// Formats the float the way Python's repr does: the shortest digits that read back as the same double, with
+        /// a ".0" on whole numbers and scientific notation once the exponent gets below -4 or up to 16.
+        /// </summary>
         public override string ToString()
         {
-            return InternalValue.ToString();
+            if(double.IsNaN(InternalValue))
+            {
+                return "nan";
+            }
+            else if(double.IsInfinity(InternalValue))
+            {
+                return InternalValue > 0 ? "inf" : "-inf";
+            }
+            else if(InternalValue == 0.0)
+            {
+                // Checking the sign bit since -0.0 == 0.0.
+                return BitConverter.DoubleToInt64Bits(InternalValue) < 0 ? "-0.0" : "0.0";
+            }
+
+            // "R" is supposed to round-trip, but some versions of .NET get it wrong for a few values. G17 always does.
+            string roundTrip = InternalValue.ToString("R", CultureInfo.InvariantCulture);
+            if(double.Parse(roundTrip, CultureInfo.InvariantCulture) != InternalValue)
+            {
+                roundTrip = InternalValue.ToString("G17", CultureInfo.InvariantCulture);
+            }
+
+            bool negative = roundTrip[0] == '-';
+            if(negative)
+            {
+                roundTrip = roundTrip.Substring(1);
+            }
+
+            int exponent = 0;
+            int ePos = roundTrip.IndexOfAny(new char[] { 'E', 'e' });
+            if(ePos >= 0)
+            {
+                exponent = int.Parse(roundTrip.Substring(ePos + 1), CultureInfo.InvariantCulture);
+                roundTrip = roundTrip.Substring(0, ePos);
+            }
+
+            // Boil it down to a string of significant digits and where the decimal point goes in them.
+            string digits = roundTrip;
+            int pointPos = roundTrip.Length;
+            int dotPos = roundTrip.IndexOf('.');
+            if(dotPos >= 0)
+            {
+                digits = roundTrip.Remove(dotPos, 1);
+                pointPos = dotPos;
+            }
+            int leadingZeros = 0;
+            while(leadingZeros < digits.Length - 1 && digits[leadingZeros] == '0')
+            {
+                ++leadingZeros;
+            }
+            digits = digits.Substring(leadingZeros).TrimEnd('0');
+            pointPos += exponent - leadingZeros;
+
+            var builder = new StringBuilder();
+            if(negative)
+            {
+                builder.Append('-');
+            }
+
+            int sciExponent = pointPos - 1;
+            if(sciExponent < -4 || sciExponent >= 16)
+            {
+                builder.Append(digits[0]);
+                if(digits.Length > 1)
+                {
+                    builder.Append('.');
+                    builder.Append(digits, 1, digits.Length - 1);
+                }
+                builder.Append(sciExponent < 0 ? "e-" : "e+");
+                builder.Append(Math.Abs(sciExponent).ToString("00", CultureInfo.InvariantCulture));
+            }
+            else if(pointPos <= 0)
+            {
+                builder.Append("0.");
+                builder.Append('0', -pointPos);
+                builder.Append(digits);
+            }
+            else if(pointPos >= digits.Length)
+            {
+                builder.Append(digits);
+                builder.Append('0', pointPos - digits.Length);
+                builder.Append(".0");
+            }
+            else
+            {
+                builder.Append(digits, 0, pointPos);
+                builder.Append('.');
+                builder.Append(digits, pointPos, digits.Length - pointPos);
+            }
+            return builder.ToString();
         }
 
         #region Cast Conversions
@@ -309,15 +369,15 @@ namespace LanguageImplementation.DataTypes
         public static explicit operator ulong(PyFloat pyfloat) => (ulong)pyfloat.InternalValue;
         public static explicit operator BigInteger(PyFloat pyfloat) => (BigInteger)pyfloat.InternalValue;
         public static explicit operator float(PyFloat pyfloat) => (float)pyfloat.InternalValue;
-        public static explicit operator double(PyFloat pyfloat) => (double)pyfloat.InternalValue;
-        public static explicit operator decimal(PyFloat pyfloat) => pyfloat.InternalValue;
+        public static explicit operator double(PyFloat pyfloat) => pyfloat.InternalValue;
+        public static explicit operator decimal(PyFloat pyfloat) => (decimal)pyfloat.InternalValue;
         public static explicit operator bool(PyFloat pyfloat)
         {
-            if (pyfloat.InternalValue == 1.0m)
+            if (pyfloat.InternalValue == 1.0)
             {
                 return true;
             }
-            else if (pyfloat.InternalValue == 0.0m)
+            else if (pyfloat.InternalValue == 0.0)
             {
                 return false;
             }
@@ -31,26 +31,105 @@ namespace LanguageImplementation.DataTypes
             }
         }
 
-        // TODO [INTEGERS WITH FLOATS] Handle mixing of PyFloat and PyInteger(PyBool?) with basic arithmetic operators; 2 - 1.0 shouldn't fail.
+        // Bools mix in as 0 and 1. Floats are handled before this by handing the whole operation to PyFloatClass.
         private static void castOperands(PyObject self, PyObject other, out PyInteger selfOut, out PyInteger otherOut, string operation)
         {
-            selfOut = self as PyInteger;
-            otherOut = other as PyInteger;
-            if (selfOut == null)
+            if (!NumberCoercion.TryGetInteger(self, out selfOut))
             {
                 throw new Exception("Tried to use a non-PyInteger for lvalue of: " + operation);
             }
-            if (otherOut == null)
+            if (!NumberCoercion.TryGetInteger(other, out otherOut))
             {
                 throw new Exception("Tried to use a non-PyInteger for rvalue of: " + operation);
             }
         }
 
+        // An int mixed with a float gets done as a float.
+        private static PyFloat promoteToFloat(PyObject self)
+        {
+            return PyFloat.Create(PyFloatClass.ExtractAsDouble(self));
+        }
+
+        private static bool tryMultiply(long a, long b, out long product)
+        {
+            try
+            {
+                product = checked(a * b);
+                return true;
+            }
+            catch(OverflowException)
+            {
+                product = 0;
+                return false;
+            }
+        }
+
+        // Exponentiation by squaring that gives up as soon as anything stops fitting in a long.
+        private static bool tryPow(long baseValue, long exponent, out long power)
+        {
+            power = 1;
+            while(exponent > 0)
+            {
+                if((exponent & 1) != 0 && !tryMultiply(power, baseValue, out power))
+                {
+                    return false;
+                }
+                exponent >>= 1;
+                if(exponent > 0 && !tryMultiply(baseValue, baseValue, out baseValue))
+                {
+                    return false;
+                }
+            }
+            return true;
+        }
+
+        // Python rounds the quotient toward negative infinity, so the remainder takes the divisor's sign. C# rounds
+        // toward zero. The two only disagree when there's a remainder and the operands have different signs.
+        private static long floorDivide(long a, long b, out long remainder)
+        {
+            long quotient = a / b;
+            remainder = a % b;
+            if(remainder != 0 && (remainder < 0) != (b < 0))
+            {
+                quotient -= 1;
+                remainder += b;
+            }
+            return quotient;
+        }
+
+        private static BigInteger floorDivide(BigInteger a, BigInteger b, out BigInteger remainder)
+        {
+            if(b.IsZero)
+            {
+                throw new DivideByZeroException("integer division or modulo by zero");
+            }
+            var quotient = BigInteger.DivRem(a, b, out remainder);
+            if(!remainder.IsZero && (remainder.Sign < 0) != (b.Sign < 0))
+            {
+                quotient -= 1;
+                remainder += b;
+            }
+            return quotient;
+        }
+
         [ClassMember]
         public static PyObject __add__(PyObject self, PyObject other)
         {
+            if(other is PyFloat)
+            {
+                return PyFloatClass.__add__(promoteToFloat(self), other);
+            }
             PyInteger a, b;
             castOperands(self, other, out a, out b, "addition");
+            if(a.IsSmall && b.IsSmall)
+            {
+                long sum = unchecked(a.SmallValue + b.SmallValue);
+                // It overflowed if both operands have the same sign and the sum has the other one.
+                if(((a.SmallValue ^ sum) & (b.SmallValue ^ sum)) >= 0)
+                {
+                    return PyInteger.Create(sum);
+                }
+            }
             var newPyInteger = PyInteger.Create(a.InternalValue + b.InternalValue);
             return newPyInteger;
         }
@@ -58,8 +137,20 @@ namespace LanguageImplementation.DataTypes
         [ClassMember]
         public static PyObject __mul__(PyObject self, PyObject other)
         {
+            if(other is PyFloat)
+            {
+                return PyFloatClass.__mul__(promoteToFloat(self), other);
+            }
             PyInteger a, b;
             castOperands(self, other, out a, out b, "multiplication");
+            if(a.IsSmall && b.IsSmall)
+            {
+                long product;
+                if(tryMultiply(a.SmallValue, b.SmallValue, out product))
+                {
+                    return PyInteger.Create(product);
+                }
+            }
             var newPyInteger = PyInteger.Create(a.InternalValue * b.InternalValue);
             return newPyInteger;
         }
@@ -67,19 +158,57 @@ namespace LanguageImplementation.DataTypes
         [ClassMember]
         public static PyObject __pow__(PyObject self, PyObject other)
         {
+            if(other is PyFloat)
+            {
+                return PyFloatClass.__pow__(promoteToFloat(self), other);
+            }
             PyInteger a, b;
             castOperands(self, other, out a, out b, "exponent");
-            double doubleExp = Math.Pow((double) a.InternalValue, (double) b.InternalValue);
-            var newPyInteger = PyInteger.Create((BigInteger) doubleExp);
-            return newPyInteger;
+
+            // A negative exponent makes a float, like in Python.
+            if(b.InternalValue.Sign < 0)
+            {
+                if(a.InternalValue.IsZero)
+                {
+                    throw new DivideByZeroException("0 cannot be raised to a negative power");
+                }
+                return PyFloat.Create(Math.Pow((double) a, (double) b));
+            }
+
+            if(a.IsSmall && b.IsSmall)
+            {
+                long power;
+                if(tryPow(a.SmallValue, b.SmallValue, out power))
+                {
+                    return PyInteger.Create(power);
+                }
+            }
+
+            if(b.InternalValue > int.MaxValue)
+            {
+                throw new Exception("Exponent too large for integer exponentiation: " + b.InternalValue);
+            }
+            return PyInteger.Create(BigInteger.Pow(a.InternalValue, (int) b.InternalValue));
         }
 
         [ClassMember]
         public static PyObject __sub__(PyObject self, PyObject other)
         {
-            // TODO [INTEGERS WITH FLOATS] Handle mixing of PyFloat and PyInteger(PyBool?) with basic arithmetic operators; 2 - 1.0 shouldn't fail.
+            if(other is PyFloat)
+            {
+                return PyFloatClass.__sub__(promoteToFloat(self), other);
+            }
             PyInteger a, b;
             castOperands(self, other, out a, out b, "subtraction");
+            if(a.IsSmall && b.IsSmall)
+            {
+                long difference = unchecked(a.SmallValue - b.SmallValue);
+                // It overflowed if the operands have different signs and the result doesn't have the first one's.
+                if(((a.SmallValue ^ b.SmallValue) & (a.SmallValue ^ difference)) >= 0)
+                {
+                    return PyInteger.Create(difference);
+                }
+            }
             var newPyInteger = PyInteger.Create(a.InternalValue - b.InternalValue);
             return newPyInteger;
         }
@@ -87,28 +216,57 @@ namespace LanguageImplementation.DataTypes
         [ClassMember]
         public static PyObject __truediv__(PyObject self, PyObject other)
         {
+            if(other is PyFloat)
+            {
+                return PyFloatClass.__truediv__(promoteToFloat(self), other);
+            }
             PyInteger a, b;
             castOperands(self, other, out a, out b, "true division");
-            var newPyFloat = PyFloat.Create(((Decimal) a.InternalValue) / ((Decimal) b.InternalValue));
+            if(b.InternalValue.IsZero)
+            {
+                throw new DivideByZeroException("division by zero");
+            }
+            var newPyFloat = PyFloat.Create((double) a / (double) b);
             return newPyFloat;
         }
 
         [ClassMember]
         public static PyObject __floordiv__(PyObject self, PyObject other)
         {
+            if(other is PyFloat)
+            {
+                return PyFloatClass.__floordiv__(promoteToFloat(self), other);
+            }
             PyInteger a, b;
             castOperands(self, other, out a, out b, "floor division");
-            var newPyInteger = PyInteger.Create(a.InternalValue / b.InternalValue);
+            if(a.IsSmall && b.IsSmall && b.SmallValue != 0 && b.SmallValue != -1)
+            {
+                long smallRemainder;
+                return PyInteger.Create(floorDivide(a.SmallValue, b.SmallValue, out smallRemainder));
+            }
+            BigInteger remainder;
+            var newPyInteger = PyInteger.Create(floorDivide(a.InternalValue, b.InternalValue, out remainder));
             return newPyInteger;
         }
 
         [ClassMember]
         public static PyObject __mod__(PyObject self, PyObject other)
         {
+            if(other is PyFloat)
+            {
+                return PyFloatClass.__mod__(promoteToFloat(self), other);
+            }
             PyInteger a, b;
             castOperands(self, other, out a, out b, "modulo");
-            var newPyInteger = PyInteger.Create(a.InternalValue % b.InternalValue);
-            return newPyInteger;
+            if(a.IsSmall && b.IsSmall && b.SmallValue != 0 && b.SmallValue != -1)
+            {
+                long smallRemainder;
+                floorDivide(a.SmallValue, b.SmallValue, out smallRemainder);
+                return PyInteger.Create(smallRemainder);
+            }
+            BigInteger remainder;
+            floorDivide(a.InternalValue, b.InternalValue, out remainder);
+            return PyInteger.Create(remainder);
         }
 
         [ClassMember]
@@ -158,54 +316,106 @@ namespace LanguageImplementation.DataTypes
         [ClassMember]
         public static PyBool __lt__(PyObject self, PyObject other)
         {
+            if(other is PyFloat)
+            {
+                return PyFloatClass.__lt__(promoteToFloat(self), other);
+            }
             PyInteger a, b;
             castOperands(self, other, out a, out b, "less-than");
+            if(a.IsSmall && b.IsSmall)
+            {
+                return a.SmallValue < b.SmallValue;
+            }
             return a.InternalValue < b.InternalValue;
         }
 
         [ClassMember]
         public static PyBool __gt__(PyObject self, PyObject other)
         {
+            if(other is PyFloat)
+            {
+                return PyFloatClass.__gt__(promoteToFloat(self), other);
+            }
             PyInteger a, b;
             castOperands(self, other, out a, out b, "greater-than");
+            if(a.IsSmall && b.IsSmall)
+            {
+                return a.SmallValue > b.SmallValue;
+            }
             return a.InternalValue > b.InternalValue;
         }
 
         [ClassMember]
         public static PyBool __le__(PyObject self, PyObject other)
         {
+            if(other is PyFloat)
+            {
+                return PyFloatClass.__le__(promoteToFloat(self), other);
+            }
             PyInteger a, b;
             castOperands(self, other, out a, out b, "less-than-equal");
+            if(a.IsSmall && b.IsSmall)
+            {
+                return a.SmallValue <= b.SmallValue;
+            }
             return a.InternalValue <= b.InternalValue;
         }
 
         [ClassMember]
         public static PyBool __ge__(PyObject self, PyObject other)
         {
+            if(other is PyFloat)
+            {
+                return PyFloatClass.__ge__(promoteToFloat(self), other);
+            }
             PyInteger a, b;
             castOperands(self, other, out a, out b, "greater-than-equal");
+            if(a.IsSmall && b.IsSmall)
+            {
+                return a.SmallValue >= b.SmallValue;
+            }
             return a.InternalValue >= b.InternalValue;
         }
 
         [ClassMember]
         public static PyBool __eq__(PyObject self, PyObject other)
         {
+            if(other is PyFloat)
+            {
+                return PyFloatClass.__eq__(promoteToFloat(self), other);
+            }
             PyInteger a, b;
             castOperands(self, other, out a, out b, "equality");
+            if(a.IsSmall && b.IsSmall)
+            {
+                return a.SmallValue == b.SmallValue;
+            }
             return a.InternalValue == b.InternalValue;
         }
 
         [ClassMember]
         public static PyBool __ne__(PyObject self, PyObject other)
         {
+            if(other is PyFloat)
+            {
+                return PyFloatClass.__ne__(promoteToFloat(self), other);
+            }
             PyInteger a, b;
             castOperands(self, other, out a, out b, "non-equality");
+            if(a.IsSmall && b.IsSmall)
+            {
+                return a.SmallValue != b.SmallValue;
+            }
             return a.InternalValue != b.InternalValue;
         }
 
         [ClassMember]
         public static PyBool __ltgt__(PyObject self, PyObject other)
         {
+            if(other is PyFloat)
+            {
+                return PyFloatClass.__ltgt__(promoteToFloat(self), other);
+            }
             PyInteger a, b;
             castOperands(self, other, out a, out b, "less-than-greater-than");
             return a.InternalValue < b.InternalValue && a.InternalValue > b.InternalValue;
@@ -226,13 +436,78 @@ namespace LanguageImplementation.DataTypes
         [ClassMember]
         public static PyInteger __neg__(PyObject self)
         {
-            return PyInteger.Create(-((PyInteger)self).InternalValue);
+            var asInt = (PyInteger)self;
+            if(asInt.IsSmall && asInt.SmallValue != long.MinValue)
+            {
+                return PyInteger.Create(-asInt.SmallValue);
+            }
+            return PyInteger.Create(-asInt.InternalValue);
         }
     }
 
     public class PyInteger : PyObject
     {
-        public BigInteger InternalValue;
+        // Small ints come up constantly as loop counters and indexes, so Create hands out shared instances for these
+        // instead of making a new object every time.
+        private const int SmallIntMin = -5;
+        private const int SmallIntMax = 1024;
+        private static readonly PyInteger[] smallInts = new PyInteger[SmallIntMax - SmallIntMin + 1];
+
+        // Values that fit in a long are kept in smallValue and everything else goes to bigValue. A value is always
+        // stored the one way, so two PyIntegers with the same value are both small or both big.
+        private long smallValue;
+        private BigInteger bigValue;
+        private bool isBig;
+
+        /// <summary>
+        /// The integer's value. Create can hand out shared instances for small values, so only set this on an integer
+        /// that was created on its own (like one from DefaultNew).
+        /// </summary>
+        public BigInteger InternalValue
+        {
+            get
+            {
+                return isBig ? bigValue : smallValue;
+            }
+            set
+            {
+                if(value >= long.MinValue && value <= long.MaxValue)
+                {
+                    smallValue = (long) value;
+                    bigValue = BigInteger.Zero;
+                    isBig = false;
+                }
+                else
+                {
+                    smallValue = 0;
+                    bigValue = value;
+                    isBig = true;
+                }
+            }
+        }
+
+        /// <summary>
+        /// True if the value fits in a long, in which case SmallValue has it.
+        /// </summary>
+        public bool IsSmall
+        {
+            get
+            {
+                return !isBig;
+            }
+        }
+
+        /// <summary>
+        /// The value as a long. Only meaningful when IsSmall is true.
+        /// </summary>
+        public long SmallValue
+        {
+            get
+            {
+                return smallValue;
+            }
+        }
+
         public PyInteger(BigInteger num) : base(PyIntegerClass.Instance)
         {
             InternalValue = num;
@@ -240,7 +515,7 @@ namespace LanguageImplementation.DataTypes
 
         public PyInteger()
         {
-            InternalValue = 0;
+            smallValue = 0;
         }
 
         public static PyInteger Create()
@@ -248,8 +523,34 @@ namespace LanguageImplementation.DataTypes
             return PyTypeObject.DefaultNew<PyInteger>(PyIntegerClass.Instance);
         }
 
+        public static PyInteger Create(long value)
+        {
+            if(value >= SmallIntMin && value <= SmallIntMax)
+            {
+                // Two threads racing here can each make their own instance. That's fine since ints compare by value.
+                int cacheIdx = (int) value - SmallIntMin;
+                var cached = smallInts[cacheIdx];
+                if(cached == null)
+                {
+                    cached = PyTypeObject.DefaultNew<PyInteger>(PyIntegerClass.Instance);
+                    cached.smallValue = value;
+                    smallInts[cacheIdx] = cached;
+                }
+                return cached;
+            }
+
+            var pyInt = PyTypeObject.DefaultNew<PyInteger>(PyIntegerClass.Instance);
+            pyInt.smallValue = value;
+            return pyInt;
+        }
+
         public static PyInteger Create(BigInteger value)
         {
+            if(value >= long.MinValue && value <= long.MaxValue)
+            {
+                return Create((long) value);
+            }
+
             var pyInt = PyTypeObject.DefaultNew<PyInteger>(PyIntegerClass.Instance);
             pyInt.InternalValue = value;
             return pyInt;
@@ -264,18 +565,22 @@ namespace LanguageImplementation.DataTypes
             }
             else
             {
+                if(!isBig && !asPyInt.isBig)
+                {
+                    return asPyInt.smallValue == smallValue;
+                }
                 return asPyInt.InternalValue == InternalValue;
             }
         }
 
         public override int GetHashCode()
         {
-            return InternalValue.GetHashCode();
+            return isBig ? bigValue.GetHashCode() : smallValue.GetHashCode();
         }
 
         public override string ToString()
         {
-            return InternalValue.ToString();
+            return isBig ? bigValue.ToString() : smallValue.ToString();
         }
 
         #region Cast Conversions
@@ -284,13 +589,13 @@ namespace LanguageImplementation.DataTypes
         public static explicit operator byte(PyInteger pyint) => (byte)pyint.InternalValue;
         public static explicit operator short(PyInteger pyint) => (short)pyint.InternalValue;
         public static explicit operator ushort(PyInteger pyint) => (ushort)pyint.InternalValue;
-        public static explicit operator int(PyInteger pyint) => (int)pyint.InternalValue;
+        public static explicit operator int(PyInteger pyint) => pyint.isBig ? (int)pyint.bigValue : checked((int)pyint.smallValue);
         public static explicit operator uint(PyInteger pyint) => (uint)pyint.InternalValue;
-        public static explicit operator long(PyInteger pyint) => (long)pyint.InternalValue;
+        public static explicit operator long(PyInteger pyint) => pyint.isBig ? (long)pyint.bigValue : pyint.smallValue;
         public static explicit operator ulong(PyInteger pyint) => (ulong)pyint.InternalValue;
         public static explicit operator BigInteger(PyInteger pyint) => pyint.InternalValue;
         public static explicit operator float(PyInteger pyint) => (float)pyint.InternalValue;
-        public static explicit operator double(PyInteger pyint) => (double)pyint.InternalValue;
+        public static explicit operator double(PyInteger pyint) => pyint.isBig ? (double)pyint.bigValue : pyint.smallValue;
         public static explicit operator decimal(PyInteger pyint) => (decimal)pyint.InternalValue;
         public static explicit operator bool(PyInteger pyint)
         {
@@ -473,7 +473,7 @@ namespace LanguageImplementation.DataTypes
         }
     }
 
-    public class PyListIterator : PyObject, PyIterable
+    public class PyListIterator : PyObject, PyIterable, INativeIterator
     {
         public int CurrentIdx;
         public PyList IteratedList;
@@ -506,5 +506,26 @@ namespace LanguageImplementation.DataTypes
             }
 
         }
+
+        public bool IsNative
+        {
+            get
+            {
+                return true;
+            }
+        }
+
+        public bool TryNext(out object next)
+        {
+            if (CurrentIdx >= IteratedList.list.Count)
+            {
+                next = null;
+                return false;
+            }
+
+            next = IteratedList.list[CurrentIdx];
+            CurrentIdx += 1;
+            return true;
+        }
     }
 }
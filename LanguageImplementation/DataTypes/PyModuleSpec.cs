@@ -135,6 +135,16 @@ namespace LanguageImplementation.DataTypes
             }
         }
 
+        /// <summary>
+        /// The module being loaded from this spec. This isn't one of the spec's Python attributes. Loaders that run
+        /// the module's code create the module first and put it here. A circular import can then get the partly
+        /// initialized module, like it would from sys.modules in Python, instead of loading the module all over again.
+        /// </summary>
+        public PyModule Module
+        {
+            get; set;
+        }
+
         public PyModuleSpec() : base(PyModuleClass.Instance)
         {
         }
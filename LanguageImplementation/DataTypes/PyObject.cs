@@ -10,7 +10,26 @@ namespace LanguageImplementation.DataTypes
     public class PyObject
     {
         // TODO: Make map of string to PyObject
-        public Dictionary<string, object> __dict__;
+        // Only holds the attributes that belong to this particular instance. Class members stay in the class's
+        // __dict__ and are found through __class__. The dictionary is created the first time somebody asks for
+        // it so that the builtin value types (int, str, bool, ...) normally don't carry one at all.
+        private Dictionary<string, object> instanceDict;
+        public Dictionary<string, object> __dict__
+        {
+            get
+            {
+                if(instanceDict == null)
+                {
+                    instanceDict = new Dictionary<string, object>();
+                }
+                return instanceDict;
+            }
+            set
+            {
+                instanceDict = value;
+            }
+        }
+
         public PyClass __class__;
         public string __doc__;
         public IPyCallable __new__;
@@ -41,6 +60,17 @@ namespace LanguageImplementation.DataTypes
             return PyClass.__getattribute__(this, name);
         }
 
+        /// <summary>
+        /// Looks up an attribute like __getattribute__, but returns false instead of throwing if it's missing.
+        /// </summary>
+        /// <param name="name">The attribute name.</param>
+        /// <param name="value">The attribute, bound into a PyMethod if it's callable, or null if it wasn't found.</param>
+        /// <returns>True if the attribute was found.</returns>
+        public virtual bool TryGetAttribute(string name, out object value)
+        {
+            return PyClass.TryGetAttribute(this, name, out value);
+        }
+
         public void __setattr__(string name, object value)
         {
             PyClass.__setattr__(this, name, value);
@@ -58,14 +88,87 @@ namespace LanguageImplementation.DataTypes
 
         public PyObject()
         {
-            __dict__ = new Dictionary<string, object>();
         }
 
         public PyObject(PyTypeObject fromType)
         {
             // TODO: Determine if there needs to be additional properties.
-            __dict__ = fromType.__dict__;
-        }        
+            __class__ = fromType as PyClass;
+        }
+
+        /// <summary>
+        /// True if this object has its own attributes stored in its __dict__. This won't create the __dict__
+        /// if it doesn't exist yet.
+        /// </summary>
+        public bool HasInstanceDict
+        {
+            get
+            {
+                return instanceDict != null && instanceDict.Count > 0;
+            }
+        }
+
+        /// <summary>
+        /// Looks up an attribute in just the object's own attributes, without creating the attribute dictionary if
+        /// the object doesn't have one.
+        /// </summary>
+        /// <param name="name">The attribute name.</param>
+        /// <param name="value">The attribute that was found, or null if nothing was found.</param>
+        /// <returns>True if the object itself has the attribute.</returns>
+        public bool TryGetInstanceAttribute(string name, out object value)
+        {
+            if(instanceDict == null)
+            {
+                value = null;
+                return false;
+            }
+            return instanceDict.TryGetValue(name, out value);
+        }
+
+        /// <summary>
+        /// Looks up an attribute from the object's own attributes and then from its class hierarchy. Unlike
+        /// __getattribute__, callables are returned as-is instead of being bound into a PyMethod, so the caller
+        /// has to pass the object as the self argument itself. This doesn't throw if the attribute is missing.
+        /// </summary>
+        /// <param name="name">The attribute name.</param>
+        /// <param name="value">The attribute that was found, or null if nothing was found.</param>
+        /// <returns>True if the attribute was found.</returns>
+        public virtual bool TryGetUnboundAttribute(string name, out object value)
+        {
+            if(instanceDict != null && instanceDict.TryGetValue(name, out value))
+            {
+                return true;
+            }
+
+            if(__class__ == null)
+            {
+                value = null;
+                return false;
+            }
+
+            bool found;
+            value = PyClass.__getattribute__(__class__, name, out found);
+            return found;
+        }
+
+        /// <summary>
+        /// True if the attribute can be found on the object itself or its class hierarchy.
+        /// </summary>
+        public bool HasUnboundAttribute(string name)
+        {
+            object ignored;
+            return TryGetUnboundAttribute(name, out ignored);
+        }
+
+        /// <summary>
+        /// Fetches an attribute using TryGetUnboundAttribute, returning null if it was not found.
+        /// </summary>
+        public object GetUnboundAttribute(string name)
+        {
+            object value;
+            TryGetUnboundAttribute(name, out value);
+            return value;
+        }
 
         public Task<object> InvokeFromDict(IInterpreter interpreter, FrameContext context, string name, params PyObject[] args)
         {
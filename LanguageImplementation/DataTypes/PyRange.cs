@@ -106,22 +106,13 @@ namespace LanguageImplementation.DataTypes
         public static object __next__(FrameContext context, PyObject self)
         {
             var asIterator = self as PyRangeIterator;
-            if(asIterator.Step > 0 && asIterator.Current >= asIterator.Stop)
+            object next;
+            if(!asIterator.TryNext(out next))
             {
                 context.CurrentException = new StopIteration();
                 return null;
             }
-            else if (asIterator.Step < 0 && asIterator.Current <= asIterator.Stop)
-            {
-                context.CurrentException = new StopIteration();
-                return null;
-            }
-            else
-            {
-                var toReturn = PyInteger.Create(asIterator.Current);
-                asIterator.Current += asIterator.Step;
-                return toReturn;
-            }
+            return next;
         }
 
         [ClassMember]
@@ -131,7 +122,7 @@ namespace LanguageImplementation.DataTypes
         }
     }
 
-    public class PyRangeIterator : PyObject
+    public class PyRangeIterator : PyObject, INativeIterator
     {
         public int Start;
         public int Stop;
@@ -154,6 +145,27 @@ namespace LanguageImplementation.DataTypes
             return iterator;
         }
 
+        public bool IsNative
+        {
+            get
+            {
+                return true;
+            }
+        }
+
+        public bool TryNext(out object next)
+        {
+            if((Step > 0 && Current >= Stop) || (Step < 0 && Current <= Stop))
+            {
+                next = null;
+                return false;
+            }
+
+            next = PyInteger.Create(Current);
+            Current += Step;
+            return true;
+        }
+
         public static PyRangeIterator Create(int start, int stop, int step)
         {
             var iterator = PyTypeObject.DefaultNew<PyRangeIterator>(PyRangeIteratorClass.Instance);
@@ -476,7 +476,7 @@ namespace LanguageImplementation.DataTypes
         }
     }
 
-    public class PySetIterator : PyObject, PyIterable
+    public class PySetIterator : PyObject, PyIterable, INativeIterator
     {
         private IEnumerator<object> enumerator;
 
@@ -505,5 +505,25 @@ namespace LanguageImplementation.DataTypes
                 return asItr.enumerator.Current;
             }
         }
+
+        public bool IsNative
+        {
+            get
+            {
+                return true;
+            }
+        }
+
+        public bool TryNext(out object next)
+        {
+            if(!enumerator.MoveNext())
+            {
+                next = null;
+                return false;
+            }
+
+            next = enumerator.Current;
+            return true;
+        }
     }
 }
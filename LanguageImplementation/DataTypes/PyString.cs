@@ -100,7 +100,7 @@ namespace LanguageImplementation.DataTypes
                     if(otherObj != null)
                     {
                         // Try invoking __str__
-                        var callFunc = (IPyCallable)otherObj.__dict__["__str__"];
+                        var callFunc = (IPyCallable)otherObj.GetUnboundAttribute("__str__");
                         otherStr = (PyString) await callFunc.Call(interpreter, context, new object[] { otherObj });
                         b = otherStr.InternalValue;
                     }
@@ -316,6 +316,15 @@ namespace LanguageImplementation.DataTypes
             return PyInteger.Create(asStr.InternalValue.Length);
         }
 
+        [ClassMember]
+        //  __iter__(self, /)
+        //      Implement iter(self).
+        //
+        public static PyObject __iter__(PyObject self)
+        {
+            return PyStringIterator.Create((PyString)self);
+        }
+
         [ClassMember]
         //  capitalize(self, /)
         //      Return a capitalized version of the string.
@@ -1017,4 +1026,80 @@ namespace LanguageImplementation.DataTypes
             return asPyString.InternalValue;
         }
     }
+
+    public class PyStringIteratorClass : PyClass
+    {
+        private static PyStringIteratorClass __instance;
+
+        public static PyStringIteratorClass Instance
+        {
+            get
+            {
+                if (__instance == null)
+                {
+                    __instance = new PyStringIteratorClass(null);
+                }
+                return __instance;
+            }
+        }
+
+        public PyStringIteratorClass(PyFunction __init__) :
+            base("str_iterator", __init__, new PyClass[0])
+        {
+            __instance = this;
+
+            // TODO: Can this be better consolidated?
+            Expression<Action<PyTypeObject>> expr = instance => DefaultNew<PyStringIterator>(null);
+            var methodInfo = ((MethodCallExpression)expr.Body).Method;
+            __new__ = new WrappedCodeObject("__new__", methodInfo, this);
+        }
+
+        [ClassMember]
+        public static object __next__(FrameContext context, PyObject self)
+        {
+            var asIterator = self as PyStringIterator;
+            object next;
+            if (!asIterator.TryNext(out next))
+            {
+                context.CurrentException = new StopIteration();
+                return null;
+            }
+            return next;
+        }
+    }
+
+    public class PyStringIterator : PyObject, INativeIterator
+    {
+        public int CurrentIdx;
+        public PyString IteratedString;
+
+        public bool IsNative
+        {
+            get
+            {
+                return true;
+            }
+        }
+
+        public bool TryNext(out object next)
+        {
+            if (CurrentIdx >= IteratedString.InternalValue.Length)
+            {
+                next = null;
+                return false;
+            }
+
+            next = PyString.Create(IteratedString.InternalValue[CurrentIdx].ToString());
+            CurrentIdx += 1;
+            return true;
+        }
+
+        public static PyStringIterator Create(PyString str)
+        {
+            var iterator = PyTypeObject.DefaultNew<PyStringIterator>(PyStringIteratorClass.Instance);
+            iterator.CurrentIdx = 0;
+            iterator.IteratedString = str;
+            return iterator;
+        }
+    }
 }
@@ -5,6 +5,8 @@ using System.Threading.Tasks;
 using System.Linq;
 using System.Reflection;
 
+using LanguageImplementation.DataTypes.Exceptions;
+
 namespace LanguageImplementation.DataTypes
 {
     public class PySuperType : PyClass
@@ -35,11 +37,25 @@ namespace LanguageImplementation.DataTypes
         [ClassMember]
         public static new object __getattribute__(PyObject self, string name)
         {
-            var asPySuper = self as PySuper;
+            object returnAttr;
+            if(!TryGetAttribute((PySuper)self, name, out returnAttr))
+            {
+                throw new EscapedPyException(NoAttributeError(self, name));
+            }
+            return returnAttr;
+        }
 
+        /// <summary>
+        /// Looks up the attribute in the parent class like __getattribute__, but returns false if it's missing.
+        /// </summary>
+        public static bool TryGetAttribute(PySuper asPySuper, string name, out object returnAttr)
+        {
             // We can't use __getattribute__ to shovel out __this_class__ so we'll just hit the dict directly.
             var parentClass = asPySuper.__dict__["__this_class__"] as PyClass;
-            var returnAttr = parentClass.__getattribute__(name);
+            if(!parentClass.TryGetAttribute(name, out returnAttr))
+            {
+                return false;
+            }
 
             // Welcome to hacktown! If we got a PyMethod, we're going to swap out self for the one we want!
             // Note that this is not supposed to be a long-term thing. Heck, this shouldn't even be in __getattribute__.
@@ -48,9 +64,8 @@ namespace LanguageImplementation.DataTypes
             if(asMethod != null)
             {
                 asMethod.selfHandle = asPySuper.__dict__["__self__"] as PyObject;
-                return asMethod;
             }
-            return returnAttr;
+            return true;
         }
     }
 
@@ -75,6 +90,11 @@ namespace LanguageImplementation.DataTypes
             return PySuperType.__getattribute__(this, name);
         }
 
+        public override bool TryGetAttribute(string name, out object value)
+        {
+            return PySuperType.TryGetAttribute(this, name, out value);
+        }
+
         public static PySuper Create(PyObject self, PyClass superclass)
         {
             var instance = PyTypeObject.DefaultNew<PySuper>(PySuperType.Instance);
@@ -47,6 +47,12 @@
             this.Next = next;
             this.Frame = frame;
             this.LineNumber = line_number;
+
+            // tb_frame hangs on to the frame after it has returned, so it can't be reused.
+            if(frame != null)
+            {
+                frame.Pinned = true;
+            }
         }
 
         public string DumpStack()
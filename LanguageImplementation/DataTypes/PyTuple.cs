@@ -267,23 +267,42 @@ namespace LanguageImplementation.DataTypes
         public static object __next__(FrameContext context, PyObject self)
         {
             var asIterator = self as PyTupleIterator;
-            if (asIterator.CurrentIdx >= asIterator.IteratedTuple.Values.Length)
+            object next;
+            if (!asIterator.TryNext(out next))
             {
-                throw new StopIterationException();
-            }
-            else
-            {
-                asIterator.CurrentIdx += 1;
-                return PyTupleClass.__getitem__(context, asIterator.IteratedTuple, asIterator.CurrentIdx - 1);
+                context.CurrentException = new StopIteration();
+                return null;
             }
+            return next;
         }
     }
 
-    public class PyTupleIterator : PyObject
+    public class PyTupleIterator : PyObject, INativeIterator
     {
         public int CurrentIdx;
         public PyTuple IteratedTuple;
 
+        public bool IsNative
+        {
+            get
+            {
+                return true;
+            }
+        }
+
+        public bool TryNext(out object next)
+        {
+            if (CurrentIdx >= IteratedTuple.Values.Length)
+            {
+                next = null;
+                return false;
+            }
+
+            next = IteratedTuple.Values[CurrentIdx];
+            CurrentIdx += 1;
+            return true;
+        }
+
         public static PyTupleIterator Create(PyTuple tuple)
         {
             var iterator = PyTypeObject.DefaultNew<PyTupleIterator>(PyTupleIteratorClass.Instance);
@@ -33,8 +33,6 @@ namespace LanguageImplementation.DataTypes
         public static T DefaultNew<T>(PyTypeObject typeObj) where T : PyObject, new()
         {
             var newObject = new T();
-
-            // Shallow copy __dict__
             DefaultNewPyObject(newObject, typeObj);
             return newObject;
         }
@@ -52,9 +50,14 @@ namespace LanguageImplementation.DataTypes
             return DefaultNew<PyObject>(typeObj);
         }
 
+        /// <summary>
+        /// Associates a freshly-created object with its class. The class's __dict__ is not copied into the object;
+        /// attribute lookups fall back to the class through __class__ instead.
+        /// </summary>
+        /// <param name="toNew">The new object.</param>
+        /// <param name="classObj">The class the object is an instance of.</param>
         public static void DefaultNewPyObject(PyObject toNew, PyTypeObject classObj)
         {
-            toNew.__dict__ = new Dictionary<string, object>(classObj.__dict__);
             toNew.__class__ = (PyClass) classObj;
         }
 
@@ -49,7 +49,8 @@ namespace LanguageImplementation
                 ++lineCount;
 
                 var cursorBefore = cursor;
-                switch ((ByteCodes)code[cursor])
+                var instruction = code.Instructions[cursor];
+                switch (Instruction.GetGenericOpcode(instruction.Opcode))
                 {
                     case ByteCodes.UNARY_NOT:
                         disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor, "UNARY_NOT", null, null);
@@ -161,28 +162,28 @@ namespace LanguageImplementation
                         break;
                     case ByteCodes.LOAD_CONST:
                         cursor += 1;
-                        disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor-1, "LOAD_CONST", code.GetUShort(cursor), string.Format("({0})", codeObject.Constants[code.GetUShort(cursor)]));
+                        disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor-1, "LOAD_CONST", instruction.Operand, string.Format("({0})", codeObject.Constants[instruction.Operand]));
                         cursor += 2;
                         break;
                     case ByteCodes.LOAD_NAME:
                         cursor += 1;
-                        disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor-1, "LOAD_NAME", code.GetUShort(cursor), string.Format("({0})", codeObject.Names[code.GetUShort(cursor)]));
+                        disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor-1, "LOAD_NAME", instruction.Operand, string.Format("({0})", codeObject.Names[instruction.Operand]));
                         cursor += 2;
                         break;
                     case ByteCodes.LOAD_FAST:
                         cursor += 1;
-                        disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor-1, "LOAD_FAST", code.GetUShort(cursor), string.Format("({0})", codeObject.VarNames[code.GetUShort(cursor)]));
+                        disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor-1, "LOAD_FAST", instruction.Operand, string.Format("({0})", codeObject.VarNames[instruction.Operand]));
                         cursor += 2;
                         break;
                     case ByteCodes.LOAD_GLOBAL:
                         cursor += 1;
-                        disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor-1, "LOAD_GLOBAL", code.GetUShort(cursor), string.Format("({0})", codeObject.Names[code.GetUShort(cursor)]));
+                        disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor-1, "LOAD_GLOBAL", instruction.Operand, string.Format("({0})", codeObject.Names[instruction.Operand]));
                         cursor += 2;
                         break;
                     case ByteCodes.LOAD_DEREF:
                         {
                             cursor += 1;
-                            var nameOffset = code.GetUShort(cursor);
+                            var nameOffset = instruction.Operand;
                             string symbolName;
                             if(nameOffset < codeObject.CellNames.Count)
                             {
@@ -192,39 +193,39 @@ namespace LanguageImplementation
                             {
                                 symbolName = codeObject.FreeNames[nameOffset - codeObject.CellNames.Count];
                             }
-                            disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor - 1, "LOAD_DEREF", code.GetUShort(cursor), string.Format("({0})", symbolName));
+                            disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor - 1, "LOAD_DEREF", instruction.Operand, string.Format("({0})", symbolName));
                             cursor += 2;
                         }
                         break;
                     case ByteCodes.LOAD_ATTR:
                         cursor += 1;
-                        disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor-1, "LOAD_ATTR", code.GetUShort(cursor), string.Format("({0})", codeObject.Names[code.GetUShort(cursor)]));
+                        disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor-1, "LOAD_ATTR", instruction.Operand, string.Format("({0})", codeObject.Names[instruction.Operand]));
                         cursor += 2;
                         break;
                     case ByteCodes.STORE_NAME:
                         cursor += 1;
-                        disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor-1, "STORE_NAME", code.GetUShort(cursor), string.Format("({0})", codeObject.Names[code.GetUShort(cursor)]));
+                        disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor-1, "STORE_NAME", instruction.Operand, string.Format("({0})", codeObject.Names[instruction.Operand]));
                         cursor += 2;
                         break;
                     case ByteCodes.STORE_FAST:
                         cursor += 1;
-                        disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor-1, "STORE_FAST", code.GetUShort(cursor), string.Format("({0})", codeObject.VarNames[code.GetUShort(cursor)]));
+                        disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor-1, "STORE_FAST", instruction.Operand, string.Format("({0})", codeObject.VarNames[instruction.Operand]));
                         cursor += 2;
                         break;
                     case ByteCodes.STORE_ATTR:
                         cursor += 1;
-                        disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor-1, "STORE_ATTR", code.GetUShort(cursor), string.Format("({0})", codeObject.Names[code.GetUShort(cursor)]));
+                        disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor-1, "STORE_ATTR", instruction.Operand, string.Format("({0})", codeObject.Names[instruction.Operand]));
                         cursor += 2;
                         break;
                     case ByteCodes.STORE_GLOBAL:
                         cursor += 1;
-                        disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor-1, "STORE_GLOBAL", code.GetUShort(cursor), string.Format("({0})", codeObject.Names[code.GetUShort(cursor)]));
+                        disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor-1, "STORE_GLOBAL", instruction.Operand, string.Format("({0})", codeObject.Names[instruction.Operand]));
                         cursor += 2;
                         break;
                     case ByteCodes.STORE_DEREF:
                         {
                             cursor += 1;
-                            var nameOffset = code.GetUShort(cursor);
+                            var nameOffset = instruction.Operand;
                             string symbolName;
                             if (nameOffset < codeObject.CellNames.Count)
                             {
@@ -234,54 +235,54 @@ namespace LanguageImplementation
                             {
                                 symbolName = codeObject.FreeNames[nameOffset - codeObject.CellNames.Count];
                             }
-                            disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor - 1, "STORE_DEREF", code.GetUShort(cursor), string.Format("({0})", symbolName));
+                            disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor - 1, "STORE_DEREF", instruction.Operand, string.Format("({0})", symbolName));
                             cursor += 2;
                         }
                         break;
                     case ByteCodes.COMPARE_OP:
                         cursor += 1;
-                        disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor-1, "COMPARE_OP", code.GetUShort(cursor), string.Format("({0})", code[cursor]));
+                        disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor-1, "COMPARE_OP", instruction.Operand, string.Format("({0})", code[cursor]));
                         cursor += 2;
                         break;
                     case ByteCodes.JUMP_IF_FALSE:
                         cursor += 1;
-                        disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor-1, "JUMP_IF_FALSE", code.GetUShort(cursor), null);
+                        disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor-1, "JUMP_IF_FALSE", instruction.Operand, null);
                         cursor += 2;
                         break;
                     case ByteCodes.JUMP_IF_TRUE:
                         cursor += 1;
-                        disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor-1, "JUMP_IF_TRUE", code.GetUShort(cursor), null);
+                        disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor-1, "JUMP_IF_TRUE", instruction.Operand, null);
                         cursor += 2;
                         break;
                     case ByteCodes.POP_JUMP_IF_FALSE:
                         cursor += 1;
-                        disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor - 1, "POP_JUMP_IF_FALSE", code.GetUShort(cursor), null);
+                        disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor - 1, "POP_JUMP_IF_FALSE", instruction.Operand, null);
                         cursor += 2;
                         break;
                     case ByteCodes.POP_JUMP_IF_TRUE:
                         cursor += 1;
-                        disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor - 1, "POP_JUMP_IF_TRUE", code.GetUShort(cursor), null);
+                        disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor - 1, "POP_JUMP_IF_TRUE", instruction.Operand, null);
                         cursor += 2;
                         break;
                     case ByteCodes.JUMP_IF_FALSE_OR_POP:
                         cursor += 1;
-                        disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor - 1, "JUMP_IF_FALSE_OR_POP", code.GetUShort(cursor), null);
+                        disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor - 1, "JUMP_IF_FALSE_OR_POP", instruction.Operand, null);
                         cursor += 2;
                         break;
                     case ByteCodes.JUMP_IF_TRUE_OR_POP:
                         cursor += 1;
-                        disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor - 1, "JUMP_IF_TRUE_OR_POP", code.GetUShort(cursor), null);
+                        disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor - 1, "JUMP_IF_TRUE_OR_POP", instruction.Operand, null);
                         cursor += 2;
                         break;
                     case ByteCodes.UNPACK_SEQUENCE:
                         cursor += 1;
-                        disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor - 1, "UNPACK_SEQUENCE", code.GetUShort(cursor), null);
+                        disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor - 1, "UNPACK_SEQUENCE", instruction.Operand, null);
                         cursor += 2;
                         break;
                     case ByteCodes.SETUP_LOOP:
                         {
                             cursor += 1;
-                            var offset = code.GetUShort(cursor);
+                            var offset = instruction.Operand;
                             disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor-1, "SETUP_LOOP", offset, string.Format("(to {0})", cursor + 2 + offset));
                             cursor += 2;
                         }
@@ -292,7 +293,7 @@ namespace LanguageImplementation
                         break;
                     case ByteCodes.FOR_ITER:
                         cursor += 1;
-                        disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor - 1, "FOR_ITER", code.GetUShort(cursor), null);
+                        disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor - 1, "FOR_ITER", instruction.Operand, null);
                         cursor += 2;
                         break;
                     case ByteCodes.POP_BLOCK:
@@ -311,7 +312,7 @@ namespace LanguageImplementation
                     case ByteCodes.JUMP_ABSOLUTE:
                         {
                             cursor += 1;
-                            var target = code.GetUShort(cursor);
+                            var target = instruction.Operand;
                             disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor-1, "JUMP_ABSOLUTE", target, string.Format("(to {0})", target));
                             cursor += 2;
                         }
@@ -319,7 +320,7 @@ namespace LanguageImplementation
                     case ByteCodes.JUMP_FORWARD:
                         {
                             cursor += 1;
-                            var offset = code.GetUShort(cursor);
+                            var offset = instruction.Operand;
                             disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor-1, "JUMP_FORWARD", offset, string.Format("(to {0})", cursor + offset + 2));
                             cursor += 2;
                         }
@@ -338,7 +339,7 @@ namespace LanguageImplementation
                     case ByteCodes.MAKE_FUNCTION:
                         {
                             cursor += 1;
-                            var opcode = code.GetUShort(cursor);
+                            var opcode = instruction.Operand;
                             disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor-1, "MAKE_FUNCTION", opcode, null);
                             cursor += 2;
                         }
@@ -346,15 +347,28 @@ namespace LanguageImplementation
                     case ByteCodes.CALL_FUNCTION:
                         {
                             cursor += 1;
-                            var argCount = code.GetUShort(cursor);
+                            var argCount = instruction.Operand;
                             disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor - 1, "CALL_FUNCTION", argCount, null);
                             cursor += 2;
                         }
                         break;
+                    case ByteCodes.LOAD_METHOD:
+                        cursor += 1;
+                        disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor-1, "LOAD_METHOD", instruction.Operand, string.Format("({0})", codeObject.Names[instruction.Operand]));
+                        cursor += 2;
+                        break;
+                    case ByteCodes.CALL_METHOD:
+                        {
+                            cursor += 1;
+                            var argCount = instruction.Operand;
+                            disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor - 1, "CALL_METHOD", argCount, null);
+                            cursor += 2;
+                        }
+                        break;
                     case ByteCodes.CALL_FUNCTION_KW:
                         {
                             cursor += 1;
-                            var argCount = code.GetUShort(cursor);
+                            var argCount = instruction.Operand;
                             disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor - 1, "CALL_FUNCTION_KW", argCount, null);
                             cursor += 2;
                         }
@@ -366,7 +380,7 @@ namespace LanguageImplementation
                     case ByteCodes.BUILD_TUPLE:
                         {
                             cursor += 1;
-                            var tuple_size = code.GetUShort(cursor);
+                            var tuple_size = instruction.Operand;
                             disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor - 1, "BUILD_TUPLE", tuple_size, null);
                             cursor += 2;
                         }
@@ -374,7 +388,7 @@ namespace LanguageImplementation
                     case ByteCodes.BUILD_MAP:
                         {
                             cursor += 1;
-                            var dict_size = code.GetUShort(cursor);
+                            var dict_size = instruction.Operand;
                             disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor - 1, "BUILD_MAP", dict_size, null);
                             cursor += 2;
                         }
@@ -382,7 +396,7 @@ namespace LanguageImplementation
                     case ByteCodes.BUILD_SET:
                         {
                             cursor += 1;
-                            var set_size = code.GetUShort(cursor);
+                            var set_size = instruction.Operand;
                             disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor - 1, "BUILD_SET", set_size, null);
                             cursor += 2;
                         }
@@ -390,7 +404,7 @@ namespace LanguageImplementation
                     case ByteCodes.BUILD_CONST_KEY_MAP:
                         {
                             cursor += 1;
-                            var dict_size = code.GetUShort(cursor);
+                            var dict_size = instruction.Operand;
                             disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor - 1, "BUILD_CONST_KEY_MAP", dict_size, null);
                             cursor += 2;
                         }
@@ -398,14 +412,14 @@ namespace LanguageImplementation
                     case ByteCodes.BUILD_LIST:
                         {
                             cursor += 1;
-                            var list_size = code.GetUShort(cursor);
+                            var list_size = instruction.Operand;
                             disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor, "BUILD_LIST", list_size, null);
                             cursor += 2;
                         }
                         break;
                     case ByteCodes.LIST_APPEND:
                         cursor += 1;
-                        var stack_i = code.GetUShort(cursor);
+                        var stack_i = instruction.Operand;
                         disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor, "LIST_APPEND", stack_i, null);
                         cursor += 2;
                         break;
@@ -424,7 +438,7 @@ namespace LanguageImplementation
                     case ByteCodes.SETUP_EXCEPT:
                         {
                             cursor += 1;
-                            var offset = code.GetUShort(cursor);
+                            var offset = instruction.Operand;
                             disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor-1, "SETUP_EXCEPT", offset, string.Format("(to {0})", cursor + 2 + offset));
                             cursor += 2;
                         }
@@ -432,7 +446,7 @@ namespace LanguageImplementation
                     case ByteCodes.SETUP_FINALLY:
                         {
                             cursor += 1;
-                            var offset = code.GetUShort(cursor);
+                            var offset = instruction.Operand;
                             disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor - 1, "SETUP_FINALLY", offset, string.Format("(to {0})", cursor + 2 + offset));
                             cursor += 2;
                         }
@@ -440,7 +454,7 @@ namespace LanguageImplementation
                     case ByteCodes.RAISE_VARARGS:
                         {
                             cursor += 1;
-                            var opcode = code.GetUShort(cursor);
+                            var opcode = instruction.Operand;
                             disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor-1, "RAISE_VARARGS", opcode, null);
                             cursor += 2;
                         }
@@ -454,14 +468,14 @@ namespace LanguageImplementation
                     case ByteCodes.IMPORT_NAME:
                         {
                             cursor += 1;
-                            disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor - 1, "IMPORT_NAME", code.GetUShort(cursor), string.Format("({0})", codeObject.Names[code.GetUShort(cursor)]));
+                            disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor - 1, "IMPORT_NAME", instruction.Operand, string.Format("({0})", codeObject.Names[instruction.Operand]));
                             cursor += 2;
                             break;
                         }
                     case ByteCodes.IMPORT_FROM:
                         {
                             cursor += 1;
-                            disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor - 1, "IMPORT_FROM", code.GetUShort(cursor), string.Format("({0})", codeObject.Constants[code.GetUShort(cursor)]));
+                            disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor - 1, "IMPORT_FROM", instruction.Operand, string.Format("({0})", codeObject.Constants[instruction.Operand]));
                             cursor += 2;
                             break;
                         }
@@ -482,7 +496,7 @@ namespace LanguageImplementation
                     case ByteCodes.BUILD_SLICE:
                         {
                             cursor += 1;
-                            disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor - 1, "BUILD_SLICE", code.GetUShort(cursor), string.Format("({0})", codeObject.Constants[code.GetUShort(cursor)]));
+                            disassembly += disassembleLine(lastLineNumber, currentLineNumber, cursor - 1, "BUILD_SLICE", instruction.Operand, string.Format("({0})", codeObject.Constants[instruction.Operand]));
                             cursor += 2;
                             break;
                         }
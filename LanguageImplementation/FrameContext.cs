@@ -48,6 +48,8 @@ namespace LanguageImplementation
             Stack<Frame> reverseStack = new Stack<Frame>();
             foreach (var parentFrame in callStack)
             {
+                // The subcontext can outlive the calls these frames are for, so they can't be reused.
+                parentFrame.Pinned = true;
                 reverseStack.Push(parentFrame);
             }
             foreach (var childFrame in subFrames)
@@ -85,7 +87,7 @@ namespace LanguageImplementation
             }
         }
 
-        public Stack<Object> DataStack
+        public ValueStack DataStack
         {
             get
             {
@@ -125,7 +127,7 @@ namespace LanguageImplementation
             }
         }
 
-        public List<object> LocalFasts
+        public object[] LocalFasts
         {
             get
             {
@@ -173,7 +175,8 @@ namespace LanguageImplementation
 
         /// <summary>
         /// A representation of sys.modules. Each context gets its own since it's possibly
-        /// importing different things.
+        /// importing different things. Modules that are the same for everybody are also shared
+        /// across contexts through the interpreter's ModuleRegistry.
         /// </summary>
         public Dictionary<string, PyModule> SysModules;
 
@@ -184,17 +187,12 @@ namespace LanguageImplementation
             var stackFrame = callStack.Peek();
 
             // Unlike LOAD_GLOBAL, the current frame is fair game. In fact, we search it first!
-            if (stackFrame.Locals.ContainsKey(name))
+            object value;
+            if (stackFrame.Locals.TryGetValue(name, out value) ||
+                stackFrame.Globals.TryGetValue(name, out value) ||
+                Builtins.TryGetValue(name, out value))
             {
-                return stackFrame.Locals[name];
-            }
-            else if(stackFrame.Globals.ContainsKey(name))
-            {
-                return stackFrame.Globals[name];
-            }
-            else if(Builtins.ContainsKey(name))
-            {
-                return Builtins[name];
+                return value;
             }
             throw new Exception("'" + name + "' not found in local, global, nor built-in namespaces.");
         }
@@ -206,7 +204,7 @@ namespace LanguageImplementation
             {
                 LocalNames.Add(name);
             }
-            Locals.AddOrSet(name, value);
+            Namespaces.Set(Locals, name, value);
         }
 
         public void SetVariable(string name, object value)
@@ -216,7 +214,7 @@ namespace LanguageImplementation
             {
                 throw new KeyNotFoundException("Could not find variable in locals named " + name);
             }
-            Locals.AddOrSet(name, value);
+            Namespaces.Set(Locals, name, value);
         }
         public void SetVariableIfExists(string name, object value)
         {
@@ -225,7 +223,7 @@ namespace LanguageImplementation
             {
                 return;
             }
-            Locals.AddOrSet(name, value);
+            Namespaces.Set(Locals, name, value);
         }
 
         public bool HasVariable(string name)
@@ -1,5 +1,6 @@
 ﻿using LanguageImplementation.DataTypes;
 using System;
+using System.Collections.Concurrent;
 using System.Collections.Generic;
 using System.Reflection;
 
@@ -58,6 +59,11 @@ namespace LanguageImplementation
         /// <param name="args"></param>
         /// <param name="thisReference"></param>
         public object[] Inject2(MethodBase methodBase, object[] args, object thisReference = null, Dictionary<string, object> overrides = null)
+        {
+            return BindingPlan.Get(methodBase).Bind(this, args, thisReference, overrides);
+        }
+
+        public object[] Inject(MethodBase methodBase, object[] args, object thisReference=null)
         {
             var methodParams = methodBase.GetParameters();
 
@@ -84,38 +90,19 @@ namespace LanguageImplementation
             for (; out_param_i < (hasParamsField ? outParams.Length - 1 : outParams.Length); ++out_param_i, ++methodInfo_i)
             {
                 var paramInfo = methodParams[methodInfo_i];
-                if (paramInfo.ParameterType == typeof(IInterpreter))
+                if(paramInfo.ParameterType == typeof(IInterpreter))
                 {
                     outParams[out_param_i] = Interpreter;
                 }
-                else if (paramInfo.ParameterType == typeof(FrameContext))
+                else if(paramInfo.ParameterType == typeof(FrameContext))
                 {
                     outParams[out_param_i] = Context;
                 }
-                else if (paramInfo.ParameterType == typeof(IScheduler))
+                else if(paramInfo.ParameterType == typeof(IScheduler))
                 {
                     outParams[out_param_i] = Scheduler;
                 }
-                else if(methodParams[methodInfo_i].HasDefaultValue)
-                {
-                    var overrideName = methodParams[methodInfo_i].Name;
-                    if (overrides != null && overrides.ContainsKey(overrideName))
-                    {
-                        outParams[out_param_i] = PyNetConverter.Convert(overrides[overrideName], paramInfo.ParameterType);
-                    }
-                    else if(in_param_i < args.Length && (overrides == null || !overrides.ContainsKey(overrideName)))
-                    {
-                        // Convert it as normal. It was given positionally in our script. This isn't legal C# but it's
-                        // legal Python.
-                        outParams[out_param_i] = PyNetConverter.Convert(args[in_param_i], paramInfo.ParameterType);
-                        ++in_param_i;
-                    }
-                    else
-                    {
-                        outParams[out_param_i] = paramInfo.DefaultValue == null ? null : PyNetConverter.Convert(paramInfo.DefaultValue, paramInfo.ParameterType);
-                    }
-                }
-                else 
+                else
                 {
                     if (in_param_i < args.Length)
                     {
@@ -124,7 +111,15 @@ namespace LanguageImplementation
                     }
                     else
                     {
-                        throw new ArgumentException("Not enough arguments for " + methodBase.Name + " to satisfy the call");
+                        // Might be an optional parameter. If so, we use the default:
+                        if(paramInfo.HasDefaultValue)
+                        {
+                            outParams[out_param_i] = paramInfo.DefaultValue == null ? null : PyNetConverter.Convert(paramInfo.DefaultValue, paramInfo.ParameterType);
+                        }
+                        else
+                        {
+                            throw new ArgumentException("Not enough arguments for " + methodBase.Name + " to satisfy the call");
+                        }
                     }
                 }
             }
@@ -154,73 +149,174 @@ namespace LanguageImplementation
 
             return outParams;
         }
+    }
 
-        public object[] Inject(MethodBase methodBase, object[] args, object thisReference=null)
+    /// <summary>
+    /// The layout Inject2 uses to turn a call's arguments into a MethodBase's parameters: which slots get the
+    /// interpreter, context, or scheduler injected, which take positional arguments or have defaults, and whether
+    /// trailing arguments get packed into a params array. Working this out walks the parameters with reflection,
+    /// so it's done once per MethodBase and cached. Each call then just runs the plan.
+    /// </summary>
+    public class BindingPlan
+    {
+        private enum SlotKind
+        {
+            Interpreter,
+            Context,
+            Scheduler,
+            Defaulted,
+            Positional
+        }
+
+        private class Slot
+        {
+            public SlotKind Kind;
+            public string Name;
+            public object DefaultValue;
+            public ParameterConverter Converter;
+        }
+
+        private static ConcurrentDictionary<MethodBase, BindingPlan> plans = new ConcurrentDictionary<MethodBase, BindingPlan>();
+
+        private string methodName;
+        private int parameterCount;
+        private bool isExtensionMethod;
+        private Slot[] slots;                           // One for each parameter that isn't the extension "this" or params array.
+        private ParameterConverter paramsConverter;     // Null if there's no params field.
+
+        public static BindingPlan Get(MethodBase methodBase)
+        {
+            BindingPlan plan;
+            if(!plans.TryGetValue(methodBase, out plan))
+            {
+                plan = plans.GetOrAdd(methodBase, new BindingPlan(methodBase));
+            }
+            return plan;
+        }
+
+        private BindingPlan(MethodBase methodBase)
         {
             var methodParams = methodBase.GetParameters();
+            methodName = methodBase.Name;
+            parameterCount = methodParams.Length;
 
             // If there's a params field then we have to cram an array into there.
             bool hasParamsField = methodParams.Length >= 1 && methodParams[methodParams.Length - 1].IsDefined(typeof(ParamArrayAttribute), false);
-            bool isExtensionMethod = methodBase.IsExtensionMethod();
+            isExtensionMethod = methodBase.IsExtensionMethod();
 
-            // Transform all arguments except for any in the params field.
-            object[] outParams;
+            int first_slot = isExtensionMethod ? 1 : 0;
+            int end_slot = hasParamsField ? methodParams.Length - 1 : methodParams.Length;
+            slots = new Slot[Math.Max(0, end_slot - first_slot)];
+            for(int param_i = first_slot; param_i < end_slot; ++param_i)
+            {
+                var paramInfo = methodParams[param_i];
+                var slot = new Slot();
+                if (paramInfo.ParameterType == typeof(IInterpreter))
+                {
+                    slot.Kind = SlotKind.Interpreter;
+                }
+                else if (paramInfo.ParameterType == typeof(FrameContext))
+                {
+                    slot.Kind = SlotKind.Context;
+                }
+                else if (paramInfo.ParameterType == typeof(IScheduler))
+                {
+                    slot.Kind = SlotKind.Scheduler;
+                }
+                else if (paramInfo.HasDefaultValue)
+                {
+                    slot.Kind = SlotKind.Defaulted;
+                    slot.Name = paramInfo.Name;
+                    slot.DefaultValue = paramInfo.DefaultValue;
+                    slot.Converter = new ParameterConverter(paramInfo.ParameterType);
+                }
+                else
+                {
+                    slot.Kind = SlotKind.Positional;
+                    slot.Converter = new ParameterConverter(paramInfo.ParameterType);
+                }
+                slots[param_i - first_slot] = slot;
+            }
+
+            if(hasParamsField)
+            {
+                paramsConverter = new ParameterConverter(methodParams[methodParams.Length - 1].ParameterType.GetElementType());
+            }
+        }
+
+        /// <summary>
+        /// Runs the plan, producing the final arguments to invoke the method with.
+        /// </summary>
+        /// <param name="injector">Supplies the interpreter, context, and scheduler for injected parameters.</param>
+        /// <param name="args">The arguments given to the call from script.</param>
+        /// <param name="thisReference">The object to put in the first slot if this is an extension method.</param>
+        /// <param name="overrides">Keyword arguments overriding parameters with default values.</param>
+        /// <returns>Arguments matching the method's parameters.</returns>
+        public object[] Bind(Injector injector, object[] args, object thisReference, Dictionary<string, object> overrides)
+        {
+            var outParams = new object[parameterCount];
             int in_param_i = 0;     // Keep an eye on this for later to determine if we have stuff for a params field!
             int out_param_i = 0;
-            int methodInfo_i = 0;
-
-            outParams = new object[methodParams.Length];
 
             // Extension method; there's the "this object" parameter in the first position that we need to insert.
             if (isExtensionMethod)
             {
                 outParams[0] = thisReference;
                 out_param_i = 1;
-                methodInfo_i = 1;
             }
 
-            for (; out_param_i < (hasParamsField ? outParams.Length - 1 : outParams.Length); ++out_param_i, ++methodInfo_i)
+            for (int slot_i = 0; slot_i < slots.Length; ++slot_i, ++out_param_i)
             {
-                var paramInfo = methodParams[methodInfo_i];
-                if(paramInfo.ParameterType == typeof(IInterpreter))
-                {
-                    outParams[out_param_i] = Interpreter;
-                }
-                else if(paramInfo.ParameterType == typeof(FrameContext))
-                {
-                    outParams[out_param_i] = Context;
-                }
-                else if(paramInfo.ParameterType == typeof(IScheduler))
-                {
-                    outParams[out_param_i] = Scheduler;
-                }
-                else
+                var slot = slots[slot_i];
+                switch(slot.Kind)
                 {
-                    if (in_param_i < args.Length)
-                    {
-                        outParams[out_param_i] = PyNetConverter.Convert(args[in_param_i], paramInfo.ParameterType);
-                        ++in_param_i;
-                    }
-                    else
-                    {
-                        // Might be an optional parameter. If so, we use the default:
-                        if(paramInfo.HasDefaultValue)
+                    case SlotKind.Interpreter:
+                        outParams[out_param_i] = injector.Interpreter;
+                        break;
+                    case SlotKind.Context:
+                        outParams[out_param_i] = injector.Context;
+                        break;
+                    case SlotKind.Scheduler:
+                        outParams[out_param_i] = injector.Scheduler;
+                        break;
+                    case SlotKind.Defaulted:
                         {
-                            outParams[out_param_i] = paramInfo.DefaultValue == null ? null : PyNetConverter.Convert(paramInfo.DefaultValue, paramInfo.ParameterType);
+                            object overrideValue;
+                            if (overrides != null && overrides.TryGetValue(slot.Name, out overrideValue))
+                            {
+                                outParams[out_param_i] = slot.Converter.Convert(overrideValue);
+                            }
+                            else if (in_param_i < args.Length)
+                            {
+                                // Convert it as normal. It was given positionally in our script. This isn't legal C# but it's
+                                // legal Python.
+                                outParams[out_param_i] = slot.Converter.Convert(args[in_param_i]);
+                                ++in_param_i;
+                            }
+                            else
+                            {
+                                outParams[out_param_i] = slot.DefaultValue == null ? null : slot.Converter.Convert(slot.DefaultValue);
+                            }
+                        }
+                        break;
+                    default:
+                        if (in_param_i < args.Length)
+                        {
+                            outParams[out_param_i] = slot.Converter.Convert(args[in_param_i]);
+                            ++in_param_i;
                         }
                         else
                         {
-                            throw new ArgumentException("Not enough arguments for " + methodBase.Name + " to satisfy the call");
+                            throw new ArgumentException("Not enough arguments for " + methodName + " to satisfy the call");
                         }
-                    }
+                        break;
                 }
             }
 
             // If there's a params field and we don't have enough stuff to fill it, then we need to
             // give it a null or else we'll run into a TargetParameterCountException
             // If we *can* fill it in, we need to convert to the params array type.
-            //
-            if (hasParamsField)
+            if (paramsConverter != null)
             {
                 if (in_param_i >= args.Length)
                 {
@@ -228,11 +324,10 @@ namespace LanguageImplementation
                 }
                 else
                 {
-                    var elementType = methodParams[methodParams.Length - 1].ParameterType.GetElementType();
-                    var paramsArray = Array.CreateInstance(elementType, args.Length - in_param_i);
+                    var paramsArray = Array.CreateInstance(paramsConverter.ToType, args.Length - in_param_i);
                     for (int i = 0; i < paramsArray.Length; ++i)
                     {
-                        paramsArray.SetValue(PyNetConverter.Convert(args[in_param_i + i], elementType), i);
+                        paramsArray.SetValue(paramsConverter.Convert(args[in_param_i + i]), i);
                     }
 
                     outParams[outParams.Length - 1] = paramsArray;
@@ -12,10 +12,10 @@ namespace LanguageImplementation
     {
         public int Cursor;
         public Stack<Block> BlockStack;
-        public Stack<object> DataStack;
+        public ValueStack DataStack;
         public PyFunction Function;
 
-        public List<object> LocalFasts;             // Used by LOAD/STORE_FAST
+        public object[] LocalFasts;                 // Used by LOAD/STORE_FAST
         public Dictionary<string, object> Locals;   // Used by LOAD/STORE_NAME
 
         // In CPython, cell variables are a part of f_localsplus, combined with the stack.
@@ -30,7 +30,12 @@ namespace LanguageImplementation
             {
                 cellIdx = Function.Code.CellNames.Count + Function.Code.FreeNames.IndexOf(name);
             }
+            SetCellVar(cellIdx, value);
+        }
 
+        // Same as SetCellVar(string, object) for when the index in CellVars is already known.
+        public void SetCellVar(int cellIdx, object value)
+        {
             var cell = CellVars[cellIdx];
             if (cell == null)
             {
@@ -72,13 +77,22 @@ namespace LanguageImplementation
         // set elsewhere though.
         public Dictionary<string, object> Globals;
 
+        // Set for frames that came from Rent() so Release() knows it can take them.
+        private bool rented;
+
+        // Set when something outside the call stack could still be looking at the frame, like a traceback or
+        // another context sharing the call stack. Those frames are never reused.
+        internal bool Pinned;
+
+        private static readonly object[] noFasts = new object[0];
+
         public Frame()
         {
             Cursor = 0;
             BlockStack = new Stack<Block>();
-            DataStack = new Stack<object>();
+            DataStack = new ValueStack();
             Function = null;
-            LocalFasts = new List<object>();
+            LocalFasts = noFasts;
             Locals = new Dictionary<string, object>();
             CellVars = null;
 
@@ -90,19 +104,18 @@ namespace LanguageImplementation
         private void createFasts(CodeObject co)
         {
             // Arguments are the first fasts, given in order of their position in the arguments.
-            for (int i = 0; i < co.ArgVarNames.Count; ++i)
-            {
-                LocalFasts.Add(null);
-            }
-            for (int i = 0; i < co.VarNames.Count; ++i)
-            {
-                LocalFasts.Add(null);
-            }
+            LocalFasts = co.NLocals > 0 ? new object[co.NLocals] : noFasts;
+            DataStack.EnsureCapacity(co.StackSize);
         }
 
         private void createCells(CodeObject co)
         {
-            CellVars = new PyCellObject[co.CellNames.Count + co.FreeNames.Count];
+            if(CellVars == null || CellVars.Length != co.CellNames.Count + co.FreeNames.Count)
+            {
+                CellVars = new PyCellObject[co.CellNames.Count + co.FreeNames.Count];
+            }
+
+            // Always new cells, even for a reused frame, since closures made by the last call could still have them.
             for(int i = 0; i < CellVars.Length; ++i)
             {
                 CellVars[i] = new PyCellObject();
@@ -153,6 +166,80 @@ namespace LanguageImplementation
             takeCellVariables(parentContext);
         }
 
+        /// <summary>
+        /// Gets a frame for calling the function, reusing one that an earlier call gave back with Release() if there
+        /// is one. The frame is set up the same as new Frame(function, parentContext, newGlobals) would do.
+        /// </summary>
+        public static Frame Rent(PyFunction function, FrameContext parentContext, Dictionary<string, object> newGlobals=null)
+        {
+            var pool = function.Code.FramePool;
+            var frame = pool != null ? pool.Take() : null;
+            if(frame == null)
+            {
+                frame = new Frame(function, parentContext, newGlobals);
+            }
+            else
+            {
+                frame.Function = function;
+                frame.Globals = newGlobals == null ? function.Globals : newGlobals;
+                frame.createCells(function.Code);
+                frame.takeCellVariables(parentContext);
+            }
+            frame.rented = true;
+            return frame;
+        }
+
+        /// <summary>
+        /// Gives a frame from Rent() back once its call has returned so another call of the same code can reuse it.
+        /// Frames that didn't come from Rent(), or that something else could still be looking at, are left alone.
+        /// </summary>
+        public void Release()
+        {
+            if(!rented || Pinned)
+            {
+                return;
+            }
+
+            var code = Function.Code;
+            rented = false;
+            Cursor = 0;
+            BlockStack.Clear();
+            DataStack.Clear();
+            Array.Clear(LocalFasts, 0, LocalFasts.Length);
+            if(Locals.Count > 0)
+            {
+                Locals = new Dictionary<string, object>();
+            }
+            Function = null;
+            Globals = null;
+
+            if(code.FramePool == null)
+            {
+                code.FramePool = new FramePool();
+            }
+            code.FramePool.Give(this);
+        }
+
+        /// <summary>
+        /// Puts the arguments for a call into the frame's fasts and cells. See CodeObject.GetArgumentSlots().
+        /// </summary>
+        public void SetArguments(object[] args)
+        {
+            var slots = Function.Code.GetArgumentSlots();
+            for(int argIdx = 0; argIdx < args.Length; ++argIdx)
+            {
+                var slot = slots[argIdx];
+                if(slot >= 0)
+                {
+                    LocalFasts[slot] = args[argIdx];
+                }
+                else if(slot != CodeObject.FreeArgumentSlot)
+                {
+                    SetCellVar(-1 - slot, args[argIdx]);
+                }
+            }
+        }
+
         private void takeCellVariables(FrameContext parent)
         {
             for (int child_cell_i = 0; child_cell_i < Function.Code.CellNames.Count; ++child_cell_i)
@@ -197,12 +284,8 @@ namespace LanguageImplementation
             if(nameIdx == -1)
             {
                 LocalNames.Add(name);
-                Locals.AddOrSet(name, value);
             }
-            else
-            {
-                Locals[name] = value;
-            }    
+            Namespaces.Set(Locals, name, value);
         }
 
         public void SetFastLocal(int idx, object value)
@@ -249,14 +332,7 @@ namespace LanguageImplementation
 
         public void AddGlobal(string name, object value)
         {
-            if(Globals.ContainsKey(name))
-            {
-                Globals[name] = value;
-            }
-            else
-            {
-                Globals.Add(name, value);
-            }
+            Namespaces.Set(Globals, name, value);
         }
 
         /// <summary>
@@ -268,7 +344,7 @@ namespace LanguageImplementation
         {
             if (!Globals.ContainsKey(name))
             {
-                Globals.Add(name, value);
+                Namespaces.Set(Globals, name, value);
             }
         }
 
@@ -290,6 +366,45 @@ namespace LanguageImplementation
         }
     }
 
+    /// <summary>
+    /// Frames given back by Frame.Release(), kept per code object. This only holds on to a handful since deep
+    /// recursion unwinding would otherwise leave a frame behind for every level.
+    /// </summary>
+    internal class FramePool
+    {
+        public const int MaxFrames = 32;
+
+        private readonly Frame[] frames = new Frame[MaxFrames];
+        private int count;
+
+        public Frame Take()
+        {
+            lock(frames)
+            {
+                if(count == 0)
+                {
+                    return null;
+                }
+                --count;
+                var frame = frames[count];
+                frames[count] = null;
+                return frame;
+            }
+        }
+
+        public void Give(Frame frame)
+        {
+            lock(frames)
+            {
+                if(count < MaxFrames)
+                {
+                    frames[count] = frame;
+                    ++count;
+                }
+            }
+        }
+    }
+
     // Traditional block in Python has: frame, opcode, handler (pointer to next instruction outside of the loop), value stack size
     // We don't have frames yet, we'll just BS our way through others for now.
     public class Block
@@ -547,10 +662,24 @@ namespace LanguageImplementation
 
         /// <summary>
         /// Get mapping of built-in definitions that interpreter is using.
+        ///
+        /// Don't write to this dictionary directly. Scripts cache the names they look up, and only changes made through
+        /// SetBuiltin or the Namespaces helpers clear those caches. A direct write can leave scripts using the old value
+        /// without any error. The same goes for globals dictionaries handed to the scheduler or the compiler: change
+        /// them with FrameContext.SetVariable or Namespaces.Set. After editing one of them directly, call
+        /// Namespaces.Changed on it.
         /// </summary>
         /// <returns>Mapping of built-in definitions that interpreter is using.</returns>
         Dictionary<string, object> GetBuiltins();
 
+        /// <summary>
+        /// Adds a built-in or replaces an existing one in a way running scripts will see. Use this instead of writing
+        /// to GetBuiltins().
+        /// </summary>
+        /// <param name="name">The name scripts use for the built-in.</param>
+        /// <param name="value">The built-in.</param>
+        void SetBuiltin(string name, object value);
+
 
         /// <summary>
         /// Returns true if an exception was raised and the context would not be in a position to still try to
@@ -22,6 +22,27 @@ namespace LanguageImplementation
         Task<object> Next(IInterpreter interpreter, FrameContext context, object selfHandle);
     }
 
+    /// <summary>
+    /// Iterators that can produce their next item directly. FOR_ITER uses this instead of looking up and calling
+    /// __next__ so loops over builtin containers don't have to go through reflection or use StopIterationException
+    /// to find their end.
+    /// </summary>
+    public interface INativeIterator
+    {
+        /// <summary>
+        /// True if TryNext can be used. Iterators that wrap other iterators can only do it if everything they wrap
+        /// can too.
+        /// </summary>
+        bool IsNative { get; }
+
+        /// <summary>
+        /// Advances the iterator.
+        /// </summary>
+        /// <param name="next">The next item, if there was one.</param>
+        /// <returns>False if the iterator is exhausted.</returns>
+        bool TryNext(out object next);
+    }
+
     /// <summary>
     /// A general-purpose iterator that works on anything that has a set of __len__ and
     /// __getitem__ dunders.
@@ -57,7 +78,7 @@ namespace LanguageImplementation
             else
             {
                 var toReturn = await getitem.Call(interpreter, context, new object[] { container, i });
-                i.InternalValue += 1;
+                i = PyInteger.Create(i.InternalValue + 1);
                 return toReturn;
             }
         }
@@ -84,7 +105,7 @@ namespace LanguageImplementation
             else
             {
                 var toReturn = await getitem.Call(interpreter, context, new object[] { container, i });
-                i.InternalValue -= 1;
+                i = PyInteger.Create(i.InternalValue - 1);
                 return toReturn;
             }
         }
@@ -94,7 +115,7 @@ namespace LanguageImplementation
     /// The iterator generated by iterator. It produces tuples with the first index being the current index into the iterator and the
     /// second index is the current iterated item.
     /// </summary>
-    public class EnumerateIterator : PyIterable
+    public class EnumerateIterator : PyIterable, INativeIterator
     {
         private int currentIndex;
         private PyIterable itr;
@@ -117,9 +138,32 @@ namespace LanguageImplementation
             currentIndex += 1;
             return returnTuple;
         }
+
+        public bool IsNative
+        {
+            get
+            {
+                var asNative = itr as INativeIterator;
+                return asNative != null && asNative.IsNative;
+            }
+        }
+
+        public bool TryNext(out object next)
+        {
+            object next_item;
+            if(!((INativeIterator)itr).TryNext(out next_item))
+            {
+                next = null;
+                return false;
+            }
+
+            next = PyTuple.Create(new object[] { PyInteger.Create(currentIndex), next_item });
+            currentIndex += 1;
+            return true;
+        }
     }
 
-    public class ZippedItemIterator : PyIterable
+    public class ZippedItemIterator : PyIterable, INativeIterator
     {
         private PyObject[] iterators;
         private bool stopped;               // Used to keep raise StopIteration after the first one.
@@ -146,7 +190,7 @@ namespace LanguageImplementation
             {
                 try
                 {
-                    var nextFunc = (IPyCallable) iterators[i].__dict__["__next__"];
+                    var nextFunc = (IPyCallable) iterators[i].GetUnboundAttribute("__next__");
                     values[i] = await nextFunc.Call(interpreter, context, new object[] { iterators[i] });
                     if(context.CurrentException != null)
                     {
@@ -166,6 +210,44 @@ namespace LanguageImplementation
             }
             return tuple;
         }
+
+        public bool IsNative
+        {
+            get
+            {
+                foreach(var iterator in iterators)
+                {
+                    var asNative = iterator as INativeIterator;
+                    if(asNative == null || !asNative.IsNative)
+                    {
+                        return false;
+                    }
+                }
+                return true;
+            }
+        }
+
+        public bool TryNext(out object next)
+        {
+            next = null;
+            if(this.iterators.Length == 0 || stopped)
+            {
+                stopped = true;
+                return false;
+            }
+
+            var values = new object[this.iterators.Length];
+            for(int i = 0; i < iterators.Length; ++i)
+            {
+                if(!((INativeIterator)iterators[i]).TryNext(out values[i]))
+                {
+                    stopped = true;
+                    return false;
+                }
+            }
+            next = PyTuple.Create(values);
+            return true;
+        }
     }
 
     /// <summary>
@@ -189,11 +271,39 @@ namespace LanguageImplementation
         }
     }
 
+    /// <summary>
+    /// The iterator object IteratorMaker wraps around a PyIterable. It can be advanced natively when what it wraps
+    /// can be.
+    /// </summary>
+    public class MadeIterator : PyObject, INativeIterator
+    {
+        public PyIterable Iterable;
+
+        public MadeIterator(PyIterable iterable)
+        {
+            Iterable = iterable;
+        }
+
+        public bool IsNative
+        {
+            get
+            {
+                var asNative = Iterable as INativeIterator;
+                return asNative != null && asNative.IsNative;
+            }
+        }
+
+        public bool TryNext(out object next)
+        {
+            return ((INativeIterator)Iterable).TryNext(out next);
+        }
+    }
+
     public class IteratorMaker
     {
         public static PyObject MakeIterator(PyIterable iterable)
         {
-            var iterator = new PyObject();
+            var iterator = new MadeIterator(iterable);
             iterator.__dict__["__next__"] = new WrappedCodeObject(iterable.GetType().GetMethod("Next"), iterable);
 
             // Return ourselves for __iter__. This sounds stupid but comes up in CPython! The result is
@@ -203,6 +313,57 @@ namespace LanguageImplementation
             return iterator;
         }
 
+        /// <summary>
+        /// Creates the iterator for one of the builtin containers without looking up and calling its __iter__.
+        /// Subclasses can override __iter__, so they don't count.
+        /// </summary>
+        /// <param name="o">The object to iterate.</param>
+        /// <returns>The new iterator, or null if the object isn't exactly a list, tuple, range, str, dict, set, or
+        /// dict view.</returns>
+        public static PyObject GetBuiltinIterator(object o)
+        {
+            var asPyObject = o as PyObject;
+            if(asPyObject == null)
+            {
+                return null;
+            }
+
+            var pyClass = asPyObject.__class__;
+            if(pyClass == PyListClass.Instance && o is PyList)
+            {
+                return PyListIterator.Create((PyList)o);
+            }
+            else if(pyClass == PyTupleClass.Instance && o is PyTuple)
+            {
+                return PyTupleIterator.Create((PyTuple)o);
+            }
+            else if(pyClass == PyRangeClass.Instance && o is PyRange)
+            {
+                return PyRangeIterator.Create((PyRange)o);
+            }
+            else if(pyClass == PyStringClass.Instance && o is PyString)
+            {
+                return PyStringIterator.Create((PyString)o);
+            }
+            else if(pyClass == PyDictClass.Instance && o is PyDict)
+            {
+                return PyKeyIterator.Create((PyDict)o);
+            }
+            else if(pyClass == PyDict_KeysClass.Instance && o is PyDict_Keys)
+            {
+                return PyDictKeysIterator.Create(((PyDict_Keys)o).Dict);
+            }
+            else if(pyClass == PyDict_ItemsClass.Instance && o is PyDict_Items)
+            {
+                return PyDictItemsIterator.Create(((PyDict_Items)o).Dict);
+            }
+            else if(pyClass == PySetClass.Instance && o is PySet)
+            {
+                return PySetIterator.Create((PySet)o);
+            }
+            return null;
+        }
+
         public static async Task<PyObject> GetOrMakeIterator(IInterpreter interpreter, FrameContext context, object o)
         {
             var asPyIterable = o as PyIterable;
@@ -214,22 +375,21 @@ namespace LanguageImplementation
             var asPyObject = o as PyObject;
             if (asPyObject != null)
             {
-                if (asPyObject.__dict__.ContainsKey("__iter__"))
+                if (asPyObject.HasUnboundAttribute("__iter__"))
                 {
-                    var iter_call = (IPyCallable)asPyObject.__dict__["__iter__"];
+                    var iter_call = (IPyCallable)asPyObject.GetUnboundAttribute("__iter__");
                     var result = await iter_call.Call(interpreter, context, new object[] { asPyObject });
                     return (PyObject) result;
                 }
-                else if (asPyObject.__dict__.ContainsKey("__len__") && asPyObject.__dict__.ContainsKey("__getitem__"))
+                else if (asPyObject.HasUnboundAttribute("__len__") && asPyObject.HasUnboundAttribute("__getitem__"))
                 {
-                    var len_dunder = (IPyCallable)asPyObject.__dict__["__len__"];
-                    var getitem_dunder = (IPyCallable)asPyObject.__dict__["__getitem__"];
+                    var len_dunder = (IPyCallable)asPyObject.GetUnboundAttribute("__len__");
+                    var getitem_dunder = (IPyCallable)asPyObject.GetUnboundAttribute("__getitem__");
                     return MakeIterator(new LenGetItemIterator(asPyObject, len_dunder, getitem_dunder));
                 }
                 else
                 {
-                    var typeClass = (PyObject)asPyObject.__dict__["__class__"];
-                    var typeName = typeClass.__dict__["__name__"].ToString();
+                    var typeName = asPyObject.__class__ != null ? asPyObject.__class__.Name : asPyObject.GetType().Name;
                     context.CurrentException = TypeErrorClass.Create("TypeError: '" + typeName + "' is not iterable");
                     return null;
                 }
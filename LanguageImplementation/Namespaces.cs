@@ -0,0 +1,98 @@
+﻿using System;
+using System.Collections.Generic;
+using System.Runtime.CompilerServices;
+
+namespace LanguageImplementation
+{
+    /// <summary>
+    /// Version numbers for a namespace dictionary: globals, builtins, and module-level locals. Caches of name lookups
+    /// keep the numbers they saw and know the dictionary is unchanged as long as they still match.
+    /// </summary>
+    public class NamespaceVersion
+    {
+        /// <summary>
+        /// Changes whenever a name is added or removed.
+        /// </summary>
+        public int Keys;
+
+        /// <summary>
+        /// Changes on every change to the namespace, including binding an existing name to something else.
+        /// </summary>
+        public int Values;
+    }
+
+    /// <summary>
+    /// Changes globals and builtins so lookups cached against them find out. The namespaces are plain dictionaries
+    /// because embedders hand them around, so they can't tell anybody when they change on their own. Everything that
+    /// changes one has to go through here, including code embedding the interpreter. Writing to the dictionary
+    /// directly can leave name lookups returning the old value. After editing a namespace directly, call Changed().
+    /// </summary>
+    public static class Namespaces
+    {
+        private static ConditionalWeakTable<Dictionary<string, object>, NamespaceVersion> versions =
+            new ConditionalWeakTable<Dictionary<string, object>, NamespaceVersion>();
+
+        // The last namespace looked up on this thread. Module-level code stores into the same namespace over and over,
+        // and this skips the table for that.
+        [ThreadStatic]
+        private static Dictionary<string, object> lastNamespace;
+        [ThreadStatic]
+        private static NamespaceVersion lastVersion;
+
+        /// <summary>
+        /// Gets the version numbers for a namespace.
+        /// </summary>
+        public static NamespaceVersion VersionOf(Dictionary<string, object> ns)
+        {
+            if(ns != lastNamespace)
+            {
+                lastVersion = versions.GetOrCreateValue(ns);
+                lastNamespace = ns;
+            }
+            return lastVersion;
+        }
+
+        /// <summary>
+        /// Binds a name in a namespace, adding it if it's not there yet.
+        /// </summary>
+        public static void Set(Dictionary<string, object> ns, string name, object value)
+        {
+            int countBefore = ns.Count;
+            ns[name] = value;
+
+            var version = VersionOf(ns);
+            if(ns.Count != countBefore)
+            {
+                ++version.Keys;
+            }
+            ++version.Values;
+        }
+
+        /// <summary>
+        /// Removes a name from a namespace.
+        /// </summary>
+        /// <returns>True if the name was there to remove.</returns>
+        public static bool Remove(Dictionary<string, object> ns, string name)
+        {
+            if(!ns.Remove(name))
+            {
+                return false;
+            }
+
+            var version = VersionOf(ns);
+            ++version.Keys;
+            ++version.Values;
+            return true;
+        }
+
+        /// <summary>
+        /// Throws out everything cached about a namespace. Call this after changing the dictionary directly.
+        /// </summary>
+        public static void Changed(Dictionary<string, object> ns)
+        {
+            var version = VersionOf(ns);
+            ++version.Keys;
+            ++version.Values;
+        }
+    }
+}
@@ -129,7 +129,38 @@
 		BUILD_CONST_KEY_MAP = 0x9C, // (2) The version of BUILD_MAP specialized for constant keys. count values are consumed from the stack. The top element on the stack contains a tuple of keys.
 		WAIT = 0xA0, // (0) Custom Cloaca green thread yield
 
+		// CPython 3.7 has these as 0xA0 and 0xA1, but WAIT already took 0xA0.
+		LOAD_METHOD = 0xA1,					// (2) Looks up co_names[/namei/] on TOS. If it's a method, pushes the unbound method and then TOS as self. Otherwise, pushes null and then the attribute as LOAD_ATTR would give it.
+		CALL_METHOD = 0xA2,					// (2) Calls a method set up by LOAD_METHOD with /argc/ positional arguments on top of it.
+
 		BUILD_SET = 0x95,					// Don't know why this doesn't get a byte with the other BUILD_* opcodes
+
+		// Specialized (quickened) forms of the instructions above. These never show up in compiled code. The interpreter
+		// rewrites an instruction into one of these in the decoded instruction stream once the instruction has seen the
+		// same operand types enough times, and rewrites it back if the types change. Each one keeps the operand of the
+		// instruction it replaces. See Instruction.GetGenericOpcode() for the mapping back.
+		BINARY_ADD_INT             = 0xC0, // (0) int + int
+		BINARY_SUBTRACT_INT        = 0xC1, // (0) int - int
+		BINARY_MULTIPLY_INT        = 0xC2, // (0) int * int
+		BINARY_FLOOR_DIVIDE_INT    = 0xC3, // (0) int // int
+		BINARY_MODULO_INT          = 0xC4, // (0) int % int
+		BINARY_TRUE_DIVIDE_INT     = 0xC5, // (0) int / int
+		INPLACE_ADD_INT            = 0xC6, // (0) int += int
+		INPLACE_SUBTRACT_INT       = 0xC7, // (0) int -= int
+		BINARY_ADD_FLOAT           = 0xC8, // (0) float + float
+		BINARY_SUBTRACT_FLOAT      = 0xC9, // (0) float - float
+		BINARY_MULTIPLY_FLOAT      = 0xCA, // (0) float * float
+		BINARY_TRUE_DIVIDE_FLOAT   = 0xCB, // (0) float / float
+		INPLACE_ADD_FLOAT          = 0xCC, // (0) float += float
+		INPLACE_SUBTRACT_FLOAT     = 0xCD, // (0) float -= float
+		COMPARE_OP_INT             = 0xCE, // (2) COMPARE_OP on two ints
+		COMPARE_OP_FLOAT           = 0xCF, // (2) COMPARE_OP on two floats
+		COMPARE_OP_STR             = 0xD0, // (2) COMPARE_OP on two strs
+		BINARY_SUBSCR_LIST_INT     = 0xD1, // (0) list[int]
+		BINARY_SUBSCR_DICT_STR     = 0xD2, // (0) dict[str]
+		STORE_SUBSCR_LIST_INT      = 0xD3, // (0) list[int] = TOS2
+		STORE_SUBSCR_DICT_STR      = 0xD4, // (0) dict[str] = TOS2
+		LOAD_ATTR_INSTANCE_VALUE   = 0xD5, // (2) LOAD_ATTR of a non-callable found in a plain object's own attributes
     }
 
     // Temporary method of establishing comparison operators. It looks like we need a cmp_op table--probably due to overrides of comparisons--but
@@ -412,7 +412,7 @@ namespace LanguageImplementation
                             }
                             else if(p is PyFloat)
                             {
-                                s = Math.Round(((PyFloat) p).InternalValue, conversion_spec.Precision, MidpointRounding.AwayFromZero).ToString();
+                                s = Math.Round((decimal) ((PyFloat) p).InternalValue, conversion_spec.Precision, MidpointRounding.AwayFromZero).ToString();
                             }
                             else if (
                                 p is float ||
@@ -1,5 +1,7 @@
 ﻿using System;
+using System.Collections.Concurrent;
 using System.Collections.Generic;
+using System.Globalization;
 using System.Numerics;
 using System.Threading;
 using LanguageImplementation.DataTypes;
@@ -54,69 +56,97 @@ namespace LanguageImplementation
             { ValueTuple.Create(typeof(PyFloat), typeof(Decimal)), (as_pf) => { return (Decimal) ((PyFloat)as_pf).InternalValue; } },
 
             // Integer-Float conversions
-            { ValueTuple.Create(typeof(PyInteger), typeof(PyFloat)), (as_pi) => { return (PyFloat) PyFloat.Create((decimal) ((PyInteger)as_pi).InternalValue); } },
+            { ValueTuple.Create(typeof(PyInteger), typeof(PyFloat)), (as_pi) => { return (PyFloat) PyFloat.Create((double) (PyInteger)as_pi); } },
 
             // Float-Integer conversions
             { ValueTuple.Create(typeof(PyFloat), typeof(PyInteger)), (as_pf) => { return (PyInteger) PyInteger.Create((BigInteger) ((PyFloat)as_pf).InternalValue); } },
 
             // Bool-Bool conversions
-            { ValueTuple.Create(typeof(bool), typeof(PyBool)), (as_bool) => { return new PyBool((bool)as_bool); } },
+            { ValueTuple.Create(typeof(bool), typeof(PyBool)), (as_bool) => { return PyBool.Create((bool)as_bool); } },
             { ValueTuple.Create(typeof(PyBool), typeof(bool)), (as_pb) => { return ((PyBool)as_pb).InternalValue; } },
 
             // String-other conversions
             { ValueTuple.Create(typeof(PyString), typeof(PyInteger)), (as_text) => { return (PyInteger) PyInteger.Create(BigInteger.Parse(((PyString) as_text).InternalValue)); } },
             { ValueTuple.Create(typeof(string), typeof(PyInteger)), (as_text) => { return (PyInteger) PyInteger.Create(BigInteger.Parse((string) as_text)); } },
-            { ValueTuple.Create(typeof(PyString), typeof(PyFloat)), (as_text) => { return (PyFloat) PyFloat.Create(decimal.Parse(((PyString) as_text).InternalValue)); } },
-            { ValueTuple.Create(typeof(string), typeof(PyFloat)), (as_text) => { return (PyFloat) PyFloat.Create(decimal.Parse((string) as_text)); } },
+            { ValueTuple.Create(typeof(PyString), typeof(PyFloat)), (as_text) => { return (PyFloat) PyFloat.Create(double.Parse(((PyString) as_text).InternalValue, CultureInfo.InvariantCulture)); } },
+            { ValueTuple.Create(typeof(string), typeof(PyFloat)), (as_text) => { return (PyFloat) PyFloat.Create(double.Parse((string) as_text, CultureInfo.InvariantCulture)); } },
             { ValueTuple.Create(typeof(PyString), typeof(PyBool)), (as_text) => { return (PyBool) PyBool.Create(extendedBoolString(((PyString) as_text).InternalValue)); } },
             { ValueTuple.Create(typeof(string), typeof(PyBool)), (as_text) => { return (PyBool) PyBool.Create(extendedBoolString((string) as_text)); } },
 
             // We don't write out to-string conversions. If the toType is a string, we'll just use ToString(). (famous last words)
         };
 
-        // We'll reuse a ValueTuple instead of constantly creating new ones.
-        private static ValueTuple<Type, Type> cachedKey = ValueTuple.Create<Type, Type>(null, null);
+        // Conversion routines specialized for a (from, to) type pair. These are built on demand by GetConverter.
+        private static ConcurrentDictionary<ValueTuple<Type, Type>, Func<object, object>> specializedConverters =
+            new ConcurrentDictionary<ValueTuple<Type, Type>, Func<object, object>>();
 
-        public static object Convert(object fromObj, Type toType)
+        private static object identity(object fromObj)
         {
-            cachedKey.Item1 = fromObj.GetType();
-            cachedKey.Item2 = toType;
+            return fromObj;
+        }
 
-            if(fromObj == NoneType.Instance)
+        /// <summary>
+        /// Works out once how to convert an object of fromType to toType, and returns that as a delegate. Running the
+        /// delegate does the same thing as Convert() would, minus deciding which conversion to use.
+        /// </summary>
+        /// <param name="fromType">The runtime type of the objects to be converted.</param>
+        /// <param name="toType">The type to convert them into.</param>
+        /// <returns>A delegate converting objects of fromType into toType.</returns>
+        public static Func<object, object> GetConverter(Type fromType, Type toType)
+        {
+            var key = ValueTuple.Create(fromType, toType);
+            Func<object, object> converter;
+            if(!specializedConverters.TryGetValue(key, out converter))
             {
-                return null;
+                converter = specializedConverters.GetOrAdd(key, makeConverter(fromType, toType));
             }
-            else if (toType.IsAssignableFrom(cachedKey.Item1))
+            return converter;
+        }
+
+        private static Func<object, object> makeConverter(Type fromType, Type toType)
+        {
+            Func<object, object> converter;
+            if (toType.IsAssignableFrom(fromType))
             {
-                return fromObj;
+                converter = identity;
             }
             else if (toType == typeof(string))
             {
-                return fromObj.ToString();
+                converter = (fromObj) => fromObj.ToString();
             }
             else if (toType == typeof(PyString))
             {
-                return PyString.Create(fromObj.ToString());
+                converter = (fromObj) => PyString.Create(fromObj.ToString());
             }
-            else if (converters.ContainsKey(cachedKey))
+            else if (converters.ContainsKey(ValueTuple.Create(fromType, toType)))
             {
-                return converters[cachedKey].Invoke(fromObj);
+                converter = converters[ValueTuple.Create(fromType, toType)];
             }
-            else if(fromObj is PyDotNetClassProxy)
+            else if(typeof(PyDotNetClassProxy).IsAssignableFrom(fromType))
             {
-                return ((PyDotNetClassProxy)fromObj).__getattribute__(PyDotNetClassProxy.__dotnettype__);
+                converter = (fromObj) => ((PyDotNetClassProxy)fromObj).__getattribute__(PyDotNetClassProxy.__dotnettype__);
             }
             else
             {
-                return fromObj;
+                converter = identity;
             }
+
+            // None always turns into null, even if the target type could have taken it as-is.
+            if(typeof(NonePyObject).IsAssignableFrom(fromType))
+            {
+                var notNoneConverter = converter;
+                converter = (fromObj) => fromObj == NoneType.Instance ? null : notNoneConverter(fromObj);
+            }
+            return converter;
         }
 
-        public static bool CanConvert(Type fromType, Type toType)
+        public static object Convert(object fromObj, Type toType)
         {
-            cachedKey.Item1 = fromType;
-            cachedKey.Item2 = toType;
+            return GetConverter(fromObj.GetType(), toType)(fromObj);
+        }
 
+        public static bool CanConvert(Type fromType, Type toType)
+        {
             if(toType.IsAssignableFrom(fromType))
             {
                 return true;
@@ -129,7 +159,44 @@ namespace LanguageImplementation
             {
                 return true;
             }
-            return converters.ContainsKey(cachedKey);
+            return converters.ContainsKey(ValueTuple.Create(fromType, toType));
+        }
+    }
+
+    /// <summary>
+    /// Converts values into one particular type, remembering the conversion for the last runtime type it saw. A given
+    /// parameter almost always gets fed the same type of argument, so this usually skips even the converter lookup.
+    /// </summary>
+    public class ParameterConverter
+    {
+        private class CachedConversion
+        {
+            public Type FromType;
+            public Func<object, object> Converter;
+        }
+
+        public Type ToType
+        {
+            get; private set;
+        }
+
+        private CachedConversion lastConversion;
+
+        public ParameterConverter(Type toType)
+        {
+            ToType = toType;
+        }
+
+        public object Convert(object fromObj)
+        {
+            var fromType = fromObj.GetType();
+            var cached = lastConversion;
+            if(cached == null || cached.FromType != fromType)
+            {
+                cached = new CachedConversion { FromType = fromType, Converter = PyNetConverter.GetConverter(fromType, ToType) };
+                lastConversion = cached;
+            }
+            return cached.Converter(fromObj);
         }
     }
 }
@@ -36,10 +36,10 @@ namespace LanguageImplementation
                 {
                     return (int)asPyInt.InternalValue;
                 }
-                else if (asPyObject.__dict__.ContainsKey("__index__"))
+                else if (asPyObject.HasUnboundAttribute("__index__"))
                 {
-                    var index_dunder = (IPyCallable)asPyObject.__dict__["__index__"];
-                    var index = await index_dunder.Call(interpreter, context, new object[0]);
+                    var index_dunder = (IPyCallable)asPyObject.GetUnboundAttribute("__index__");
+                    var index = await index_dunder.Call(interpreter, context, new object[] { asPyObject });
                     var asPyIndex = index as PyInteger;
                     if (asPyIndex == null)
                     {
@@ -0,0 +1,108 @@
+﻿using System;
+using System.Collections;
+using System.Collections.Generic;
+
+namespace LanguageImplementation
+{
+    /// <summary>
+    /// A frame's data stack. It works like a Stack&lt;object&gt;, including enumerating from the top down, but it sits on
+    /// an array the frame sizes from its code's StackSize up front. That way a frame that gets reused keeps its storage
+    /// instead of growing a new stack. It still grows if something goes deeper than that.
+    /// </summary>
+    public class ValueStack : IEnumerable<object>
+    {
+        private static readonly object[] empty = new object[0];
+
+        private object[] items;
+        private int count;
+
+        public ValueStack()
+        {
+            items = empty;
+            count = 0;
+        }
+
+        public ValueStack(int capacity) : this()
+        {
+            EnsureCapacity(capacity);
+        }
+
+        public int Count
+        {
+            get
+            {
+                return count;
+            }
+        }
+
+        /// <summary>
+        /// Makes sure the stack can hold at least the given number of items without growing.
+        /// </summary>
+        public void EnsureCapacity(int capacity)
+        {
+            if(capacity > items.Length)
+            {
+                Array.Resize(ref items, capacity);
+            }
+        }
+
+        public void Push(object item)
+        {
+            if(count == items.Length)
+            {
+                EnsureCapacity(items.Length == 0 ? 4 : items.Length * 2);
+            }
+            items[count] = item;
+            ++count;
+        }
+
+        public object Pop()
+        {
+            if(count == 0)
+            {
+                throw new InvalidOperationException("Stack empty.");
+            }
+            --count;
+            var item = items[count];
+            items[count] = null;
+            return item;
+        }
+
+        public object Peek()
+        {
+            return Peek(0);
+        }
+
+        /// <summary>
+        /// Gets an item without popping anything. Depth 0 is the top of the stack, which is the same order
+        /// enumerating the stack goes in.
+        /// </summary>
+        public object Peek(int depth)
+        {
+            if(depth < 0 || depth >= count)
+            {
+                throw new InvalidOperationException("Stack empty.");
+            }
+            return items[count - 1 - depth];
+        }
+
+        public void Clear()
+        {
+            Array.Clear(items, 0, count);
+            count = 0;
+        }
+
+        public IEnumerator<object> GetEnumerator()
+        {
+            for(int i = count - 1; i >= 0; --i)
+            {
+                yield return items[i];
+            }
+        }
+
+        IEnumerator IEnumerable.GetEnumerator()
+        {
+            return GetEnumerator();
+        }
+    }
+}
@@ -1,5 +1,6 @@
 ﻿using LanguageImplementation.DataTypes;
 using System;
+using System.Collections.Concurrent;
 using System.Collections.Generic;
 using System.Linq;
 using System.Reflection;
@@ -20,6 +21,89 @@ namespace LanguageImplementation
         }
     }
 
+    /// <summary>
+    /// The runtime shape of a set of call arguments. Overload resolution only looks at the types of the arguments,
+    /// except for leading arguments that are themselves types (or .NET class proxies) being used to fill in generic
+    /// parameters. Those get keyed by the type they represent.
+    /// </summary>
+    public class ArgumentSignature : IEquatable<ArgumentSignature>
+    {
+        private Type[] argTypes;
+        private Type[] representedTypes;
+        private int hash;
+
+        private ArgumentSignature(Type[] argTypes, Type[] representedTypes)
+        {
+            this.argTypes = argTypes;
+            this.representedTypes = representedTypes;
+
+            hash = argTypes.Length;
+            for(int i = 0; i < argTypes.Length; ++i)
+            {
+                hash = hash * 31 + argTypes[i].GetHashCode();
+                if(representedTypes[i] != null)
+                {
+                    hash = hash * 31 + representedTypes[i].GetHashCode();
+                }
+            }
+        }
+
+        /// <summary>
+        /// Builds the signature for the given arguments. Returns null if the arguments can't be described by their
+        /// types alone (currently just when one is null), which means the call shouldn't be cached.
+        /// </summary>
+        public static ArgumentSignature Create(object[] args)
+        {
+            var argTypes = new Type[args.Length];
+            var representedTypes = new Type[args.Length];
+            for(int i = 0; i < args.Length; ++i)
+            {
+                if(args[i] == null)
+                {
+                    return null;
+                }
+
+                argTypes[i] = args[i].GetType();
+                if(args[i] is Type)
+                {
+                    representedTypes[i] = (Type)args[i];
+                }
+                else if(args[i] is PyDotNetClassProxy)
+                {
+                    representedTypes[i] = (Type)((PyDotNetClassProxy)args[i]).__getattribute__(PyDotNetClassProxy.__dotnettype__);
+                }
+            }
+            return new ArgumentSignature(argTypes, representedTypes);
+        }
+
+        public bool Equals(ArgumentSignature other)
+        {
+            if(other == null || other.hash != hash || other.argTypes.Length != argTypes.Length)
+            {
+                return false;
+            }
+
+            for(int i = 0; i < argTypes.Length; ++i)
+            {
+                if(argTypes[i] != other.argTypes[i] || representedTypes[i] != other.representedTypes[i])
+                {
+                    return false;
+                }
+            }
+            return true;
+        }
+
+        public override bool Equals(object other)
+        {
+            return Equals(other as ArgumentSignature);
+        }
+
+        public override int GetHashCode()
+        {
+            return hash;
+        }
+    }
+
     /// <summary>
     /// Represents callable code outside of the scope of the interpreter.
     /// </summary>
@@ -33,6 +117,72 @@ namespace LanguageImplementation
 
         private object instance;
 
+        // Overload resolution results for this set of MethodBases, keyed by the shape of the arguments. WrappedCodeObjects
+        // get created over the same methods all the time (bound instance methods, class proxies), so these are shared
+        // between every WrappedCodeObject wrapping the same MethodBases.
+        private ConcurrentDictionary<ArgumentSignature, FoundBestMethod> resolvedOverloads;
+        private static ConcurrentDictionary<OverloadSet, ConcurrentDictionary<ArgumentSignature, FoundBestMethod>> overloadSets =
+            new ConcurrentDictionary<OverloadSet, ConcurrentDictionary<ArgumentSignature, FoundBestMethod>>();
+
+        /// <summary>
+        /// Key for the shared overload resolution caches: the MethodBases being wrapped, compared element by element.
+        /// </summary>
+        private class OverloadSet : IEquatable<OverloadSet>
+        {
+            private MethodBase[] methodBases;
+            private int hash;
+
+            public OverloadSet(MethodBase[] methodBases)
+            {
+                this.methodBases = methodBases;
+                hash = methodBases.Length;
+                foreach(var methodBase in methodBases)
+                {
+                    hash = hash * 31 + methodBase.GetHashCode();
+                }
+            }
+
+            public bool Equals(OverloadSet other)
+            {
+                if(other == null || other.hash != hash || other.methodBases.Length != methodBases.Length)
+                {
+                    return false;
+                }
+
+                for(int i = 0; i < methodBases.Length; ++i)
+                {
+                    if(!methodBases[i].Equals(other.methodBases[i]))
+                    {
+                        return false;
+                    }
+                }
+                return true;
+            }
+
+            public override bool Equals(object other)
+            {
+                return Equals(other as OverloadSet);
+            }
+
+            public override int GetHashCode()
+            {
+                return hash;
+            }
+        }
+
+        private ConcurrentDictionary<ArgumentSignature, FoundBestMethod> ResolvedOverloads
+        {
+            get
+            {
+                if(resolvedOverloads == null)
+                {
+                    resolvedOverloads = overloadSets.GetOrAdd(new OverloadSet(MethodBases),
+                        (ignored) => new ConcurrentDictionary<ArgumentSignature, FoundBestMethod>());
+                }
+                return resolvedOverloads;
+            }
+        }
+
         public string Name
         {
             get; protected set;
@@ -186,7 +336,9 @@ namespace LanguageImplementation
 
         public WrappedCodeObject CloneForInstance(object instance)
         {
-            return new WrappedCodeObject(Name, MethodBases, instance);
+            var clone = new WrappedCodeObject(Name, MethodBases, instance);
+            clone.resolvedOverloads = ResolvedOverloads;
+            return clone;
         }
 
         /// <summary>
@@ -195,13 +347,25 @@ namespace LanguageImplementation
         /// the coroutine, harvest its result, and convert that to an object. This inner coroutine is wrapped
         /// as the Task<object> we wanted in the first place.
         /// </summary>
+        /// <param name="methodBase">The method to invoke. This is the match found in Call().</param>
         /// <param name="final_args">The final arguments to give to the method when invoking it. This is prepared
         /// by the injector in Call().</param>
         /// <returns>A Task<object> where the returned object is casted from some other type that was the original
         /// method's return type.</returns>
-        private async Task<object> InvokeAsTaskObject(object[] final_args)
+        private Task<object> InvokeAsTaskObject(MethodBase methodBase, object[] final_args)
+        {
+            var task = (Task)CompiledInvoker.Invoke(methodBase, instance, final_args);
+
+            // Most of these finish without ever suspending, so skip the coroutine when the result is already there.
+            if (task.Status == TaskStatus.RanToCompletion)
+            {
+                return Task.FromResult((object)((dynamic)task).Result);
+            }
+            return AwaitAsTaskObject(task);
+        }
+
+        private async Task<object> AwaitAsTaskObject(Task task)
         {
-            var task = (Task)MethodBases[0].Invoke(instance, final_args);
             await task.ConfigureAwait(true);
             var result = ((dynamic)task).Result;
             return (object)result;
@@ -230,10 +394,30 @@ namespace LanguageImplementation
         /// <summary>
         /// Search all the available MethodInfos and return one that most appropriately matches the given arguments. Note that
         /// injectable arguments will simply be skipped during consideration; it won't expect to find them in the given arguments.
+        /// 
+        /// The match depends only on the arguments' types, so it gets cached by their ArgumentSignature. Repeated calls with the
+        /// same shapes of arguments skip resolution and generic monomorphization entirely.
         /// </summary>
         /// <param name="in_args">Arguments to call this method with</param>
         /// <returns>The right MethodInformation to use to invoke the method.</returns>
         public FoundBestMethod FindBestMethodMatch(object[] in_args)
+        {
+            var signature = ArgumentSignature.Create(in_args);
+            if(signature == null)
+            {
+                return resolveBestMethodMatch(in_args);
+            }
+
+            FoundBestMethod found;
+            if(!ResolvedOverloads.TryGetValue(signature, out found))
+            {
+                found = resolveBestMethodMatch(in_args);
+                ResolvedOverloads[signature] = found;
+            }
+            return found;
+        }
+
+        private FoundBestMethod resolveBestMethodMatch(object[] in_args)
         {
             foreach(var methodBase_itr in MethodBases)
             {
@@ -456,7 +640,7 @@ namespace LanguageImplementation
             var asConstructorInfo = methodBase as ConstructorInfo;
             if (methodBase is ConstructorInfo)
             {
-                return Task.FromResult(asConstructorInfo.Invoke(injectedArgs));
+                return Task.FromResult(CompiledInvoker.Invoke(asConstructorInfo, null, injectedArgs));
             }
             else if (asMethodInfo != null && asMethodInfo.ReturnType.IsGenericType && asMethodInfo.ReturnType.GetGenericTypeDefinition() == typeof(Task<>))
             {
@@ -464,16 +648,16 @@ namespace LanguageImplementation
                 // our helper.
                 if (asMethodInfo.ReturnType == typeof(Task<object>))
                 {
-                    return (Task<object>)methodBase.Invoke(instance, injectedArgs);
+                    return (Task<object>)CompiledInvoker.Invoke(methodBase, instance, injectedArgs);
                 }
                 else
                 {
-                    return InvokeAsTaskObject(injectedArgs);
+                    return InvokeAsTaskObject(methodBase, injectedArgs);
                 }
             }
             else
             {
-                return Task.FromResult(methodBase.Invoke(instance, injectedArgs));
+                return Task.FromResult(CompiledInvoker.Invoke(methodBase, instance, injectedArgs));
             }
         }
 